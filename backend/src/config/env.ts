@@ -10,6 +10,29 @@ export type EnvConfig = {
   pineconeApiKey?: string;
   pineconeIndex?: string;
   pineconeNamespace?: string;
+  logLevel: string;
+  logFormat: string;
+  logBuffer: boolean;
+  metricsFlushIntervalMs: number;
+  embeddingBatchWindowMs: number;
+  embeddingBatchMaxSize: number;
+  serverEmbeddingBatchMaxSize: number;
+  searchShapeRerankWeight: number;
+  searchShapeMaxDistance?: number;
+  searchMaxInFlight: number;
+  searchMaxQueue: number;
+  searchDeadlineMs: number;
+  serverPort: number;
+  serverWorkers: number;
+  serverShutdownTimeoutMs: number;
+  pineconeTimeoutMs: number;
+  dynamodbTimeoutMs: number;
+  hedgeMinDelayMs: number;
+  hedgeMaxRatio: number;
+  circuitFailureThreshold: number;
+  circuitOpenMs: number;
+  activeIndexTtlMs: number;
+  cursorSecret?: string;
 };
 
 let envFileLoaded = false;
@@ -74,6 +97,18 @@ function getEnv(name: string, fallback?: string): string | undefined {
   return value;
 }
 
+function getIntEnv(name: string, fallback: number): number {
+  const value = getEnv(name);
+  const parsed = value === undefined ? Number.NaN : Number.parseInt(value, 10);
+  return Number.isInteger(parsed) && parsed >= 0 ? parsed : fallback;
+}
+
+function getFloatEnv(name: string): number | undefined {
+  const value = getEnv(name);
+  const parsed = value === undefined ? Number.NaN : Number.parseFloat(value);
+  return Number.isFinite(parsed) && parsed >= 0 ? parsed : undefined;
+}
+
 export const env: EnvConfig = {
   nodeEnv: getEnv('NODE_ENV', 'development') ?? 'development',
   apiBaseUrl: getEnv('API_BASE_URL'),
@@ -82,7 +117,32 @@ export const env: EnvConfig = {
   dynamodbTableName: getEnv('DYNAMODB_TABLE_NAME'),
   pineconeApiKey: getEnv('PINECONE_API_KEY'),
   pineconeIndex: getEnv('PINECONE_INDEX'),
-  pineconeNamespace: getEnv('PINECONE_NAMESPACE', 'industrility-demo')
+  pineconeNamespace: getEnv('PINECONE_NAMESPACE', 'industrility-demo'),
+  logLevel: getEnv('LOG_LEVEL', 'INFO') ?? 'INFO',
+  logFormat: getEnv('LOG_FORMAT', 'text') ?? 'text',
+  logBuffer: (getEnv('LOG_BUFFER', 'true') ?? 'true').toLowerCase() !== 'false',
+  metricsFlushIntervalMs: getIntEnv('METRICS_FLUSH_INTERVAL_MS', 60_000),
+  embeddingBatchWindowMs: getIntEnv('EMBEDDING_BATCH_WINDOW_MS', 4),
+  // Off by default: a Lambda container serves one request at a time, so a batch window only adds
+  // latency. The cluster server handles concurrent requests per worker and batches by default.
+  embeddingBatchMaxSize: getIntEnv('EMBEDDING_BATCH_MAX_SIZE', 1),
+  serverEmbeddingBatchMaxSize: getIntEnv('EMBEDDING_BATCH_MAX_SIZE', 8),
+  searchShapeRerankWeight: getFloatEnv('SEARCH_SHAPE_RERANK_WEIGHT') ?? 0,
+  searchShapeMaxDistance: getFloatEnv('SEARCH_SHAPE_MAX_DISTANCE'),
+  searchMaxInFlight: getIntEnv('SEARCH_MAX_IN_FLIGHT', 8),
+  searchMaxQueue: getIntEnv('SEARCH_MAX_QUEUE', 32),
+  searchDeadlineMs: getIntEnv('SEARCH_DEADLINE_MS', 25_000),
+  serverPort: getIntEnv('SERVER_PORT', 3001),
+  serverWorkers: getIntEnv('SERVER_WORKERS', 0),
+  serverShutdownTimeoutMs: getIntEnv('SERVER_SHUTDOWN_TIMEOUT_MS', 30_000),
+  pineconeTimeoutMs: getIntEnv('PINECONE_TIMEOUT_MS', 3_000),
+  dynamodbTimeoutMs: getIntEnv('DYNAMODB_TIMEOUT_MS', 1_000),
+  hedgeMinDelayMs: getIntEnv('HEDGE_MIN_DELAY_MS', 20),
+  hedgeMaxRatio: getFloatEnv('HEDGE_MAX_RATIO') ?? 0.1,
+  circuitFailureThreshold: getIntEnv('CIRCUIT_FAILURE_THRESHOLD', 5),
+  circuitOpenMs: getIntEnv('CIRCUIT_OPEN_MS', 10_000),
+  activeIndexTtlMs: getIntEnv('ACTIVE_INDEX_TTL_MS', 30_000),
+  cursorSecret: getEnv('CURSOR_SECRET')
 };
 
 function requireEnv(name: string): string {
@@ -130,3 +190,16 @@ export function validatePreindexEnv(): {
     pineconeNamespace: getEnv('PINECONE_NAMESPACE', 'industrility-demo') ?? 'industrility-demo'
   };
 }
+
+export function validateCandidatesEnv(): {
+  awsRegion: string;
+  s3BucketName: string;
+  dynamodbTableName: string;
+} {
+  const awsRegion = getEnv('AWS_REGION', 'ap-south-1') ?? 'ap-south-1';
+  return {
+    awsRegion,
+    s3BucketName: requireEnv('S3_BUCKET_NAME'),
+    dynamodbTableName: requireEnv('DYNAMODB_TABLE_NAME')
+  };
+}
@@ -0,0 +1,134 @@
+import type { APIGatewayProxyEventV2, APIGatewayProxyHandlerV2 } from 'aws-lambda';
+import { env, validateCandidatesEnv } from '../config/env';
+import { logger } from '../utils/logger';
+import { jsonResponse, withRetryAfter, withServerTiming } from '../utils/http';
+import { RequestTimer, flushLatencyMetrics, runWithTimer, timeSpan } from '../utils/metrics';
+import { decodeCandidateCursor, encodeCandidateCursor } from '../utils/cursor';
+import { metadataKeyPrefix } from '../utils/indexVersion';
+import { requestDeadline, runWithDeadline } from '../utils/deadline';
+import { DynamoDbProvider } from '../providers/metadata/dynamodbProvider';
+import { MetadataService } from '../services/metadataService';
+import { S3Provider } from '../providers/storage/s3Provider';
+import { StorageService } from '../services/storageService';
+import { CandidateService } from '../services/candidateService';
+import { getSharedDependencyGuard, isDependencyUnavailable } from '../services/dependencyGuard';
+
+// Budget for one hydration, inside the function's 10 s timeout.
+const CANDIDATES_BUDGET_MS = 9_000;
+
+export function createAwsCandidateService(): CandidateService {
+  const { awsRegion, s3BucketName, dynamodbTableName } = validateCandidatesEnv();
+  const metadataService = new MetadataService(
+    new DynamoDbProvider(awsRegion),
+    dynamodbTableName,
+    getSharedDependencyGuard('dynamodb')
+  );
+  const storageService = new StorageService(new S3Provider(awsRegion), s3BucketName);
+  return new CandidateService(metadataService, storageService);
+}
+
+async function handleCandidates(event: APIGatewayProxyEventV2, createCandidateService: () => CandidateService) {
+  const start = Date.now();
+  const requestId = event.requestContext?.requestId;
+  const logStep = (step: string, details?: string) => {
+    const elapsedMs = Date.now() - start;
+    logger.info(`[CANDIDATES_STEP] t+${elapsedMs}ms | ${step}${details ? ` | ${details}` : ''}`, { requestId });
+  };
+
+  logStep('request_received');
+
+  const rawCursor = event.queryStringParameters?.cursor;
+  if (!rawCursor) {
+    return jsonResponse(
+      400,
+      {
+        error: 'Missing cursor query parameter',
+        error_code: 'MISSING_CURSOR',
+        request_id: requestId
+      },
+      requestId
+    );
+  }
+
+  try {
+    const { candidates, indexVersion } = decodeCandidateCursor(rawCursor);
+    const [nextCandidate, ...remainingCandidates] = candidates;
+    if (!nextCandidate) {
+      return jsonResponse(200, { modelCandidate: null, cursor: null, request_id: requestId }, requestId);
+    }
+
+    // Hydrate from the index version that ranked the candidates, even if a newer one went live since.
+    const candidateService = createCandidateService().withMetadataPrefix(metadataKeyPrefix(indexVersion));
+
+    const { source, ...modelCandidate } = await timeSpan('hydration', () => candidateService.hydrate(nextCandidate));
+    logStep(
+      'model_candidate_views_done',
+      `part=${modelCandidate.partId} views=${modelCandidate.views.length} source=${source} atlas=${modelCandidate.atlas ? 'yes' : 'no'} remaining=${remainingCandidates.length} index_version=${indexVersion ?? 'legacy'}`
+    );
+
+    return jsonResponse(
+      200,
+      { modelCandidate, cursor: encodeCandidateCursor(remainingCandidates, indexVersion), request_id: requestId },
+      requestId
+    );
+  } catch (error) {
+    const message = error instanceof Error ? error.message : String(error);
+    logStep('candidates_failed', `message=${message}`);
+    if (message.includes('Invalid candidate cursor')) {
+      return jsonResponse(
+        400,
+        {
+          error: message,
+          error_code: 'INVALID_CURSOR',
+          request_id: requestId
+        },
+        requestId
+      );
+    }
+    if (isDependencyUnavailable(message)) {
+      return withRetryAfter(
+        jsonResponse(
+          503,
+          {
+            error: 'Metadata store unavailable',
+            error_code: 'DEPENDENCY_UNAVAILABLE',
+            request_id: requestId
+          },
+          requestId
+        ),
+        message.includes('circuit open') ? Math.ceil(env.circuitOpenMs / 1000) : 1
+      );
+    }
+
+    return jsonResponse(
+      500,
+      {
+        error: 'Internal server error',
+        error_code: 'INTERNAL_ERROR',
+        request_id: requestId
+      },
+      requestId
+    );
+  }
+}
+
+export function createCandidatesHandler(
+  createCandidateService: () => CandidateService = createAwsCandidateService
+): APIGatewayProxyHandlerV2 {
+  return async (event, context) => {
+    const timer = new RequestTimer();
+    const deadlineAt = requestDeadline(CANDIDATES_BUDGET_MS, context?.getRemainingTimeInMillis?.());
+    try {
+      const response = await runWithDeadline(deadlineAt, () =>
+        runWithTimer(timer, () => handleCandidates(event, createCandidateService))
+      );
+      return withServerTiming(response, timer);
+    } finally {
+      logger.info(`[REQUEST_TIMING] route=candidates ${timer.summary()}`, { requestId: event.requestContext?.requestId });
+      flushLatencyMetrics();
+      logger.flush();
+    }
+  };
+}
+
+export const handler = createCandidatesHandler();
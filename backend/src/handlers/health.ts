@@ -4,6 +4,7 @@ import { formatIstTimestamp, logger } from '../utils/logger';
 export const handler: APIGatewayProxyHandlerV2 = async (event) => {
   const requestId = event.requestContext?.requestId;
   logger.info('Health check invoked', { requestId });
+  logger.flush();
 
   const timeIst = formatIstTimestamp(new Date());
 
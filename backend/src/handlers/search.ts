@@ -1,21 +1,40 @@
-import type { APIGatewayProxyHandlerV2 } from 'aws-lambda';
-import { validateSearchEnv } from '../config/env';
-import { parseMultipartFile } from '../utils/multipart';
+import type { APIGatewayProxyEventV2, APIGatewayProxyHandlerV2 } from 'aws-lambda';
+import { performance } from 'perf_hooks';
+import { env, validateSearchEnv } from '../config/env';
+import { parseUploadedFiles } from '../utils/multipart';
 import { logger } from '../utils/logger';
+import { jsonResponse, withRetryAfter, withServerTiming } from '../utils/http';
+import { RequestTimer, flushLatencyMetrics, registerGauge, runWithTimer, timeSpan } from '../utils/metrics';
+import { requestDeadline, runWithDeadline } from '../utils/deadline';
 import { ClipXenovaProvider } from '../providers/embedding/clipXenovaProvider';
 import { EmbeddingService } from '../services/embeddingService';
+import { EmbeddingBatcher } from '../services/embeddingBatcher';
+import { AdmissionController } from '../services/admissionController';
+import type { AdmissionTicket } from '../services/admissionController';
+import { getSharedDependencyGuard, isDependencyUnavailable } from '../services/dependencyGuard';
+import { getSharedActiveIndexService } from '../services/activeIndexService';
+import type { ActiveIndexService } from '../services/activeIndexService';
 import { PineconeProvider } from '../providers/vector/pineconeProvider';
 import { PineconeService } from '../services/pineconeService';
 import { DynamoDbProvider } from '../providers/metadata/dynamodbProvider';
 import { MetadataService } from '../services/metadataService';
 import { S3Provider } from '../providers/storage/s3Provider';
 import { StorageService } from '../services/storageService';
+import { CandidateService, splitReferenceId } from '../services/candidateService';
+import { encodeCandidateCursor } from '../utils/cursor';
+import { SHAPE_METADATA_KEY, parseShapeVector, rerankByShape } from '../utils/shape';
+import { describeFilter, parseSearchFilter } from '../utils/partAttributes';
+import { DEFAULT_RANKING_OPTIONS, aggregateByPart, fuseQueryMatches, selectParts } from '../utils/ranking';
+import type { CandidateView, ModelCandidate, PendingCandidate } from '../types/search';
 
 const MAX_UPLOAD_BYTES = 5 * 1024 * 1024;
+// Photos of one part per request (repeated `file` fields), embedded in one forward pass.
+const MAX_UPLOAD_FILES = 6;
+// All photos of one request together; with multipart overhead this stays under the 6 MB body cap.
+const MAX_UPLOAD_TOTAL_BYTES = 5 * 1024 * 1024;
 const ALLOWED_MIME_TYPES = new Set(['image/png', 'image/jpeg', 'image/jpg', 'image/webp']);
 const CRASH_HOOK_KEY = '__INDUSTRILITY_SEARCH_CRASH_HOOK__';
-const VIEW_SUFFIXES = ['top', 'bottom', 'left', 'right', 'front', 'back', 'isometric'] as const;
-const DEFAULT_MIN_PART_SCORE = 0.72;
+const DEFAULT_MIN_PART_SCORE = DEFAULT_RANKING_OPTIONS.minPartScore;
 
 if (!(globalThis as Record<string, unknown>)[CRASH_HOOK_KEY]) {
   (globalThis as Record<string, unknown>)[CRASH_HOOK_KEY] = true;
@@ -32,44 +51,154 @@ if (!(globalThis as Record<string, unknown>)[CRASH_HOOK_KEY]) {
   });
 }
 
-function jsonResponse(statusCode: number, payload: Record<string, unknown>, requestId?: string) {
+// Shared across concurrent invocations in long-running deployments (serverless-offline, containers).
+let sharedEmbeddingBatcher: EmbeddingBatcher | null = null;
+
+function getSharedEmbeddingBatcher(maxBatchSize: number): EmbeddingBatcher | undefined {
+  if (maxBatchSize <= 1) {
+    return undefined;
+  }
+  if (!sharedEmbeddingBatcher) {
+    const batcher = new EmbeddingBatcher(new ClipXenovaProvider(), {
+      windowMs: env.embeddingBatchWindowMs,
+      maxBatchSize
+    });
+    registerGauge('embedding_batcher', () => batcher.getStats());
+    sharedEmbeddingBatcher = batcher;
+  }
+  return sharedEmbeddingBatcher;
+}
+
+let sharedAdmissionController: AdmissionController | null = null;
+
+function getSharedAdmissionController(): AdmissionController | null {
+  if (env.searchMaxInFlight <= 0) {
+    return null;
+  }
+  if (!sharedAdmissionController) {
+    const controller = new AdmissionController({
+      maxInFlight: env.searchMaxInFlight,
+      maxQueue: env.searchMaxQueue,
+      deadlineMs: env.searchDeadlineMs
+    });
+    registerGauge('search_admission', () => controller.getStats());
+    sharedAdmissionController = controller;
+  }
+  return sharedAdmissionController;
+}
+
+export type SearchDependencies = {
+  configSummary: string;
+  embeddingService: EmbeddingService;
+  pineconeService: PineconeService;
+  metadataService: MetadataService;
+  candidateService: CandidateService;
+  /** Blue/green pointer; without it the services are used as configured. */
+  activeIndex?: ActiveIndexService;
+};
+
+export function createAwsSearchDependencies(
+  embeddingBatchMaxSize: number = env.embeddingBatchMaxSize
+): SearchDependencies {
+  const { awsRegion, s3BucketName, dynamodbTableName, pineconeApiKey, pineconeIndex, pineconeNamespace } =
+    validateSearchEnv();
+
+  const clipProvider = new ClipXenovaProvider();
+  const embeddingService = new EmbeddingService(clipProvider, getSharedEmbeddingBatcher(embeddingBatchMaxSize));
+  const pineconeProvider = new PineconeProvider(pineconeApiKey);
+  const pineconeService = new PineconeService(
+    pineconeProvider,
+    pineconeIndex,
+    pineconeNamespace,
+    getSharedDependencyGuard('pinecone')
+  );
+  const dynamoProvider = new DynamoDbProvider(awsRegion);
+  const metadataService = new MetadataService(dynamoProvider, dynamodbTableName, getSharedDependencyGuard('dynamodb'));
+  const s3Provider = new S3Provider(awsRegion);
+  const storageService = new StorageService(s3Provider, s3BucketName);
+  const candidateService = new CandidateService(metadataService, storageService);
+
   return {
-    statusCode,
-    headers: {
-      'content-type': 'application/json',
-      ...(requestId ? { 'x-request-id': requestId } : {})
-    },
-    body: JSON.stringify(payload)
+    configSummary: `region=${awsRegion} bucket=${s3BucketName} table=${dynamodbTableName} pinecone_index=${pineconeIndex} namespace=${pineconeNamespace} api_key_set=${pineconeApiKey ? 'yes' : 'no'}`,
+    embeddingService,
+    pineconeService,
+    metadataService,
+    candidateService,
+    activeIndex: getSharedActiveIndexService(dynamodbTableName, metadataService, pineconeNamespace)
   };
 }
 
-export const handler: APIGatewayProxyHandlerV2 = async (event) => {
+async function handleSearch(
+  event: APIGatewayProxyEventV2,
+  timer: RequestTimer,
+  createDependencies: () => SearchDependencies
+) {
   const start = Date.now();
   const requestId = event.requestContext?.requestId;
+  const formatStep = (step: string, details?: string) =>
+    `[SEARCH_STEP] t+${Date.now() - start}ms | ${step}${details ? ` | ${details}` : ''}`;
   const logStep = (step: string, details?: string) => {
-    const elapsedMs = Date.now() - start;
-    logger.info(`[SEARCH_STEP] t+${elapsedMs}ms | ${step}${details ? ` | ${details}` : ''}`, { requestId });
+    logger.info(formatStep(step, details), { requestId });
+  };
+  // Per-match detail: the details closure only runs when DEBUG is enabled.
+  const debugStep = (step: string, details?: () => string) => {
+    logger.debug(() => formatStep(step, details?.()), { requestId });
   };
 
   logStep('request_received', `method=${event.requestContext?.http?.method ?? 'unknown'} path=${event.requestContext?.http?.path ?? '/search'}`);
 
   try {
-    const { awsRegion, s3BucketName, dynamodbTableName, pineconeApiKey, pineconeIndex, pineconeNamespace } =
-      validateSearchEnv();
+    const dependencies = createDependencies();
+    const { configSummary, embeddingService, activeIndex: activeIndexService } = dependencies;
+    logStep('env_validated', configSummary);
+
+    // Every read below goes to the index version that is live now; the cursor carries it along
+    // so later hydration stays on the same version across a switchover.
+    const activeIndex = activeIndexService ? await timeSpan('active_index', () => activeIndexService.resolve()) : null;
+    const pineconeService = activeIndex
+      ? dependencies.pineconeService.withNamespace(activeIndex.namespace)
+      : dependencies.pineconeService;
+    const metadataService = activeIndex
+      ? dependencies.metadataService.withKeyPrefix(activeIndex.metadataPrefix)
+      : dependencies.metadataService;
+    const candidateService = activeIndex
+      ? dependencies.candidateService.withMetadataPrefix(activeIndex.metadataPrefix)
+      : dependencies.candidateService;
+    logStep('active_index_resolved', `version=${activeIndex?.version ?? 'legacy'} namespace=${pineconeService.namespace}`);
+
+    // Optional ?family=&manufacturer=&view= filter, applied inside the vector query.
+    const filter = parseSearchFilter(event.queryStringParameters);
+
+    logStep('multipart_parse_start');
+    const files = await timeSpan('multipart', () =>
+      parseUploadedFiles(event, {
+        fieldName: 'file',
+        maxBytes: MAX_UPLOAD_BYTES,
+        maxFiles: MAX_UPLOAD_FILES
+      })
+    );
     logStep(
-      'env_validated',
-      `region=${awsRegion} bucket=${s3BucketName} table=${dynamodbTableName} pinecone_index=${pineconeIndex} namespace=${pineconeNamespace} api_key_set=${pineconeApiKey ? 'yes' : 'no'}`
+      'multipart_parse_done',
+      `files=${files.length} ${files.map((file) => `filename=${file.filename} bytes=${file.size} mime=${file.mimeType}`).join(' ')}`
     );
 
-    logStep('multipart_parse_start');
-    const file = await parseMultipartFile(event, {
-      fieldName: 'file',
-      maxBytes: MAX_UPLOAD_BYTES
-    });
-    logStep('multipart_parse_done', `filename=${file.filename} bytes=${file.size} mime=${file.mimeType}`);
+    const totalBytes = files.reduce((sum, file) => sum + file.size, 0);
+    if (totalBytes > MAX_UPLOAD_TOTAL_BYTES) {
+      logStep('validation_rejected', `total_bytes=${totalBytes}`);
+      return jsonResponse(
+        413,
+        {
+          error: `Uploads exceed a total of ${MAX_UPLOAD_TOTAL_BYTES} bytes`,
+          error_code: 'FILE_TOO_LARGE',
+          request_id: requestId
+        },
+        requestId
+      );
+    }
 
-    if (!ALLOWED_MIME_TYPES.has(file.mimeType)) {
-      logStep('validation_rejected', `unsupported_mime=${file.mimeType}`);
+    const unsupportedFile = files.find((file) => !ALLOWED_MIME_TYPES.has(file.mimeType));
+    if (unsupportedFile) {
+      logStep('validation_rejected', `unsupported_mime=${unsupportedFile.mimeType}`);
       return jsonResponse(
         400,
         {
@@ -81,21 +210,16 @@ export const handler: APIGatewayProxyHandlerV2 = async (event) => {
       );
     }
 
-    const clipProvider = new ClipXenovaProvider();
-    const embeddingService = new EmbeddingService(clipProvider);
-    const pineconeProvider = new PineconeProvider(pineconeApiKey);
-    const pineconeService = new PineconeService(pineconeProvider, pineconeIndex, pineconeNamespace);
-    const dynamoProvider = new DynamoDbProvider(awsRegion);
-    const metadataService = new MetadataService(dynamoProvider, dynamodbTableName);
-    const s3Provider = new S3Provider(awsRegion);
-    const storageService = new StorageService(s3Provider, s3BucketName);
-    logStep('providers_initialized');
-
-    logStep('embedding_start');
-    const embedding = await embeddingService.embedImage(file.buffer);
-    logStep('embedding_done', `dims=${embedding.length}`);
-
-    const topK = 20;
+    logStep('embedding_start', `photos=${files.length}`);
+    // One photo goes through the shared request batcher; several photos already form a batch
+    // and take a single forward pass of their own.
+    const embeddings =
+      files.length === 1
+        ? [await embeddingService.embedImage(files[0].buffer, files[0].mimeType)]
+        : await embeddingService.embedImages(files.map(({ buffer, mimeType }) => ({ buffer, mimeType })));
+    logStep('embedding_done', `dims=${embeddings[0]?.length ?? 0} photos=${embeddings.length}`);
+
+    const { topK, bestScoreWeight, maxParts } = DEFAULT_RANKING_OPTIONS;
     const rawMinPartScore = process.env.SEARCH_MIN_SCORE;
     const parsedMinPartScore = rawMinPartScore ? Number.parseFloat(rawMinPartScore) : Number.NaN;
     const isValidMinPartScore =
@@ -105,175 +229,158 @@ export const handler: APIGatewayProxyHandlerV2 = async (event) => {
     if (rawMinPartScore && !isValidMinPartScore) {
       logStep('config_warn', `invalid_SEARCH_MIN_SCORE=${rawMinPartScore} fallback=${DEFAULT_MIN_PART_SCORE}`);
     }
-    logStep('pinecone_query_start', `topK=${topK} min_part_score=${minPartScore} source=${minPartScoreSource}`);
-    const matches = await pineconeService.querySimilar(embedding, topK);
-    logStep('pinecone_query_done', `match_count=${matches.length}`);
+    // Shape descriptors ride along in the vector metadata, so reranking costs no extra reads.
+    const shapeRerankEnabled = env.searchShapeRerankWeight > 0 || env.searchShapeMaxDistance !== undefined;
+    logStep(
+      'pinecone_query_start',
+      `topK=${topK} min_part_score=${minPartScore} source=${minPartScoreSource} filter=${describeFilter(filter)}`
+    );
+    // Pinecone takes one vector per query, so each photo queries concurrently and the lists are
+    // fused before ranking; metadata reads and hydration below then run once for all photos.
+    const matchLists = await Promise.all(
+      embeddings.map((embedding) =>
+        pineconeService.querySimilar(embedding, topK, {
+          includeMetadata: shapeRerankEnabled,
+          ...(filter ? { filter } : {})
+        })
+      )
+    );
+    const matches = matchLists.length === 1 ? matchLists[0] : fuseQueryMatches(matchLists, topK);
+    logStep(
+      'pinecone_query_done',
+      `match_count=${matches.length}${matchLists.length > 1 ? ` per_photo=${matchLists.map((list) => list.length).join(',')}` : ''}`
+    );
+    if (filter && matches.length === 0) {
+      // Vectors indexed before attribute filters carry no views/family/manufacturer metadata.
+      logger.warn(
+        formatStep(
+          'filter_no_matches',
+          `filter=${describeFilter(filter)} hint=vectors indexed before attribute filters need a full reindex`
+        ),
+        { requestId }
+      );
+    }
 
     const rawCandidates: Array<{
       id: string;
       score: number;
       partId: string;
       model: string;
-      view: string;
-      label: string;
-      signedImageUrl: string;
+      shape: number[] | null;
     }> = [];
     let i = 0;
     for (const match of matches) {
       i += 1;
-      logStep('match_process_start', `rank=${i} id=${match.id} score=${match.score.toFixed(6)}`);
-      logStep('dynamodb_get_start', `id=${match.id}`);
-      const metadata = await metadataService.getReferenceMetadata(match.id);
-      if (!metadata) {
-        logStep('dynamodb_get_missing', `id=${match.id}`);
-        continue;
+      debugStep('match_process_start', () => `rank=${i} id=${match.id} score=${match.score.toFixed(6)}`);
+      const parsedId = splitReferenceId(match.id);
+      let partId = parsedId?.partId;
+      if (!partId) {
+        // Ids outside the <part>-<view> convention still need a metadata read to find their part.
+        debugStep('dynamodb_get_start', () => `id=${match.id}`);
+        const metadata = await metadataService.getReferenceMetadata(match.id).catch((error: unknown) => {
+          // One unreadable match should not fail the search; the remaining matches still rank.
+          const message = error instanceof Error ? error.message : String(error);
+          logStep('dynamodb_get_failed', `id=${match.id} message=${message}`);
+          return null;
+        });
+        if (!metadata) {
+          debugStep('dynamodb_get_missing', () => `id=${match.id}`);
+          continue;
+        }
+        debugStep('dynamodb_get_done', () => `id=${match.id} model=${metadata.model} view=${metadata.view} s3_key=${metadata.s3Key}`);
+        partId = metadata.model;
       }
-      logStep('dynamodb_get_done', `id=${match.id} model=${metadata.model} view=${metadata.view} s3_key=${metadata.s3Key}`);
-      logStep('s3_presign_start', `s3_key=${metadata.s3Key}`);
-      const signedImageUrl = await storageService.getSignedReferenceUrl(metadata.s3Key);
-      logStep('s3_presign_done', `id=${match.id}`);
 
       rawCandidates.push({
         id: match.id,
         score: match.score,
-        partId: metadata.model,
-        model: metadata.model,
-        view: metadata.view,
-        label: metadata.label,
-        signedImageUrl
+        partId,
+        model: partId,
+        shape: parseShapeVector(match.metadata?.[SHAPE_METADATA_KEY])
       });
-      logStep('match_process_done', `rank=${i} id=${match.id}`);
+      debugStep('match_process_done', () => `rank=${i} id=${match.id} part=${partId}`);
     }
 
-    type PartAggregate = {
-      partId: string;
-      bestScore: number;
-      totalScore: number;
-      count: number;
-      bestCandidate: (typeof rawCandidates)[number];
-    };
-
-    const grouped = new Map<string, PartAggregate>();
-    for (const candidate of rawCandidates) {
-      const existing = grouped.get(candidate.partId);
-      if (!existing) {
-        grouped.set(candidate.partId, {
-          partId: candidate.partId,
-          bestScore: candidate.score,
-          totalScore: candidate.score,
-          count: 1,
-          bestCandidate: candidate
-        });
-        continue;
-      }
-      existing.totalScore += candidate.score;
-      existing.count += 1;
-      if (candidate.score > existing.bestScore) {
-        existing.bestScore = candidate.score;
-        existing.bestCandidate = candidate;
-      }
-    }
-
-    const aggregated = Array.from(grouped.values())
-      .map((part) => {
-        const meanScore = part.totalScore / part.count;
-        const aggregateScore = part.bestScore * 0.7 + meanScore * 0.3;
-        return { ...part, aggregateScore };
-      })
-      .sort((a, b) => b.aggregateScore - a.aggregateScore);
+    const aggregationStartedAt = performance.now();
+    let aggregated = aggregateByPart(rawCandidates, bestScoreWeight);
 
     logStep('part_aggregation_done', `parts=${aggregated.length}`);
 
-    const filtered = aggregated.filter((item) => item.aggregateScore >= minPartScore).slice(0, 5);
+    if (shapeRerankEnabled) {
+      const reranked = rerankByShape(aggregated, {
+        weight: env.searchShapeRerankWeight,
+        maxDistance: env.searchShapeMaxDistance,
+        consensusSize: 3
+      });
+      aggregated = reranked.parts;
+      logStep(
+        'shape_rerank_done',
+        `weight=${env.searchShapeRerankWeight} max_distance=${env.searchShapeMaxDistance ?? 'none'} with_shape=${aggregated.filter((part) => part.shape).length} pruned=${reranked.pruned}`
+      );
+    }
+
+    const { parts: partSelection, qualified } = selectParts(aggregated, minPartScore, maxParts);
     logStep(
       'part_filter_done',
-      `threshold=${minPartScore} qualified=${filtered.length}${filtered[0] ? ` top_score=${filtered[0].aggregateScore.toFixed(6)}` : ''}`
+      `threshold=${minPartScore} qualified=${qualified}${qualified > 0 ? ` top_score=${partSelection[0].aggregateScore.toFixed(6)}` : ''}`
     );
 
-    const partSelection = filtered.length > 0 ? filtered : aggregated.slice(0, 5);
-    if (filtered.length === 0 && aggregated.length > 0) {
+    timer.record('aggregation', performance.now() - aggregationStartedAt);
+    if (qualified === 0 && aggregated.length > 0) {
       logStep('part_filter_fallback', `using_top_parts_without_threshold count=${partSelection.length}`);
     }
 
-    const modelCandidates: Array<{
-      partId: string;
-      model: string;
-      aggregateScore: number;
-      views: Array<{
-        id: string;
-        score: number;
-        model: string;
-        view: string;
-        label: string;
-        signedImageUrl: string;
-      }>;
-    }> = [];
+    const pendingCandidates: PendingCandidate[] = partSelection.map((item) => ({
+      partId: item.partId,
+      model: item.bestCandidate.model,
+      aggregateScore: item.aggregateScore,
+      matches: rawCandidates
+        .filter((candidate) => candidate.partId === item.partId)
+        .map((candidate) => ({ id: candidate.id, score: candidate.score }))
+    }));
 
-    for (const item of partSelection) {
-      const canonicalViews: Array<{
-        id: string;
-        score: number;
-        model: string;
-        view: string;
-        label: string;
-        signedImageUrl: string;
-      }> = [];
-
-      for (const view of VIEW_SUFFIXES) {
-        const id = `${item.partId}-${view}`;
-        const matchForView = rawCandidates.find((candidate) => candidate.id === id);
-        const metadata = await metadataService.getReferenceMetadata(id);
-        if (!metadata) {
-          continue;
-        }
-        const signedImageUrl = await storageService.getSignedReferenceUrl(metadata.s3Key);
-        canonicalViews.push({
-          id,
-          score: matchForView?.score ?? item.aggregateScore,
-          model: metadata.model,
-          view: metadata.view,
-          label: metadata.label,
-          signedImageUrl
-        });
+    // Only the first candidate is hydrated eagerly; the UI reveals the rest one at a time
+    // and pulls them through /search/candidates with the returned cursor.
+    const modelCandidates: ModelCandidate[] = [];
+    const degraded: string[] = [];
+    const [firstCandidate, ...remainingCandidates] = pendingCandidates;
+    let unhydratedCandidates = remainingCandidates;
+    if (firstCandidate) {
+      try {
+        const hydrated = await timeSpan('hydration', () => candidateService.hydrate(firstCandidate));
+        const { source, ...candidate } = hydrated;
+        modelCandidates.push(candidate);
+        logStep('model_candidate_views_done', `part=${candidate.partId} views=${candidate.views.length} source=${source} atlas=${candidate.atlas ? 'yes' : 'no'}`);
+      } catch (error) {
+        // The ranking is already paid for: return it unhydrated and let the client hydrate the
+        // first candidate through /search/candidates once metadata reads recover.
+        const message = error instanceof Error ? error.message : String(error);
+        logStep('hydration_degraded', `part=${firstCandidate.partId} message=${message}`);
+        degraded.push('metadata');
+        unhydratedCandidates = pendingCandidates;
       }
-
-      const fallbackViews = rawCandidates
-        .filter((candidate) => candidate.partId === item.partId)
-        .sort((a, b) => b.score - a.score)
-        .slice(0, 7)
-        .map((candidate) => ({
-          id: candidate.id,
-          score: candidate.score,
-          model: candidate.model,
-          view: candidate.view,
-          label: candidate.label,
-          signedImageUrl: candidate.signedImageUrl
-        }));
-
-      const views = canonicalViews.length > 0 ? canonicalViews : fallbackViews;
-      modelCandidates.push({
-        partId: item.partId,
-        model: item.bestCandidate.model,
-        aggregateScore: item.aggregateScore,
-        views
-      });
-      logStep('model_candidate_views_done', `part=${item.partId} views=${views.length} source=${canonicalViews.length > 0 ? 'canonical' : 'fallback'}`);
     }
-    logStep('model_candidates_built', `count=${modelCandidates.length}`);
+    const cursor = encodeCandidateCursor(unhydratedCandidates, activeIndex?.version ?? null);
+    const pending = unhydratedCandidates.map(({ partId, model, aggregateScore }) => ({ partId, model, aggregateScore }));
+    logStep('model_candidates_built', `hydrated=${modelCandidates.length} pending=${pending.length}`);
 
-    const results: Array<{
-      id: string;
-      score: number;
-      model: string;
-      view: string;
-      label: string;
-      signedImageUrl: string;
-    }> = modelCandidates[0]?.views ?? [];
+    const results: CandidateView[] = modelCandidates[0]?.views ?? [];
 
     const latencyMs = Date.now() - start;
-    logStep('response_ready', `latency_ms=${latencyMs} returned_matches=${results.length} returned_models=${modelCandidates.length}`);
+    logStep('response_ready', `latency_ms=${latencyMs} returned_matches=${results.length} returned_models=${modelCandidates.length} pending_models=${pending.length}${degraded.length > 0 ? ` degraded=${degraded.join(',')}` : ''}`);
 
-    return jsonResponse(200, { matches: results, modelCandidates, request_id: requestId }, requestId);
+    return jsonResponse(
+      200,
+      {
+        matches: results,
+        modelCandidates,
+        pendingCandidates: pending,
+        cursor,
+        ...(degraded.length > 0 ? { degraded } : {}),
+        request_id: requestId
+      },
+      requestId
+    );
   } catch (error) {
     const message = error instanceof Error ? error.message : String(error);
     const stackHead =
@@ -294,6 +401,28 @@ export const handler: APIGatewayProxyHandlerV2 = async (event) => {
         requestId
       );
     }
+    if (message.includes('Invalid search filter')) {
+      return jsonResponse(
+        400,
+        {
+          error: message,
+          error_code: 'INVALID_FILTER',
+          request_id: requestId
+        },
+        requestId
+      );
+    }
+    if (message.includes('Too many files')) {
+      return jsonResponse(
+        400,
+        {
+          error: message,
+          error_code: 'TOO_MANY_FILES',
+          request_id: requestId
+        },
+        requestId
+      );
+    }
     if (message.includes('File exceeds')) {
       return jsonResponse(
         413,
@@ -316,6 +445,21 @@ export const handler: APIGatewayProxyHandlerV2 = async (event) => {
         requestId
       );
     }
+    if (isDependencyUnavailable(message)) {
+      // Timed out or circuit open: fail fast and tell the client when trying again makes sense.
+      return withRetryAfter(
+        jsonResponse(
+          503,
+          {
+            error: 'Search dependency unavailable',
+            error_code: 'DEPENDENCY_UNAVAILABLE',
+            request_id: requestId
+          },
+          requestId
+        ),
+        message.includes('circuit open') ? Math.ceil(env.circuitOpenMs / 1000) : 1
+      );
+    }
     if (message.toLowerCase().includes('pinecone')) {
       return jsonResponse(
         502,
@@ -338,4 +482,71 @@ export const handler: APIGatewayProxyHandlerV2 = async (event) => {
       requestId
     );
   }
-};
+}
+
+async function handleAdmittedSearch(
+  event: APIGatewayProxyEventV2,
+  timer: RequestTimer,
+  createDependencies: () => SearchDependencies,
+  admission: AdmissionController | null
+) {
+  if (!admission) {
+    return handleSearch(event, timer, createDependencies);
+  }
+
+  const requestId = event.requestContext?.requestId;
+  let ticket: AdmissionTicket;
+  try {
+    ticket = await timeSpan('admission_wait', () => admission.acquire());
+  } catch (error) {
+    const message = error instanceof Error ? error.message : String(error);
+    const queueFull = message.includes('queue full');
+    const retryAfter = admission.retryAfterSeconds();
+    const { inFlight, queueDepth } = admission.getStats();
+    logger.warn(
+      `[SEARCH_STEP] t+${Math.round(timer.elapsedMs())}ms | admission_rejected | reason=${queueFull ? 'queue_full' : 'deadline'} in_flight=${inFlight} queue_depth=${queueDepth} retry_after_s=${retryAfter}`,
+      { requestId }
+    );
+    return withRetryAfter(
+      jsonResponse(
+        queueFull ? 429 : 503,
+        {
+          error: queueFull ? 'Too many concurrent searches' : 'Search cannot complete before its deadline',
+          error_code: queueFull ? 'SEARCH_QUEUE_FULL' : 'SEARCH_DEADLINE_EXCEEDED',
+          request_id: requestId
+        },
+        requestId
+      ),
+      retryAfter
+    );
+  }
+
+  try {
+    return await handleSearch(event, timer, createDependencies);
+  } finally {
+    ticket.release();
+  }
+}
+
+export function createSearchHandler(
+  createDependencies: () => SearchDependencies = createAwsSearchDependencies,
+  admission: AdmissionController | null = getSharedAdmissionController()
+): APIGatewayProxyHandlerV2 {
+  return async (event, context) => {
+    const timer = new RequestTimer();
+    // Downstream calls size their timeouts from this, so a slow dependency cannot outlive the request.
+    const deadlineAt = requestDeadline(env.searchDeadlineMs, context?.getRemainingTimeInMillis?.());
+    try {
+      const response = await runWithDeadline(deadlineAt, () =>
+        runWithTimer(timer, () => handleAdmittedSearch(event, timer, createDependencies, admission))
+      );
+      return withServerTiming(response, timer);
+    } finally {
+      logger.info(`[REQUEST_TIMING] route=search ${timer.summary()}`, { requestId: event.requestContext?.requestId });
+      flushLatencyMetrics();
+      logger.flush();
+    }
+  };
+}
+
+export const handler = createSearchHandler();
@@ -0,0 +1,155 @@
+import type { APIGatewayProxyEventV2, APIGatewayProxyHandlerV2 } from 'aws-lambda';
+import { env, validateCandidatesEnv } from '../config/env';
+import { logger } from '../utils/logger';
+import { jsonResponse, withCacheControl, withRetryAfter, withServerTiming } from '../utils/http';
+import { RequestTimer, flushLatencyMetrics, runWithTimer, timeSpan } from '../utils/metrics';
+import { requestDeadline, runWithDeadline } from '../utils/deadline';
+import { DynamoDbProvider } from '../providers/metadata/dynamodbProvider';
+import { MetadataService } from '../services/metadataService';
+import { getSharedDependencyGuard, isDependencyUnavailable } from '../services/dependencyGuard';
+import { getSharedActiveIndexService } from '../services/activeIndexService';
+import type { ActiveIndexService } from '../services/activeIndexService';
+
+// Budget for one lookup, inside the function's 10 s timeout.
+const SIMILAR_BUDGET_MS = 9_000;
+// Lists only change when the indexer runs, so clients and CDNs may reuse them briefly.
+const SIMILAR_CACHE_SECONDS = 300;
+
+export type SimilarPartsDependencies = {
+  metadataService: MetadataService;
+  /** Blue/green pointer; lists are read from the active version's items. */
+  activeIndex?: ActiveIndexService;
+};
+
+export function createAwsSimilarDependencies(): SimilarPartsDependencies {
+  const { awsRegion, dynamodbTableName } = validateCandidatesEnv();
+  const metadataService = new MetadataService(
+    new DynamoDbProvider(awsRegion),
+    dynamodbTableName,
+    getSharedDependencyGuard('dynamodb')
+  );
+  return {
+    metadataService,
+    // Only the metadata prefix is used here, so the namespace default does not matter.
+    activeIndex: getSharedActiveIndexService(dynamodbTableName, metadataService, env.pineconeNamespace ?? '')
+  };
+}
+
+async function handleSimilarParts(event: APIGatewayProxyEventV2, createDependencies: () => SimilarPartsDependencies) {
+  const start = Date.now();
+  const requestId = event.requestContext?.requestId;
+  const logStep = (step: string, details?: string) => {
+    const elapsedMs = Date.now() - start;
+    logger.info(`[SIMILAR_STEP] t+${elapsedMs}ms | ${step}${details ? ` | ${details}` : ''}`, { requestId });
+  };
+
+  logStep('request_received');
+
+  const partId = event.pathParameters?.partId ?? '';
+  if (!partId) {
+    return jsonResponse(
+      400,
+      {
+        error: 'Missing partId path parameter',
+        error_code: 'MISSING_PART_ID',
+        request_id: requestId
+      },
+      requestId
+    );
+  }
+
+  const rawLimit = event.queryStringParameters?.limit;
+  const limit = rawLimit === undefined ? undefined : Number(rawLimit);
+  if (limit !== undefined && (!Number.isInteger(limit) || limit <= 0)) {
+    return jsonResponse(
+      400,
+      {
+        error: 'Invalid limit query parameter. Expected a positive integer.',
+        error_code: 'INVALID_LIMIT',
+        request_id: requestId
+      },
+      requestId
+    );
+  }
+
+  try {
+    // One key lookup: the list was ranked at index time, so no embedding or vector query here.
+    const { metadataService, activeIndex: activeIndexService } = createDependencies();
+    const activeIndex = activeIndexService ? await timeSpan('active_index', () => activeIndexService.resolve()) : null;
+    const record = await metadataService.withKeyPrefix(activeIndex?.metadataPrefix ?? '').getPartNeighbors(partId);
+    if (!record) {
+      logStep('similar_not_found', `part=${partId} index_version=${activeIndex?.version ?? 'legacy'}`);
+      return jsonResponse(
+        404,
+        {
+          error: `No similar parts indexed for ${partId}`,
+          error_code: 'PART_NOT_FOUND',
+          request_id: requestId
+        },
+        requestId
+      );
+    }
+
+    const neighbors = limit === undefined ? record.neighbors : record.neighbors.slice(0, limit);
+    logStep(
+      'similar_done',
+      `part=${partId} neighbors=${neighbors.length} k=${record.k} index_version=${activeIndex?.version ?? 'legacy'}`
+    );
+    return withCacheControl(
+      jsonResponse(
+        200,
+        { partId, neighbors, k: record.k, updatedAt: record.updatedAt, request_id: requestId },
+        requestId
+      ),
+      SIMILAR_CACHE_SECONDS
+    );
+  } catch (error) {
+    const message = error instanceof Error ? error.message : String(error);
+    logStep('similar_failed', `message=${message}`);
+    if (isDependencyUnavailable(message)) {
+      return withRetryAfter(
+        jsonResponse(
+          503,
+          {
+            error: 'Metadata store unavailable',
+            error_code: 'DEPENDENCY_UNAVAILABLE',
+            request_id: requestId
+          },
+          requestId
+        ),
+        message.includes('circuit open') ? Math.ceil(env.circuitOpenMs / 1000) : 1
+      );
+    }
+
+    return jsonResponse(
+      500,
+      {
+        error: 'Internal server error',
+        error_code: 'INTERNAL_ERROR',
+        request_id: requestId
+      },
+      requestId
+    );
+  }
+}
+
+export function createSimilarPartsHandler(
+  createDependencies: () => SimilarPartsDependencies = createAwsSimilarDependencies
+): APIGatewayProxyHandlerV2 {
+  return async (event, context) => {
+    const timer = new RequestTimer();
+    const deadlineAt = requestDeadline(SIMILAR_BUDGET_MS, context?.getRemainingTimeInMillis?.());
+    try {
+      const response = await runWithDeadline(deadlineAt, () =>
+        runWithTimer(timer, () => handleSimilarParts(event, createDependencies))
+      );
+      return withServerTiming(response, timer);
+    } finally {
+      logger.info(`[REQUEST_TIMING] route=similar ${timer.summary()}`, { requestId: event.requestContext?.requestId });
+      flushLatencyMetrics();
+      logger.flush();
+    }
+  };
+}
+
+export const handler = createSimilarPartsHandler();
@@ -1,18 +1,40 @@
 import { logger } from '../../utils/logger';
+import { timeSpan } from '../../utils/metrics';
+import type { EmbeddingInput, EmbeddingProvider } from '../../types/providers';
 
 type ClipPipeline = (input: unknown, options?: Record<string, unknown>) => Promise<{
   data: Float32Array | number[];
 }>;
 
+function toVectors(data: Float32Array | number[], count: number): number[][] {
+  const width = data.length / count;
+  const vectors: number[][] = [];
+  for (let i = 0; i < count; i += 1) {
+    vectors.push(Array.from(data.slice(i * width, (i + 1) * width)));
+  }
+  return vectors;
+}
+
 type TransformersModule = {
   pipeline: (task: string, model: string) => Promise<ClipPipeline>;
   RawImage: {
+    new (data: Uint8ClampedArray | Uint8Array, width: number, height: number, channels: number): unknown;
     fromBlob: (blob: Blob) => Promise<unknown>;
   };
 };
 
+// Typed from the package itself, like the lazy import in utils/atlas.ts, so they cannot drift apart.
+type CanvasModule = typeof import('canvas');
+
+// CLIP ViT-B/32 resizes the shortest edge to 224px before center cropping.
+const MODEL_INPUT_SHORT_EDGE = 224;
+// node-canvas decodes these natively; other formats go through RawImage.fromBlob. Indexing uses
+// this path too, so changing how images are decoded here requires a full reindex.
+const CANVAS_DECODABLE_MIME_TYPES = new Set(['image/png', 'image/jpeg', 'image/jpg']);
+
 let transformersPromise: Promise<TransformersModule> | null = null;
 let pipelinePromise: Promise<ClipPipeline> | null = null;
+let canvasPromise: Promise<CanvasModule | null> | null = null;
 
 async function loadTransformers(): Promise<TransformersModule> {
   if (!transformersPromise) {
@@ -21,6 +43,28 @@ async function loadTransformers(): Promise<TransformersModule> {
   return transformersPromise;
 }
 
+async function loadCanvas(): Promise<CanvasModule | null> {
+  if (!canvasPromise) {
+    canvasPromise = import('canvas').catch((error) => {
+      const message = error instanceof Error ? error.message : String(error);
+      logger.warn(`Native canvas decoder unavailable, using RawImage decode path: ${message}`);
+      return null;
+    });
+  }
+  return canvasPromise;
+}
+
+async function decodeWithCanvas(module: TransformersModule, canvas: CanvasModule, buffer: Buffer): Promise<unknown> {
+  const image = await canvas.loadImage(buffer);
+  const scale = Math.min(1, MODEL_INPUT_SHORT_EDGE / Math.min(image.width, image.height));
+  const width = Math.max(1, Math.round(image.width * scale));
+  const height = Math.max(1, Math.round(image.height * scale));
+  const context = canvas.createCanvas(width, height).getContext('2d');
+  context.drawImage(image, 0, 0, width, height);
+  const { data } = context.getImageData(0, 0, width, height);
+  return new module.RawImage(data, width, height, 4);
+}
+
 async function loadPipeline(): Promise<ClipPipeline> {
   if (!pipelinePromise) {
     pipelinePromise = (async () => {
@@ -34,14 +78,48 @@ async function loadPipeline(): Promise<ClipPipeline> {
   return pipelinePromise;
 }
 
-export class ClipXenovaProvider {
-  async embedBuffer(buffer: Buffer): Promise<number[]> {
+export class ClipXenovaProvider implements EmbeddingProvider {
+  /** Loads the model ahead of the first request so long-running processes never serve a cold start. */
+  async warmup(): Promise<void> {
+    await loadPipeline();
+  }
+
+  async embedBuffer(buffer: Buffer, mimeType = 'image/png'): Promise<number[]> {
     const module = await loadTransformers();
     const extractor = await loadPipeline();
-    const blob = new Blob([buffer], { type: 'image/png' });
-    const rawImage = await module.RawImage.fromBlob(blob);
-    const output = await extractor(rawImage, { pooling: 'mean', normalize: true });
+    const rawImage = await timeSpan('embedding_decode', () => this.decodeImage(module, buffer, mimeType));
+    const output = await timeSpan('embedding_inference', () => extractor(rawImage, { pooling: 'mean', normalize: true }));
     const data = output.data instanceof Float32Array ? Array.from(output.data) : (output.data as number[]);
     return data;
   }
+
+  async embedBuffers(inputs: EmbeddingInput[]): Promise<number[][]> {
+    if (inputs.length === 0) {
+      return [];
+    }
+    const module = await loadTransformers();
+    const extractor = await loadPipeline();
+    const rawImages = await timeSpan('embedding_decode', () =>
+      Promise.all(inputs.map((input) => this.decodeImage(module, input.buffer, input.mimeType ?? 'image/png')))
+    );
+    const output = await timeSpan('embedding_inference', () => extractor(rawImages, { pooling: 'mean', normalize: true }));
+    return toVectors(output.data, inputs.length);
+  }
+
+  private async decodeImage(module: TransformersModule, buffer: Buffer, mimeType: string): Promise<unknown> {
+    const normalizedMimeType = mimeType.toLowerCase();
+    if (CANVAS_DECODABLE_MIME_TYPES.has(normalizedMimeType)) {
+      const canvas = await loadCanvas();
+      if (canvas) {
+        try {
+          return await decodeWithCanvas(module, canvas, buffer);
+        } catch (error) {
+          const message = error instanceof Error ? error.message : String(error);
+          logger.warn(`Native decode failed for mime=${normalizedMimeType}, falling back to RawImage: ${message}`);
+        }
+      }
+    }
+    const blob = new Blob([buffer], { type: normalizedMimeType });
+    return module.RawImage.fromBlob(blob);
+  }
 }
@@ -1,68 +1,270 @@
-import { DynamoDBClient } from '@aws-sdk/client-dynamodb';
-import { DynamoDBDocumentClient, GetCommand, PutCommand } from '@aws-sdk/lib-dynamodb';
-import type { ReferenceMetadata } from '../../types/metadata';
+import { DescribeTableCommand, DynamoDBClient } from '@aws-sdk/client-dynamodb';
+import {
+  BatchWriteCommand,
+  DeleteCommand,
+  DynamoDBDocumentClient,
+  GetCommand,
+  PutCommand,
+  ScanCommand
+} from '@aws-sdk/lib-dynamodb';
+import type { ActiveIndexRecord, PartNeighborsRecord, ReferenceMetadata } from '../../types/metadata';
+import type { MetadataProvider } from '../../types/providers';
+import { hasVersionPrefix } from '../../utils/indexVersion';
 
-export class DynamoDbProvider {
+// Neighbour lists share the metadata table under their own item, next to the part's view items.
+const NEIGHBORS_SORT_KEY = 'SIMILAR';
+
+function neighborsItemId(partId: string): string {
+  return `${partId}#similar`;
+}
+
+// The active-index pointer is a single unversioned item.
+const ACTIVE_INDEX_ID = '_active_index';
+const ACTIVE_INDEX_SORT_KEY = 'POINTER';
+// BatchWriteItem limit.
+const BATCH_WRITE_SIZE = 25;
+const MAX_BATCH_ATTEMPTS = 8;
+
+type WriteRequest = { PutRequest: { Item: Record<string, unknown> } } | { DeleteRequest: { Key: Record<string, unknown> } };
+
+function toItem(item: ReferenceMetadata): Record<string, unknown> {
+  // Tolerate existing table schemas that use pk/sk keys.
+  // Keep id for app-level compatibility.
+  return {
+    ...item,
+    pk: (item as ReferenceMetadata & { pk?: string }).pk ?? item.id,
+    sk: (item as ReferenceMetadata & { sk?: string }).sk ?? 'METADATA'
+  };
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+function isKeySchemaMismatch(error: unknown): boolean {
+  return error instanceof Error && error.name === 'ValidationException';
+}
+
+export class DynamoDbProvider implements MetadataProvider {
+  private baseClient: DynamoDBClient;
   private client: DynamoDBDocumentClient;
+  private keyAttributes = new Map<string, string[]>();
 
   constructor(region: string) {
-    const baseClient = new DynamoDBClient({ region });
-    this.client = DynamoDBDocumentClient.from(baseClient);
+    this.baseClient = new DynamoDBClient({ region });
+    this.client = DynamoDBDocumentClient.from(this.baseClient);
   }
 
   async putMetadata(tableName: string, item: ReferenceMetadata): Promise<void> {
-    // Tolerate existing table schemas that use pk/sk keys.
-    // Keep id for app-level compatibility.
-    const normalizedItem = {
-      ...item,
-      pk: (item as ReferenceMetadata & { pk?: string }).pk ?? item.id,
-      sk: (item as ReferenceMetadata & { sk?: string }).sk ?? 'METADATA'
-    };
     const command = new PutCommand({
       TableName: tableName,
-      Item: normalizedItem
+      Item: toItem(item)
     });
     await this.client.send(command);
   }
 
-  async getMetadata(tableName: string, id: string): Promise<ReferenceMetadata | null> {
+  async putMetadataBatch(tableName: string, items: ReferenceMetadata[]): Promise<void> {
+    await this.batchWrite(
+      tableName,
+      items.map((item) => ({ PutRequest: { Item: toItem(item) } }))
+    );
+  }
+
+  async getMetadata(tableName: string, id: string, signal?: AbortSignal): Promise<ReferenceMetadata | null> {
     // Try pk-first (current AWS table), then fallback to id for older/local tables.
-    try {
-      const responsePk = await this.client.send(
-        new GetCommand({
+    // Only a key-schema mismatch falls through; throttling, timeouts and outages propagate so
+    // callers (and the circuit breaker) see them instead of a silent "not found".
+    for (const key of [{ pk: id, sk: 'METADATA' }, { id }]) {
+      try {
+        const response = await this.client.send(new GetCommand({ TableName: tableName, Key: key }), {
+          abortSignal: signal
+        });
+        if (response.Item) {
+          const item = response.Item as ReferenceMetadata & { pk?: string };
+          return {
+            ...item,
+            id: item.id ?? item.pk ?? id
+          };
+        }
+      } catch (error) {
+        if (!isKeySchemaMismatch(error)) {
+          throw error;
+        }
+      }
+    }
+
+    return null;
+  }
+
+  async putPartNeighbors(tableName: string, record: PartNeighborsRecord): Promise<void> {
+    const id = neighborsItemId(record.partId);
+    await this.client.send(
+      new PutCommand({
+        TableName: tableName,
+        Item: { ...record, id, pk: id, sk: NEIGHBORS_SORT_KEY }
+      })
+    );
+  }
+
+  async getPartNeighbors(tableName: string, partId: string, signal?: AbortSignal): Promise<PartNeighborsRecord | null> {
+    const id = neighborsItemId(partId);
+    for (const key of [{ pk: id, sk: NEIGHBORS_SORT_KEY }, { id }]) {
+      try {
+        const response = await this.client.send(new GetCommand({ TableName: tableName, Key: key }), {
+          abortSignal: signal
+        });
+        if (response.Item) {
+          const item = response.Item as PartNeighborsRecord;
+          return { partId, neighbors: item.neighbors ?? [], k: item.k, updatedAt: item.updatedAt };
+        }
+      } catch (error) {
+        if (!isKeySchemaMismatch(error)) {
+          throw error;
+        }
+      }
+    }
+
+    return null;
+  }
+
+  async deletePartNeighbors(tableName: string, partId: string): Promise<void> {
+    const id = neighborsItemId(partId);
+    for (const key of [{ pk: id, sk: NEIGHBORS_SORT_KEY }, { id }]) {
+      try {
+        await this.client.send(new DeleteCommand({ TableName: tableName, Key: key }));
+        return;
+      } catch (error) {
+        if (!isKeySchemaMismatch(error)) {
+          throw error;
+        }
+      }
+    }
+  }
+
+  async deleteMetadataWithPrefix(tableName: string, prefix: string): Promise<number> {
+    return this.deleteScanned(tableName, () => true, {
+      expression: 'begins_with(#id, :prefix)',
+      values: { ':prefix': prefix }
+    });
+  }
+
+  async deleteUnversionedMetadata(tableName: string): Promise<number> {
+    // Version prefixes cannot be told apart from legacy part ids in a filter expression, so the
+    // whole table is scanned and the ids are checked here.
+    return this.deleteScanned(tableName, (id) => id !== ACTIVE_INDEX_ID && !hasVersionPrefix(id));
+  }
+
+  private async deleteScanned(
+    tableName: string,
+    shouldDelete: (id: string) => boolean,
+    filter?: { expression: string; values: Record<string, unknown> }
+  ): Promise<number> {
+    const keyAttributes = await this.getKeyAttributes(tableName);
+    const projected = Array.from(new Set(['id', ...keyAttributes]));
+    let deleted = 0;
+    let startKey: Record<string, unknown> | undefined;
+    do {
+      const response = await this.client.send(
+        new ScanCommand({
           TableName: tableName,
-          Key: { pk: id, sk: 'METADATA' }
+          ...(filter ? { FilterExpression: filter.expression, ExpressionAttributeValues: filter.values } : {}),
+          ProjectionExpression: projected.map((_, index) => `#k${index}`).join(', '),
+          ExpressionAttributeNames: {
+            ...(filter ? { '#id': 'id' } : {}),
+            ...Object.fromEntries(projected.map((name, index) => [`#k${index}`, name]))
+          },
+          ExclusiveStartKey: startKey
         })
       );
-      if (responsePk.Item) {
-        const item = responsePk.Item as ReferenceMetadata & { pk?: string };
-        return {
-          ...item,
-          id: item.id ?? item.pk ?? id
-        };
+      const keys = (response.Items ?? [])
+        .filter((item) => typeof item.id === 'string' && shouldDelete(item.id))
+        .map((item) => Object.fromEntries(keyAttributes.map((name) => [name, item[name]])));
+      await this.batchWrite(
+        tableName,
+        keys.map((key) => ({ DeleteRequest: { Key: key } }))
+      );
+      deleted += keys.length;
+      startKey = response.LastEvaluatedKey;
+    } while (startKey);
+    return deleted;
+  }
+
+  async getActiveIndex(tableName: string, signal?: AbortSignal): Promise<ActiveIndexRecord | null> {
+    for (const key of [{ pk: ACTIVE_INDEX_ID, sk: ACTIVE_INDEX_SORT_KEY }, { id: ACTIVE_INDEX_ID }]) {
+      try {
+        const response = await this.client.send(new GetCommand({ TableName: tableName, Key: key }), {
+          abortSignal: signal
+        });
+        if (response.Item) {
+          const item = response.Item as ActiveIndexRecord;
+          return {
+            version: item.version,
+            namespace: item.namespace,
+            activatedAt: item.activatedAt,
+            vectors: item.vectors ?? 0,
+            parts: item.parts ?? 0,
+            retired: item.retired ?? [],
+            staged: item.staged ?? []
+          };
+        }
+      } catch (error) {
+        if (!isKeySchemaMismatch(error)) {
+          throw error;
+        }
       }
-    } catch {
-      // Fallback below.
     }
 
+    return null;
+  }
+
+  async putActiveIndex(tableName: string, record: ActiveIndexRecord, expectedVersion: string | null): Promise<void> {
     try {
-      const responseId = await this.client.send(
-        new GetCommand({
+      await this.client.send(
+        new PutCommand({
           TableName: tableName,
-          Key: { id }
+          Item: { ...record, id: ACTIVE_INDEX_ID, pk: ACTIVE_INDEX_ID, sk: ACTIVE_INDEX_SORT_KEY },
+          ConditionExpression: expectedVersion === null ? 'attribute_not_exists(#version)' : '#version = :expected',
+          ExpressionAttributeNames: { '#version': 'version' },
+          ...(expectedVersion === null ? {} : { ExpressionAttributeValues: { ':expected': expectedVersion } })
         })
       );
-      if (responseId.Item) {
-        const item = responseId.Item as ReferenceMetadata & { pk?: string };
-        return {
-          ...item,
-          id: item.id ?? item.pk ?? id
-        };
+    } catch (error) {
+      if (error instanceof Error && error.name === 'ConditionalCheckFailedException') {
+        throw new Error(`Active index pointer changed concurrently (expected ${expectedVersion ?? 'none'})`);
       }
-    } catch {
-      // No compatible key schema.
+      throw error;
     }
+  }
 
-    return null;
+  private async getKeyAttributes(tableName: string): Promise<string[]> {
+    let attributes = this.keyAttributes.get(tableName);
+    if (!attributes) {
+      const response = await this.baseClient.send(new DescribeTableCommand({ TableName: tableName }));
+      attributes = (response.Table?.KeySchema ?? [])
+        .map((element) => element.AttributeName)
+        .filter((name): name is string => Boolean(name));
+      if (attributes.length === 0) {
+        throw new Error(`Could not read the key schema of ${tableName}`);
+      }
+      this.keyAttributes.set(tableName, attributes);
+    }
+    return attributes;
+  }
+
+  private async batchWrite(tableName: string, requests: WriteRequest[]): Promise<void> {
+    for (let start = 0; start < requests.length; start += BATCH_WRITE_SIZE) {
+      let pending = requests.slice(start, start + BATCH_WRITE_SIZE);
+      for (let attempt = 1; pending.length > 0; attempt += 1) {
+        if (attempt > MAX_BATCH_ATTEMPTS) {
+          throw new Error(`DynamoDB batch write left ${pending.length} unprocessed items after ${MAX_BATCH_ATTEMPTS} attempts`);
+        }
+        if (attempt > 1) {
+          // Unprocessed items mean the table is throttling; back off before resending them.
+          await sleep(Math.min(2_000, 50 * 2 ** (attempt - 2)));
+        }
+        const response = await this.client.send(new BatchWriteCommand({ RequestItems: { [tableName]: pending } }));
+        pending = (response.UnprocessedItems?.[tableName] ?? []) as WriteRequest[];
+      }
+    }
   }
 }
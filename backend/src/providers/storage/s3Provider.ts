@@ -1,14 +1,8 @@
-import { GetObjectCommand, ListObjectsV2Command, PutObjectCommand, S3Client } from '@aws-sdk/client-s3';
+import { DeleteObjectCommand, GetObjectCommand, ListObjectsV2Command, PutObjectCommand, S3Client } from '@aws-sdk/client-s3';
 import { getSignedUrl } from '@aws-sdk/s3-request-presigner';
+import type { PutObjectInput, StorageProvider } from '../../types/providers';
 
-export type PutObjectInput = {
-  bucket: string;
-  key: string;
-  body: Buffer;
-  contentType: string;
-};
-
-export class S3Provider {
+export class S3Provider implements StorageProvider {
   private client: S3Client;
 
   constructor(region: string) {
@@ -77,4 +71,8 @@ export class S3Provider {
     const bytes = await body.transformToByteArray();
     return Buffer.from(bytes);
   }
+
+  async deleteObject(bucket: string, key: string): Promise<void> {
+    await this.client.send(new DeleteObjectCommand({ Bucket: bucket, Key: key }));
+  }
 }
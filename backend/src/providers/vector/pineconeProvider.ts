@@ -1,51 +1,102 @@
 import { Pinecone } from '@pinecone-database/pinecone';
+import type {
+  VectorMatch,
+  VectorMetadataFilter,
+  VectorProvider,
+  VectorQueryOptions,
+  VectorRecord
+} from '../../types/providers';
 
-export type PineconeMatch = {
-  id: string;
-  score: number;
-};
+// Pinecone's recommended upsert batch size, and how many batches are in flight at once.
+const UPSERT_BATCH_SIZE = 100;
+const UPSERT_CONCURRENCY = 4;
 
-export class PineconeProvider {
+function toStringMetadata(metadata: Record<string, unknown>): Record<string, string> {
+  const result: Record<string, string> = {};
+  for (const [key, value] of Object.entries(metadata)) {
+    if (typeof value === 'string') {
+      result[key] = value;
+    } else if (typeof value === 'number' || typeof value === 'boolean') {
+      result[key] = String(value);
+    }
+  }
+  return result;
+}
+
+function toPineconeFilter(filter: VectorMetadataFilter | undefined): Record<string, unknown> | undefined {
+  const clauses = Object.entries(filter ?? {})
+    .filter(([, values]) => values.length > 0)
+    .map(([field, values]) => ({ [field]: values.length === 1 ? { $eq: values[0] } : { $in: values } }));
+  if (clauses.length === 0) {
+    return undefined;
+  }
+  return clauses.length === 1 ? clauses[0] : { $and: clauses };
+}
+
+export class PineconeProvider implements VectorProvider {
   private client: Pinecone;
 
   constructor(apiKey: string) {
     this.client = new Pinecone({ apiKey });
   }
 
-  async upsertVector(
-    indexName: string,
-    namespace: string,
-    id: string,
-    values: number[],
-    metadata: Record<string, string>
-  ): Promise<void> {
-    const index = this.client.index(indexName);
-    await index.namespace(namespace).upsert([
-      {
-        id,
-        values,
-        metadata
-      }
-    ]);
+  async upsertVectors(indexName: string, namespace: string, records: VectorRecord[]): Promise<void> {
+    const target = this.client.index(indexName).namespace(namespace);
+    const batches: VectorRecord[][] = [];
+    for (let start = 0; start < records.length; start += UPSERT_BATCH_SIZE) {
+      batches.push(records.slice(start, start + UPSERT_BATCH_SIZE));
+    }
+    for (let start = 0; start < batches.length; start += UPSERT_CONCURRENCY) {
+      await Promise.all(batches.slice(start, start + UPSERT_CONCURRENCY).map((batch) => target.upsert(batch)));
+    }
   }
 
   async queryVectors(
     indexName: string,
     namespace: string,
     vector: number[],
-    topK: number
-  ): Promise<PineconeMatch[]> {
+    topK: number,
+    options: VectorQueryOptions = {}
+  ): Promise<VectorMatch[]> {
     const index = this.client.index(indexName);
+    const includeMetadata = options.includeMetadata === true;
+    const filter = toPineconeFilter(options.filter);
+    // The v2 client takes no AbortSignal, so options.signal is not forwarded; a timed-out or
+    // out-hedged query is abandoned rather than cancelled.
     const response = await index.namespace(namespace).query({
       vector,
       topK,
-      includeMetadata: false
+      includeMetadata,
+      ...(filter ? { filter } : {})
     });
     return (response.matches ?? [])
       .filter((match): match is typeof match & { id: string } => typeof match.id === 'string' && match.id.length > 0)
-      .map((match) => ({
-        id: match.id,
-        score: match.score ?? 0
-      }));
+      .map((match) => {
+        const result: VectorMatch = {
+          id: match.id,
+          score: match.score ?? 0
+        };
+        if (includeMetadata && match.metadata) {
+          result.metadata = toStringMetadata(match.metadata);
+        }
+        return result;
+      });
+  }
+
+  async deleteVectors(indexName: string, namespace: string, ids: string[]): Promise<void> {
+    if (ids.length === 0) {
+      return;
+    }
+    const index = this.client.index(indexName);
+    await index.namespace(namespace).deleteMany(ids);
+  }
+
+  async countVectors(indexName: string, namespace: string): Promise<number> {
+    const stats = await this.client.index(indexName).describeIndexStats();
+    return stats.namespaces?.[namespace]?.recordCount ?? 0;
+  }
+
+  async deleteNamespace(indexName: string, namespace: string): Promise<void> {
+    await this.client.index(indexName).namespace(namespace).deleteAll();
   }
 }
@@ -0,0 +1,395 @@
+import { createHmac } from 'crypto';
+import type { ActiveIndexRecord, PartNeighborsRecord, ReferenceMetadata } from '../types/metadata';
+import type {
+  EmbeddingInput,
+  EmbeddingProvider,
+  MetadataProvider,
+  PutObjectInput,
+  StorageProvider,
+  VectorMatch,
+  VectorMetadata,
+  VectorMetadataFilter,
+  VectorProvider,
+  VectorQueryOptions,
+  VectorRecord
+} from '../types/providers';
+import { hasVersionPrefix } from '../utils/indexVersion';
+
+// In-process stand-ins for S3, DynamoDB, Pinecone and CLIP used by the offline benchmarks.
+// Only type imports and import-free utils from src/ here, so importing this module does not
+// initialize the logger.
+
+export const CATALOG_VIEWS = ['top', 'bottom', 'left', 'right', 'front', 'back', 'isometric'] as const;
+const PNG_SIGNATURE = Buffer.from([0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a]);
+const QUERY_INDEX_OFFSET = PNG_SIGNATURE.length;
+
+export type LatencyProfile = {
+  baseMs: number;
+  jitterMs: number;
+  /** Fraction of calls that also pay `tailMs`, like a dependency's occasional slow replica. */
+  tailRate: number;
+  tailMs: number;
+};
+
+/** Parses `"<base>"`, `"<base>:<jitter>"` or `"<base>:<jitter>:<tail_rate>:<tail_ms>"` (milliseconds). */
+export function parseLatencyProfile(value: string): LatencyProfile {
+  const [base, jitter, tailRate, tailMs] = value.split(':').map((part) => Number.parseFloat(part));
+  const valid = (part: number | undefined) => part === undefined || (Number.isFinite(part) && part >= 0);
+  if (!Number.isFinite(base) || base < 0 || !valid(jitter) || !valid(tailRate) || !valid(tailMs) || (tailRate ?? 0) > 1) {
+    throw new Error(
+      `Invalid latency profile "${value}". Expected <base_ms>, <base_ms>:<jitter_ms> or <base_ms>:<jitter_ms>:<tail_rate>:<tail_ms>.`
+    );
+  }
+  return { baseMs: base, jitterMs: jitter ?? 0, tailRate: tailRate ?? 0, tailMs: tailMs ?? 0 };
+}
+
+async function injectLatency(profile: LatencyProfile): Promise<void> {
+  const tailMs = Math.random() < profile.tailRate ? profile.tailMs : 0;
+  const delayMs = profile.baseMs + Math.random() * profile.jitterMs + tailMs;
+  if (delayMs > 0) {
+    await new Promise((resolve) => setTimeout(resolve, delayMs));
+  }
+}
+
+export function createRandom(seed: number): () => number {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function normalize(values: number[]): number[] {
+  const norm = Math.sqrt(values.reduce((acc, value) => acc + value * value, 0)) || 1;
+  return values.map((value) => value / norm);
+}
+
+function perturb(base: number[], amount: number, random: () => number): number[] {
+  return normalize(base.map((value) => value + (random() - 0.5) * amount));
+}
+
+export class InMemoryStorageProvider implements StorageProvider {
+  private objects = new Map<string, Buffer>();
+  private latency: LatencyProfile;
+
+  constructor(latency: LatencyProfile) {
+    this.latency = latency;
+  }
+
+  async putObject(input: PutObjectInput): Promise<void> {
+    await injectLatency(this.latency);
+    this.objects.set(`${input.bucket}/${input.key}`, input.body);
+  }
+
+  async getPresignedUrl(bucket: string, key: string, expiresInSeconds: number): Promise<string> {
+    // Presigning is local HMAC work in the AWS SDK, so no network latency is injected here.
+    const signature = createHmac('sha256', 'bench-secret').update(`${bucket}/${key}/${expiresInSeconds}`).digest('hex');
+    return `https://${bucket}.s3.local/${key}?X-Amz-Expires=${expiresInSeconds}&X-Amz-Signature=${signature}`;
+  }
+
+  async listObjectKeys(bucket: string, prefix: string): Promise<string[]> {
+    await injectLatency(this.latency);
+    const bucketPrefix = `${bucket}/`;
+    return Array.from(this.objects.keys())
+      .filter((key) => key.startsWith(`${bucketPrefix}${prefix}`))
+      .map((key) => key.slice(bucketPrefix.length));
+  }
+
+  async getObjectBuffer(bucket: string, key: string): Promise<Buffer> {
+    await injectLatency(this.latency);
+    const body = this.objects.get(`${bucket}/${key}`);
+    if (!body) {
+      throw new Error(`Empty S3 object body for s3://${bucket}/${key}`);
+    }
+    return body;
+  }
+
+  async deleteObject(bucket: string, key: string): Promise<void> {
+    await injectLatency(this.latency);
+    this.objects.delete(`${bucket}/${key}`);
+  }
+}
+
+export class InMemoryMetadataProvider implements MetadataProvider {
+  private items = new Map<string, ReferenceMetadata>();
+  private neighbors = new Map<string, PartNeighborsRecord>();
+  private activeIndex = new Map<string, ActiveIndexRecord>();
+  private latency: LatencyProfile;
+
+  constructor(latency: LatencyProfile) {
+    this.latency = latency;
+  }
+
+  async putMetadata(tableName: string, item: ReferenceMetadata): Promise<void> {
+    await injectLatency(this.latency);
+    this.seed(tableName, item);
+  }
+
+  async putMetadataBatch(tableName: string, items: ReferenceMetadata[]): Promise<void> {
+    await injectLatency(this.latency);
+    items.forEach((item) => this.seed(tableName, item));
+  }
+
+  /** Loads an item without injected latency. */
+  seed(tableName: string, item: ReferenceMetadata): void {
+    this.items.set(`${tableName}/${item.id}`, item);
+  }
+
+  async getMetadata(tableName: string, id: string): Promise<ReferenceMetadata | null> {
+    await injectLatency(this.latency);
+    return this.items.get(`${tableName}/${id}`) ?? null;
+  }
+
+  async putPartNeighbors(tableName: string, record: PartNeighborsRecord): Promise<void> {
+    await injectLatency(this.latency);
+    this.neighbors.set(`${tableName}/${record.partId}`, record);
+  }
+
+  async getPartNeighbors(tableName: string, partId: string): Promise<PartNeighborsRecord | null> {
+    await injectLatency(this.latency);
+    return this.neighbors.get(`${tableName}/${partId}`) ?? null;
+  }
+
+  async deletePartNeighbors(tableName: string, partId: string): Promise<void> {
+    await injectLatency(this.latency);
+    this.neighbors.delete(`${tableName}/${partId}`);
+  }
+
+  async deleteMetadataWithPrefix(tableName: string, prefix: string): Promise<number> {
+    await injectLatency(this.latency);
+    let deleted = 0;
+    for (const map of [this.items, this.neighbors] as Map<string, unknown>[]) {
+      for (const key of Array.from(map.keys())) {
+        if (key.startsWith(`${tableName}/${prefix}`)) {
+          map.delete(key);
+          deleted += 1;
+        }
+      }
+    }
+    return deleted;
+  }
+
+  async deleteUnversionedMetadata(tableName: string): Promise<number> {
+    await injectLatency(this.latency);
+    let deleted = 0;
+    for (const map of [this.items, this.neighbors] as Map<string, unknown>[]) {
+      for (const key of Array.from(map.keys())) {
+        if (key.startsWith(`${tableName}/`) && !hasVersionPrefix(key.slice(tableName.length + 1))) {
+          map.delete(key);
+          deleted += 1;
+        }
+      }
+    }
+    return deleted;
+  }
+
+  async getActiveIndex(tableName: string): Promise<ActiveIndexRecord | null> {
+    await injectLatency(this.latency);
+    return this.activeIndex.get(tableName) ?? null;
+  }
+
+  async putActiveIndex(tableName: string, record: ActiveIndexRecord, expectedVersion: string | null): Promise<void> {
+    await injectLatency(this.latency);
+    if ((this.activeIndex.get(tableName)?.version ?? null) !== expectedVersion) {
+      throw new Error(`Active index pointer changed concurrently (expected ${expectedVersion ?? 'none'})`);
+    }
+    this.activeIndex.set(tableName, record);
+  }
+}
+
+function matchesFilter(metadata: VectorMetadata, filter: VectorMetadataFilter | undefined): boolean {
+  for (const [field, accepted] of Object.entries(filter ?? {})) {
+    const value = metadata[field];
+    const present = Array.isArray(value) ? value : value === undefined ? [] : [value];
+    if (accepted.length > 0 && !present.some((item) => accepted.includes(item))) {
+      return false;
+    }
+  }
+  return true;
+}
+
+function scalarMetadata(metadata: VectorMetadata): Record<string, string> {
+  const result: Record<string, string> = {};
+  for (const [key, value] of Object.entries(metadata)) {
+    if (typeof value === 'string') {
+      result[key] = value;
+    }
+  }
+  return result;
+}
+
+export class InMemoryVectorProvider implements VectorProvider {
+  private entries = new Map<string, { id: string; values: Float32Array; metadata: VectorMetadata }>();
+  private latency: LatencyProfile;
+
+  constructor(latency: LatencyProfile) {
+    this.latency = latency;
+  }
+
+  get size(): number {
+    return this.entries.size;
+  }
+
+  async upsertVectors(indexName: string, namespace: string, records: VectorRecord[]): Promise<void> {
+    await injectLatency(this.latency);
+    for (const record of records) {
+      this.seed(indexName, namespace, record.id, record.values, record.metadata);
+    }
+  }
+
+  /** Loads a vector without injected latency. */
+  seed(indexName: string, namespace: string, id: string, values: number[], metadata: VectorMetadata = {}): void {
+    this.entries.set(`${indexName}/${namespace}/${id}`, { id, values: Float32Array.from(values), metadata });
+  }
+
+  async deleteVectors(indexName: string, namespace: string, ids: string[]): Promise<void> {
+    await injectLatency(this.latency);
+    for (const id of ids) {
+      this.entries.delete(`${indexName}/${namespace}/${id}`);
+    }
+  }
+
+  async countVectors(indexName: string, namespace: string): Promise<number> {
+    await injectLatency(this.latency);
+    return Array.from(this.entries.keys()).filter((key) => key.startsWith(`${indexName}/${namespace}/`)).length;
+  }
+
+  async deleteNamespace(indexName: string, namespace: string): Promise<void> {
+    await injectLatency(this.latency);
+    for (const key of Array.from(this.entries.keys())) {
+      if (key.startsWith(`${indexName}/${namespace}/`)) {
+        this.entries.delete(key);
+      }
+    }
+  }
+
+  async queryVectors(
+    indexName: string,
+    namespace: string,
+    vector: number[],
+    topK: number,
+    options: VectorQueryOptions = {}
+  ): Promise<VectorMatch[]> {
+    await injectLatency(this.latency);
+    const scopePrefix = `${indexName}/${namespace}/`;
+    const top: VectorMatch[] = [];
+    for (const [key, entry] of this.entries) {
+      if (!key.startsWith(scopePrefix) || !matchesFilter(entry.metadata, options.filter)) {
+        continue;
+      }
+      let score = 0;
+      for (let i = 0; i < entry.values.length; i += 1) {
+        score += entry.values[i] * vector[i];
+      }
+      if (top.length === topK && score <= top[top.length - 1].score) {
+        continue;
+      }
+      let insertAt = top.length;
+      while (insertAt > 0 && top[insertAt - 1].score < score) {
+        insertAt -= 1;
+      }
+      top.splice(
+        insertAt,
+        0,
+        options.includeMetadata ? { id: entry.id, score, metadata: scalarMetadata(entry.metadata) } : { id: entry.id, score }
+      );
+      if (top.length > topK) {
+        top.pop();
+      }
+    }
+    return top;
+  }
+}
+
+/** Resolves query images built by `buildQueryImage` back to their precomputed vectors. */
+export class FakeEmbeddingProvider implements EmbeddingProvider {
+  private vectors: number[][];
+  private latency: LatencyProfile;
+
+  constructor(vectors: number[][], latency: LatencyProfile) {
+    this.vectors = vectors;
+    this.latency = latency;
+  }
+
+  async embedBuffer(buffer: Buffer): Promise<number[]> {
+    await injectLatency(this.latency);
+    return this.lookup(buffer);
+  }
+
+  /** Pays the injected latency once per batch, like a single batched forward pass. */
+  async embedBuffers(inputs: EmbeddingInput[]): Promise<number[][]> {
+    await injectLatency(this.latency);
+    return inputs.map((input) => this.lookup(input.buffer));
+  }
+
+  private lookup(buffer: Buffer): number[] {
+    const vector = this.vectors[buffer.readUInt32BE(QUERY_INDEX_OFFSET)];
+    if (!vector) {
+      throw new Error('Unknown benchmark query image');
+    }
+    return vector;
+  }
+}
+
+export function buildQueryImage(index: number, sizeBytes: number): Buffer {
+  const image = Buffer.alloc(Math.max(sizeBytes, QUERY_INDEX_OFFSET + 4));
+  PNG_SIGNATURE.copy(image, 0);
+  image.writeUInt32BE(index, QUERY_INDEX_OFFSET);
+  for (let i = QUERY_INDEX_OFFSET + 4; i < image.length; i += 1) {
+    image[i] = (i * 131 + index) & 0xff;
+  }
+  return image;
+}
+
+export type GeneratedCatalog = {
+  parts: string[];
+  queryVectors: number[][];
+  queryTargets: string[];
+};
+
+export type CatalogSink = {
+  writeMetadata(item: ReferenceMetadata): void | Promise<void>;
+  writeVector(id: string, values: number[], metadata: { model: string; view: string; s3Key: string }): void | Promise<void>;
+};
+
+/**
+ * Writes `parts` x 7 view vectors (and their metadata) and derives `queries` noisy query vectors
+ * from random part views, so every query has a known target part.
+ */
+export async function generateCatalog(
+  sink: CatalogSink,
+  options: { parts: number; queries: number; dims: number; seed: number }
+): Promise<GeneratedCatalog> {
+  const random = createRandom(options.seed);
+  const parts: string[] = [];
+  const viewVectors: number[][] = [];
+  const viewOwners: string[] = [];
+
+  for (let p = 0; p < options.parts; p += 1) {
+    const partId = `bench_part_${String(p).padStart(5, '0')}`;
+    parts.push(partId);
+    const base = normalize(Array.from({ length: options.dims }, () => random() - 0.5));
+    for (const view of CATALOG_VIEWS) {
+      const id = `${partId}-${view}`;
+      const s3Key = `reference_snapshots/${partId}/${view}.png`;
+      const values = perturb(base, 0.6, random);
+      viewVectors.push(values);
+      viewOwners.push(partId);
+      await sink.writeMetadata({ id, model: partId, view, s3Key, label: `${partId} - ${view} view` });
+      await sink.writeVector(id, values, { model: partId, view, s3Key });
+    }
+  }
+
+  const queryVectors: number[][] = [];
+  const queryTargets: string[] = [];
+  for (let q = 0; q < options.queries; q += 1) {
+    const source = Math.floor(random() * viewVectors.length);
+    queryVectors.push(perturb(viewVectors[source], 0.4, random));
+    queryTargets.push(viewOwners[source]);
+  }
+
+  return { parts, queryVectors, queryTargets };
+}
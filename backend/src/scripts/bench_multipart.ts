@@ -0,0 +1,134 @@
+import type { APIGatewayProxyEventV2 } from 'aws-lambda';
+import { parseMultipartBuffer, parseMultipartWithBusboy, parseUploadedFile } from '../utils/multipart';
+import { percentile } from '../utils/metrics';
+
+// Run with `node --expose-gc` (see `npm run bench:multipart`) for stable allocation numbers.
+const SIZES = [100 * 1024, 500 * 1024, 1024 * 1024, 2 * 1024 * 1024, 5 * 1024 * 1024];
+const BOUNDARY = '----industrilityBenchBoundary7MA4YWxkTrZu0gW';
+const DEFAULT_ITERATIONS = 50;
+
+type Strategy = {
+  name: string;
+  parse: (event: APIGatewayProxyEventV2, buffer: Buffer, contentType: string, maxBytes: number) => Promise<unknown>;
+};
+
+type BenchResult = {
+  strategy: string;
+  sizeBytes: number;
+  iterations: number;
+  meanMs: number;
+  p50Ms: number;
+  p99Ms: number;
+  meanAllocatedBytes: number;
+};
+
+const strategies: Strategy[] = [
+  {
+    name: 'busboy',
+    parse: (_event, buffer, contentType, maxBytes) =>
+      parseMultipartWithBusboy(buffer, contentType, { fieldName: 'file', maxBytes })
+  },
+  {
+    name: 'scanner',
+    parse: async (_event, buffer, contentType, maxBytes) =>
+      parseMultipartBuffer(buffer, contentType, { fieldName: 'file', maxBytes })
+  },
+  {
+    name: 'handler_multipart',
+    parse: (event, _buffer, _contentType, maxBytes) => parseUploadedFile(event, { fieldName: 'file', maxBytes })
+  },
+  {
+    name: 'handler_raw_body',
+    parse: (event, _buffer, _contentType, maxBytes) => parseUploadedFile(event, { fieldName: 'file', maxBytes })
+  }
+];
+
+function buildMultipartBody(size: number): Buffer {
+  const file = Buffer.alloc(size);
+  for (let i = 0; i < size; i += 1) {
+    file[i] = (i * 31 + 7) & 0xff;
+  }
+  return Buffer.concat([
+    Buffer.from(
+      `--${BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="bench.png"\r\nContent-Type: image/png\r\n\r\n`
+    ),
+    file,
+    Buffer.from(`\r\n--${BOUNDARY}--\r\n`)
+  ]);
+}
+
+function buildEvent(body: Buffer, contentType: string): APIGatewayProxyEventV2 {
+  return {
+    headers: { 'content-type': contentType },
+    body: body.toString('base64'),
+    isBase64Encoded: true
+  } as unknown as APIGatewayProxyEventV2;
+}
+
+function collectGarbage(): void {
+  const gc = (globalThis as { gc?: () => void }).gc;
+  if (gc) {
+    gc();
+  }
+}
+
+async function runStrategy(strategy: Strategy, size: number, iterations: number): Promise<BenchResult> {
+  const contentType = `multipart/form-data; boundary=${BOUNDARY}`;
+  const body = buildMultipartBody(size);
+  const event = buildEvent(body, contentType);
+  // The raw-body strategy posts the same file bytes without the multipart envelope.
+  const filePart = parseMultipartBuffer(body, contentType, { fieldName: 'file', maxBytes: size + 1 });
+  const target = strategy.name === 'handler_raw_body' && filePart ? buildEvent(filePart.buffer, 'image/png') : event;
+
+  await strategy.parse(target, body, contentType, size + 1);
+
+  const durations: number[] = [];
+  let allocated = 0;
+  for (let i = 0; i < iterations; i += 1) {
+    collectGarbage();
+    const before = process.memoryUsage().arrayBuffers;
+    const startedAt = process.hrtime.bigint();
+    await strategy.parse(target, body, contentType, size + 1);
+    const elapsedNs = process.hrtime.bigint() - startedAt;
+    allocated += Math.max(0, process.memoryUsage().arrayBuffers - before);
+    durations.push(Number(elapsedNs) / 1e6);
+  }
+
+  const sorted = [...durations].sort((a, b) => a - b);
+  return {
+    strategy: strategy.name,
+    sizeBytes: size,
+    iterations,
+    meanMs: durations.reduce((acc, value) => acc + value, 0) / durations.length,
+    p50Ms: percentile(sorted, 50),
+    p99Ms: percentile(sorted, 99),
+    meanAllocatedBytes: Math.round(allocated / iterations)
+  };
+}
+
+async function run(): Promise<void> {
+  const iterationsArg = Number.parseInt(process.argv[2] ?? '', 10);
+  const iterations = Number.isInteger(iterationsArg) && iterationsArg > 0 ? iterationsArg : DEFAULT_ITERATIONS;
+  if (!(globalThis as { gc?: () => void }).gc) {
+    console.warn('[BENCH] global.gc is not exposed; allocation numbers include garbage from earlier iterations.');
+  }
+
+  const results: BenchResult[] = [];
+  for (const size of SIZES) {
+    for (const strategy of strategies) {
+      const result = await runStrategy(strategy, size, iterations);
+      results.push(result);
+      console.log(
+        `[BENCH] strategy=${result.strategy} size=${size} mean_ms=${result.meanMs.toFixed(3)} p50_ms=${result.p50Ms.toFixed(3)} p99_ms=${result.p99Ms.toFixed(3)} alloc_bytes=${result.meanAllocatedBytes}`
+      );
+    }
+  }
+
+  console.log(JSON.stringify({ iterations, results }, null, 2));
+}
+
+run().catch((error) => {
+  const message = error instanceof Error ? error.message : String(error);
+  console.error(`[FATAL] ${message}`);
+  process.exit(1);
+});
@@ -0,0 +1,353 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from snapshot_renderer_common import RENDER_ARGS_ENV, TIMINGS_PATH_ENV
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))
+DEFAULT_INPUT_DIR = os.path.join(BACKEND_DIR, "assets", "cad_inputs")
+VIEW_NAMES = ["top", "bottom", "left", "right", "front", "back", "isometric"]
+RSS_SAMPLE_INTERVAL_SECONDS = 0.05
+
+RENDERERS = {
+    "freecad": {
+        "script": "freecad_step_snapshot_renderer.py",
+        "extensions": {".step", ".stp"},
+    },
+    "freecad_headless": {
+        "script": "headless_snapshot_renderer.py",
+        "extensions": {".step", ".stp"},
+    },
+    "blender_step": {
+        "script": "blender_step_snapshot_renderer.py",
+        "extensions": {".step", ".stp"},
+    },
+    "blender_mesh": {
+        "script": "blender_snapshot_renderer.py",
+        "extensions": {".stl", ".obj"},
+    },
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the CAD snapshot renderers over local CAD inputs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Render every input with each renderer and record timings")
+    run_parser.add_argument("--input_dir", default=DEFAULT_INPUT_DIR, help="Directory scanned recursively for CAD files")
+    run_parser.add_argument("--renderers", default="freecad", help="Comma-separated: " + ",".join(RENDERERS))
+    run_parser.add_argument("--freecad_cmd", default="FreeCAD", help="FreeCAD GUI executable")
+    run_parser.add_argument("--freecadcmd_cmd", default="FreeCADCmd", help="FreeCAD console executable (freecad_headless)")
+    run_parser.add_argument("--blender_cmd", default="blender", help="Blender executable")
+    run_parser.add_argument("--size", type=int, default=512, help="Snapshot size in pixels")
+    run_parser.add_argument("--repeat", type=int, default=1, help="Runs per file and renderer")
+    run_parser.add_argument("--timeout", type=int, default=900, help="Per-render timeout in seconds")
+    run_parser.add_argument("--label", default="", help="Free-form label stored with the results")
+    run_parser.add_argument("--output", required=True, help="Path of the results JSON")
+    run_parser.add_argument("--keep_outputs", action="store_true", help="Keep rendered PNGs next to the results")
+
+    compare_parser = sub.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline", help="Baseline results JSON")
+    compare_parser.add_argument("candidate", help="Candidate results JSON")
+    compare_parser.add_argument("--json", action="store_true", help="Print the comparison as JSON")
+
+    return parser.parse_args()
+
+
+def list_inputs(input_dir, extensions):
+    inputs = []
+    for root, _, files in os.walk(input_dir):
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in extensions:
+                inputs.append(os.path.join(root, name))
+    return sorted(inputs)
+
+
+def build_command(renderer, args, input_path, output_dir):
+    script = os.path.join(SCRIPT_DIR, RENDERERS[renderer]["script"])
+    if renderer == "freecad":
+        return [args.freecad_cmd, script, input_path, output_dir, str(args.size)]
+    if renderer == "freecad_headless":
+        # Arguments travel in RENDER_ARGS_ENV; see run_render.
+        return [args.freecadcmd_cmd, script]
+    return [
+        args.blender_cmd,
+        "-b",
+        "-P",
+        script,
+        "--",
+        "--input",
+        input_path,
+        "--output_dir",
+        output_dir,
+        "--size",
+        str(args.size),
+    ]
+
+
+def sample_peak_rss(pid, stop_event, result):
+    # POSIX reads peak RSS from os.wait4; this sampler covers Windows when psutil is installed.
+    try:
+        import psutil
+    except ImportError:
+        return
+    try:
+        proc = psutil.Process(pid)
+    except psutil.Error:
+        return
+    peak = 0
+    while not stop_event.is_set():
+        try:
+            total = proc.memory_info().rss
+            for child in proc.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            peak = max(peak, total)
+        except psutil.Error:
+            break
+        stop_event.wait(RSS_SAMPLE_INTERVAL_SECONDS)
+    result["peak_rss_bytes"] = peak
+
+
+def wait_with_rusage(proc, timeout, rss_result):
+    deadline = time.monotonic() + timeout
+    timed_out = False
+    while True:
+        # After a kill, block until the child is reaped so it leaves no zombie and its rusage is kept.
+        pid, status, usage = os.wait4(proc.pid, 0 if timed_out else os.WNOHANG)
+        if pid != 0:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is KiB on Linux and bytes on macOS.
+            scale = 1 if sys.platform == "darwin" else 1024
+            rss_result["wait4_peak_rss_bytes"] = usage.ru_maxrss * scale
+            if timed_out:
+                raise subprocess.TimeoutExpired(proc.args, timeout)
+            return
+        if time.monotonic() > deadline:
+            proc.kill()
+            timed_out = True
+            continue
+        time.sleep(RSS_SAMPLE_INTERVAL_SECONDS)
+
+
+def run_render(renderer, args, input_path, work_dir):
+    output_dir = tempfile.mkdtemp(prefix=f"{renderer}_", dir=work_dir)
+    timings_path = os.path.join(output_dir, "timings.json")
+    log_path = os.path.join(output_dir, "render.log")
+    env = dict(os.environ)
+    env[TIMINGS_PATH_ENV] = timings_path
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if renderer == "freecad_headless":
+        env[RENDER_ARGS_ENV] = json.dumps(["render", input_path, output_dir, str(args.size)])
+
+    record = {
+        "file": os.path.basename(input_path),
+        "renderer": renderer,
+        "ok": False,
+        "exit_code": None,
+        "wall_seconds": None,
+        "peak_rss_bytes": None,
+        "phases": {},
+        "png_bytes": {},
+        "total_png_bytes": 0,
+        "output_dir": output_dir,
+    }
+
+    rss_result = {}
+    stop_event = threading.Event()
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log_handle:
+        try:
+            proc = subprocess.Popen(
+                build_command(renderer, args, input_path, output_dir),
+                stdout=log_handle,
+                stderr=subprocess.STDOUT,
+                env=env,
+            )
+        except OSError as error:
+            record["error"] = str(error)
+            record["wall_seconds"] = time.perf_counter() - started
+            return record
+
+        sampler = threading.Thread(target=sample_peak_rss, args=(proc.pid, stop_event, rss_result), daemon=True)
+        sampler.start()
+        try:
+            if hasattr(os, "wait4"):
+                wait_with_rusage(proc, args.timeout, rss_result)
+            else:
+                proc.wait(timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            record["error"] = f"timeout after {args.timeout}s"
+        finally:
+            stop_event.set()
+            sampler.join()
+
+    record["wall_seconds"] = time.perf_counter() - started
+    record["exit_code"] = proc.returncode
+    record["peak_rss_bytes"] = rss_result.get("wait4_peak_rss_bytes") or rss_result.get("peak_rss_bytes")
+
+    if os.path.exists(timings_path):
+        with open(timings_path, "r", encoding="utf-8") as handle:
+            for phase in json.load(handle).get("phases", []):
+                record["phases"][phase["name"]] = record["phases"].get(phase["name"], 0.0) + phase["seconds"]
+
+    for view_name in VIEW_NAMES:
+        png_path = os.path.join(output_dir, f"{view_name}.png")
+        if os.path.exists(png_path):
+            record["png_bytes"][view_name] = os.path.getsize(png_path)
+    record["total_png_bytes"] = sum(record["png_bytes"].values())
+    record["ok"] = proc.returncode == 0 and len(record["png_bytes"]) == len(VIEW_NAMES)
+    return record
+
+
+def summarize(records):
+    groups = {}
+    for record in records:
+        groups.setdefault((record["file"], record["renderer"]), []).append(record)
+
+    summary = []
+    for (file_name, renderer), runs in sorted(groups.items()):
+        ok_runs = [run for run in runs if run["ok"]]
+        phase_names = sorted({name for run in ok_runs for name in run["phases"]})
+        summary.append(
+            {
+                "file": file_name,
+                "renderer": renderer,
+                "runs": len(runs),
+                "ok_runs": len(ok_runs),
+                "median_wall_seconds": statistics.median([run["wall_seconds"] for run in ok_runs]) if ok_runs else None,
+                "max_peak_rss_bytes": max((run["peak_rss_bytes"] or 0 for run in ok_runs), default=None),
+                "median_total_png_bytes": statistics.median([run["total_png_bytes"] for run in ok_runs]) if ok_runs else None,
+                "median_phase_seconds": {
+                    name: statistics.median([run["phases"][name] for run in ok_runs if name in run["phases"]])
+                    for name in phase_names
+                },
+            }
+        )
+    return summary
+
+
+def command_run(args):
+    renderers = [name.strip() for name in args.renderers.split(",") if name.strip()]
+    unknown = [name for name in renderers if name not in RENDERERS]
+    if unknown:
+        raise RuntimeError(f"Unknown renderer(s): {', '.join(unknown)}")
+    if args.repeat <= 0:
+        raise RuntimeError("Invalid --repeat value. Expected a positive integer.")
+
+    output_path = os.path.abspath(args.output)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="render_bench_")
+
+    records = []
+    for renderer in renderers:
+        inputs = list_inputs(args.input_dir, RENDERERS[renderer]["extensions"])
+        if not inputs:
+            print(f"WARN: No inputs for renderer={renderer} under {args.input_dir}")
+        for input_path in inputs:
+            for attempt in range(args.repeat):
+                record = run_render(renderer, args, input_path, work_dir)
+                record["attempt"] = attempt + 1
+                records.append(record)
+                print(
+                    f"[RENDER_BENCH] renderer={renderer} file={record['file']} attempt={attempt + 1} ok={record['ok']} "
+                    f"wall_s={record['wall_seconds']:.2f} peak_rss_mb={(record['peak_rss_bytes'] or 0) / 1048576:.1f} "
+                    f"png_bytes={record['total_png_bytes']}"
+                )
+                sys.stdout.flush()
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "label": args.label,
+        "host": {"platform": platform.platform(), "python": platform.python_version(), "cpu_count": os.cpu_count()},
+        "config": {"renderers": renderers, "size": args.size, "repeat": args.repeat, "input_dir": args.input_dir},
+        "runs": records,
+        "summary": summarize(records),
+    }
+    with open(output_path, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"Wrote {len(records)} render results to {output_path}")
+
+    if args.keep_outputs:
+        print(f"Rendered outputs kept under {work_dir}")
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0 if all(record["ok"] for record in records) else 1
+
+
+def relative_change(baseline, candidate):
+    if baseline in (None, 0) or candidate is None:
+        return None
+    return (candidate - baseline) / baseline
+
+
+def command_compare(args):
+    with open(args.baseline, "r", encoding="utf-8") as handle:
+        baseline = {(item["file"], item["renderer"]): item for item in json.load(handle)["summary"]}
+    with open(args.candidate, "r", encoding="utf-8") as handle:
+        candidate = {(item["file"], item["renderer"]): item for item in json.load(handle)["summary"]}
+
+    rows = []
+    for key in sorted(set(baseline) & set(candidate)):
+        before = baseline[key]
+        after = candidate[key]
+        metrics = {
+            "wall_seconds": (before["median_wall_seconds"], after["median_wall_seconds"]),
+            "peak_rss_bytes": (before["max_peak_rss_bytes"], after["max_peak_rss_bytes"]),
+            "total_png_bytes": (before["median_total_png_bytes"], after["median_total_png_bytes"]),
+        }
+        for phase in sorted(set(before["median_phase_seconds"]) | set(after["median_phase_seconds"])):
+            metrics[f"phase:{phase}"] = (
+                before["median_phase_seconds"].get(phase),
+                after["median_phase_seconds"].get(phase),
+            )
+        for metric, (old, new) in metrics.items():
+            rows.append(
+                {
+                    "file": key[0],
+                    "renderer": key[1],
+                    "metric": metric,
+                    "baseline": old,
+                    "candidate": new,
+                    "change": relative_change(old, new),
+                }
+            )
+
+    if args.json:
+        print(json.dumps({"rows": rows}, indent=2))
+        return 0
+
+    print(f"{'file':<32}{'renderer':<14}{'metric':<32}{'baseline':>14}{'candidate':>14}{'change':>10}")
+    for row in rows:
+        old = "-" if row["baseline"] is None else f"{row['baseline']:.3f}"
+        new = "-" if row["candidate"] is None else f"{row['candidate']:.3f}"
+        change = "-" if row["change"] is None else f"{row['change'] * 100:+.1f}%"
+        print(f"{row['file']:<32}{row['renderer']:<14}{row['metric']:<32}{old:>14}{new:>14}{change:>10}")
+    missing = sorted(set(baseline) ^ set(candidate))
+    for file_name, renderer in missing:
+        print(f"WARN: {file_name} ({renderer}) present in only one of the result files")
+    return 0
+
+
+def main():
+    args = parse_args()
+    if args.command == "run":
+        return command_run(args)
+    return command_compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,468 @@
+import fs from 'fs/promises';
+import path from 'path';
+import { performance } from 'perf_hooks';
+import type { APIGatewayProxyEventV2, APIGatewayProxyHandlerV2, APIGatewayProxyStructuredResultV2, Context } from 'aws-lambda';
+import {
+  FakeEmbeddingProvider,
+  InMemoryMetadataProvider,
+  InMemoryStorageProvider,
+  InMemoryVectorProvider,
+  LatencyProfile,
+  buildQueryImage,
+  generateCatalog,
+  parseLatencyProfile
+} from './bench_fakes';
+
+const BENCH_BOUNDARY = '----industrilitySearchBench';
+const BENCH_BUCKET = 'bench-bucket';
+const BENCH_TABLE = 'bench-table';
+const BENCH_INDEX = 'bench-index';
+const BENCH_NAMESPACE = 'bench';
+
+type CliOptions = {
+  parts: number;
+  queries: number;
+  dims: number;
+  queryBytes: number;
+  photos: number;
+  requests: number;
+  warmup: number;
+  concurrency: number[];
+  seed: number;
+  s3Latency: LatencyProfile;
+  dynamoLatency: LatencyProfile;
+  vectorLatency: LatencyProfile;
+  embeddingLatency: LatencyProfile;
+  embeddingBatchWindowMs: number;
+  embeddingBatchMaxSize: number;
+  maxInFlight: number;
+  maxQueue: number;
+  deadlineMs: number;
+  guards: boolean;
+  output?: string;
+  baseline?: string;
+  tolerance: number;
+};
+
+type LatencyStats = {
+  p50Ms: number;
+  p95Ms: number;
+  p99Ms: number;
+  maxMs: number;
+};
+
+type LevelReport = {
+  concurrency: number;
+  requests: number;
+  errors: number;
+  shed: number;
+  durationMs: number;
+  throughputRps: number;
+  latency: LatencyStats;
+  stages: Record<string, LatencyStats>;
+};
+
+type BenchReport = {
+  createdAt: string;
+  config: Omit<CliOptions, 'output' | 'baseline'>;
+  levels: LevelReport[];
+};
+
+function parseArgs(argv: string[]): CliOptions {
+  const options: CliOptions = {
+    parts: 500,
+    queries: 64,
+    dims: 512,
+    queryBytes: 150 * 1024,
+    photos: 1,
+    requests: 200,
+    warmup: 10,
+    concurrency: [1, 4, 16, 64],
+    seed: 42,
+    s3Latency: { baseMs: 15, jitterMs: 10, tailRate: 0, tailMs: 0 },
+    dynamoLatency: { baseMs: 6, jitterMs: 4, tailRate: 0, tailMs: 0 },
+    vectorLatency: { baseMs: 25, jitterMs: 15, tailRate: 0, tailMs: 0 },
+    embeddingLatency: { baseMs: 60, jitterMs: 20, tailRate: 0, tailMs: 0 },
+    embeddingBatchWindowMs: 4,
+    embeddingBatchMaxSize: 1,
+    maxInFlight: 0,
+    maxQueue: 32,
+    deadlineMs: 25_000,
+    guards: false,
+    tolerance: 0.15
+  };
+
+  const nextValue = (index: number, flag: string): string => {
+    const value = argv[index + 1];
+    if (!value || value.startsWith('--')) {
+      throw new Error(`Missing value for ${flag}`);
+    }
+    return value;
+  };
+  const positiveInt = (value: string, flag: string): number => {
+    const parsed = Number.parseInt(value, 10);
+    if (!Number.isInteger(parsed) || parsed <= 0) {
+      throw new Error(`Invalid ${flag} value. Expected a positive integer.`);
+    }
+    return parsed;
+  };
+
+  for (let i = 0; i < argv.length; i += 1) {
+    const arg = argv[i];
+    switch (arg) {
+      case '--parts':
+        options.parts = positiveInt(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--queries':
+        options.queries = positiveInt(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--dims':
+        options.dims = positiveInt(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--query_bytes':
+        options.queryBytes = positiveInt(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--photos':
+        options.photos = positiveInt(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--requests':
+        options.requests = positiveInt(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--warmup':
+        options.warmup = Number.parseInt(nextValue(i, arg), 10) || 0;
+        i += 1;
+        break;
+      case '--concurrency':
+        options.concurrency = nextValue(i, arg)
+          .split(',')
+          .map((value) => positiveInt(value.trim(), arg));
+        i += 1;
+        break;
+      case '--seed':
+        options.seed = Number.parseInt(nextValue(i, arg), 10);
+        i += 1;
+        break;
+      case '--s3_latency':
+        options.s3Latency = parseLatencyProfile(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--dynamo_latency':
+        options.dynamoLatency = parseLatencyProfile(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--vector_latency':
+        options.vectorLatency = parseLatencyProfile(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--embedding_latency':
+        options.embeddingLatency = parseLatencyProfile(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--embedding_batch_window':
+        options.embeddingBatchWindowMs = Number.parseInt(nextValue(i, arg), 10) || 0;
+        i += 1;
+        break;
+      case '--embedding_batch_size':
+        options.embeddingBatchMaxSize = positiveInt(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--max_in_flight':
+        options.maxInFlight = Number.parseInt(nextValue(i, arg), 10) || 0;
+        i += 1;
+        break;
+      case '--max_queue':
+        options.maxQueue = Number.parseInt(nextValue(i, arg), 10) || 0;
+        i += 1;
+        break;
+      case '--deadline_ms':
+        options.deadlineMs = positiveInt(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--guards':
+        options.guards = true;
+        break;
+      case '--output':
+        options.output = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--baseline':
+        options.baseline = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--tolerance':
+        options.tolerance = Number.parseFloat(nextValue(i, arg));
+        i += 1;
+        break;
+      default:
+        if (arg.startsWith('--')) {
+          throw new Error(`Unknown argument: ${arg}`);
+        }
+    }
+  }
+
+  if (!Number.isFinite(options.tolerance) || options.tolerance < 0) {
+    throw new Error('Invalid --tolerance value. Expected a non-negative number.');
+  }
+  return options;
+}
+
+function buildSearchEvent(images: Buffer[], requestId: string): APIGatewayProxyEventV2 {
+  const body = Buffer.concat([
+    ...images.flatMap((image, index) => [
+      Buffer.from(
+        `--${BENCH_BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="query-${index}.png"\r\nContent-Type: image/png\r\n\r\n`
+      ),
+      image,
+      Buffer.from('\r\n')
+    ]),
+    Buffer.from(`--${BENCH_BOUNDARY}--\r\n`)
+  ]);
+  return {
+    headers: { 'content-type': `multipart/form-data; boundary=${BENCH_BOUNDARY}` },
+    body: body.toString('base64'),
+    isBase64Encoded: true,
+    requestContext: { requestId, http: { method: 'POST', path: '/search' } }
+  } as unknown as APIGatewayProxyEventV2;
+}
+
+function parseServerTiming(header: string | undefined): Map<string, number> {
+  const stages = new Map<string, number>();
+  for (const entry of (header ?? '').split(',')) {
+    const [name, ...params] = entry.trim().split(';');
+    const duration = params.find((param) => param.startsWith('dur='));
+    if (name && duration) {
+      stages.set(name, Number.parseFloat(duration.slice(4)));
+    }
+  }
+  return stages;
+}
+
+async function run(): Promise<void> {
+  const options = parseArgs(process.argv.slice(2));
+  // Keep per-request logging out of the measurement unless explicitly requested.
+  process.env.LOG_LEVEL = process.env.LOG_LEVEL ?? 'WARN';
+
+  const { createSearchHandler } = await import('../handlers/search');
+  const { EmbeddingService } = await import('../services/embeddingService');
+  const { PineconeService } = await import('../services/pineconeService');
+  const { MetadataService } = await import('../services/metadataService');
+  const { StorageService } = await import('../services/storageService');
+  const { CandidateService } = await import('../services/candidateService');
+  const { EmbeddingBatcher } = await import('../services/embeddingBatcher');
+  const { AdmissionController } = await import('../services/admissionController');
+  const { DependencyGuard } = await import('../services/dependencyGuard');
+  const { env } = await import('../config/env');
+  const { percentile } = await import('../utils/metrics');
+
+  const stats = (values: number[]): LatencyStats => {
+    const sorted = [...values].sort((a, b) => a - b);
+    return {
+      p50Ms: percentile(sorted, 50),
+      p95Ms: percentile(sorted, 95),
+      p99Ms: percentile(sorted, 99),
+      maxMs: sorted[sorted.length - 1] ?? 0
+    };
+  };
+
+  const vectorProvider = new InMemoryVectorProvider(options.vectorLatency);
+  const metadataProvider = new InMemoryMetadataProvider(options.dynamoLatency);
+  // --guards adds the production timeouts, hedging and circuit breakers (configured from the same env vars).
+  const guard = (name: string, timeoutMs: number) =>
+    options.guards
+      ? new DependencyGuard(name, {
+          timeoutMs,
+          hedgeMinDelayMs: env.hedgeMinDelayMs,
+          hedgeMaxRatio: env.hedgeMaxRatio,
+          failureThreshold: env.circuitFailureThreshold,
+          openMs: env.circuitOpenMs
+        })
+      : undefined;
+  const pineconeGuard = guard('pinecone', env.pineconeTimeoutMs);
+  const dynamodbGuard = guard('dynamodb', env.dynamodbTimeoutMs);
+  const metadataService = new MetadataService(metadataProvider, BENCH_TABLE, dynamodbGuard);
+  const pineconeService = new PineconeService(vectorProvider, BENCH_INDEX, BENCH_NAMESPACE, pineconeGuard);
+  const storageService = new StorageService(new InMemoryStorageProvider(options.s3Latency), BENCH_BUCKET);
+
+  // Catalog loading goes through the seed methods so it does not pay injected latency.
+  const catalogStartedAt = performance.now();
+  const catalog = await generateCatalog(
+    {
+      writeMetadata: (item) => metadataProvider.seed(BENCH_TABLE, item),
+      writeVector: (id, values) => vectorProvider.seed(BENCH_INDEX, BENCH_NAMESPACE, id, values)
+    },
+    { parts: options.parts, queries: options.queries, dims: options.dims, seed: options.seed }
+  );
+  console.log(
+    `[BENCH] catalog parts=${catalog.parts.length} vectors=${vectorProvider.size} queries=${catalog.queryVectors.length} load_ms=${(
+      performance.now() - catalogStartedAt
+    ).toFixed(0)}`
+  );
+
+  const embeddingProvider = new FakeEmbeddingProvider(catalog.queryVectors, options.embeddingLatency);
+  const embeddingBatcher =
+    options.embeddingBatchMaxSize > 1
+      ? new EmbeddingBatcher(embeddingProvider, {
+          windowMs: options.embeddingBatchWindowMs,
+          maxBatchSize: options.embeddingBatchMaxSize
+        })
+      : undefined;
+  const embeddingService = new EmbeddingService(embeddingProvider, embeddingBatcher);
+  const candidateService = new CandidateService(metadataService, storageService);
+  // --max_in_flight 0 (default) benchmarks without admission control.
+  const admission =
+    options.maxInFlight > 0
+      ? new AdmissionController({ maxInFlight: options.maxInFlight, maxQueue: options.maxQueue, deadlineMs: options.deadlineMs })
+      : null;
+  const handler: APIGatewayProxyHandlerV2 = createSearchHandler(
+    () => ({
+      configSummary: 'bench=in_process',
+      embeddingService,
+      pineconeService,
+      metadataService,
+      candidateService
+    }),
+    admission
+  );
+
+  // --photos N sends N query images per request (multi-photo search), cycling through the query set.
+  const events = catalog.queryVectors.map((_, index) =>
+    buildSearchEvent(
+      Array.from({ length: options.photos }, (_unused, photo) =>
+        buildQueryImage((index + photo) % catalog.queryVectors.length, options.queryBytes)
+      ),
+      `bench-${index}`
+    )
+  );
+  const invoke = async (index: number) =>
+    (await handler(events[index % events.length], {} as Context, () => undefined)) as APIGatewayProxyStructuredResultV2;
+
+  for (let i = 0; i < options.warmup; i += 1) {
+    await invoke(i);
+  }
+
+  const levels: LevelReport[] = [];
+  for (const concurrency of options.concurrency) {
+    const latencies: number[] = [];
+    const stageSamples = new Map<string, number[]>();
+    let errors = 0;
+    let shed = 0;
+    let cursor = 0;
+
+    const startedAt = performance.now();
+    await Promise.all(
+      Array.from({ length: Math.min(concurrency, options.requests) }, async () => {
+        while (true) {
+          const index = cursor;
+          cursor += 1;
+          if (index >= options.requests) {
+            return;
+          }
+          const requestStartedAt = performance.now();
+          const response = await invoke(index);
+          if (response.statusCode === 429 || response.statusCode === 503) {
+            // Shed requests are answered immediately; keep them out of the served-latency percentiles.
+            shed += 1;
+            continue;
+          }
+          latencies.push(performance.now() - requestStartedAt);
+          if (response.statusCode !== 200) {
+            errors += 1;
+          }
+          const serverTiming = response.headers?.['server-timing'];
+          for (const [stage, durationMs] of parseServerTiming(typeof serverTiming === 'string' ? serverTiming : undefined)) {
+            const values = stageSamples.get(stage) ?? [];
+            values.push(durationMs);
+            stageSamples.set(stage, values);
+          }
+        }
+      })
+    );
+    const durationMs = performance.now() - startedAt;
+
+    const stages: Record<string, LatencyStats> = {};
+    for (const [stage, values] of stageSamples) {
+      stages[stage] = stats(values);
+    }
+    const level: LevelReport = {
+      concurrency,
+      requests: options.requests,
+      errors,
+      shed,
+      durationMs,
+      throughputRps: ((options.requests - shed) / durationMs) * 1000,
+      latency: stats(latencies),
+      stages
+    };
+    levels.push(level);
+    console.log(
+      `[BENCH] concurrency=${concurrency} rps=${level.throughputRps.toFixed(1)} p50_ms=${level.latency.p50Ms.toFixed(1)} p95_ms=${level.latency.p95Ms.toFixed(
+        1
+      )} p99_ms=${level.latency.p99Ms.toFixed(1)} errors=${errors} shed=${shed}`
+    );
+    if (pineconeGuard && dynamodbGuard) {
+      console.log(
+        `[BENCH] guards pinecone=${JSON.stringify(pineconeGuard.getStats())} dynamodb=${JSON.stringify(dynamodbGuard.getStats())}`
+      );
+    }
+  }
+
+  const { output, baseline, ...config } = options;
+  const report: BenchReport = { createdAt: new Date().toISOString(), config, levels };
+  const serialized = JSON.stringify(report, null, 2);
+  if (output) {
+    await fs.mkdir(path.dirname(output), { recursive: true });
+    await fs.writeFile(output, serialized);
+    console.log(`[BENCH] report written to ${output}`);
+  } else {
+    console.log(serialized);
+  }
+
+  if (baseline) {
+    const regressions = compareWithBaseline(JSON.parse(await fs.readFile(baseline, 'utf8')) as BenchReport, report, options.tolerance);
+    if (regressions.length > 0) {
+      for (const regression of regressions) {
+        console.error(`[REGRESSION] ${regression}`);
+      }
+      process.exit(1);
+    }
+    console.log(`[BENCH] no regressions against ${baseline} (tolerance=${options.tolerance})`);
+  }
+}
+
+function compareWithBaseline(baseline: BenchReport, current: BenchReport, tolerance: number): string[] {
+  const regressions: string[] = [];
+  for (const level of current.levels) {
+    const previous = baseline.levels.find((item) => item.concurrency === level.concurrency);
+    if (!previous) {
+      continue;
+    }
+    const label = `concurrency=${level.concurrency}`;
+    if (level.throughputRps < previous.throughputRps * (1 - tolerance)) {
+      regressions.push(`${label} throughput ${level.throughputRps.toFixed(1)} < baseline ${previous.throughputRps.toFixed(1)}`);
+    }
+    for (const key of ['p95Ms', 'p99Ms'] as const) {
+      if (level.latency[key] > previous.latency[key] * (1 + tolerance)) {
+        regressions.push(`${label} ${key} ${level.latency[key].toFixed(1)} > baseline ${previous.latency[key].toFixed(1)}`);
+      }
+    }
+    for (const [stage, stageStats] of Object.entries(level.stages)) {
+      const previousStage = previous.stages[stage];
+      if (previousStage && stageStats.p95Ms > previousStage.p95Ms * (1 + tolerance)) {
+        regressions.push(`${label} stage=${stage} p95Ms ${stageStats.p95Ms.toFixed(1)} > baseline ${previousStage.p95Ms.toFixed(1)}`);
+      }
+    }
+  }
+  return regressions;
+}
+
+run().catch((error) => {
+  const message = error instanceof Error ? error.message : String(error);
+  console.error(`[FATAL] ${message}`);
+  process.exit(1);
+});
@@ -6,6 +6,10 @@ import sys
 import bpy
 from mathutils import Vector
 
+# Blender does not put the script's directory on sys.path.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from snapshot_renderer_common import timed_phase, write_phase_timings  # noqa: E402
+
 
 VIEWS = {
     "top": Vector((0.0, 0.0, 1.0)),
@@ -169,7 +173,8 @@ def render_views(camera, output_dir, distance):
         facing = target - camera.location
         camera.rotation_euler = facing.to_track_quat("-Z", "Y").to_euler()
         scene.render.filepath = os.path.join(output_dir, f"{view_name}.png")
-        bpy.ops.render.render(write_still=True)
+        with timed_phase(f"render:{view_name}"):
+            bpy.ops.render.render(write_still=True)
 
 
 def main():
@@ -180,21 +185,25 @@ def main():
     os.makedirs(output_dir, exist_ok=True)
 
     clear_scene()
-    import_mesh(input_path)
+    with timed_phase("import"):
+        import_mesh(input_path)
     objects = mesh_objects()
     if not objects:
         raise RuntimeError("No mesh objects found after import.")
 
-    center_objects(objects)
+    with timed_phase("recenter"):
+        center_objects(objects)
     size = max(args.size, 64)
     object_max_dim = max(max_dimension(objects), 0.001)
     ortho_scale = object_max_dim * 1.6
     distance = object_max_dim * 3.0
 
-    setup_world()
-    setup_lights()
+    with timed_phase("scene_setup"):
+        setup_world()
+        setup_lights()
     cam = setup_camera(size, ortho_scale)
     render_views(cam, output_dir, distance)
+    write_phase_timings()
     print(f"Rendered 7 views to {output_dir}")
 
 
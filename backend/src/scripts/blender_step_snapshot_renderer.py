@@ -6,6 +6,10 @@ import sys
 import bpy
 from mathutils import Vector
 
+# Blender does not put the script's directory on sys.path.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from snapshot_renderer_common import timed_phase, write_phase_timings  # noqa: E402
+
 
 VIEWS = {
     "front": Vector((0.0, -1.0, 0.0)),
@@ -195,7 +199,8 @@ def render_views(camera, output_dir, distance):
         facing = target - camera.location
         camera.rotation_euler = facing.to_track_quat("-Z", "Y").to_euler()
         scene.render.filepath = os.path.join(output_dir, f"{view_name}.png")
-        bpy.ops.render.render(write_still=True)
+        with timed_phase(f"render:{view_name}"):
+            bpy.ops.render.render(write_still=True)
 
 
 def main():
@@ -206,23 +211,28 @@ def main():
     os.makedirs(output_dir, exist_ok=True)
 
     clear_scene()
-    import_step(input_path)
-    to_mesh_and_cleanup()
+    with timed_phase("import"):
+        import_step(input_path)
+    with timed_phase("tessellation"):
+        to_mesh_and_cleanup()
 
     objects = mesh_objects()
     if not objects:
         raise RuntimeError("No mesh objects found after conversion.")
 
-    max_dim = center_and_scale(objects)
+    with timed_phase("recenter"):
+        max_dim = center_and_scale(objects)
     size = max(args.size, 128)
 
-    setup_world()
-    setup_studio_lights()
+    with timed_phase("scene_setup"):
+        setup_world()
+        setup_studio_lights()
 
     ortho_scale = max_dim * 1.65
     distance = max_dim * 3.2
     camera = setup_camera(size, ortho_scale)
     render_views(camera, output_dir, distance)
+    write_phase_timings()
 
     print(f"Rendered 7 snapshots to: {output_dir}")
 
@@ -0,0 +1,193 @@
+import { createCanvas } from 'canvas';
+
+// Pixel-level helpers for the evaluation scripts: PNG decode/encode and the synthetic
+// "photo-like" augmentations applied to rendered snapshots to build query images.
+
+export type RgbImage = {
+  width: number;
+  height: number;
+  /** Packed RGB, row-major. */
+  data: Uint8ClampedArray;
+};
+
+export const AUGMENTATIONS = ['none', 'background', 'crop', 'blur', 'rotate', 'all'] as const;
+export type Augmentation = (typeof AUGMENTATIONS)[number];
+
+// Snapshot background painted by the renderers (0x212122).
+const RENDER_BACKGROUND = [0x21, 0x21, 0x22] as const;
+const BACKGROUND_TOLERANCE = 12;
+
+type RawImageLike = {
+  data: Uint8Array | Uint8ClampedArray;
+  width: number;
+  height: number;
+  channels: number;
+};
+
+/** Decodes a PNG to packed RGB (alpha dropped, grey expanded); shared with parity_renderers.ts. */
+export async function decodePng(buffer: Buffer): Promise<RgbImage> {
+  const { RawImage } = (await import('@xenova/transformers')) as unknown as {
+    RawImage: { fromBlob: (blob: Blob) => Promise<RawImageLike> };
+  };
+  const raw = await RawImage.fromBlob(new Blob([buffer], { type: 'image/png' }));
+  const data = new Uint8ClampedArray(raw.width * raw.height * 3);
+  for (let pixel = 0; pixel < raw.width * raw.height; pixel += 1) {
+    for (let channel = 0; channel < 3; channel += 1) {
+      data[pixel * 3 + channel] = raw.data[pixel * raw.channels + Math.min(channel, raw.channels - 1)];
+    }
+  }
+  return { width: raw.width, height: raw.height, data };
+}
+
+export function encodePng(image: RgbImage): Buffer {
+  const canvas = createCanvas(image.width, image.height);
+  const context = canvas.getContext('2d');
+  const rgba = context.createImageData(image.width, image.height);
+  for (let pixel = 0; pixel < image.width * image.height; pixel += 1) {
+    rgba.data.set(image.data.subarray(pixel * 3, pixel * 3 + 3), pixel * 4);
+    rgba.data[pixel * 4 + 3] = 255;
+  }
+  context.putImageData(rgba, 0, 0);
+  return canvas.toBuffer('image/png');
+}
+
+function isRenderBackground(image: RgbImage, pixel: number): boolean {
+  for (let channel = 0; channel < 3; channel += 1) {
+    if (Math.abs(image.data[pixel * 3 + channel] - RENDER_BACKGROUND[channel]) > BACKGROUND_TOLERANCE) {
+      return false;
+    }
+  }
+  return true;
+}
+
+function sampleBilinear(image: RgbImage, x: number, y: number, out: number[]): boolean {
+  if (x < 0 || y < 0 || x > image.width - 1 || y > image.height - 1) {
+    return false;
+  }
+  const x0 = Math.floor(x);
+  const y0 = Math.floor(y);
+  const x1 = Math.min(x0 + 1, image.width - 1);
+  const y1 = Math.min(y0 + 1, image.height - 1);
+  const fx = x - x0;
+  const fy = y - y0;
+  for (let channel = 0; channel < 3; channel += 1) {
+    const top = image.data[(y0 * image.width + x0) * 3 + channel] * (1 - fx) + image.data[(y0 * image.width + x1) * 3 + channel] * fx;
+    const bottom = image.data[(y1 * image.width + x0) * 3 + channel] * (1 - fx) + image.data[(y1 * image.width + x1) * 3 + channel] * fx;
+    out[channel] = top * (1 - fy) + bottom * fy;
+  }
+  return true;
+}
+
+/** Replaces the flat render background with a noisy two-colour gradient, like a bench or floor. */
+export function swapBackground(image: RgbImage, random: () => number): RgbImage {
+  const from = [random() * 255, random() * 255, random() * 255];
+  const to = [random() * 255, random() * 255, random() * 255];
+  const angle = random() * Math.PI * 2;
+  const dx = Math.cos(angle);
+  const dy = Math.sin(angle);
+  const noise = 10 + random() * 20;
+  const data = new Uint8ClampedArray(image.data);
+  for (let y = 0; y < image.height; y += 1) {
+    for (let x = 0; x < image.width; x += 1) {
+      const pixel = y * image.width + x;
+      if (!isRenderBackground(image, pixel)) {
+        continue;
+      }
+      const t = Math.min(1, Math.max(0, 0.5 + ((x / image.width - 0.5) * dx + (y / image.height - 0.5) * dy)));
+      for (let channel = 0; channel < 3; channel += 1) {
+        data[pixel * 3 + channel] = from[channel] + (to[channel] - from[channel]) * t + (random() - 0.5) * noise;
+      }
+    }
+  }
+  return { ...image, data };
+}
+
+/** Crops 60-90% of each side at a random offset and scales back to the original size. */
+export function randomCrop(image: RgbImage, random: () => number): RgbImage {
+  const scale = 0.6 + random() * 0.3;
+  const cropWidth = image.width * scale;
+  const cropHeight = image.height * scale;
+  const left = random() * (image.width - cropWidth);
+  const top = random() * (image.height - cropHeight);
+  const data = new Uint8ClampedArray(image.data.length);
+  const sample = [0, 0, 0];
+  for (let y = 0; y < image.height; y += 1) {
+    for (let x = 0; x < image.width; x += 1) {
+      sampleBilinear(image, left + (x / (image.width - 1)) * (cropWidth - 1), top + (y / (image.height - 1)) * (cropHeight - 1), sample);
+      data.set(sample, (y * image.width + x) * 3);
+    }
+  }
+  return { ...image, data };
+}
+
+function boxBlurPass(source: Uint8ClampedArray, width: number, height: number, radius: number, horizontal: boolean): Uint8ClampedArray {
+  const target = new Uint8ClampedArray(source.length);
+  const outer = horizontal ? height : width;
+  const inner = horizontal ? width : height;
+  const index = (line: number, position: number) => (horizontal ? line * width + position : position * width + line) * 3;
+  for (let line = 0; line < outer; line += 1) {
+    for (let channel = 0; channel < 3; channel += 1) {
+      let sum = 0;
+      for (let k = -radius; k <= radius; k += 1) {
+        sum += source[index(line, Math.min(inner - 1, Math.max(0, k))) + channel];
+      }
+      for (let position = 0; position < inner; position += 1) {
+        target[index(line, position) + channel] = sum / (2 * radius + 1);
+        const leaving = Math.max(0, position - radius);
+        const entering = Math.min(inner - 1, position + radius + 1);
+        sum += source[index(line, entering) + channel] - source[index(line, leaving) + channel];
+      }
+    }
+  }
+  return target;
+}
+
+/** Two separable box-blur passes (close to a Gaussian) with a 1-3px radius, like a soft focus. */
+export function randomBlur(image: RgbImage, random: () => number): RgbImage {
+  const radius = 1 + Math.floor(random() * 3);
+  let data = image.data;
+  for (let pass = 0; pass < 2; pass += 1) {
+    data = boxBlurPass(data, image.width, image.height, radius, true);
+    data = boxBlurPass(data, image.width, image.height, radius, false);
+  }
+  return { ...image, data };
+}
+
+/** Rotates by 5-25 degrees either way about the centre; uncovered corners get the render background. */
+export function randomRotate(image: RgbImage, random: () => number): RgbImage {
+  const degrees = (5 + random() * 20) * (random() < 0.5 ? -1 : 1);
+  const cos = Math.cos((degrees * Math.PI) / 180);
+  const sin = Math.sin((degrees * Math.PI) / 180);
+  const cx = (image.width - 1) / 2;
+  const cy = (image.height - 1) / 2;
+  const data = new Uint8ClampedArray(image.data.length);
+  const sample = [0, 0, 0];
+  for (let y = 0; y < image.height; y += 1) {
+    for (let x = 0; x < image.width; x += 1) {
+      const sx = cos * (x - cx) + sin * (y - cy) + cx;
+      const sy = -sin * (x - cx) + cos * (y - cy) + cy;
+      data.set(sampleBilinear(image, sx, sy, sample) ? sample : RENDER_BACKGROUND, (y * image.width + x) * 3);
+    }
+  }
+  return { ...image, data };
+}
+
+export function augment(image: RgbImage, augmentation: Augmentation, random: () => number): RgbImage {
+  switch (augmentation) {
+    case 'none':
+      return image;
+    case 'background':
+      return swapBackground(image, random);
+    case 'crop':
+      return randomCrop(image, random);
+    case 'blur':
+      return randomBlur(image, random);
+    case 'rotate':
+      return randomRotate(image, random);
+    case 'all':
+      // Geometry first so the background swap also covers the rotated-in corners; blur last.
+      return randomBlur(swapBackground(randomCrop(randomRotate(image, random), random), random), random);
+    default:
+      throw new Error(`Unknown augmentation: ${augmentation as string}`);
+  }
+}
@@ -0,0 +1,626 @@
+import { createHash } from 'crypto';
+import fs from 'fs/promises';
+import path from 'path';
+import { performance } from 'perf_hooks';
+import { createRandom } from './bench_fakes';
+import { AUGMENTATIONS, augment, decodePng, encodePng } from './eval_images';
+import type { Augmentation } from './eval_images';
+import { DEFAULT_RANKING_OPTIONS, aggregateByPart, selectParts } from '../utils/ranking';
+import { percentile } from '../utils/percentile';
+import { isShapeDescriptor, rerankByShape } from '../utils/shape';
+
+const VIEWS = ['top', 'bottom', 'left', 'right', 'front', 'back', 'isometric'] as const;
+const DESCRIPTORS_FILE_NAME = 'descriptors.json';
+const EMBEDDING_BATCH_SIZE = 16;
+
+type CliOptions = {
+  snapshotsDir: string;
+  parts?: number;
+  queriesPerPart: number;
+  augmentations: Augmentation[];
+  seed: number;
+  backends: string[];
+  topK: number[];
+  bestScoreWeight: number[];
+  minPartScore: number[];
+  shapeWeight: number[];
+  k: number[];
+  holdout: boolean;
+  embeddingCache?: string;
+  saveQueries?: string;
+  output?: string;
+};
+
+type ReferenceView = {
+  id: string;
+  partId: string;
+  view: string;
+  vector: Float32Array;
+};
+
+type Query = {
+  partId: string;
+  sourceId: string;
+  augmentation: Augmentation;
+  vector: Float32Array;
+};
+
+type BackendMatch = { id: string; score: number };
+
+type RetrievalBackend = {
+  label: string;
+  query(vector: Float32Array, topK: number): Promise<{ matches: BackendMatch[]; scanned: number }>;
+};
+
+type EvalConfig = {
+  backend: string;
+  topK: number;
+  bestScoreWeight: number;
+  minPartScore: number;
+  shapeWeight: number;
+};
+
+type ConfigResult = EvalConfig & {
+  queries: number;
+  recall: Record<string, number>;
+  mrr: number;
+  recallByAugmentation: Record<string, number>;
+  meanVectorsScanned: number | null;
+  p50Ms: number;
+  p95Ms: number;
+  pareto: boolean;
+};
+
+function parseArgs(argv: string[]): CliOptions {
+  const options: CliOptions = {
+    snapshotsDir: path.resolve(__dirname, '..', '..', 'assets', 'snapshots_out'),
+    queriesPerPart: 2,
+    augmentations: ['none', 'background', 'crop', 'blur', 'rotate', 'all'],
+    seed: 7,
+    backends: ['exact'],
+    topK: [DEFAULT_RANKING_OPTIONS.topK],
+    bestScoreWeight: [DEFAULT_RANKING_OPTIONS.bestScoreWeight],
+    minPartScore: [DEFAULT_RANKING_OPTIONS.minPartScore],
+    shapeWeight: [0],
+    k: [1, 3, 5],
+    holdout: true
+  };
+
+  const nextValue = (index: number, flag: string): string => {
+    const value = argv[index + 1];
+    if (!value || value.startsWith('--')) {
+      throw new Error(`Missing value for ${flag}`);
+    }
+    return value;
+  };
+  const numberList = (value: string, flag: string, integer: boolean): number[] =>
+    value.split(',').map((item) => {
+      const parsed = integer ? Number.parseInt(item.trim(), 10) : Number.parseFloat(item.trim());
+      if (!Number.isFinite(parsed) || parsed < 0 || (integer && parsed <= 0)) {
+        throw new Error(`Invalid ${flag} value "${item}".`);
+      }
+      return parsed;
+    });
+
+  for (let i = 0; i < argv.length; i += 1) {
+    const arg = argv[i];
+    switch (arg) {
+      case '--snapshots_dir':
+        options.snapshotsDir = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--parts':
+        options.parts = numberList(nextValue(i, arg), arg, true)[0];
+        i += 1;
+        break;
+      case '--queries_per_part':
+        options.queriesPerPart = numberList(nextValue(i, arg), arg, true)[0];
+        i += 1;
+        break;
+      case '--augmentations': {
+        const values = nextValue(i, arg).split(',').map((item) => item.trim());
+        const unknown = values.filter((item) => !(AUGMENTATIONS as readonly string[]).includes(item));
+        if (unknown.length > 0) {
+          throw new Error(`Unknown augmentation(s): ${unknown.join(', ')}. Expected: ${AUGMENTATIONS.join(', ')}`);
+        }
+        options.augmentations = values as Augmentation[];
+        i += 1;
+        break;
+      }
+      case '--seed':
+        options.seed = Number.parseInt(nextValue(i, arg), 10);
+        i += 1;
+        break;
+      case '--backends':
+        // Semicolon-separated so backend parameters can use commas, e.g. "exact;ivf:nlist=16,nprobe=2".
+        options.backends = nextValue(i, arg)
+          .split(';')
+          .map((item) => item.trim())
+          .filter(Boolean);
+        i += 1;
+        break;
+      case '--top_k':
+        options.topK = numberList(nextValue(i, arg), arg, true);
+        i += 1;
+        break;
+      case '--best_weight':
+        options.bestScoreWeight = numberList(nextValue(i, arg), arg, false);
+        i += 1;
+        break;
+      case '--min_score':
+        options.minPartScore = numberList(nextValue(i, arg), arg, false);
+        i += 1;
+        break;
+      case '--shape_weight':
+        options.shapeWeight = numberList(nextValue(i, arg), arg, false);
+        i += 1;
+        break;
+      case '--k':
+        options.k = numberList(nextValue(i, arg), arg, true);
+        i += 1;
+        break;
+      case '--no_holdout':
+        options.holdout = false;
+        break;
+      case '--embedding_cache':
+        options.embeddingCache = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--save_queries':
+        options.saveQueries = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--output':
+        options.output = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      default:
+        throw new Error(`Unknown argument: ${arg}`);
+    }
+  }
+  return options;
+}
+
+// --- Embeddings ----------------------------------------------------------------------------
+
+type Embedder = (buffers: Buffer[]) => Promise<Float32Array[]>;
+
+async function createEmbedder(cachePath: string | undefined): Promise<{ embed: Embedder; save: () => Promise<void> }> {
+  const { ClipXenovaProvider } = await import('../providers/embedding/clipXenovaProvider');
+  const provider = new ClipXenovaProvider();
+  const cache = new Map<string, number[]>();
+  if (cachePath) {
+    const raw = await fs.readFile(cachePath, 'utf8').catch(() => null);
+    for (const [key, vector] of Object.entries(raw ? (JSON.parse(raw) as Record<string, number[]>) : {})) {
+      cache.set(key, vector);
+    }
+  }
+
+  // Keyed by image content, so the cache stays valid across re-renders and augmentation seeds.
+  const embed: Embedder = async (buffers) => {
+    const keys = buffers.map((buffer) => createHash('sha1').update(buffer).digest('hex'));
+    const missing = keys.map((key, index) => ({ key, index })).filter(({ key }) => !cache.has(key));
+    for (let start = 0; start < missing.length; start += EMBEDDING_BATCH_SIZE) {
+      const batch = missing.slice(start, start + EMBEDDING_BATCH_SIZE);
+      const vectors = await provider.embedBuffers(batch.map(({ index }) => ({ buffer: buffers[index], mimeType: 'image/png' })));
+      batch.forEach(({ key }, offset) => cache.set(key, vectors[offset]));
+    }
+    return keys.map((key) => Float32Array.from(cache.get(key) as number[]));
+  };
+  const save = async () => {
+    if (cachePath) {
+      await fs.mkdir(path.dirname(cachePath), { recursive: true });
+      await fs.writeFile(cachePath, JSON.stringify(Object.fromEntries(cache)));
+    }
+  };
+  return { embed, save };
+}
+
+// --- Retrieval backends --------------------------------------------------------------------
+
+function dot(a: Float32Array, b: Float32Array): number {
+  let sum = 0;
+  for (let i = 0; i < a.length; i += 1) {
+    sum += a[i] * b[i];
+  }
+  return sum;
+}
+
+function pushTopK(top: BackendMatch[], match: BackendMatch, topK: number): void {
+  if (top.length === topK && match.score <= top[top.length - 1].score) {
+    return;
+  }
+  let insertAt = top.length;
+  while (insertAt > 0 && top[insertAt - 1].score < match.score) {
+    insertAt -= 1;
+  }
+  top.splice(insertAt, 0, match);
+  if (top.length > topK) {
+    top.pop();
+  }
+}
+
+/** Brute-force cosine scan: the recall ceiling every approximate backend is measured against. */
+function createExactBackend(references: ReferenceView[]): RetrievalBackend {
+  return {
+    label: 'exact',
+    async query(vector, topK) {
+      const top: BackendMatch[] = [];
+      for (const reference of references) {
+        pushTopK(top, { id: reference.id, score: dot(vector, reference.vector) }, topK);
+      }
+      return { matches: top, scanned: references.length };
+    }
+  };
+}
+
+/**
+ * Inverted-file index: spherical k-means into `nlist` cells and a scan of only the `nprobe`
+ * nearest cells per query. Stands in for any approximate index under consideration.
+ */
+function createIvfBackend(references: ReferenceView[], nlist: number, nprobe: number, seed: number): RetrievalBackend {
+  const random = createRandom(seed);
+  const cells = Math.max(1, Math.min(nlist, references.length));
+  const dims = references[0]?.vector.length ?? 0;
+  let centroids = Array.from({ length: cells }, () => Float32Array.from(references[Math.floor(random() * references.length)].vector));
+  let assignment = new Array<number>(references.length).fill(0);
+
+  for (let iteration = 0; iteration < 10; iteration += 1) {
+    assignment = references.map((reference) => {
+      let best = 0;
+      let bestScore = -Infinity;
+      centroids.forEach((centroid, index) => {
+        const score = dot(reference.vector, centroid);
+        if (score > bestScore) {
+          bestScore = score;
+          best = index;
+        }
+      });
+      return best;
+    });
+    const sums = Array.from({ length: cells }, () => new Float32Array(dims));
+    references.forEach((reference, index) => {
+      const sum = sums[assignment[index]];
+      for (let d = 0; d < dims; d += 1) {
+        sum[d] += reference.vector[d];
+      }
+    });
+    centroids = sums.map((sum, index) => {
+      const norm = Math.sqrt(dot(sum, sum));
+      return norm > 0 ? sum.map((value) => value / norm) : centroids[index];
+    });
+  }
+
+  const lists = Array.from({ length: cells }, () => [] as ReferenceView[]);
+  references.forEach((reference, index) => lists[assignment[index]].push(reference));
+  const probes = Math.max(1, Math.min(nprobe, cells));
+
+  return {
+    label: `ivf:nlist=${cells},nprobe=${probes}`,
+    async query(vector, topK) {
+      const nearestCells = centroids
+        .map((centroid, index) => ({ index, score: dot(vector, centroid) }))
+        .sort((a, b) => b.score - a.score)
+        .slice(0, probes);
+      const top: BackendMatch[] = [];
+      let scanned = cells;
+      for (const { index } of nearestCells) {
+        for (const reference of lists[index]) {
+          pushTopK(top, { id: reference.id, score: dot(vector, reference.vector) }, topK);
+        }
+        scanned += lists[index].length;
+      }
+      return { matches: top, scanned };
+    }
+  };
+}
+
+/**
+ * The deployed Pinecone index (from backend/.env), at the active index version search reads;
+ * vectors scanned is not observable there.
+ */
+async function createPineconeBackend(): Promise<RetrievalBackend> {
+  const { validateSearchEnv } = await import('../config/env');
+  const { PineconeProvider } = await import('../providers/vector/pineconeProvider');
+  const { PineconeService } = await import('../services/pineconeService');
+  const { DynamoDbProvider } = await import('../providers/metadata/dynamodbProvider');
+  const { MetadataService } = await import('../services/metadataService');
+  const { ActiveIndexService } = await import('../services/activeIndexService');
+  const { awsRegion, dynamodbTableName, pineconeApiKey, pineconeIndex, pineconeNamespace } = validateSearchEnv();
+  const metadataService = new MetadataService(new DynamoDbProvider(awsRegion), dynamodbTableName);
+  const active = await new ActiveIndexService(metadataService, pineconeNamespace, 0).resolve();
+  const service = new PineconeService(new PineconeProvider(pineconeApiKey), pineconeIndex, active.namespace);
+  return {
+    label: `pinecone${active.version ? `@${active.version}` : ''}`,
+    async query(vector, topK) {
+      const matches = await service.querySimilar(Array.from(vector), topK);
+      return { matches: matches.map(({ id, score }) => ({ id, score })), scanned: Number.NaN };
+    }
+  };
+}
+
+async function createBackend(spec: string, references: ReferenceView[], seed: number): Promise<RetrievalBackend> {
+  const [name, rawParams = ''] = spec.split(':');
+  const params = new Map(
+    rawParams
+      .split(',')
+      .filter(Boolean)
+      .map((entry) => entry.split('=').map((item) => item.trim()) as [string, string])
+  );
+  switch (name) {
+    case 'exact':
+      return createExactBackend(references);
+    case 'ivf':
+      return createIvfBackend(
+        references,
+        Number.parseInt(params.get('nlist') ?? '16', 10),
+        Number.parseInt(params.get('nprobe') ?? '2', 10),
+        seed
+      );
+    case 'pinecone':
+      return createPineconeBackend();
+    default:
+      throw new Error(`Unknown backend "${spec}". Expected exact, ivf[:nlist=N,nprobe=M] or pinecone.`);
+  }
+}
+
+// --- Query set -----------------------------------------------------------------------------
+
+async function loadCatalog(
+  options: CliOptions,
+  embed: Embedder
+): Promise<{ references: ReferenceView[]; shapes: Map<string, number[]>; images: Map<string, Buffer> }> {
+  const entries = await fs.readdir(options.snapshotsDir, { withFileTypes: true }).catch(() => {
+    throw new Error(`Snapshots directory does not exist: ${options.snapshotsDir}. Render the CAD inputs first (ingest:s3-snapshots --dry_run).`);
+  });
+  let partIds = entries
+    .filter((entry) => entry.isDirectory() && !entry.name.startsWith('.'))
+    .map((entry) => entry.name)
+    .sort();
+  if (options.parts) {
+    partIds = partIds.slice(0, options.parts);
+  }
+
+  const images = new Map<string, Buffer>();
+  const pending: Array<Omit<ReferenceView, 'vector'>> = [];
+  const shapes = new Map<string, number[]>();
+  for (const partId of partIds) {
+    for (const view of VIEWS) {
+      const buffer = await fs.readFile(path.join(options.snapshotsDir, partId, `${view}.png`)).catch(() => null);
+      if (buffer) {
+        const id = `${partId}-${view}`;
+        images.set(id, buffer);
+        pending.push({ id, partId, view });
+      }
+    }
+    const descriptors = await fs.readFile(path.join(options.snapshotsDir, partId, DESCRIPTORS_FILE_NAME), 'utf8').catch(() => null);
+    const parsed: unknown = descriptors ? JSON.parse(descriptors) : null;
+    if (isShapeDescriptor(parsed)) {
+      shapes.set(partId, parsed.vector);
+    }
+  }
+  if (pending.length === 0) {
+    throw new Error(`No <part>/<view>.png snapshots found under ${options.snapshotsDir}`);
+  }
+
+  const vectors = await embed(pending.map((item) => images.get(item.id) as Buffer));
+  return { references: pending.map((item, index) => ({ ...item, vector: vectors[index] })), shapes, images };
+}
+
+async function buildQueries(
+  options: CliOptions,
+  references: ReferenceView[],
+  images: Map<string, Buffer>,
+  embed: Embedder
+): Promise<Query[]> {
+  const random = createRandom(options.seed);
+  const byPart = new Map<string, ReferenceView[]>();
+  for (const reference of references) {
+    byPart.set(reference.partId, [...(byPart.get(reference.partId) ?? []), reference]);
+  }
+
+  const specs: Array<Omit<Query, 'vector'> & { buffer: Buffer }> = [];
+  for (const [partId, views] of byPart) {
+    for (const augmentation of options.augmentations) {
+      // Distinct source views per part and augmentation (seeded Fisher-Yates).
+      const shuffled = [...views];
+      for (let i = shuffled.length - 1; i > 0; i -= 1) {
+        const j = Math.floor(random() * (i + 1));
+        [shuffled[i], shuffled[j]] = [shuffled[j], shuffled[i]];
+      }
+      for (const source of shuffled.slice(0, options.queriesPerPart)) {
+        const image = augment(await decodePng(images.get(source.id) as Buffer), augmentation, random);
+        specs.push({ partId, sourceId: source.id, augmentation, buffer: encodePng(image) });
+      }
+    }
+  }
+
+  if (options.saveQueries) {
+    await fs.mkdir(options.saveQueries, { recursive: true });
+    await Promise.all(
+      specs.map((spec, index) => fs.writeFile(path.join(options.saveQueries as string, `${index}_${spec.sourceId}_${spec.augmentation}.png`), spec.buffer))
+    );
+  }
+
+  const vectors = await embed(specs.map((spec) => spec.buffer));
+  return specs.map(({ buffer: _buffer, ...spec }, index) => ({ ...spec, vector: vectors[index] }));
+}
+
+// --- Evaluation ----------------------------------------------------------------------------
+
+async function evaluate(
+  backend: RetrievalBackend,
+  config: EvalConfig,
+  queries: Query[],
+  partOf: Map<string, string>,
+  shapes: Map<string, number[]>,
+  options: CliOptions
+): Promise<Omit<ConfigResult, 'pareto'>> {
+  const maxK = Math.max(...options.k);
+  const hits = new Map<number, number>(options.k.map((k) => [k, 0]));
+  const augmentationHits = new Map<string, { hits: number; total: number }>();
+  const latencies: number[] = [];
+  let reciprocalRankSum = 0;
+  let scannedSum = 0;
+
+  for (const query of queries) {
+    const startedAt = performance.now();
+    // Holdout: the query's own source render is excluded, so one extra match is requested.
+    const { matches, scanned } = await backend.query(query.vector, config.topK + (options.holdout ? 1 : 0));
+    const candidates = matches
+      .filter((match) => !options.holdout || match.id !== query.sourceId)
+      .slice(0, config.topK)
+      .flatMap((match) => {
+        const partId = partOf.get(match.id);
+        return partId ? [{ id: match.id, score: match.score, partId, shape: shapes.get(partId) ?? null }] : [];
+      });
+    let aggregated = aggregateByPart(candidates, config.bestScoreWeight);
+    if (config.shapeWeight > 0) {
+      aggregated = rerankByShape(aggregated, { weight: config.shapeWeight, consensusSize: 3 }).parts;
+    }
+    // /search returns maxParts parts; a larger k looks past what users see, to gauge headroom.
+    const { parts } = selectParts(aggregated, config.minPartScore, Math.max(DEFAULT_RANKING_OPTIONS.maxParts, maxK));
+    latencies.push(performance.now() - startedAt);
+    scannedSum += scanned;
+
+    const rank = parts.findIndex((part) => part.partId === query.partId) + 1;
+    if (rank > 0) {
+      reciprocalRankSum += 1 / rank;
+    }
+    for (const k of options.k) {
+      if (rank > 0 && rank <= k) {
+        hits.set(k, (hits.get(k) ?? 0) + 1);
+      }
+    }
+    const bucket = augmentationHits.get(query.augmentation) ?? { hits: 0, total: 0 };
+    bucket.total += 1;
+    bucket.hits += rank === 1 ? 1 : 0;
+    augmentationHits.set(query.augmentation, bucket);
+  }
+
+  const sortedLatencies = [...latencies].sort((a, b) => a - b);
+  return {
+    ...config,
+    queries: queries.length,
+    recall: Object.fromEntries(options.k.map((k) => [`@${k}`, (hits.get(k) ?? 0) / queries.length])),
+    mrr: reciprocalRankSum / queries.length,
+    recallByAugmentation: Object.fromEntries(Array.from(augmentationHits, ([name, { hits: h, total }]) => [name, h / total])),
+    meanVectorsScanned: Number.isFinite(scannedSum) ? scannedSum / queries.length : null,
+    p50Ms: percentile(sortedLatencies, 50),
+    p95Ms: percentile(sortedLatencies, 95)
+  };
+}
+
+/** A configuration is on the front when no other one has both higher recall@1 and lower p50 latency. */
+function markPareto(results: Array<Omit<ConfigResult, 'pareto'>>, primaryK: string): ConfigResult[] {
+  return results.map((result) => ({
+    ...result,
+    pareto: !results.some(
+      (other) =>
+        other !== result &&
+        other.recall[primaryK] >= result.recall[primaryK] &&
+        other.p50Ms <= result.p50Ms &&
+        (other.recall[primaryK] > result.recall[primaryK] || other.p50Ms < result.p50Ms)
+    )
+  }));
+}
+
+function printTable(results: ConfigResult[], options: CliOptions): void {
+  const headers = ['pareto', 'backend', 'topK', 'best_w', 'min_score', 'shape_w', ...options.k.map((k) => `R@${k}`), 'MRR', 'scanned', 'p50_ms', 'p95_ms'];
+  const rows = [...results]
+    .sort((a, b) => a.p50Ms - b.p50Ms)
+    .map((result) => [
+      result.pareto ? '*' : '',
+      result.backend,
+      String(result.topK),
+      result.bestScoreWeight.toFixed(2),
+      result.minPartScore.toFixed(2),
+      result.shapeWeight.toFixed(2),
+      ...options.k.map((k) => result.recall[`@${k}`].toFixed(3)),
+      result.mrr.toFixed(3),
+      result.meanVectorsScanned === null ? '-' : result.meanVectorsScanned.toFixed(0),
+      result.p50Ms.toFixed(3),
+      result.p95Ms.toFixed(3)
+    ]);
+  const widths = headers.map((header, column) => Math.max(header.length, ...rows.map((row) => row[column].length)));
+  const format = (row: string[]) => row.map((cell, column) => cell.padEnd(widths[column])).join('  ');
+  console.log(format(headers));
+  console.log(widths.map((width) => '-'.repeat(width)).join('  '));
+  for (const row of rows) {
+    console.log(format(row));
+  }
+}
+
+async function run(): Promise<void> {
+  const options = parseArgs(process.argv.slice(2));
+  // Keep provider logging out of the latency measurements. The logger reads LOG_LEVEL once, when
+  // config/env is first imported, so this must run before that: the static imports of this script
+  // are all import-free (no config/env, no utils/logger or utils/metrics), and everything that logs
+  // is imported dynamically after this line.
+  process.env.LOG_LEVEL = process.env.LOG_LEVEL ?? 'WARN';
+
+  console.log('[EVAL] config');
+  console.log(`- snapshots_dir: ${options.snapshotsDir}`);
+  console.log(`- augmentations: ${options.augmentations.join(',')} x ${options.queriesPerPart} per part (seed=${options.seed})`);
+  console.log(`- backends: ${options.backends.join(' ; ')}`);
+  console.log(`- holdout: ${options.holdout}`);
+
+  const embedder = await createEmbedder(options.embeddingCache);
+  const embedStartedAt = performance.now();
+  const { references, shapes, images } = await loadCatalog(options, embedder.embed);
+  const queries = await buildQueries(options, references, images, embedder.embed);
+  await embedder.save();
+  const partOf = new Map(references.map((reference) => [reference.id, reference.partId]));
+  console.log(
+    `[EVAL] parts=${new Set(partOf.values()).size} reference_views=${references.length} queries=${queries.length} with_shape=${shapes.size} embed_ms=${(
+      performance.now() - embedStartedAt
+    ).toFixed(0)}`
+  );
+
+  const results: Array<Omit<ConfigResult, 'pareto'>> = [];
+  for (const spec of options.backends) {
+    const backend = await createBackend(spec, references, options.seed);
+    for (const topK of options.topK) {
+      for (const bestScoreWeight of options.bestScoreWeight) {
+        for (const minPartScore of options.minPartScore) {
+          for (const shapeWeight of options.shapeWeight) {
+            const config = { backend: backend.label, topK, bestScoreWeight, minPartScore, shapeWeight };
+            results.push(await evaluate(backend, config, queries, partOf, shapes, options));
+          }
+        }
+      }
+    }
+  }
+
+  const primaryK = `@${Math.min(...options.k)}`;
+  const report = markPareto(results, primaryK);
+  printTable(report, options);
+
+  if (options.output) {
+    await fs.mkdir(path.dirname(options.output), { recursive: true });
+    await fs.writeFile(
+      options.output,
+      JSON.stringify(
+        {
+          createdAt: new Date().toISOString(),
+          snapshotsDir: options.snapshotsDir,
+          seed: options.seed,
+          augmentations: options.augmentations,
+          queries: queries.length,
+          referenceViews: references.length,
+          holdout: options.holdout,
+          results: report
+        },
+        null,
+        2
+      )
+    );
+    console.log(`[EVAL] report written to ${options.output}`);
+  }
+}
+
+run().catch((error) => {
+  const message = error instanceof Error ? error.message : String(error);
+  console.error(`[FATAL] ${message}`);
+  process.exit(1);
+});
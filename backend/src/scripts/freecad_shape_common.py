@@ -0,0 +1,195 @@
+# Geometry helpers shared by the FreeCAD GUI and headless snapshot renderers.
+# Only FreeCAD/Part are used here (no FreeCADGui), so this module also loads under FreeCADCmd.
+
+import json
+import math
+import os
+
+
+# Sidecar written next to the PNGs; the indexer stores it in DynamoDB/Pinecone metadata.
+DESCRIPTORS_FILE_NAME = "descriptors.json"
+DESCRIPTORS_VERSION = 1
+# Counts are log-scaled against this ceiling so every vector component lands in [0, 1].
+DESCRIPTOR_COUNT_CEILING = 1000
+
+
+def _iter_children(obj):
+    children = []
+    group = getattr(obj, "Group", None)
+    if group:
+        children.extend(group)
+    out_list = getattr(obj, "OutList", None)
+    if out_list:
+        children.extend(out_list)
+    return children
+
+
+def get_shape_objects(doc):
+    shape_objects = []
+    seen = set()
+    stack = list(doc.Objects)
+
+    while stack:
+        obj = stack.pop()
+        if obj is None:
+            continue
+        key = getattr(obj, "Name", None) or id(obj)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        shape = getattr(obj, "Shape", None)
+        if shape is not None:
+            try:
+                if not shape.isNull():
+                    bb = shape.BoundBox
+                    if bb is not None and bb.DiagonalLength > 0:
+                        shape_objects.append(obj)
+            except Exception:
+                pass
+
+        stack.extend(_iter_children(obj))
+
+    return shape_objects
+
+
+def get_root_shapes(doc):
+    # Assemblies expose both the container and its children as shape objects; keep only the
+    # outermost ones so faces are not counted twice.
+    shape_objects = get_shape_objects(doc)
+    names = {getattr(obj, "Name", None) for obj in shape_objects}
+    child_names = set()
+    for obj in shape_objects:
+        for child in _iter_children(obj):
+            child_name = getattr(child, "Name", None)
+            if child_name in names and child_name != getattr(obj, "Name", None):
+                child_names.add(child_name)
+    return [obj.Shape for obj in shape_objects if getattr(obj, "Name", None) not in child_names]
+
+
+def _is_concave_cylinder(face):
+    import FreeCAD
+
+    surface = face.Surface
+    u0, u1, v0, v1 = face.ParameterRange
+    u = (u0 + u1) * 0.5
+    v = (v0 + v1) * 0.5
+    point = face.valueAt(u, v)
+    normal = face.normalAt(u, v)
+    axis = FreeCAD.Vector(surface.Axis)
+    relative = point.sub(surface.Center)
+    radial = relative.sub(FreeCAD.Vector(axis).multiply(relative.dot(axis)))
+    # Face normals point out of the material, so a hole's normal points back at its axis.
+    return normal.dot(radial) < 0
+
+
+def _hole_key(face):
+    import FreeCAD
+
+    # Periodic faces are often split in two by STEP exporters; group halves by axis line and radius.
+    surface = face.Surface
+    axis = FreeCAD.Vector(surface.Axis)
+    if axis.x < 0 or (axis.x == 0 and (axis.y < 0 or (axis.y == 0 and axis.z < 0))):
+        axis = FreeCAD.Vector(-axis.x, -axis.y, -axis.z)
+    center = surface.Center
+    # Closest point of the axis line to the origin identifies the line independent of face extent.
+    foot = center.sub(FreeCAD.Vector(axis).multiply(center.dot(axis)))
+    return (
+        round(surface.Radius, 3),
+        round(axis.x, 3),
+        round(axis.y, 3),
+        round(axis.z, 3),
+        round(foot.x, 2),
+        round(foot.y, 2),
+        round(foot.z, 2),
+    )
+
+
+def _scaled_count(count):
+    return min(1.0, math.log1p(count) / math.log1p(DESCRIPTOR_COUNT_CEILING))
+
+
+def combine_shapes(shapes):
+    import Part
+
+    if not shapes:
+        return None
+    return shapes[0] if len(shapes) == 1 else Part.makeCompound(shapes)
+
+
+def compute_shape_descriptors(doc):
+    return compute_shape_descriptors_for_shape(combine_shapes(get_root_shapes(doc)))
+
+
+def compute_shape_descriptors_for_shape(shape):
+    if shape is None:
+        return None
+
+    bb = shape.BoundBox
+    extents = sorted([bb.XLength, bb.YLength, bb.ZLength], reverse=True)
+    if extents[0] <= 0:
+        return None
+
+    volume = abs(shape.Volume) if shape.Solids else 0.0
+    area = shape.Area
+    bbox_volume = extents[0] * extents[1] * extents[2]
+    fill_ratio = volume / bbox_volume if bbox_volume > 0 else 0.0
+    # 1.0 for a sphere, approaching 0 for thin or highly detailed parts.
+    sphericity = (math.pi ** (1.0 / 3.0)) * ((6.0 * volume) ** (2.0 / 3.0)) / area if area > 0 else 0.0
+
+    faces = shape.Faces
+    cylindrical_faces = 0
+    hole_keys = set()
+    for face in faces:
+        if type(face.Surface).__name__ != "Cylinder":
+            continue
+        cylindrical_faces += 1
+        try:
+            if _is_concave_cylinder(face):
+                hole_keys.add(_hole_key(face))
+        except Exception:
+            pass
+
+    aspect_mid = extents[1] / extents[0]
+    aspect_min = extents[2] / extents[0]
+    cylindrical_fraction = cylindrical_faces / len(faces) if faces else 0.0
+    return {
+        "version": DESCRIPTORS_VERSION,
+        "extents": [round(value, 4) for value in extents],
+        "volume": round(volume, 4),
+        "area": round(area, 4),
+        "fillRatio": round(min(1.0, fill_ratio), 4),
+        "sphericity": round(min(1.0, sphericity), 4),
+        "solids": len(shape.Solids),
+        "faces": len(faces),
+        "edges": len(shape.Edges),
+        "cylindricalFaces": cylindrical_faces,
+        "holes": len(hole_keys),
+        # Fixed-order, unit-range vector used by search for cheap distance checks.
+        "vector": [
+            round(aspect_mid, 4),
+            round(aspect_min, 4),
+            round(min(1.0, fill_ratio), 4),
+            round(min(1.0, sphericity), 4),
+            round(cylindrical_fraction, 4),
+            round(_scaled_count(len(faces)), 4),
+            round(_scaled_count(len(hole_keys)), 4),
+        ],
+    }
+
+
+def write_shape_descriptors(doc, output_dir, shape=None):
+    # Pass `shape` when there is no document (headless renderer); otherwise roots of `doc` are used.
+    output_path = os.path.join(output_dir, DESCRIPTORS_FILE_NAME)
+    try:
+        descriptors = compute_shape_descriptors_for_shape(shape) if shape is not None else compute_shape_descriptors(doc)
+    except Exception as exc:
+        descriptors = None
+        print(f"WARN: Shape descriptor extraction failed: {exc}")
+    if descriptors is None:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return False
+    with open(output_path, "w", encoding="utf-8") as handle:
+        json.dump(descriptors, handle, indent=2)
+    return True
@@ -3,6 +3,13 @@ import sys
 import traceback
 
 
+# FreeCAD sets __file__ when running a script file; fall back to the script argument.
+_script_path = globals().get("__file__") or next((arg for arg in sys.argv if arg.lower().endswith(".py")), "")
+sys.path.insert(0, os.path.dirname(os.path.abspath(_script_path or "__main__.py")))
+from freecad_shape_common import get_shape_objects, write_shape_descriptors  # noqa: E402
+from snapshot_renderer_common import timed_phase, write_phase_timings  # noqa: E402
+
+
 VIEWS = [
     ("top", "viewTop", []),
     ("bottom", "viewBottom", []),
@@ -18,47 +25,6 @@ HQ_DEVIATION = 0.03
 HQ_ANGULAR_DEFLECTION = 5.0
 MIN_VALID_PNG_SIZE_BYTES = 4000
 
-
-def _iter_children(obj):
-    children = []
-    group = getattr(obj, "Group", None)
-    if group:
-        children.extend(group)
-    out_list = getattr(obj, "OutList", None)
-    if out_list:
-        children.extend(out_list)
-    return children
-
-
-def get_shape_objects(doc):
-    shape_objects = []
-    seen = set()
-    stack = list(doc.Objects)
-
-    while stack:
-        obj = stack.pop()
-        if obj is None:
-            continue
-        key = getattr(obj, "Name", None) or id(obj)
-        if key in seen:
-            continue
-        seen.add(key)
-
-        shape = getattr(obj, "Shape", None)
-        if shape is not None:
-            try:
-                if not shape.isNull():
-                    bb = shape.BoundBox
-                    if bb is not None and bb.DiagonalLength > 0:
-                        shape_objects.append(obj)
-            except Exception:
-                pass
-
-        stack.extend(_iter_children(obj))
-
-    return shape_objects
-
-
 def recenter_model(doc):
     import FreeCAD
 
@@ -152,25 +118,30 @@ def get_rotate_callable(view, direction):
     return None
 
 
-def render_all_views(FreeCADGui, view, output_dir, size):
+def render_all_views(FreeCADGui, view, output_dir, size, phase_prefix="render"):
     for view_name, method_name, rotate_steps in VIEWS:
-        method = getattr(view, method_name, None)
-        if method is None:
-            raise RuntimeError(f"View method not available in FreeCAD: {method_name}")
-        method()
-        for rotate_direction, rotate_count in rotate_steps:
-            rotate_fn = get_rotate_callable(view, rotate_direction)
-            if rotate_fn is None:
-                print(f"WARN: No camera rotate method found for direction={rotate_direction}; view={view_name}")
-                continue
-            for _ in range(max(1, int(rotate_count))):
-                rotate_fn()
-        view.fitAll()
-        FreeCADGui.SendMsgToActiveView("ViewFit")
-        if hasattr(FreeCADGui, "updateGui"):
-            FreeCADGui.updateGui()
-        output_path = os.path.join(output_dir, f"{view_name}.png")
-        view.saveImage(output_path, size, size, "Current")
+        with timed_phase(f"{phase_prefix}:{view_name}"):
+            render_view(FreeCADGui, view, output_dir, size, view_name, method_name, rotate_steps)
+
+
+def render_view(FreeCADGui, view, output_dir, size, view_name, method_name, rotate_steps):
+    method = getattr(view, method_name, None)
+    if method is None:
+        raise RuntimeError(f"View method not available in FreeCAD: {method_name}")
+    method()
+    for rotate_direction, rotate_count in rotate_steps:
+        rotate_fn = get_rotate_callable(view, rotate_direction)
+        if rotate_fn is None:
+            print(f"WARN: No camera rotate method found for direction={rotate_direction}; view={view_name}")
+            continue
+        for _ in range(max(1, int(rotate_count))):
+            rotate_fn()
+    view.fitAll()
+    FreeCADGui.SendMsgToActiveView("ViewFit")
+    if hasattr(FreeCADGui, "updateGui"):
+        FreeCADGui.updateGui()
+    output_path = os.path.join(output_dir, f"{view_name}.png")
+    view.saveImage(output_path, size, size, "Current")
 
 
 def outputs_look_blank(output_dir):
@@ -225,8 +196,10 @@ def main():
     set_background_color()
 
     doc = FreeCAD.newDocument("SnapshotDoc")
-    ImportGui.insert(input_path, doc.Name)
-    FreeCAD.ActiveDocument.recompute()
+    with timed_phase("import"):
+        ImportGui.insert(input_path, doc.Name)
+    with timed_phase("recompute"):
+        FreeCAD.ActiveDocument.recompute()
 
     # Fallback for STEP assemblies where insert() creates a document tree
     # without directly discoverable shape geometry.
@@ -235,17 +208,21 @@ def main():
             FreeCAD.closeDocument(doc.Name)
         except Exception:
             pass
-        ImportGui.open(input_path)
+        with timed_phase("import_open_fallback"):
+            ImportGui.open(input_path)
         doc = FreeCAD.ActiveDocument
         if doc is None:
             raise RuntimeError("Failed to open STEP document for rendering.")
-        doc.recompute()
+        with timed_phase("recompute_open_fallback"):
+            doc.recompute()
 
-    recentered = recenter_model(doc)
+    with timed_phase("recenter"):
+        recentered = recenter_model(doc)
     if not recentered:
         print("WARN: Could not recenter model from shape bounds; continuing with default placement.")
-    apply_high_quality_view_settings(doc)
-    FreeCAD.ActiveDocument.recompute()
+    with timed_phase("tessellation"):
+        apply_high_quality_view_settings(doc)
+        FreeCAD.ActiveDocument.recompute()
 
     gui_doc = FreeCADGui.ActiveDocument
     if gui_doc is None:
@@ -264,15 +241,23 @@ def main():
     if outputs_look_blank(output_dir):
         print("WARN: Initial render appears blank. Retrying with Part.read() fallback.")
         clear_document(doc)
-        import_step_with_part_read(doc, input_path)
-        recentered = recenter_model(doc)
+        with timed_phase("import_part_read_fallback"):
+            import_step_with_part_read(doc, input_path)
+        with timed_phase("recenter_part_read_fallback"):
+            recentered = recenter_model(doc)
         if not recentered:
             print("WARN: Part.read() fallback could not recenter model.")
-        apply_high_quality_view_settings(doc)
-        FreeCAD.ActiveDocument.recompute()
-        render_all_views(FreeCADGui, view, output_dir, size)
+        with timed_phase("tessellation_part_read_fallback"):
+            apply_high_quality_view_settings(doc)
+            FreeCAD.ActiveDocument.recompute()
+        render_all_views(FreeCADGui, view, output_dir, size, phase_prefix="render_part_read_fallback")
+
+    with timed_phase("descriptors"):
+        if not write_shape_descriptors(doc, output_dir):
+            print("WARN: No shape descriptors written; part will be indexed without them.")
 
     FreeCAD.closeDocument(doc.Name)
+    write_phase_timings()
     print(f"Rendered {len(VIEWS)} STEP snapshots to {output_dir}")
     sys.stdout.flush()
     sys.stderr.flush()
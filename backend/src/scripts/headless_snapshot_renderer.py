@@ -0,0 +1,456 @@
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import struct
+import subprocess
+import sys
+import time
+import traceback
+import zlib
+
+
+# Bootstrap only: put this directory on sys.path so the shared modules import. FreeCAD sets
+# __file__ when running a script file; fall back to the script argument, then the cwd.
+_script_path = globals().get("__file__") or next((arg for arg in sys.argv if arg.lower().endswith(".py")), "")
+sys.path.insert(0, os.path.dirname(os.path.abspath(_script_path or "__main__.py")))
+from snapshot_renderer_common import (  # noqa: E402
+    RENDER_ARGS_ENV,
+    SCRIPT_DIR,
+    TIMINGS_PATH_ENV,
+    record_phase,
+    timed_phase,
+    write_phase_timings,
+)
+
+
+VIEW_NAMES = ["top", "bottom", "left", "right", "front", "back", "isometric"]
+# Direction from the model towards the camera and the screen-up vector, matching FreeCAD's
+# standard orthographic views (viewTop, viewBottom, ..., viewAxonometric).
+VIEW_CAMERAS = {
+    "top": ((0.0, 0.0, 1.0), (0.0, 1.0, 0.0)),
+    "bottom": ((0.0, 0.0, -1.0), (0.0, -1.0, 0.0)),
+    "left": ((-1.0, 0.0, 0.0), (0.0, 0.0, 1.0)),
+    "right": ((1.0, 0.0, 0.0), (0.0, 0.0, 1.0)),
+    "front": ((0.0, -1.0, 0.0), (0.0, 0.0, 1.0)),
+    "back": ((0.0, 1.0, 0.0), (0.0, 0.0, 1.0)),
+    "isometric": ((1.0, -1.0, 1.0), (0.0, 0.0, 1.0)),
+}
+
+# Look of freecad_step_snapshot_renderer.py: flat 0x212122 background, default grey shape
+# colour lit by FreeCAD's camera headlight, no edges ("Shaded" display mode).
+BACKGROUND_RGB = (0x21, 0x21, 0x22)
+SHAPE_RGB = (0.8, 0.8, 0.8)
+AMBIENT = 0.2
+DIFFUSE = 0.8
+# Linear deflection relative to the bounding-box diagonal; close to the GUI's HQ_DEVIATION.
+LINEAR_DEFLECTION_RATIO = 0.0003
+MIN_LINEAR_DEFLECTION = 1e-4
+# Supersampling factor per axis, standing in for the GUI's 8x multisampling.
+DEFAULT_SUPERSAMPLE = 2
+# Upper bound on candidate pixels evaluated per vectorized batch of triangles.
+FRAGMENT_BATCH = 1_000_000
+
+
+def sanitize_part_id(file_name):
+    # Same rules as sanitizePartId in s3_snapshots_ingest.ts so output folders line up.
+    base = os.path.splitext(os.path.basename(file_name))[0].lower().strip()
+    normalized = re.sub(r"\s+", "_", base)
+    normalized = re.sub(r"[^a-z0-9_-]", "", normalized)
+    normalized = re.sub(r"_+", "_", normalized).strip("_")
+    return normalized or "part"
+
+
+# --- Tessellation (FreeCADCmd) -------------------------------------------------------------
+
+
+def tessellate_step(input_path):
+    import numpy as np
+    import Part
+
+    shape = Part.read(input_path)
+    if shape.isNull() or shape.BoundBox.DiagonalLength <= 0:
+        raise RuntimeError(f"STEP file has no renderable geometry: {input_path}")
+
+    bb = shape.BoundBox
+    tolerance = max(bb.DiagonalLength * LINEAR_DEFLECTION_RATIO, MIN_LINEAR_DEFLECTION)
+    center = ((bb.XMin + bb.XMax) * 0.5, (bb.YMin + bb.YMax) * 0.5, (bb.ZMin + bb.ZMax) * 0.5)
+
+    # Faces are tessellated separately so normals are only smoothed within a face and
+    # creases between faces stay sharp, like the GUI's per-face display mesh.
+    vertex_chunks = []
+    triangle_chunks = []
+    offset = 0
+    for face in shape.Faces:
+        points, facets = face.tessellate(tolerance)
+        if not facets:
+            continue
+        vertex_chunks.append(np.array([(p.x, p.y, p.z) for p in points], dtype=np.float64))
+        triangle_chunks.append(np.array(facets, dtype=np.int64) + offset)
+        offset += len(points)
+    if not triangle_chunks:
+        raise RuntimeError(f"Tessellation produced no triangles: {input_path}")
+
+    vertices = np.concatenate(vertex_chunks) - np.array(center)
+    triangles = np.concatenate(triangle_chunks)
+    return shape, vertices, triangles, vertex_normals(vertices, triangles)
+
+
+def vertex_normals(vertices, triangles):
+    import numpy as np
+
+    corners = vertices[triangles]
+    face_normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    normals = np.zeros_like(vertices)
+    for corner in range(3):
+        np.add.at(normals, triangles[:, corner], face_normals)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.where(lengths > 0, lengths, 1.0)
+
+
+def save_mesh(path, vertices, triangles, normals):
+    import numpy as np
+
+    np.savez_compressed(
+        path,
+        vertices=vertices.astype(np.float32),
+        triangles=triangles.astype(np.int32),
+        normals=normals.astype(np.float32),
+    )
+
+
+def load_mesh(path):
+    import numpy as np
+
+    with np.load(path) as data:
+        return (
+            data["vertices"].astype(np.float64),
+            data["triangles"].astype(np.int64),
+            data["normals"].astype(np.float64),
+        )
+
+
+# --- Rasterization (NumPy only) ------------------------------------------------------------
+
+
+def camera_basis(view_name):
+    import numpy as np
+
+    toward_camera, world_up = (np.array(vector, dtype=np.float64) for vector in VIEW_CAMERAS[view_name])
+    toward_camera /= np.linalg.norm(toward_camera)
+    right = np.cross(world_up, toward_camera)
+    right /= np.linalg.norm(right)
+    up = np.cross(toward_camera, right)
+    return toward_camera, right, up
+
+
+def rasterize_view(vertices, triangles, normals, view_name, size, supersample=DEFAULT_SUPERSAMPLE):
+    import numpy as np
+
+    res = size * supersample
+    toward_camera, right, up = camera_basis(view_name)
+
+    # Orthographic fit to the bounding sphere, like FreeCAD's fitAll/ViewFit.
+    extent = vertices.max(axis=0) - vertices.min(axis=0)
+    radius = max(float(np.linalg.norm(extent)) * 0.5, 1e-9)
+    scale = res / (2.0 * radius)
+    sx = vertices @ right * scale + res * 0.5
+    sy = res * 0.5 - vertices @ up * scale
+    depth = vertices @ toward_camera
+
+    x = sx[triangles]
+    y = sy[triangles]
+    z = depth[triangles]
+    det = (y[:, 1] - y[:, 2]) * (x[:, 0] - x[:, 2]) + (x[:, 2] - x[:, 1]) * (y[:, 0] - y[:, 2])
+    x_min = np.clip(np.floor(x.min(axis=1) - 0.5), 0, res - 1).astype(np.int64)
+    x_max = np.clip(np.ceil(x.max(axis=1) - 0.5), 0, res - 1).astype(np.int64)
+    y_min = np.clip(np.floor(y.min(axis=1) - 0.5), 0, res - 1).astype(np.int64)
+    y_max = np.clip(np.ceil(y.max(axis=1) - 0.5), 0, res - 1).astype(np.int64)
+    widths = x_max - x_min + 1
+    counts = widths * (y_max - y_min + 1)
+    keep = np.nonzero((np.abs(det) > 1e-12) & (counts > 0))[0]
+
+    depth_buffer = np.full(res * res, -np.inf)
+    intensity = np.zeros(res * res)
+    cumulative = np.cumsum(counts[keep])
+
+    start = 0
+    while start < len(keep):
+        base = cumulative[start - 1] if start > 0 else 0
+        end = max(int(np.searchsorted(cumulative, base + FRAGMENT_BATCH, side="right")), start + 1)
+        batch = keep[start:end]
+        start = end
+
+        # One row per candidate pixel inside each triangle's bounding box.
+        batch_counts = counts[batch]
+        owner = np.repeat(np.arange(len(batch)), batch_counts)
+        local = np.arange(owner.size) - np.repeat(np.cumsum(batch_counts) - batch_counts, batch_counts)
+        tri = batch[owner]
+        px = x_min[tri] + local % widths[tri]
+        py = y_min[tri] + local // widths[tri]
+        cx = px + 0.5
+        cy = py + 0.5
+
+        tx = x[tri]
+        ty = y[tri]
+        l0 = ((ty[:, 1] - ty[:, 2]) * (cx - tx[:, 2]) + (tx[:, 2] - tx[:, 1]) * (cy - ty[:, 2])) / det[tri]
+        l1 = ((ty[:, 2] - ty[:, 0]) * (cx - tx[:, 2]) + (tx[:, 0] - tx[:, 2]) * (cy - ty[:, 2])) / det[tri]
+        l2 = 1.0 - l0 - l1
+        inside = (l0 >= -1e-9) & (l1 >= -1e-9) & (l2 >= -1e-9)
+        if not inside.any():
+            continue
+
+        tri = tri[inside]
+        l0, l1, l2 = l0[inside], l1[inside], l2[inside]
+        flat = (py * res + px)[inside]
+        tz = z[tri]
+        frag_depth = l0 * tz[:, 0] + l1 * tz[:, 1] + l2 * tz[:, 2]
+        np.maximum.at(depth_buffer, flat, frag_depth)
+
+        # Depth only grows, so fragments that win now are either final or get overwritten by
+        # a nearer fragment from a later batch.
+        winners = frag_depth >= depth_buffer[flat]
+        tri = tri[winners]
+        corner_normals = normals[triangles[tri]]
+        normal = (
+            l0[winners, None] * corner_normals[:, 0]
+            + l1[winners, None] * corner_normals[:, 1]
+            + l2[winners, None] * corner_normals[:, 2]
+        )
+        lengths = np.linalg.norm(normal, axis=1)
+        facing = np.abs(normal @ toward_camera) / np.where(lengths > 0, lengths, 1.0)
+        intensity[flat[winners]] = AMBIENT + DIFFUSE * facing
+
+    covered = np.isfinite(depth_buffer)
+    image = np.empty((res * res, 3))
+    image[:] = BACKGROUND_RGB
+    shaded = np.clip(intensity[covered, None] * np.array(SHAPE_RGB) * 255.0, 0.0, 255.0)
+    image[covered] = shaded
+    image = image.reshape(size, supersample, size, supersample, 3).mean(axis=(1, 3))
+    return np.clip(np.rint(image), 0, 255).astype(np.uint8)
+
+
+def write_png(path, rgb):
+    import numpy as np
+
+    height, width, _ = rgb.shape
+    rows = rgb.reshape(height, width * 3)
+    # "Up" filter: flat backgrounds become runs of zeros and compress well.
+    filtered = rows.copy()
+    filtered[1:] = rows[1:] - rows[:-1]
+    raw = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 0] = 2
+    raw[:, 1:] = filtered
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    with open(path, "wb") as handle:
+        handle.write(b"\x89PNG\r\n\x1a\n")
+        handle.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        handle.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        handle.write(chunk(b"IEND", b""))
+
+
+def _render_view_task(task):
+    mesh_path, view_name, output_dir, size, supersample = task
+    vertices, triangles, normals = load_mesh(mesh_path)
+    started = time.perf_counter()
+    write_png(os.path.join(output_dir, f"{view_name}.png"), rasterize_view(vertices, triangles, normals, view_name, size, supersample))
+    return view_name, time.perf_counter() - started
+
+
+def rasterize_all_views(mesh, output_dir, size, supersample, jobs, mesh_path=None):
+    os.makedirs(output_dir, exist_ok=True)
+    if jobs > 1 and mesh_path:
+        tasks = [(mesh_path, view_name, output_dir, size, supersample) for view_name in VIEW_NAMES]
+        with multiprocessing.Pool(min(jobs, len(VIEW_NAMES))) as pool:
+            for view_name, seconds in pool.imap_unordered(_render_view_task, tasks):
+                record_phase(f"rasterize:{view_name}", seconds)
+        return
+    vertices, triangles, normals = mesh
+    for view_name in VIEW_NAMES:
+        with timed_phase(f"rasterize:{view_name}"):
+            image = rasterize_view(vertices, triangles, normals, view_name, size, supersample)
+            write_png(os.path.join(output_dir, f"{view_name}.png"), image)
+
+
+# --- Subcommands ---------------------------------------------------------------------------
+
+
+def command_tessellate(args):
+    from freecad_shape_common import write_shape_descriptors
+
+    with timed_phase("tessellate"):
+        shape, vertices, triangles, normals = tessellate_step(os.path.abspath(args.input))
+    mesh_dir = os.path.dirname(os.path.abspath(args.mesh))
+    os.makedirs(mesh_dir, exist_ok=True)
+    save_mesh(args.mesh, vertices, triangles, normals)
+    with timed_phase("descriptors"):
+        if not write_shape_descriptors(None, args.descriptors_dir or mesh_dir, shape=shape):
+            print("WARN: No shape descriptors written; part will be indexed without them.")
+    print(f"Tessellated {len(triangles)} triangles to {args.mesh}")
+
+
+def command_render(args):
+    from freecad_shape_common import write_shape_descriptors
+
+    output_dir = os.path.abspath(args.output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    with timed_phase("tessellate"):
+        shape, vertices, triangles, normals = tessellate_step(os.path.abspath(args.input))
+    with timed_phase("descriptors"):
+        if not write_shape_descriptors(None, output_dir, shape=shape):
+            print("WARN: No shape descriptors written; part will be indexed without them.")
+    rasterize_all_views((vertices, triangles, normals), output_dir, args.size, args.supersample, 1)
+    print(f"Rendered {len(VIEW_NAMES)} STEP snapshots to {output_dir} (headless, {len(triangles)} triangles)")
+
+
+def command_rasterize(args):
+    mesh = load_mesh(args.mesh)
+    rasterize_all_views(mesh, os.path.abspath(args.output_dir), args.size, args.supersample, args.jobs, mesh_path=args.mesh)
+    print(f"Rasterized {len(VIEW_NAMES)} views to {args.output_dir}")
+
+
+def _batch_worker(task):
+    input_path, output_dir, size, supersample, freecad_cmd, keep_mesh, timeout = task
+    part_dir = os.path.join(output_dir, sanitize_part_id(input_path))
+    mesh_path = os.path.join(part_dir, "mesh.npz")
+    started = time.perf_counter()
+    result = {"file": input_path, "output_dir": part_dir, "ok": False}
+    try:
+        os.makedirs(part_dir, exist_ok=True)
+        # OpenCascade tessellation needs FreeCAD; rasterization then runs in this worker.
+        env = dict(os.environ)
+        env[RENDER_ARGS_ENV] = json.dumps(["tessellate", input_path, mesh_path])
+        env.pop(TIMINGS_PATH_ENV, None)
+        completed = subprocess.run(
+            [freecad_cmd, os.path.join(SCRIPT_DIR, os.path.basename(__file__))],
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        if completed.returncode != 0 or not os.path.exists(mesh_path):
+            raise RuntimeError((completed.stdout + completed.stderr).strip() or f"exit code {completed.returncode}")
+        rasterize_all_views(load_mesh(mesh_path), part_dir, size, supersample, 1)
+        if not keep_mesh:
+            os.remove(mesh_path)
+        result["ok"] = True
+    except Exception as exc:
+        result["error"] = str(exc)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def command_batch(args):
+    extensions = {".step", ".stp"}
+    inputs = []
+    for root, _, files in os.walk(args.input_dir):
+        inputs.extend(os.path.join(root, name) for name in files if os.path.splitext(name)[1].lower() in extensions)
+    inputs.sort()
+    if not inputs:
+        print(f"No STEP/STP files found under {args.input_dir}")
+        return 0
+
+    output_dir = os.path.abspath(args.output_dir)
+    tasks = [
+        (os.path.abspath(path), output_dir, args.size, args.supersample, args.freecad_cmd, args.keep_mesh, args.timeout)
+        for path in inputs
+    ]
+    started = time.perf_counter()
+    failures = 0
+    with multiprocessing.Pool(args.jobs) as pool:
+        for result in pool.imap_unordered(_batch_worker, tasks):
+            if result["ok"]:
+                print(f"[RENDERED] {result['file']} -> {result['output_dir']} ({result['seconds']:.1f}s)")
+            else:
+                failures += 1
+                print(f"[ERROR] {result['file']}: {result.get('error')}")
+    print(
+        f"[SUMMARY] files={len(inputs)} ok={len(inputs) - failures} errors={failures} "
+        f"jobs={args.jobs} wall_seconds={time.perf_counter() - started:.1f}"
+    )
+    return 1 if failures else 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Headless STEP snapshot renderer (FreeCADCmd tessellation + NumPy z-buffer).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    render_parser = sub.add_parser("render", help="Tessellate and rasterize one STEP file (run under FreeCADCmd)")
+    render_parser.add_argument("input")
+    render_parser.add_argument("output_dir")
+    render_parser.add_argument("size", type=int)
+    render_parser.add_argument("--supersample", type=int, default=DEFAULT_SUPERSAMPLE)
+
+    tessellate_parser = sub.add_parser("tessellate", help="Write a mesh .npz and descriptors.json (run under FreeCADCmd)")
+    tessellate_parser.add_argument("input")
+    tessellate_parser.add_argument("mesh")
+    tessellate_parser.add_argument("--descriptors_dir", default=None)
+
+    rasterize_parser = sub.add_parser("rasterize", help="Render the 7 views from a mesh .npz (plain Python + NumPy)")
+    rasterize_parser.add_argument("mesh")
+    rasterize_parser.add_argument("output_dir")
+    rasterize_parser.add_argument("size", type=int)
+    rasterize_parser.add_argument("--supersample", type=int, default=DEFAULT_SUPERSAMPLE)
+    rasterize_parser.add_argument("--jobs", type=int, default=1, help="Worker processes, one view each")
+
+    batch_parser = sub.add_parser("batch", help="Render a directory of STEP files across cores (plain Python + NumPy)")
+    batch_parser.add_argument("--input_dir", required=True)
+    batch_parser.add_argument("--output_dir", required=True)
+    batch_parser.add_argument("--size", type=int, default=512)
+    batch_parser.add_argument("--supersample", type=int, default=DEFAULT_SUPERSAMPLE)
+    batch_parser.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    batch_parser.add_argument("--freecad_cmd", default="FreeCADCmd")
+    batch_parser.add_argument("--timeout", type=int, default=900, help="Per-file tessellation timeout in seconds")
+    batch_parser.add_argument("--keep_mesh", action="store_true")
+
+    args = parser.parse_args(argv)
+    if getattr(args, "size", 1) <= 0 or getattr(args, "supersample", 1) <= 0 or getattr(args, "jobs", 1) <= 0:
+        parser.error("size, supersample and jobs must be positive integers")
+    return args
+
+
+def script_args():
+    raw = os.environ.get(RENDER_ARGS_ENV)
+    if raw:
+        return json.loads(raw)
+    args = sys.argv[1:]
+    if args and args[0].lower().endswith(".py"):
+        args = args[1:]
+    return args
+
+
+def main():
+    args = parse_args(script_args())
+    handlers = {
+        "render": command_render,
+        "tessellate": command_tessellate,
+        "rasterize": command_rasterize,
+        "batch": command_batch,
+    }
+    exit_code = handlers[args.command](args) or 0
+    write_phase_timings()
+    return exit_code
+
+
+def running_inside_freecad():
+    return "FreeCAD" in sys.modules
+
+
+if __name__ == "__main__":
+    try:
+        code = main()
+    except SystemExit as exc:
+        code = exc.code if isinstance(exc.code, int) else 1
+    except Exception:
+        traceback.print_exc()
+        code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    if running_inside_freecad():
+        # Leave FreeCADCmd immediately instead of returning to its command loop.
+        os._exit(code)
+    sys.exit(code)
@@ -7,9 +7,36 @@ import { ClipXenovaProvider } from '../providers/embedding/clipXenovaProvider';
 import { MetadataService } from '../services/metadataService';
 import { EmbeddingService } from '../services/embeddingService';
 import { PineconeService } from '../services/pineconeService';
+import { PartGraphService, partGraphStateKey } from '../services/partGraphService';
+import { ActiveIndexService } from '../services/activeIndexService';
+import { splitReferenceId } from '../services/candidateService';
 import { logger } from '../utils/logger';
+import { DEFAULT_DEDUPE_THRESHOLD, PartIndexer } from '../services/partIndexer';
+import type { PartSnapshot } from '../services/partIndexer';
+import { isShapeDescriptor } from '../utils/shape';
+import { cleanPartAttributes, isPartAttributes } from '../utils/partAttributes';
+import {
+  ATLAS_IMAGE_FILE_NAME,
+  ATLAS_LAYOUT_FILE_NAME,
+  DEFAULT_ATLAS_TILE_SIZE,
+  buildAtlas,
+  isAtlasLayout
+} from '../utils/atlas';
+import type { ActiveIndexRecord, AtlasLayout } from '../types/metadata';
+import { DEFAULT_SIMILAR_K } from '../utils/partGraph';
+import { DEFAULT_RANKING_OPTIONS } from '../utils/ranking';
+import {
+  UNVERSIONED_INDEX_VERSION,
+  isActivatableVersion,
+  metadataKeyPrefix,
+  newIndexVersion,
+  versionedNamespace
+} from '../utils/indexVersion';
 
 const DEFAULT_PREFIX = process.env.S3_PREFIX || 'reference_snapshots/';
+// Optional per-part sidecars uploaded by s3_snapshots_ingest.ts.
+const DESCRIPTORS_FILE_NAME = 'descriptors.json';
+const ATTRIBUTES_FILE_NAME = 'attributes.json';
 const VALID_VIEWS = new Set([
   'top',
   'bottom',
@@ -19,18 +46,46 @@ const VALID_VIEWS = new Set([
   'back',
   'isometric'
 ]);
+// Pinecone's namespace stats lag writes by a few seconds.
+const COUNT_POLL_INTERVAL_MS = 2_000;
+const COUNT_POLL_TIMEOUT_MS = 60_000;
 
 type CliOptions = {
   prefix: string;
   concurrency: number;
   dryRun: boolean;
+  dedupe: boolean;
+  dedupeThreshold: number;
+  buildAtlas: boolean;
+  atlasTileSize: number;
+  similar: boolean;
+  similarK: number;
+  blueGreen: boolean;
+  switchIndex: boolean;
+  activateVersion?: string;
+  gcOnly: boolean;
+  gcGraceHours: number;
+  validateSamples: number;
+  minSampleRecall: number;
+  maxShrink: number;
 };
 
 type Summary = {
   keysScanned: number;
   indexed: number;
+  vectorsStored: number;
+  aliased: number;
   errors: number;
   skipped: number;
+  withShape: number;
+  withAtlas: number;
+  atlasesBuilt: number;
+};
+
+type SnapshotKey = {
+  key: string;
+  partId: string;
+  view: string;
 };
 
 function normalizePrefix(prefix: string): string {
@@ -45,7 +100,20 @@ function parseArgs(argv: string[]): CliOptions {
   const options: CliOptions = {
     prefix: normalizePrefix(DEFAULT_PREFIX),
     concurrency: 2,
-    dryRun: false
+    dryRun: false,
+    dedupe: true,
+    dedupeThreshold: DEFAULT_DEDUPE_THRESHOLD,
+    buildAtlas: false,
+    atlasTileSize: DEFAULT_ATLAS_TILE_SIZE,
+    similar: true,
+    similarK: DEFAULT_SIMILAR_K,
+    blueGreen: false,
+    switchIndex: true,
+    gcOnly: false,
+    gcGraceHours: 24,
+    validateSamples: 20,
+    minSampleRecall: 0.9,
+    maxShrink: 0.2
   };
 
   const nextValue = (index: number, flag: string): string => {
@@ -70,6 +138,56 @@ function parseArgs(argv: string[]): CliOptions {
       case '--dry_run':
         options.dryRun = true;
         break;
+      case '--dedupe_threshold':
+        options.dedupeThreshold = Number.parseFloat(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--no_dedupe':
+        options.dedupe = false;
+        break;
+      case '--build_atlas':
+        options.buildAtlas = true;
+        break;
+      case '--atlas_tile_size':
+        options.atlasTileSize = Number.parseInt(nextValue(i, arg), 10);
+        i += 1;
+        break;
+      case '--similar_k':
+        options.similarK = Number.parseInt(nextValue(i, arg), 10);
+        i += 1;
+        break;
+      case '--no_similar':
+        options.similar = false;
+        break;
+      case '--blue_green':
+        options.blueGreen = true;
+        break;
+      case '--no_switch':
+        options.switchIndex = false;
+        break;
+      case '--activate':
+        options.activateVersion = nextValue(i, arg);
+        i += 1;
+        break;
+      case '--gc_only':
+        options.gcOnly = true;
+        break;
+      case '--gc_grace_hours':
+        options.gcGraceHours = Number.parseFloat(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--validate_samples':
+        options.validateSamples = Number.parseInt(nextValue(i, arg), 10);
+        i += 1;
+        break;
+      case '--min_sample_recall':
+        options.minSampleRecall = Number.parseFloat(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--max_shrink':
+        options.maxShrink = Number.parseFloat(nextValue(i, arg));
+        i += 1;
+        break;
       default:
         if (arg.startsWith('--')) {
           throw new Error(`Unknown argument: ${arg}`);
@@ -80,6 +198,38 @@ function parseArgs(argv: string[]): CliOptions {
   if (!Number.isInteger(options.concurrency) || options.concurrency <= 0) {
     throw new Error('Invalid --concurrency value. Expected a positive integer.');
   }
+  if (!Number.isFinite(options.dedupeThreshold) || options.dedupeThreshold <= 0 || options.dedupeThreshold > 1) {
+    throw new Error('Invalid --dedupe_threshold value. Expected a number in (0, 1].');
+  }
+  if (!Number.isInteger(options.atlasTileSize) || options.atlasTileSize <= 0) {
+    throw new Error('Invalid --atlas_tile_size value. Expected a positive integer.');
+  }
+  if (!Number.isInteger(options.similarK) || options.similarK <= 0) {
+    throw new Error('Invalid --similar_k value. Expected a positive integer.');
+  }
+  if (options.activateVersion !== undefined && !isActivatableVersion(options.activateVersion)) {
+    throw new Error(
+      `Invalid --activate value. Expected an index version such as v20261019-120000 or ${UNVERSIONED_INDEX_VERSION}.`
+    );
+  }
+  if ([options.blueGreen, options.activateVersion !== undefined, options.gcOnly].filter(Boolean).length > 1) {
+    throw new Error('--blue_green, --activate and --gc_only cannot be combined.');
+  }
+  if (!options.switchIndex && !options.blueGreen) {
+    throw new Error('--no_switch only applies to --blue_green builds.');
+  }
+  if (!Number.isFinite(options.gcGraceHours) || options.gcGraceHours < 0) {
+    throw new Error('Invalid --gc_grace_hours value. Expected a non-negative number.');
+  }
+  if (!Number.isInteger(options.validateSamples) || options.validateSamples < 0) {
+    throw new Error('Invalid --validate_samples value. Expected a non-negative integer.');
+  }
+  if (!Number.isFinite(options.minSampleRecall) || options.minSampleRecall < 0 || options.minSampleRecall > 1) {
+    throw new Error('Invalid --min_sample_recall value. Expected a number in [0, 1].');
+  }
+  if (!Number.isFinite(options.maxShrink) || options.maxShrink < 0 || options.maxShrink > 1) {
+    throw new Error('Invalid --max_shrink value. Expected a number in [0, 1].');
+  }
 
   return options;
 }
@@ -98,6 +248,36 @@ function parseSnapshotKey(prefix: string, key: string): { partId: string; view:
   return { partId, view };
 }
 
+function createSidecarLoader<T>(
+  s3Provider: S3Provider,
+  bucket: string,
+  prefix: string,
+  keys: string[],
+  fileName: string,
+  isValid: (value: unknown) => value is T
+): (partId: string) => Promise<T | undefined> {
+  const available = new Set(keys.filter((key) => path.posix.basename(key) === fileName));
+
+  return async (partId) => {
+    const key = `${prefix}${partId}/${fileName}`;
+    if (!available.has(key)) {
+      return undefined;
+    }
+    try {
+      const parsed: unknown = JSON.parse((await s3Provider.getObjectBuffer(bucket, key)).toString('utf8'));
+      if (!isValid(parsed)) {
+        logger.warn(`[SIDECAR] Ignoring malformed ${key}`);
+        return undefined;
+      }
+      return parsed;
+    } catch (error) {
+      const message = error instanceof Error ? error.message : String(error);
+      logger.warn(`[SIDECAR] Failed to load ${key}: ${message}`);
+      return undefined;
+    }
+  };
+}
+
 async function runWorkerPool<T>(items: T[], concurrency: number, worker: (item: T) => Promise<void>): Promise<void> {
   let cursor = 0;
   const workers = Array.from({ length: Math.min(concurrency, items.length) }, async () => {
@@ -113,6 +293,112 @@ async function runWorkerPool<T>(items: T[], concurrency: number, worker: (item:
   await Promise.all(workers);
 }
 
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+async function waitForVectorCount(pineconeService: PineconeService, expected: number): Promise<number> {
+  const deadline = Date.now() + COUNT_POLL_TIMEOUT_MS;
+  let count = await pineconeService.countReferenceVectors();
+  while (count !== expected && Date.now() < deadline) {
+    await sleep(COUNT_POLL_INTERVAL_MS);
+    count = await pineconeService.countReferenceVectors();
+  }
+  return count;
+}
+
+/** Evenly spaced over the sorted part ids, so repeated builds check the same parts. */
+function sampleCentroids(centroids: Map<string, number[]>, samples: number): Array<[string, number[]]> {
+  const sorted = Array.from(centroids.entries()).sort(([a], [b]) => a.localeCompare(b));
+  if (sorted.length <= samples) {
+    return sorted;
+  }
+  const step = sorted.length / samples;
+  return Array.from({ length: samples }, (_, index) => sorted[Math.floor(index * step)]);
+}
+
+/**
+ * Checks a staged build before it can go live: no failed parts, the namespace holds every vector
+ * written, the catalog did not shrink past `--max_shrink`, and sampled parts find themselves (with
+ * readable metadata) when queried by their own centroid. Returns the failed checks.
+ */
+async function validateBuild(
+  pineconeService: PineconeService,
+  metadataService: MetadataService,
+  centroids: Map<string, number[]>,
+  summary: Summary,
+  current: ActiveIndexRecord | null,
+  options: CliOptions
+): Promise<string[]> {
+  const failures: string[] = [];
+  if (centroids.size === 0) {
+    failures.push('no parts were indexed');
+  }
+  if (summary.errors > 0) {
+    failures.push(`${summary.errors} errors during the build`);
+  }
+
+  const counted = await waitForVectorCount(pineconeService, summary.vectorsStored);
+  logger.info(`[VALIDATE] vectors written=${summary.vectorsStored} counted=${counted}`);
+  if (counted !== summary.vectorsStored) {
+    failures.push(`namespace holds ${counted} vectors, expected ${summary.vectorsStored}`);
+  }
+  if (current && summary.vectorsStored < current.vectors * (1 - options.maxShrink)) {
+    failures.push(
+      `index would shrink from ${current.vectors} to ${summary.vectorsStored} vectors (max_shrink=${options.maxShrink})`
+    );
+  }
+
+  const { topK } = DEFAULT_RANKING_OPTIONS;
+  const samples = sampleCentroids(centroids, options.validateSamples);
+  let found = 0;
+  let metadataMissing = 0;
+  for (const [partId, centroid] of samples) {
+    const matches = await pineconeService.querySimilar(centroid, topK);
+    const hit = matches.find((match) => splitReferenceId(match.id)?.partId === partId);
+    if (!hit) {
+      logger.warn(`[VALIDATE] ${partId} is not in the top ${topK} of its own centroid query`);
+      continue;
+    }
+    found += 1;
+    if (!(await metadataService.getReferenceMetadata(hit.id))) {
+      metadataMissing += 1;
+      logger.warn(`[VALIDATE] No metadata item for ${hit.id}`);
+    }
+  }
+  const recall = samples.length > 0 ? found / samples.length : 1;
+  logger.info(`[VALIDATE] sample queries=${samples.length} self_recall=${recall.toFixed(3)} metadata_missing=${metadataMissing}`);
+  if (recall < options.minSampleRecall) {
+    failures.push(`sample self-recall ${recall.toFixed(3)} is below ${options.minSampleRecall}`);
+  }
+  if (metadataMissing > 0) {
+    failures.push(`${metadataMissing} sampled matches have no metadata item`);
+  }
+  return failures;
+}
+
+/**
+ * Deletes one index version: its Pinecone namespace, its metadata items and its graph state. The
+ * unversioned index is deleted the same way once it has been retired and its grace period is over.
+ */
+async function deleteIndexVersion(
+  version: string,
+  namespace: string,
+  basePineconeService: PineconeService,
+  baseMetadataService: MetadataService,
+  s3Provider: S3Provider,
+  bucket: string,
+  prefix: string
+): Promise<void> {
+  await basePineconeService.withNamespace(namespace).deleteNamespace();
+  const items =
+    version === UNVERSIONED_INDEX_VERSION
+      ? await baseMetadataService.deleteUnversioned()
+      : await baseMetadataService.deleteKeyPrefix(metadataKeyPrefix(version));
+  await s3Provider.deleteObject(bucket, partGraphStateKey(prefix, version));
+  logger.info(`[GC] Deleted ${version}: namespace=${namespace} metadata_items=${items}`);
+}
+
 async function run(): Promise<void> {
   const options = parseArgs(process.argv.slice(2));
   const { awsRegion, s3BucketName, dynamodbTableName, pineconeApiKey, pineconeIndex, pineconeNamespace } =
@@ -126,72 +412,356 @@ async function run(): Promise<void> {
   logger.info(`- pinecone_namespace: ${pineconeNamespace}`);
   logger.info(`- concurrency: ${options.concurrency}`);
   logger.info(`- dry_run: ${options.dryRun}`);
+  logger.info(`- dedupe_threshold: ${options.dedupe ? options.dedupeThreshold : 'off'}`);
+  logger.info(`- build_atlas: ${options.buildAtlas ? `missing only (tile=${options.atlasTileSize})` : 'off'}`);
+  logger.info(`- similar_parts: ${options.similar ? `k=${options.similarK}` : 'off'}`);
+  logger.info(
+    `- mode: ${options.gcOnly ? 'gc only' : options.activateVersion ? `activate ${options.activateVersion}` : options.blueGreen ? `blue/green${options.switchIndex ? '' : ' (no switch)'}` : 'in place'}`
+  );
+  logger.info(`- gc_grace_hours: ${options.gcGraceHours}`);
 
   const summary: Summary = {
     keysScanned: 0,
     indexed: 0,
+    vectorsStored: 0,
+    aliased: 0,
     errors: 0,
-    skipped: 0
+    skipped: 0,
+    withShape: 0,
+    withAtlas: 0,
+    atlasesBuilt: 0
   };
 
   const s3Provider = new S3Provider(awsRegion);
-  const metadataService = new MetadataService(new DynamoDbProvider(awsRegion), dynamodbTableName);
-  const pineconeService = new PineconeService(new PineconeProvider(pineconeApiKey), pineconeIndex, pineconeNamespace);
+  const baseMetadataService = new MetadataService(new DynamoDbProvider(awsRegion), dynamodbTableName);
+  const basePineconeService = new PineconeService(
+    new PineconeProvider(pineconeApiKey),
+    pineconeIndex,
+    pineconeNamespace
+  );
+  // The indexer always reads the pointer fresh, so the cache TTL does not matter here.
+  const activeIndexService = new ActiveIndexService(baseMetadataService, pineconeNamespace, 0);
+
+  // Retired versions and staged (--no_switch) builds stay restorable with --activate until their
+  // grace period ends.
+  const collectGarbage = async (): Promise<void> => {
+    const record = await activeIndexService.read();
+    const cutoff = Date.now() - options.gcGraceHours * 3_600_000;
+    const expired = [
+      ...(record?.retired ?? []).map(({ version, namespace, retiredAt }) => ({ version, namespace, state: 'retired', at: retiredAt })),
+      ...(record?.staged ?? []).map(({ version, namespace, stagedAt }) => ({ version, namespace, state: 'staged', at: stagedAt }))
+    ].filter((entry) => Date.parse(entry.at) <= cutoff);
+    if (!record || expired.length === 0) {
+      logger.info(
+        `[GC] Nothing to collect (retired=${record?.retired.length ?? 0} staged=${record?.staged.length ?? 0} grace_hours=${options.gcGraceHours})`
+      );
+      return;
+    }
+    const deleted: string[] = [];
+    for (const entry of expired) {
+      if (options.dryRun) {
+        logger.info(`[DRY_RUN] Would delete ${entry.version} (namespace=${entry.namespace} ${entry.state} ${entry.at})`);
+        continue;
+      }
+      try {
+        await deleteIndexVersion(
+          entry.version,
+          entry.namespace,
+          basePineconeService,
+          baseMetadataService,
+          s3Provider,
+          s3BucketName,
+          options.prefix
+        );
+        deleted.push(entry.version);
+      } catch (error) {
+        const message = error instanceof Error ? error.message : String(error);
+        logger.error(`[GC] Failed to delete ${entry.version}: ${message}; it stays listed for the next run`);
+      }
+    }
+    if (deleted.length > 0) {
+      await activeIndexService.dropVersions(deleted, record);
+    }
+  };
+
+  // Before the first switch there is no pointer; the unversioned index is recorded from its
+  // namespace so it can be rolled back to and collected like any other version.
+  const countUnversioned = async (current: ActiveIndexRecord | null) =>
+    current ? undefined : { vectors: await basePineconeService.countReferenceVectors(), parts: 0 };
+
+  if (options.gcOnly) {
+    await collectGarbage();
+    return;
+  }
+
+  if (options.activateVersion) {
+    // Rollback (or a delayed --no_switch build): point at a version that is still retained.
+    const version = options.activateVersion;
+    const current = await activeIndexService.read();
+    if ((current?.version ?? UNVERSIONED_INDEX_VERSION) === version) {
+      logger.info(`[SWITCH] ${version} is already active`);
+      return;
+    }
+    const retained = [...(current?.retired ?? []), ...(current?.staged ?? [])].find((entry) => entry.version === version);
+    const namespace =
+      retained?.namespace ??
+      (version === UNVERSIONED_INDEX_VERSION ? pineconeNamespace : versionedNamespace(pineconeNamespace, version));
+    const vectors = await basePineconeService.withNamespace(namespace).countReferenceVectors();
+    if (vectors === 0) {
+      throw new Error(`Index version ${version} has no vectors in namespace ${namespace}; it may have been garbage-collected`);
+    }
+    if (options.dryRun) {
+      logger.info(`[DRY_RUN] Would activate ${version} (namespace=${namespace} vectors=${vectors})`);
+      return;
+    }
+    await activeIndexService.activate(
+      { version, namespace, vectors, parts: retained?.parts ?? 0 },
+      current,
+      await countUnversioned(current)
+    );
+    logger.info(`[SWITCH] Active index ${current?.version ?? UNVERSIONED_INDEX_VERSION} -> ${version} (namespace=${namespace} vectors=${vectors})`);
+    await collectGarbage();
+    return;
+  }
+
+  // A blue/green build writes a new version next to the live one; otherwise the live version
+  // (or the unversioned namespace, before the first blue/green build) is updated in place.
+  const current = await activeIndexService.read();
+  const buildVersion = options.blueGreen ? newIndexVersion() : null;
+  const targetVersion = buildVersion ?? current?.version ?? null;
+  const targetNamespace = buildVersion
+    ? versionedNamespace(pineconeNamespace, buildVersion)
+    : current?.namespace ?? pineconeNamespace;
+  const metadataService = baseMetadataService.withKeyPrefix(metadataKeyPrefix(targetVersion));
+  const pineconeService = basePineconeService.withNamespace(targetNamespace);
   const embeddingService = new EmbeddingService(new ClipXenovaProvider());
+  logger.info(`- active_index: ${current ? `${current.version} (${current.namespace})` : 'none (unversioned namespace)'}`);
+  logger.info(`- target: ${targetVersion ?? 'unversioned'} namespace=${targetNamespace}`);
 
   const keys = (await s3Provider.listObjectKeys(s3BucketName, options.prefix)).sort();
   const pngKeys = keys.filter((key) => key.toLowerCase().endsWith('.png'));
+  const loadDescriptors = createSidecarLoader(
+    s3Provider,
+    s3BucketName,
+    options.prefix,
+    keys,
+    DESCRIPTORS_FILE_NAME,
+    isShapeDescriptor
+  );
+  const loadAttributes = createSidecarLoader(
+    s3Provider,
+    s3BucketName,
+    options.prefix,
+    keys,
+    ATTRIBUTES_FILE_NAME,
+    isPartAttributes
+  );
+  const loadAtlasLayout = createSidecarLoader(
+    s3Provider,
+    s3BucketName,
+    options.prefix,
+    keys,
+    ATLAS_LAYOUT_FILE_NAME,
+    isAtlasLayout
+  );
+  const keySet = new Set(keys);
+  const centroids = new Map<string, number[]>();
+
+  // Uses the uploaded sprite sheet when both halves exist; with --build_atlas, parts ingested
+  // before atlases existed get one built from the views just downloaded.
+  const resolveAtlas = async (
+    partId: string,
+    downloaded: PartSnapshot[]
+  ): Promise<{ s3Key: string; layout: AtlasLayout } | undefined> => {
+    const s3Key = `${options.prefix}${partId}/${ATLAS_IMAGE_FILE_NAME}`;
+    const layout = keySet.has(s3Key) ? await loadAtlasLayout(partId) : undefined;
+    if (layout || !options.buildAtlas) {
+      return layout ? { s3Key, layout } : undefined;
+    }
+    const canonical = Array.from(VALID_VIEWS);
+    const ordered = [...downloaded].sort((a, b) => canonical.indexOf(a.view) - canonical.indexOf(b.view));
+    const built = await buildAtlas(ordered, options.atlasTileSize);
+    if (!built) {
+      logger.warn(`[ATLAS] node-canvas is unavailable; skipping atlas for ${partId}`);
+      return undefined;
+    }
+    if (!options.dryRun) {
+      await s3Provider.putObject({ bucket: s3BucketName, key: s3Key, body: built.image, contentType: 'image/jpeg' });
+      await s3Provider.putObject({
+        bucket: s3BucketName,
+        key: `${options.prefix}${partId}/${ATLAS_LAYOUT_FILE_NAME}`,
+        body: Buffer.from(JSON.stringify(built.layout, null, 2), 'utf8'),
+        contentType: 'application/json'
+      });
+    }
+    summary.atlasesBuilt += 1;
+    logger.info(`[ATLAS] Built s3://${s3BucketName}/${s3Key} (${built.layout.width}x${built.layout.height})`);
+    return { s3Key, layout: built.layout };
+  };
 
   if (pngKeys.length === 0) {
     logger.warn(`No PNG keys found under s3://${s3BucketName}/${options.prefix}`);
     return;
   }
 
-  await runWorkerPool(pngKeys, options.concurrency, async (key) => {
+  const parts = new Map<string, SnapshotKey[]>();
+  for (const key of pngKeys) {
     summary.keysScanned += 1;
     const parsed = parseSnapshotKey(options.prefix, key);
     if (!parsed) {
       summary.skipped += 1;
       logger.warn(`[SKIP] Key does not match expected format: ${key}`);
+      continue;
+    }
+    const views = parts.get(parsed.partId) ?? [];
+    views.push({ key, ...parsed });
+    parts.set(parsed.partId, views);
+  }
+
+  const partIndexer = new PartIndexer(embeddingService, metadataService, pineconeService, {
+    dedupe: options.dedupe,
+    dedupeThreshold: options.dedupeThreshold,
+    dryRun: options.dryRun,
+    freshIndex: buildVersion !== null
+  });
+
+  // Parts are the unit of work so a part's views can be embedded together and deduplicated.
+  await runWorkerPool(Array.from(parts.entries()), options.concurrency, async ([partId, snapshots]) => {
+    const downloaded: PartSnapshot[] = [];
+    await Promise.all(
+      snapshots.map(async (snapshot) => {
+        try {
+          logger.info(`[INDEX] Downloading ${snapshot.key}`);
+          const buffer = await s3Provider.getObjectBuffer(s3BucketName, snapshot.key);
+          downloaded.push({ view: snapshot.view, s3Key: snapshot.key, buffer });
+        } catch (error) {
+          summary.errors += 1;
+          const message = error instanceof Error ? error.message : String(error);
+          logger.error(`[ERROR] ${snapshot.key}: ${message}`);
+        }
+      })
+    );
+    if (downloaded.length === 0) {
       return;
     }
 
-    const id = `${parsed.partId}-${parsed.view}`;
-    const label = `${parsed.partId} - ${parsed.view} view`;
     try {
-      logger.info(`[INDEX] Downloading ${key}`);
-      const imageBuffer = await s3Provider.getObjectBuffer(s3BucketName, key);
-      const embedding = await embeddingService.embedImage(imageBuffer);
-
-      if (!options.dryRun) {
-        await metadataService.writeReferenceMetadata({
-          id,
-          model: parsed.partId,
-          view: parsed.view,
-          s3Key: key,
-          label
-        });
-        await pineconeService.upsertReferenceVector(id, embedding, {
-          model: parsed.partId,
-          view: parsed.view,
-          s3Key: key
-        });
+      const [shape, attributes, atlas] = await Promise.all([
+        loadDescriptors(partId),
+        loadAttributes(partId),
+        resolveAtlas(partId, downloaded)
+      ]);
+      const result = await partIndexer.indexPart(partId, downloaded, {
+        shape,
+        attributes: attributes ? cleanPartAttributes(attributes) : undefined,
+        atlas
+      });
+      summary.indexed += result.views;
+      summary.vectorsStored += result.vectors;
+      summary.aliased += result.aliased;
+      centroids.set(partId, result.centroid);
+      if (result.withShape) {
+        summary.withShape += result.views;
       }
-
-      summary.indexed += 1;
-      logger.info(`[INDEXED] ${id} (${embedding.length} dims)`);
+      if (result.withAtlas) {
+        summary.withAtlas += result.views;
+      }
+      logger.info(
+        `[INDEXED] ${partId} views=${result.views} vectors=${result.vectors} (${result.dims} dims)${result.aliasSummary ? ` aliases: ${result.aliasSummary}` : ''}`
+      );
     } catch (error) {
-      summary.errors += 1;
+      summary.errors += downloaded.length;
       const message = error instanceof Error ? error.message : String(error);
-      logger.error(`[ERROR] ${key}: ${message}`);
+      logger.error(`[ERROR] ${partId}: ${message}`);
     }
   });
+  try {
+    await partIndexer.flush();
+  } catch (error) {
+    summary.errors += 1;
+    const message = error instanceof Error ? error.message : String(error);
+    logger.error(`[ERROR] Final bulk write: ${message}`);
+  }
+
+  if (options.similar && centroids.size > 0) {
+    // Every listed part stays in the graph, including ones that failed this run; only parts whose
+    // snapshots are gone from the prefix are dropped.
+    const partGraph = new PartGraphService(
+      s3Provider,
+      metadataService,
+      s3BucketName,
+      partGraphStateKey(options.prefix, targetVersion),
+      { k: options.similarK, dryRun: options.dryRun }
+    );
+    const graph = await partGraph.refresh(centroids, new Set(parts.keys()));
+    logger.info(
+      `[SIMILAR] ${graph.fullRebuild ? 'Rebuilt' : 'Refreshed'} part graph: parts=${Object.keys(graph.state.parts).length} rows_scored=${graph.rowsScored} lists_written=${graph.changed.length} removed=${graph.removed.length}`
+    );
+  }
 
   logger.info('[INDEX SUMMARY]');
   logger.info(`- Keys scanned: ${summary.keysScanned}`);
   logger.info(`- Indexed: ${summary.indexed}`);
+  logger.info(`- Vectors stored: ${summary.vectorsStored}`);
+  logger.info(`- Views aliased to a near-duplicate: ${summary.aliased}`);
+  if (summary.indexed > 0) {
+    const reduction = (1 - summary.vectorsStored / summary.indexed) * 100;
+    logger.info(`- Index size reduction: ${reduction.toFixed(1)}% (threshold=${options.dedupe ? options.dedupeThreshold : 'off'})`);
+  }
+  logger.info(`- Indexed with shape descriptors: ${summary.withShape}`);
+  logger.info(`- Indexed with an atlas tile: ${summary.withAtlas} (atlases built: ${summary.atlasesBuilt})`);
   logger.info(`- Skipped: ${summary.skipped}`);
   logger.info(`- Errors: ${summary.errors}`);
+
+  if (!buildVersion) {
+    return;
+  }
+  if (options.dryRun) {
+    logger.info(`[DRY_RUN] Nothing was staged for ${buildVersion}; skipping validation and switch`);
+    return;
+  }
+
+  const discardBuild = () =>
+    deleteIndexVersion(
+      buildVersion,
+      targetNamespace,
+      basePineconeService,
+      baseMetadataService,
+      s3Provider,
+      s3BucketName,
+      options.prefix
+    );
+  const failures = await validateBuild(pineconeService, metadataService, centroids, summary, current, options);
+  if (failures.length > 0) {
+    failures.forEach((failure) => logger.error(`[VALIDATE] ${failure}`));
+    await discardBuild();
+    throw new Error(`Index version ${buildVersion} failed validation; ${current?.version ?? 'the unversioned index'} stays active`);
+  }
+  const build = { version: buildVersion, namespace: targetNamespace, vectors: summary.vectorsStored, parts: centroids.size };
+  try {
+    if (options.switchIndex) {
+      await activeIndexService.activate(build, current, await countUnversioned(current));
+    } else {
+      // Listed on the pointer so garbage collection removes it if it is never activated.
+      await activeIndexService.stage(build, current, await countUnversioned(current));
+    }
+  } catch (error) {
+    const message = error instanceof Error ? error.message : String(error);
+    if (message.includes('changed concurrently')) {
+      // Another build went live while this one was running; this one would roll it back.
+      await discardBuild();
+    }
+    throw error;
+  }
+  if (!options.switchIndex) {
+    logger.info(`[SWITCH] Skipped (--no_switch); go live later with --activate ${buildVersion}`);
+    await collectGarbage();
+    return;
+  }
+  logger.info(
+    `[SWITCH] Active index ${current?.version ?? UNVERSIONED_INDEX_VERSION} -> ${buildVersion} (namespace=${targetNamespace} vectors=${summary.vectorsStored} parts=${centroids.size})`
+  );
+  await collectGarbage();
 }
 
 run().catch((error) => {
@@ -0,0 +1,299 @@
+import fs from 'fs/promises';
+import path from 'path';
+import { VIEW_SUFFIXES } from '../services/candidateService';
+import { cosineSimilarity } from '../utils/viewDedupe';
+import { decodePng } from './eval_images';
+import type { RgbImage } from './eval_images';
+
+// Both renderers paint this flat background (0x212122); anything further away is the part.
+const BACKGROUND_RGB = [0x21, 0x21, 0x22] as const;
+const FOREGROUND_TOLERANCE = 12;
+
+type CliOptions = {
+  referenceDir: string;
+  candidateDir: string;
+  parts?: string[];
+  minIou: number;
+  minCosine: number;
+  minRetrieval: number;
+  skipEmbeddings: boolean;
+  output?: string;
+};
+
+type ViewParity = {
+  partId: string;
+  view: string;
+  silhouetteIou: number;
+  meanLuminanceDiff: number;
+  embeddingCosine?: number;
+  nearestReferencePart?: string;
+};
+
+type ParityReport = {
+  createdAt: string;
+  referenceDir: string;
+  candidateDir: string;
+  thresholds: { minIou: number; minCosine: number; minRetrieval: number };
+  views: ViewParity[];
+  missing: string[];
+  summary: {
+    compared: number;
+    meanIou: number;
+    minIou: number;
+    meanLuminanceDiff: number;
+    meanCosine?: number;
+    minCosine?: number;
+    retrievalAgreement?: number;
+  };
+  failures: string[];
+};
+
+function parseArgs(argv: string[]): CliOptions {
+  const options: Partial<CliOptions> = {
+    minIou: 0.9,
+    minCosine: 0.9,
+    minRetrieval: 0.95,
+    skipEmbeddings: false
+  };
+
+  const nextValue = (index: number, flag: string): string => {
+    const value = argv[index + 1];
+    if (!value || value.startsWith('--')) {
+      throw new Error(`Missing value for ${flag}`);
+    }
+    return value;
+  };
+  const ratio = (value: string, flag: string): number => {
+    const parsed = Number.parseFloat(value);
+    if (!Number.isFinite(parsed) || parsed < 0 || parsed > 1) {
+      throw new Error(`Invalid ${flag} value. Expected a number between 0 and 1.`);
+    }
+    return parsed;
+  };
+
+  for (let i = 0; i < argv.length; i += 1) {
+    const arg = argv[i];
+    switch (arg) {
+      case '--reference_dir':
+        options.referenceDir = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--candidate_dir':
+        options.candidateDir = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--parts':
+        options.parts = nextValue(i, arg)
+          .split(',')
+          .map((value) => value.trim())
+          .filter(Boolean);
+        i += 1;
+        break;
+      case '--min_iou':
+        options.minIou = ratio(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--min_cosine':
+        options.minCosine = ratio(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--min_retrieval':
+        options.minRetrieval = ratio(nextValue(i, arg), arg);
+        i += 1;
+        break;
+      case '--skip_embeddings':
+        options.skipEmbeddings = true;
+        break;
+      case '--output':
+        options.output = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      default:
+        throw new Error(`Unknown argument: ${arg}`);
+    }
+  }
+
+  if (!options.referenceDir || !options.candidateDir) {
+    throw new Error('Both --reference_dir (GUI renders) and --candidate_dir (headless renders) are required.');
+  }
+  return options as CliOptions;
+}
+
+async function listPartIds(dir: string): Promise<string[]> {
+  const entries = await fs.readdir(dir, { withFileTypes: true });
+  return entries
+    .filter((entry) => entry.isDirectory() && !entry.name.startsWith('.'))
+    .map((entry) => entry.name)
+    .sort();
+}
+
+function isForeground(image: RgbImage, pixel: number): boolean {
+  const offset = pixel * 3;
+  for (let channel = 0; channel < 3; channel += 1) {
+    if (Math.abs(image.data[offset + channel] - BACKGROUND_RGB[channel]) > FOREGROUND_TOLERANCE) {
+      return true;
+    }
+  }
+  return false;
+}
+
+function luminance(image: RgbImage, pixel: number): number {
+  const offset = pixel * 3;
+  return 0.299 * image.data[offset] + 0.587 * image.data[offset + 1] + 0.114 * image.data[offset + 2];
+}
+
+function compareImages(reference: RgbImage, candidate: RgbImage): { silhouetteIou: number; meanLuminanceDiff: number } {
+  if (reference.width !== candidate.width || reference.height !== candidate.height) {
+    throw new Error(
+      `size mismatch ${reference.width}x${reference.height} vs ${candidate.width}x${candidate.height}; render both with the same --size`
+    );
+  }
+  const pixels = reference.width * reference.height;
+  let intersection = 0;
+  let union = 0;
+  let luminanceDiff = 0;
+  for (let pixel = 0; pixel < pixels; pixel += 1) {
+    const inReference = isForeground(reference, pixel);
+    const inCandidate = isForeground(candidate, pixel);
+    if (inReference && inCandidate) {
+      intersection += 1;
+    }
+    if (inReference || inCandidate) {
+      union += 1;
+    }
+    luminanceDiff += Math.abs(luminance(reference, pixel) - luminance(candidate, pixel));
+  }
+  return {
+    silhouetteIou: union === 0 ? 1 : intersection / union,
+    meanLuminanceDiff: luminanceDiff / pixels
+  };
+}
+
+function mean(values: number[]): number {
+  return values.length === 0 ? 0 : values.reduce((sum, value) => sum + value, 0) / values.length;
+}
+
+async function run(): Promise<void> {
+  const options = parseArgs(process.argv.slice(2));
+  const partIds = options.parts ?? (await listPartIds(options.referenceDir));
+  if (partIds.length === 0) {
+    throw new Error(`No part folders found under ${options.referenceDir}`);
+  }
+
+  console.log('[PARITY] config');
+  console.log(`- reference_dir: ${options.referenceDir}`);
+  console.log(`- candidate_dir: ${options.candidateDir}`);
+  console.log(`- parts: ${partIds.length}`);
+  console.log(`- embeddings: ${options.skipEmbeddings ? 'skipped' : 'clip'}`);
+
+  const views: ViewParity[] = [];
+  const missing: string[] = [];
+  const buffers: Array<{ reference: Buffer; candidate: Buffer }> = [];
+
+  for (const partId of partIds) {
+    for (const view of VIEW_SUFFIXES) {
+      const label = `${partId}/${view}.png`;
+      const [reference, candidate] = await Promise.all([
+        fs.readFile(path.join(options.referenceDir, partId, `${view}.png`)).catch(() => null),
+        fs.readFile(path.join(options.candidateDir, partId, `${view}.png`)).catch(() => null)
+      ]);
+      if (!reference || !candidate) {
+        missing.push(`${label} (${!reference ? 'reference' : 'candidate'})`);
+        continue;
+      }
+      const metrics = compareImages(await decodePng(reference), await decodePng(candidate));
+      views.push({ partId, view, ...metrics });
+      buffers.push({ reference, candidate });
+    }
+  }
+
+  if (!options.skipEmbeddings && views.length > 0) {
+    const { ClipXenovaProvider } = await import('../providers/embedding/clipXenovaProvider');
+    const provider = new ClipXenovaProvider();
+    const referenceVectors = await provider.embedBuffers(buffers.map((item) => ({ buffer: item.reference, mimeType: 'image/png' })));
+    const candidateVectors = await provider.embedBuffers(buffers.map((item) => ({ buffer: item.candidate, mimeType: 'image/png' })));
+
+    views.forEach((entry, index) => {
+      entry.embeddingCosine = cosineSimilarity(referenceVectors[index], candidateVectors[index]);
+      // Retrieval parity: a headless view should still land closest to a GUI view of its own part.
+      let bestScore = -Infinity;
+      referenceVectors.forEach((vector, referenceIndex) => {
+        const score = cosineSimilarity(candidateVectors[index], vector);
+        if (score > bestScore) {
+          bestScore = score;
+          entry.nearestReferencePart = views[referenceIndex].partId;
+        }
+      });
+    });
+  }
+
+  const failures: string[] = [];
+  for (const entry of views) {
+    const label = `${entry.partId}/${entry.view}`;
+    if (entry.silhouetteIou < options.minIou) {
+      failures.push(`${label} silhouette_iou=${entry.silhouetteIou.toFixed(3)} < ${options.minIou}`);
+    }
+    if (entry.embeddingCosine !== undefined && entry.embeddingCosine < options.minCosine) {
+      failures.push(`${label} embedding_cosine=${entry.embeddingCosine.toFixed(3)} < ${options.minCosine}`);
+    }
+  }
+  if (missing.length > 0) {
+    failures.push(`${missing.length} view(s) missing`);
+  }
+
+  const ious = views.map((entry) => entry.silhouetteIou);
+  const cosines = views.flatMap((entry) => (entry.embeddingCosine === undefined ? [] : [entry.embeddingCosine]));
+  const retrievalAgreement =
+    cosines.length > 0 ? views.filter((entry) => entry.nearestReferencePart === entry.partId).length / views.length : undefined;
+  if (retrievalAgreement !== undefined && retrievalAgreement < options.minRetrieval) {
+    failures.push(`retrieval_agreement=${retrievalAgreement.toFixed(3)} < ${options.minRetrieval}`);
+  }
+
+  const report: ParityReport = {
+    createdAt: new Date().toISOString(),
+    referenceDir: options.referenceDir,
+    candidateDir: options.candidateDir,
+    thresholds: { minIou: options.minIou, minCosine: options.minCosine, minRetrieval: options.minRetrieval },
+    views,
+    missing,
+    summary: {
+      compared: views.length,
+      meanIou: mean(ious),
+      minIou: ious.length > 0 ? Math.min(...ious) : 0,
+      meanLuminanceDiff: mean(views.map((entry) => entry.meanLuminanceDiff)),
+      meanCosine: cosines.length > 0 ? mean(cosines) : undefined,
+      minCosine: cosines.length > 0 ? Math.min(...cosines) : undefined,
+      retrievalAgreement
+    },
+    failures
+  };
+
+  const { summary } = report;
+  console.log(
+    `[PARITY] compared=${summary.compared} mean_iou=${summary.meanIou.toFixed(3)} min_iou=${summary.minIou.toFixed(3)} mean_luma_diff=${summary.meanLuminanceDiff.toFixed(
+      1
+    )}${summary.meanCosine === undefined ? '' : ` mean_cosine=${summary.meanCosine.toFixed(3)} min_cosine=${summary.minCosine?.toFixed(3)}`}${
+      retrievalAgreement === undefined ? '' : ` retrieval_agreement=${retrievalAgreement.toFixed(3)}`
+    }`
+  );
+
+  if (options.output) {
+    await fs.mkdir(path.dirname(options.output), { recursive: true });
+    await fs.writeFile(options.output, JSON.stringify(report, null, 2));
+    console.log(`[PARITY] report written to ${options.output}`);
+  }
+
+  if (failures.length > 0) {
+    for (const failure of failures) {
+      console.error(`[PARITY_FAIL] ${failure}`);
+    }
+    process.exit(1);
+  }
+  console.log('[PARITY] headless renders match the GUI reference within thresholds');
+}
+
+run().catch((error) => {
+  const message = error instanceof Error ? error.message : String(error);
+  console.error(`[FATAL] ${message}`);
+  process.exit(1);
+});
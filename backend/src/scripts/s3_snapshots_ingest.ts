@@ -1,7 +1,24 @@
 import fs from 'fs/promises';
 import path from 'path';
 import { spawn, spawnSync } from 'child_process';
+import { validatePreindexEnv } from '../config/env';
 import { S3Provider } from '../providers/storage/s3Provider';
+import { DynamoDbProvider } from '../providers/metadata/dynamodbProvider';
+import { PineconeProvider } from '../providers/vector/pineconeProvider';
+import { ClipXenovaProvider } from '../providers/embedding/clipXenovaProvider';
+import { EmbeddingService } from '../services/embeddingService';
+import { MetadataService } from '../services/metadataService';
+import { PineconeService } from '../services/pineconeService';
+import { PartGraphService, partGraphStateKey } from '../services/partGraphService';
+import { ActiveIndexService } from '../services/activeIndexService';
+import { metadataKeyPrefix } from '../utils/indexVersion';
+import { DEFAULT_DEDUPE_THRESHOLD, PartIndexer } from '../services/partIndexer';
+import type { PartSnapshot } from '../services/partIndexer';
+import type { AtlasLayout, PartAttributes, ShapeDescriptor } from '../types/metadata';
+import { isShapeDescriptor } from '../utils/shape';
+import { cleanPartAttributes, isPartAttributes } from '../utils/partAttributes';
+import { ATLAS_IMAGE_FILE_NAME, ATLAS_LAYOUT_FILE_NAME, DEFAULT_ATLAS_TILE_SIZE, buildAtlas } from '../utils/atlas';
+import { DEFAULT_SIMILAR_K } from '../utils/partGraph';
 
 const VIEWS = [
   'top',
@@ -13,6 +30,16 @@ const VIEWS = [
   'isometric'
 ] as const;
 const STEP_EXTENSIONS = new Set(['.step', '.stp']);
+// Optional shape-descriptor sidecar written by both FreeCAD renderers (see freecad_shape_common.py).
+const DESCRIPTORS_FILE_NAME = 'descriptors.json';
+const ATTRIBUTES_FILE_NAME = 'attributes.json';
+// Optional manifest in the input directory: { "<part_id or file name>": { "family": ..., "manufacturer": ... } }.
+const ATTRIBUTES_MANIFEST_FILE_NAME = 'part_attributes.json';
+const CHECKPOINT_FILE_NAME = '.ingest_checkpoint.jsonl';
+// headless_snapshot_renderer.py reads its arguments from here because FreeCADCmd opens extra argv entries as documents.
+const HEADLESS_ARGS_ENV = 'SNAPSHOT_RENDER_ARGS';
+
+type RendererKind = 'gui' | 'headless';
 
 type CliOptions = {
   inputDir: string;
@@ -24,12 +51,47 @@ type CliOptions = {
   concurrency: number;
   dryRun: boolean;
   freecadCmd?: string;
+  renderer: RendererKind;
+  index: boolean;
+  dedupe: boolean;
+  dedupeThreshold: number;
+  checkpointPath: string;
+  restart: boolean;
+  attributesPath?: string;
+  atlasTileSize: number;
+  similarK: number;
+};
+
+// Settings a completed part was rendered and uploaded with; a rerun only skips parts whose
+// entry matches the current run's settings.
+type CheckpointSettings = {
+  bucket: string;
+  prefix: string;
+  snapshotSize: number;
+  renderer: RendererKind;
+  dedupe: boolean;
+  dedupeThreshold: number;
+  atlasTileSize: number;
+};
+
+type CheckpointEntry = CheckpointSettings & {
+  partId: string;
+  cadFile: string;
+  size: number;
+  mtimeMs: number;
+  indexed: boolean;
+  completedAt: string;
 };
 
 type IngestSummary = {
   cadFilesProcessed: number;
   snapshotsGenerated: number;
   uploaded: number;
+  descriptorsUploaded: number;
+  atlasesUploaded: number;
+  viewsIndexed: number;
+  vectorsStored: number;
+  resumed: number;
   errors: number;
 };
 
@@ -42,7 +104,14 @@ function parseArgs(argv: string[]): CliOptions {
     prefix: process.env.S3_PREFIX || 'reference_snapshots/',
     size: 512,
     concurrency: 2,
-    dryRun: false
+    dryRun: false,
+    renderer: 'gui' as RendererKind,
+    index: false,
+    dedupe: true,
+    dedupeThreshold: DEFAULT_DEDUPE_THRESHOLD,
+    restart: false,
+    atlasTileSize: DEFAULT_ATLAS_TILE_SIZE,
+    similarK: DEFAULT_SIMILAR_K
   };
 
   const nextValue = (index: number, flag: string): string => {
@@ -53,7 +122,8 @@ function parseArgs(argv: string[]): CliOptions {
     return value;
   };
 
-  const options: CliOptions = { ...defaults };
+  let checkpointPath: string | undefined;
+  const options: CliOptions = { ...defaults, checkpointPath: '' };
   for (let i = 0; i < argv.length; i += 1) {
     const arg = argv[i];
     switch (arg) {
@@ -88,6 +158,44 @@ function parseArgs(argv: string[]): CliOptions {
         options.freecadCmd = nextValue(i, arg);
         i += 1;
         break;
+      case '--renderer': {
+        const value = nextValue(i, arg);
+        if (value !== 'gui' && value !== 'headless') {
+          throw new Error('Invalid --renderer value. Expected "gui" or "headless".');
+        }
+        options.renderer = value;
+        i += 1;
+        break;
+      }
+      case '--index':
+        options.index = true;
+        break;
+      case '--dedupe_threshold':
+        options.dedupeThreshold = Number.parseFloat(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--no_dedupe':
+        options.dedupe = false;
+        break;
+      case '--checkpoint':
+        checkpointPath = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--restart':
+        options.restart = true;
+        break;
+      case '--attributes':
+        options.attributesPath = path.resolve(nextValue(i, arg));
+        i += 1;
+        break;
+      case '--atlas_tile_size':
+        options.atlasTileSize = Number.parseInt(nextValue(i, arg), 10);
+        i += 1;
+        break;
+      case '--similar_k':
+        options.similarK = Number.parseInt(nextValue(i, arg), 10);
+        i += 1;
+        break;
       default:
         if (arg.startsWith('--')) {
           throw new Error(`Unknown argument: ${arg}`);
@@ -101,7 +209,17 @@ function parseArgs(argv: string[]): CliOptions {
   if (!Number.isInteger(options.concurrency) || options.concurrency <= 0) {
     throw new Error('Invalid --concurrency value. Expected a positive integer.');
   }
+  if (!Number.isFinite(options.dedupeThreshold) || options.dedupeThreshold <= 0 || options.dedupeThreshold > 1) {
+    throw new Error('Invalid --dedupe_threshold value. Expected a number in (0, 1].');
+  }
+  if (!Number.isInteger(options.atlasTileSize) || options.atlasTileSize < 0) {
+    throw new Error('Invalid --atlas_tile_size value. Expected a non-negative integer (0 disables atlases).');
+  }
+  if (!Number.isInteger(options.similarK) || options.similarK <= 0) {
+    throw new Error('Invalid --similar_k value. Expected a positive integer.');
+  }
   options.prefix = normalizePrefix(options.prefix);
+  options.checkpointPath = checkpointPath ?? path.join(options.outputDir, CHECKPOINT_FILE_NAME);
   return options;
 }
 
@@ -151,9 +269,12 @@ async function listStepFilesRecursive(root: string): Promise<string[]> {
   return results;
 }
 
-function findFreeCadRenderCommand(): string | null {
+function findFreeCadRenderCommand(renderer: RendererKind): string | null {
+  const guiCandidates = process.platform === 'win32' ? ['FreeCAD', 'freecad'] : ['FreeCAD'];
+  const consoleCandidates = process.platform === 'win32' ? ['FreeCADCmd', 'freecadcmd'] : ['freecadcmd', 'FreeCADCmd'];
+  // The headless renderer only needs Part, so prefer the console build that starts without a display.
   const candidates =
-    process.platform === 'win32' ? ['FreeCAD', 'freecad', 'FreeCADCmd', 'freecadcmd'] : ['FreeCAD', 'freecadcmd', 'FreeCADCmd'];
+    renderer === 'headless' ? [...consoleCandidates, ...guiCandidates] : [...guiCandidates, ...consoleCandidates];
   for (const candidate of candidates) {
     const check = spawnSync(candidate, ['-h'], {
       stdio: 'ignore',
@@ -166,16 +287,19 @@ function findFreeCadRenderCommand(): string | null {
   }
 
   if (process.platform === 'win32') {
-    const windowsPaths = [
+    const guiPaths = [
       'C:\\Program Files\\FreeCAD 1.0\\bin\\FreeCAD.exe',
       'C:\\Program Files\\FreeCAD\\bin\\FreeCAD.exe',
+      'C:\\Program Files\\FreeCAD 1.0\\bin\\freecad.exe',
+      'C:\\Program Files\\FreeCAD\\bin\\freecad.exe'
+    ];
+    const consolePaths = [
       'C:\\Program Files\\FreeCAD 1.0\\bin\\FreeCADCmd.exe',
       'C:\\Program Files\\FreeCAD\\bin\\FreeCADCmd.exe',
-      'C:\\Program Files\\FreeCAD 1.0\\bin\\freecad.exe',
-      'C:\\Program Files\\FreeCAD\\bin\\freecad.exe',
       'C:\\Program Files\\FreeCAD 1.0\\bin\\freecadcmd.exe',
       'C:\\Program Files\\FreeCAD\\bin\\freecadcmd.exe'
     ];
+    const windowsPaths = renderer === 'headless' ? [...consolePaths, ...guiPaths] : [...guiPaths, ...consolePaths];
     for (const candidate of windowsPaths) {
       const check = spawnSync(candidate, ['-h'], {
         stdio: 'ignore',
@@ -199,19 +323,27 @@ async function renderSnapshotsWithFreeCad(
   freecadCmd: string,
   stepFile: string,
   outputDir: string,
-  size: number
+  size: number,
+  renderer: RendererKind
 ): Promise<void> {
-  const freecadScript = path.resolve(__dirname, 'freecad_step_snapshot_renderer.py');
   await ensureDirectory(outputDir);
+  const env: NodeJS.ProcessEnv = {
+    ...process.env,
+    QT_QPA_PLATFORM: process.env.QT_QPA_PLATFORM || 'offscreen'
+  };
+  let args: string[];
+  if (renderer === 'headless') {
+    args = [path.resolve(__dirname, 'headless_snapshot_renderer.py')];
+    env[HEADLESS_ARGS_ENV] = JSON.stringify(['render', stepFile, outputDir, String(size)]);
+  } else {
+    args = [path.resolve(__dirname, 'freecad_step_snapshot_renderer.py'), stepFile, outputDir, String(size)];
+  }
 
   await new Promise<void>((resolve, reject) => {
-    const child = spawn(freecadCmd, [freecadScript, stepFile, outputDir, String(size)], {
+    const child = spawn(freecadCmd, args, {
       stdio: ['ignore', 'pipe', 'pipe'],
       windowsHide: true,
-      env: {
-        ...process.env,
-        QT_QPA_PLATFORM: process.env.QT_QPA_PLATFORM || 'offscreen'
-      }
+      env
     });
 
     let stderr = '';
@@ -258,22 +390,133 @@ async function renderSnapshotsWithFreeCad(
   }
 }
 
+async function readSnapshots(prefix: string, partId: string, outputDir: string): Promise<PartSnapshot[]> {
+  // Read once; the same buffers feed both the upload and the fused embedding.
+  return Promise.all(
+    VIEWS.map(async (view) => ({
+      view,
+      s3Key: `${prefix}${partId}/${view}.png`,
+      buffer: await fs.readFile(path.join(outputDir, `${view}.png`))
+    }))
+  );
+}
+
+async function readLocalDescriptors(outputDir: string): Promise<ShapeDescriptor | undefined> {
+  const raw = await fs.readFile(path.join(outputDir, DESCRIPTORS_FILE_NAME), 'utf8').catch(() => null);
+  if (!raw) {
+    return undefined;
+  }
+  try {
+    const parsed: unknown = JSON.parse(raw);
+    return isShapeDescriptor(parsed) ? parsed : undefined;
+  } catch {
+    return undefined;
+  }
+}
+
+async function loadAttributesManifest(manifestPath: string, required: boolean): Promise<Record<string, PartAttributes>> {
+  const raw = await fs.readFile(manifestPath, 'utf8').catch(() => null);
+  if (raw === null) {
+    if (required) {
+      throw new Error(`Attributes manifest not found: ${manifestPath}`);
+    }
+    return {};
+  }
+  const parsed: unknown = JSON.parse(raw);
+  if (!parsed || typeof parsed !== 'object' || Array.isArray(parsed)) {
+    throw new Error(`Attributes manifest must be an object keyed by part id: ${manifestPath}`);
+  }
+  const manifest: Record<string, PartAttributes> = {};
+  for (const [key, value] of Object.entries(parsed as Record<string, unknown>)) {
+    if (!isPartAttributes(value)) {
+      throw new Error(`Invalid attributes for "${key}" in ${manifestPath}`);
+    }
+    manifest[key] = value;
+  }
+  return manifest;
+}
+
+function resolvePartAttributes(
+  inputDir: string,
+  cadFile: string,
+  partId: string,
+  manifest: Record<string, PartAttributes>
+): PartAttributes {
+  const sourceFile = path.relative(inputDir, cadFile).split(path.sep).join('/');
+  const segments = sourceFile.split('/');
+  // Catalogs organised as <family>/<file>.step get their family from the folder name.
+  const family = segments.length > 1 ? segments[0] : undefined;
+  const entry = manifest[partId] ?? manifest[path.basename(cadFile)] ?? {};
+  return cleanPartAttributes({ family, ...entry, sourceFile });
+}
+
+async function loadCheckpoint(checkpointPath: string): Promise<Map<string, CheckpointEntry>> {
+  const entries = new Map<string, CheckpointEntry>();
+  const raw = await fs.readFile(checkpointPath, 'utf8').catch(() => '');
+  for (const line of raw.split(/\r?\n/)) {
+    if (!line.trim()) {
+      continue;
+    }
+    try {
+      const entry = JSON.parse(line) as CheckpointEntry;
+      entries.set(entry.cadFile, entry);
+    } catch {
+      // A run killed mid-append leaves a partial last line; that part is simply redone.
+    }
+  }
+  return entries;
+}
+
+async function appendCheckpoint(checkpointPath: string, entry: CheckpointEntry): Promise<void> {
+  await fs.appendFile(checkpointPath, `${JSON.stringify(entry)}\n`, 'utf8');
+}
+
+function checkpointSettings(options: CliOptions): CheckpointSettings {
+  return {
+    bucket: options.bucket,
+    prefix: options.prefix,
+    snapshotSize: options.size,
+    renderer: options.renderer,
+    dedupe: options.dedupe,
+    dedupeThreshold: options.dedupeThreshold,
+    atlasTileSize: options.atlasTileSize
+  };
+}
+
+function isCheckpointCurrent(
+  entry: CheckpointEntry | undefined,
+  stat: { size: number; mtimeMs: number },
+  settings: CheckpointSettings,
+  requireIndexed: boolean
+): boolean {
+  // Entries written before the settings were recorded lack them and never match.
+  return Boolean(
+    entry &&
+      entry.size === stat.size &&
+      entry.mtimeMs === stat.mtimeMs &&
+      entry.bucket === settings.bucket &&
+      entry.prefix === settings.prefix &&
+      entry.snapshotSize === settings.snapshotSize &&
+      entry.renderer === settings.renderer &&
+      entry.dedupe === settings.dedupe &&
+      entry.dedupeThreshold === settings.dedupeThreshold &&
+      entry.atlasTileSize === settings.atlasTileSize &&
+      (entry.indexed || !requireIndexed)
+  );
+}
+
 async function uploadSnapshots(
   s3: S3Provider,
   bucket: string,
-  prefix: string,
-  partId: string,
-  outputDir: string
+  snapshots: PartSnapshot[]
 ): Promise<number> {
   let uploaded = 0;
-  for (const view of VIEWS) {
-    const filePath = path.join(outputDir, `${view}.png`);
-    const body = await fs.readFile(filePath);
-    const key = `${prefix}${partId}/${view}.png`;
+  for (const snapshot of snapshots) {
+    const key = snapshot.s3Key;
     await s3.putObject({
       bucket,
       key,
-      body,
+      body: snapshot.buffer,
       contentType: 'image/png'
     });
     uploaded += 1;
@@ -282,6 +525,48 @@ async function uploadSnapshots(
   return uploaded;
 }
 
+async function uploadSidecar(
+  s3: S3Provider,
+  bucket: string,
+  prefix: string,
+  partId: string,
+  outputDir: string,
+  fileName: string
+): Promise<boolean> {
+  const filePath = path.join(outputDir, fileName);
+  const body = await fs.readFile(filePath).catch(() => null);
+  if (!body) {
+    console.warn(`[WARN] No ${fileName} for part_id=${partId}; indexing will skip it.`);
+    return false;
+  }
+  const key = `${prefix}${partId}/${fileName}`;
+  await s3.putObject({
+    bucket,
+    key,
+    body,
+    contentType: 'application/json'
+  });
+  console.log(`[UPLOAD] s3://${bucket}/${key}`);
+  return true;
+}
+
+async function writeLocalAtlas(
+  prefix: string,
+  partId: string,
+  outputDir: string,
+  snapshots: PartSnapshot[],
+  tileSize: number
+): Promise<{ s3Key: string; layout: AtlasLayout } | null> {
+  const atlas = await buildAtlas(snapshots, tileSize);
+  if (!atlas) {
+    console.warn(`[WARN] node-canvas is unavailable; no atlas for part_id=${partId}.`);
+    return null;
+  }
+  await fs.writeFile(path.join(outputDir, ATLAS_IMAGE_FILE_NAME), atlas.image);
+  await fs.writeFile(path.join(outputDir, ATLAS_LAYOUT_FILE_NAME), JSON.stringify(atlas.layout, null, 2), 'utf8');
+  return { s3Key: `${prefix}${partId}/${ATLAS_IMAGE_FILE_NAME}`, layout: atlas.layout };
+}
+
 async function runWorkerPool<T>(items: T[], concurrency: number, worker: (item: T) => Promise<void>): Promise<void> {
   let cursor = 0;
   const workers = Array.from({ length: Math.min(concurrency, items.length) }, async () => {
@@ -303,6 +588,11 @@ async function run(): Promise<void> {
     cadFilesProcessed: 0,
     snapshotsGenerated: 0,
     uploaded: 0,
+    descriptorsUploaded: 0,
+    atlasesUploaded: 0,
+    viewsIndexed: 0,
+    vectorsStored: 0,
+    resumed: 0,
     errors: 0
   };
 
@@ -315,6 +605,14 @@ async function run(): Promise<void> {
   console.log(`- size: ${options.size}`);
   console.log(`- concurrency: ${options.concurrency}`);
   console.log(`- dry_run: ${options.dryRun}`);
+  console.log(`- renderer: ${options.renderer}`);
+  console.log(`- atlas_tile_size: ${options.atlasTileSize > 0 ? options.atlasTileSize : 'off'}`);
+  console.log(`- index (fused): ${options.index}`);
+  if (options.index) {
+    console.log(`- dedupe_threshold: ${options.dedupe ? options.dedupeThreshold : 'off'}`);
+    console.log(`- similar_k: ${options.similarK}`);
+  }
+  console.log(`- checkpoint: ${options.restart ? 'ignored (--restart)' : options.checkpointPath}`);
   if (options.freecadCmd) {
     console.log(`- freecad_cmd (forced): ${options.freecadCmd}`);
   }
@@ -323,7 +621,7 @@ async function run(): Promise<void> {
     throw new Error(`Input directory does not exist: ${options.inputDir}`);
   }
 
-  const freecadCmd = options.freecadCmd || findFreeCadRenderCommand();
+  const freecadCmd = options.freecadCmd || findFreeCadRenderCommand(options.renderer);
   if (!freecadCmd) {
     throw new Error(
       [
@@ -333,11 +631,12 @@ async function run(): Promise<void> {
       ].join(' ')
     );
   }
-  if (/freecadcmd(?:\.exe)?$/i.test(path.basename(freecadCmd))) {
+  if (options.renderer === 'gui' && /freecadcmd(?:\.exe)?$/i.test(path.basename(freecadCmd))) {
     throw new Error(
       [
         `Selected FreeCAD command "${freecadCmd}" is console-only and cannot render snapshots with ImportGui.`,
-        'Use FreeCAD GUI executable instead (example: "C:\\Program Files\\FreeCAD 1.0\\bin\\FreeCAD.exe").'
+        'Use FreeCAD GUI executable instead (example: "C:\\Program Files\\FreeCAD 1.0\\bin\\FreeCAD.exe"),',
+        'or pass --renderer headless to rasterize without the GUI.'
       ].join(' ')
     );
   }
@@ -351,6 +650,43 @@ async function run(): Promise<void> {
   }
 
   const s3 = new S3Provider(options.region);
+  let partIndexer: PartIndexer | null = null;
+  let partGraph: PartGraphService | null = null;
+  if (options.index) {
+    const { awsRegion, dynamodbTableName, pineconeApiKey, pineconeIndex, pineconeNamespace } = validatePreindexEnv();
+    console.log(`- dynamodb_table: ${dynamodbTableName}`);
+    console.log(`- pinecone_index: ${pineconeIndex}`);
+    const baseMetadataService = new MetadataService(new DynamoDbProvider(awsRegion), dynamodbTableName);
+    // New parts go into the live index version, the one search reads.
+    const active = await new ActiveIndexService(baseMetadataService, pineconeNamespace, 0).resolve();
+    console.log(`- pinecone_namespace: ${active.namespace}`);
+    console.log(`- index_version: ${active.version ?? 'unversioned'}`);
+    const metadataService = baseMetadataService.withKeyPrefix(active.metadataPrefix);
+    partIndexer = new PartIndexer(
+      new EmbeddingService(new ClipXenovaProvider()),
+      metadataService,
+      new PineconeService(new PineconeProvider(pineconeApiKey), pineconeIndex, active.namespace),
+      { dedupe: options.dedupe, dedupeThreshold: options.dedupeThreshold, dryRun: options.dryRun }
+    );
+    partGraph = new PartGraphService(
+      s3,
+      metadataService,
+      options.bucket,
+      partGraphStateKey(options.prefix, active.version),
+      { k: options.similarK, dryRun: options.dryRun }
+    );
+  }
+  const centroids = new Map<string, number[]>();
+
+  const attributesManifest = await loadAttributesManifest(
+    options.attributesPath ?? path.join(options.inputDir, ATTRIBUTES_MANIFEST_FILE_NAME),
+    options.attributesPath !== undefined
+  );
+  console.log(`- attribute manifest entries: ${Object.keys(attributesManifest).length}`);
+
+  await ensureDirectory(path.dirname(options.checkpointPath));
+  const checkpoint = options.restart ? new Map<string, CheckpointEntry>() : await loadCheckpoint(options.checkpointPath);
+  const settings = checkpointSettings(options);
 
   await runWorkerPool(cadFiles, options.concurrency, async (cadFile) => {
     summary.cadFilesProcessed += 1;
@@ -358,17 +694,77 @@ async function run(): Promise<void> {
     const outputDir = path.join(options.outputDir, partId);
 
     try {
+      const stat = await fs.stat(cadFile);
+      if (isCheckpointCurrent(checkpoint.get(cadFile), stat, settings, options.index)) {
+        summary.resumed += 1;
+        console.log(`[RESUME] Skipping ${cadFile}; already completed in an earlier run.`);
+        return;
+      }
+
       console.log(`[RENDER] ${cadFile} -> ${outputDir}`);
-      await renderSnapshotsWithFreeCad(freecadCmd, cadFile, outputDir, options.size);
+      await renderSnapshotsWithFreeCad(freecadCmd, cadFile, outputDir, options.size, options.renderer);
       summary.snapshotsGenerated += VIEWS.length;
+      const attributes = resolvePartAttributes(options.inputDir, cadFile, partId, attributesManifest);
+      await fs.writeFile(path.join(outputDir, ATTRIBUTES_FILE_NAME), JSON.stringify(attributes, null, 2), 'utf8');
+
+      const snapshots = await readSnapshots(options.prefix, partId, outputDir);
+      const atlas =
+        options.atlasTileSize > 0
+          ? await writeLocalAtlas(options.prefix, partId, outputDir, snapshots, options.atlasTileSize)
+          : null;
+      // Embedding runs while the snapshots upload; metadata and vectors are written only after
+      // the upload succeeded so the index never points at missing objects.
+      const embedding = partIndexer ? partIndexer.embed(partId, snapshots) : null;
+      // Handled below; keeps a failed upload from also surfacing as an unhandled rejection.
+      embedding?.catch(() => undefined);
 
       if (options.dryRun) {
         console.log(`[DRY_RUN] Skipped upload for part_id=${partId}`);
-        return;
+      } else {
+        const uploaded = await uploadSnapshots(s3, options.bucket, snapshots);
+        summary.uploaded += uploaded;
+        if (await uploadSidecar(s3, options.bucket, options.prefix, partId, outputDir, DESCRIPTORS_FILE_NAME)) {
+          summary.descriptorsUploaded += 1;
+        }
+        await uploadSidecar(s3, options.bucket, options.prefix, partId, outputDir, ATTRIBUTES_FILE_NAME);
+        if (atlas) {
+          await s3.putObject({
+            bucket: options.bucket,
+            key: atlas.s3Key,
+            body: await fs.readFile(path.join(outputDir, ATLAS_IMAGE_FILE_NAME)),
+            contentType: 'image/jpeg'
+          });
+          console.log(`[UPLOAD] s3://${options.bucket}/${atlas.s3Key}`);
+          await uploadSidecar(s3, options.bucket, options.prefix, partId, outputDir, ATLAS_LAYOUT_FILE_NAME);
+          summary.atlasesUploaded += 1;
+        }
+      }
+
+      if (partIndexer && embedding) {
+        const result = await partIndexer.write(await embedding, {
+          shape: await readLocalDescriptors(outputDir),
+          attributes,
+          atlas: atlas ?? undefined
+        });
+        summary.viewsIndexed += result.views;
+        summary.vectorsStored += result.vectors;
+        centroids.set(partId, result.centroid);
+        console.log(
+          `[INDEXED] ${partId} views=${result.views} vectors=${result.vectors}${result.aliasSummary ? ` aliases: ${result.aliasSummary}` : ''}`
+        );
       }
 
-      const uploaded = await uploadSnapshots(s3, options.bucket, options.prefix, partId, outputDir);
-      summary.uploaded += uploaded;
+      if (!options.dryRun) {
+        await appendCheckpoint(options.checkpointPath, {
+          ...settings,
+          partId,
+          cadFile,
+          size: stat.size,
+          mtimeMs: stat.mtimeMs,
+          indexed: partIndexer !== null,
+          completedAt: new Date().toISOString()
+        });
+      }
     } catch (error) {
       summary.errors += 1;
       const message = error instanceof Error ? error.message : String(error);
@@ -376,10 +772,25 @@ async function run(): Promise<void> {
     }
   });
 
+  if (partGraph && centroids.size > 0) {
+    // Only this run's parts are known here, so nothing is removed; index_s3_snapshots.ts prunes.
+    const graph = await partGraph.refresh(centroids);
+    console.log(
+      `[SIMILAR] ${graph.fullRebuild ? 'Rebuilt' : 'Refreshed'} part graph: parts=${Object.keys(graph.state.parts).length} rows_scored=${graph.rowsScored} lists_written=${graph.changed.length}`
+    );
+  }
+
   console.log('[SUMMARY]');
   console.log(`- CAD files processed: ${summary.cadFilesProcessed}`);
   console.log(`- Snapshots generated: ${summary.snapshotsGenerated}`);
   console.log(`- Uploaded: ${summary.uploaded}`);
+  console.log(`- Shape descriptors uploaded: ${summary.descriptorsUploaded}`);
+  console.log(`- Atlases uploaded: ${summary.atlasesUploaded}`);
+  if (options.index) {
+    console.log(`- Views indexed: ${summary.viewsIndexed}`);
+    console.log(`- Vectors stored: ${summary.vectorsStored}`);
+  }
+  console.log(`- Resumed from checkpoint (skipped): ${summary.resumed}`);
   console.log(`- Errors: ${summary.errors}`);
 }
 
@@ -0,0 +1,38 @@
+# Names and per-phase timing helpers shared by the snapshot renderers and bench_renderers.py.
+# Standard library only, so this module loads under FreeCAD, FreeCADCmd and Blender alike.
+
+import contextlib
+import json
+import os
+import time
+
+
+# FreeCADCmd treats extra command-line arguments as files to open, so callers pass the headless
+# renderer's subcommand arguments as a JSON list in this variable instead.
+RENDER_ARGS_ENV = "SNAPSHOT_RENDER_ARGS"
+# Directory holding the renderer scripts, resolved from this module once it is importable.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Optional per-phase timings for bench_renderers.py; written only when the env var is set.
+TIMINGS_PATH_ENV = "SNAPSHOT_TIMINGS_PATH"
+_phase_timings = []
+
+
+def record_phase(name, seconds):
+    _phase_timings.append({"name": name, "seconds": seconds})
+
+
+@contextlib.contextmanager
+def timed_phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - started)
+
+
+def write_phase_timings():
+    timings_path = os.environ.get(TIMINGS_PATH_ENV)
+    if not timings_path:
+        return
+    with open(timings_path, "w", encoding="utf-8") as handle:
+        json.dump({"phases": _phase_timings}, handle)
@@ -0,0 +1,150 @@
+import fs from 'fs/promises';
+import { percentile } from '../utils/metrics';
+
+const TIMING_MARKER = '[REQUEST_TIMING]';
+
+type CliOptions = {
+  files: string[];
+  route?: string;
+  json: boolean;
+};
+
+type StageSummary = {
+  stage: string;
+  count: number;
+  p50Ms: number;
+  p90Ms: number;
+  p99Ms: number;
+  maxMs: number;
+};
+
+function parseArgs(argv: string[]): CliOptions {
+  const options: CliOptions = { files: [], json: false };
+
+  const nextValue = (index: number, flag: string): string => {
+    const value = argv[index + 1];
+    if (!value || value.startsWith('--')) {
+      throw new Error(`Missing value for ${flag}`);
+    }
+    return value;
+  };
+
+  for (let i = 0; i < argv.length; i += 1) {
+    const arg = argv[i];
+    switch (arg) {
+      case '--route':
+        options.route = nextValue(i, arg);
+        i += 1;
+        break;
+      case '--json':
+        options.json = true;
+        break;
+      default:
+        if (arg.startsWith('--')) {
+          throw new Error(`Unknown argument: ${arg}`);
+        }
+        options.files.push(arg);
+    }
+  }
+
+  if (options.files.length === 0) {
+    throw new Error('Usage: summarize_latency.ts <log_file> [more_files...] [--route search] [--json]');
+  }
+  return options;
+}
+
+// Accepts both text log lines and LOG_FORMAT=json lines; the timing payload is the same message text.
+function extractTimingMessage(line: string): string | null {
+  const trimmed = line.trim();
+  if (trimmed.startsWith('{')) {
+    try {
+      const parsed = JSON.parse(trimmed) as { message?: unknown };
+      return typeof parsed.message === 'string' && parsed.message.startsWith(TIMING_MARKER) ? parsed.message : null;
+    } catch {
+      return null;
+    }
+  }
+  const idx = trimmed.indexOf(TIMING_MARKER);
+  return idx >= 0 ? trimmed.slice(idx) : null;
+}
+
+function parseTimingMessage(message: string): { route: string; stages: Map<string, number> } {
+  const stages = new Map<string, number>();
+  let route = 'unknown';
+  for (const token of message.slice(TIMING_MARKER.length).trim().split(/\s+/)) {
+    const eqIdx = token.indexOf('=');
+    if (eqIdx <= 0) {
+      continue;
+    }
+    const key = token.slice(0, eqIdx);
+    const value = token.slice(eqIdx + 1);
+    if (key === 'route') {
+      route = value;
+      continue;
+    }
+    const durationMs = Number.parseFloat(value);
+    if (Number.isFinite(durationMs)) {
+      stages.set(key, durationMs);
+    }
+  }
+  return { route, stages };
+}
+
+async function run(): Promise<void> {
+  const options = parseArgs(process.argv.slice(2));
+  const samples = new Map<string, number[]>();
+  let requests = 0;
+
+  for (const file of options.files) {
+    const content = await fs.readFile(file, 'utf8');
+    for (const line of content.split(/\r?\n/)) {
+      const message = extractTimingMessage(line);
+      if (!message) {
+        continue;
+      }
+      const { route, stages } = parseTimingMessage(message);
+      if (options.route && route !== options.route) {
+        continue;
+      }
+      requests += 1;
+      for (const [stage, durationMs] of stages) {
+        const values = samples.get(stage) ?? [];
+        values.push(durationMs);
+        samples.set(stage, values);
+      }
+    }
+  }
+
+  const summaries: StageSummary[] = Array.from(samples, ([stage, values]) => {
+    const sorted = [...values].sort((a, b) => a - b);
+    return {
+      stage,
+      count: sorted.length,
+      p50Ms: percentile(sorted, 50),
+      p90Ms: percentile(sorted, 90),
+      p99Ms: percentile(sorted, 99),
+      maxMs: sorted[sorted.length - 1]
+    };
+  }).sort((a, b) => b.p50Ms - a.p50Ms);
+
+  if (options.json) {
+    console.log(JSON.stringify({ requests, route: options.route ?? 'all', stages: summaries }, null, 2));
+    return;
+  }
+
+  console.log(`[LATENCY SUMMARY] requests=${requests} route=${options.route ?? 'all'}`);
+  console.log(`${'stage'.padEnd(22)}${'count'.padStart(8)}${'p50_ms'.padStart(12)}${'p90_ms'.padStart(12)}${'p99_ms'.padStart(12)}${'max_ms'.padStart(12)}`);
+  for (const summary of summaries) {
+    console.log(
+      `${summary.stage.padEnd(22)}${String(summary.count).padStart(8)}${summary.p50Ms.toFixed(2).padStart(12)}${summary.p90Ms
+        .toFixed(2)
+        .padStart(12)}${summary.p99Ms.toFixed(2).padStart(12)}${summary.maxMs.toFixed(2).padStart(12)}`
+    );
+  }
+}
+
+run().catch((error) => {
+  const message = error instanceof Error ? error.message : String(error);
+  console.error(`[FATAL] ${message}`);
+  process.exit(1);
+});
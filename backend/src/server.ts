@@ -0,0 +1,306 @@
+import cluster from 'cluster';
+import type { Worker } from 'cluster';
+import http from 'http';
+import os from 'os';
+import type { APIGatewayProxyHandlerV2 } from 'aws-lambda';
+import { env } from './config/env';
+import { logger } from './utils/logger';
+import { jsonResponse } from './utils/http';
+import { invokeHandler, matchRouteKey, readRequestBody, sendHandlerResult, toApiGatewayEvent } from './utils/lambdaAdapter';
+import { handler as healthHandler } from './handlers/health';
+import { createAwsSearchDependencies, createSearchHandler } from './handlers/search';
+import type { SearchDependencies } from './handlers/search';
+import { createAwsCandidateService, createCandidatesHandler } from './handlers/candidates';
+import { createAwsSimilarDependencies, createSimilarPartsHandler } from './handlers/similar';
+import type { SimilarPartsDependencies } from './handlers/similar';
+import { ClipXenovaProvider } from './providers/embedding/clipXenovaProvider';
+import type { CandidateService } from './services/candidateService';
+
+// Same per-route limits as the Lambda functions in serverless.yml; enforced by invokeHandler.
+const ROUTE_TIMEOUTS_MS = {
+  health: 10_000,
+  search: 30_000,
+  candidates: 10_000,
+  similar: 10_000
+};
+// Behind a load balancer, keep-alive must outlive the balancer's idle timeout (commonly 60 s).
+const KEEP_ALIVE_TIMEOUT_MS = 65_000;
+const MAX_RESTART_DELAY_MS = 30_000;
+const CRASH_WINDOW_MS = 60_000;
+const CORS_HEADERS: Record<string, string> = {
+  'access-control-allow-origin': '*',
+  'access-control-allow-methods': 'GET,POST,OPTIONS',
+  'access-control-allow-headers': 'content-type,authorization,x-request-id',
+  'access-control-expose-headers': 'server-timing,retry-after,x-request-id'
+};
+
+type WorkerMessage = { type: 'ready' };
+
+type Route = {
+  handler: APIGatewayProxyHandlerV2;
+  timeoutMs: number;
+};
+
+function memoize<T>(create: () => T): () => T {
+  let value: T | undefined;
+  return () => {
+    if (value === undefined) {
+      value = create();
+    }
+    return value;
+  };
+}
+
+function workerCount(): number {
+  return env.serverWorkers > 0 ? env.serverWorkers : os.availableParallelism?.() ?? os.cpus().length;
+}
+
+// --- Primary: forks one worker per core, replaces crashed workers, rolls restarts on SIGHUP. ---
+
+function runPrimary(): void {
+  const count = workerCount();
+  let shuttingDown = false;
+  let restarting = false;
+  const recentCrashes: number[] = [];
+
+  logger.info(`[SERVER] primary pid=${process.pid} workers=${count} port=${env.serverPort}`);
+
+  const waitForReady = (worker: Worker): Promise<void> =>
+    new Promise<void>((resolve, reject) => {
+      const onMessage = (message: WorkerMessage) => {
+        if (message?.type === 'ready') {
+          cleanup();
+          resolve();
+        }
+      };
+      const onExit = () => {
+        cleanup();
+        reject(new Error(`Worker ${worker.process.pid} exited before becoming ready`));
+      };
+      const cleanup = () => {
+        worker.off('message', onMessage);
+        worker.off('exit', onExit);
+      };
+      worker.on('message', onMessage);
+      worker.on('exit', onExit);
+    });
+
+  const stopWorker = (worker: Worker): Promise<void> =>
+    new Promise<void>((resolve) => {
+      if (worker.isDead()) {
+        resolve();
+        return;
+      }
+      const killTimer = setTimeout(() => worker.kill('SIGKILL'), env.serverShutdownTimeoutMs);
+      worker.once('exit', () => {
+        clearTimeout(killTimer);
+        resolve();
+      });
+      // disconnect() lets the worker finish in-flight requests before it exits.
+      worker.disconnect();
+    });
+
+  cluster.on('exit', (worker, code, signal) => {
+    if (shuttingDown || worker.exitedAfterDisconnect) {
+      return;
+    }
+    const now = Date.now();
+    recentCrashes.push(now);
+    while (recentCrashes.length > 0 && now - recentCrashes[0] > CRASH_WINDOW_MS) {
+      recentCrashes.shift();
+    }
+    // Back off when workers keep dying (bad config, model download failing) instead of fork-looping.
+    const delayMs = Math.min(MAX_RESTART_DELAY_MS, 500 * 2 ** Math.max(0, recentCrashes.length - 1));
+    logger.error(`[SERVER] worker pid=${worker.process.pid} died code=${code} signal=${signal ?? 'none'} restart_in_ms=${delayMs}`);
+    setTimeout(() => {
+      if (!shuttingDown) {
+        cluster.fork();
+      }
+    }, delayMs);
+  });
+
+  const rollingRestart = async () => {
+    if (restarting || shuttingDown) {
+      return;
+    }
+    restarting = true;
+    const current = Object.values(cluster.workers ?? {}).filter((worker): worker is Worker => worker !== undefined);
+    logger.info(`[SERVER] rolling restart of ${current.length} worker(s)`);
+    try {
+      // One worker at a time: the replacement is warm and listening before the old one drains.
+      for (const worker of current) {
+        const replacement = cluster.fork();
+        await waitForReady(replacement);
+        await stopWorker(worker);
+        logger.info(`[SERVER] replaced worker pid=${worker.process.pid} with pid=${replacement.process.pid}`);
+      }
+      logger.info('[SERVER] rolling restart complete');
+    } catch (error) {
+      const message = error instanceof Error ? error.message : String(error);
+      logger.error(`[SERVER] rolling restart aborted: ${message}`);
+    } finally {
+      restarting = false;
+      logger.flush();
+    }
+  };
+
+  const shutdown = async (signal: string) => {
+    if (shuttingDown) {
+      return;
+    }
+    shuttingDown = true;
+    logger.info(`[SERVER] ${signal} received, draining ${Object.keys(cluster.workers ?? {}).length} worker(s)`);
+    logger.flush();
+    await Promise.all(
+      Object.values(cluster.workers ?? {})
+        .filter((worker): worker is Worker => worker !== undefined)
+        .map(stopWorker)
+    );
+    logger.info('[SERVER] all workers stopped');
+    logger.flush();
+    process.exit(0);
+  };
+
+  process.on('SIGHUP', () => void rollingRestart());
+  process.on('SIGTERM', () => void shutdown('SIGTERM'));
+  process.on('SIGINT', () => void shutdown('SIGINT'));
+
+  for (let i = 0; i < count; i += 1) {
+    cluster.fork();
+  }
+}
+
+// --- Worker: warm model and clients, then serve the Lambda handlers over HTTP. ---
+
+async function runWorker(): Promise<void> {
+  let ready = false;
+  let draining = false;
+
+  // Dependencies (and their SDK clients' connection pools) live for the life of the worker.
+  // Each worker serves concurrent searches, so embedding micro-batching is on unless configured off.
+  const getSearchDependencies = memoize<SearchDependencies>(() =>
+    createAwsSearchDependencies(env.serverEmbeddingBatchMaxSize)
+  );
+  const getCandidateService = memoize<CandidateService>(createAwsCandidateService);
+  const getSimilarDependencies = memoize<SimilarPartsDependencies>(createAwsSimilarDependencies);
+  const routes: Record<string, Route> = {
+    'GET /health': { handler: healthHandler, timeoutMs: ROUTE_TIMEOUTS_MS.health },
+    'POST /search': { handler: createSearchHandler(getSearchDependencies), timeoutMs: ROUTE_TIMEOUTS_MS.search },
+    'GET /search/candidates': {
+      handler: createCandidatesHandler(getCandidateService),
+      timeoutMs: ROUTE_TIMEOUTS_MS.candidates
+    },
+    'GET /parts/{partId}/similar': {
+      handler: createSimilarPartsHandler(getSimilarDependencies),
+      timeoutMs: ROUTE_TIMEOUTS_MS.similar
+    }
+  };
+  const routeKeys = Object.keys(routes);
+
+  const server = http.createServer(async (req, res) => {
+    const method = (req.method ?? 'GET').toUpperCase();
+    // Ask keep-alive clients to reconnect elsewhere while this worker drains.
+    const headers = draining ? { ...CORS_HEADERS, connection: 'close' } : CORS_HEADERS;
+    let path: string;
+    try {
+      path = new URL(req.url ?? '/', 'http://localhost').pathname.replace(/\/+$/, '') || '/';
+    } catch {
+      // A malformed request target must not become an unhandled rejection that kills the worker.
+      sendHandlerResult(res, jsonResponse(400, { error: 'Invalid request URL', error_code: 'BAD_REQUEST' }), headers);
+      return;
+    }
+
+    if (method === 'OPTIONS') {
+      res.writeHead(204, headers);
+      res.end();
+      return;
+    }
+    if (method === 'GET' && path === '/ready') {
+      const isReady = ready && !draining;
+      sendHandlerResult(res, jsonResponse(isReady ? 200 : 503, { ready: isReady, draining, pid: process.pid }), headers);
+      return;
+    }
+
+    const match = matchRouteKey(routeKeys, method, path);
+    if (!match) {
+      sendHandlerResult(res, jsonResponse(404, { error: 'Not found', error_code: 'NOT_FOUND' }), headers);
+      return;
+    }
+    const { routeKey, pathParameters } = match;
+    const route = routes[routeKey];
+
+    try {
+      const body = await readRequestBody(req);
+      const event = toApiGatewayEvent(req, body, routeKey, pathParameters);
+      sendHandlerResult(res, await invokeHandler(route.handler, event, route.timeoutMs), headers);
+    } catch (error) {
+      const message = error instanceof Error ? error.message : String(error);
+      logger.error(`[SERVER] route=${routeKey} failed: ${message}`);
+      if (res.headersSent) {
+        return;
+      }
+      if (message.includes('Request body exceeds')) {
+        // The rest of the body is drained, not read; close the connection after answering.
+        sendHandlerResult(res, jsonResponse(413, { error: message, error_code: 'FILE_TOO_LARGE' }), {
+          ...headers,
+          connection: 'close'
+        });
+      } else if (message.includes('Handler timed out')) {
+        sendHandlerResult(res, jsonResponse(504, { error: message, error_code: 'GATEWAY_TIMEOUT' }), headers);
+      } else {
+        sendHandlerResult(
+          res,
+          jsonResponse(500, { error: 'Internal server error', error_code: 'INTERNAL_ERROR' }),
+          headers
+        );
+      }
+    }
+  });
+  server.keepAliveTimeout = KEEP_ALIVE_TIMEOUT_MS;
+  server.headersTimeout = KEEP_ALIVE_TIMEOUT_MS + 1_000;
+
+  const drain = () => {
+    if (draining) {
+      return;
+    }
+    draining = true;
+    logger.info(`[SERVER] worker pid=${process.pid} draining`);
+    logger.flush();
+    server.close(() => process.exit(0));
+    server.closeIdleConnections();
+    setTimeout(() => {
+      logger.error(`[SERVER] worker pid=${process.pid} shutdown timed out, exiting`);
+      logger.flush();
+      process.exit(1);
+    }, env.serverShutdownTimeoutMs).unref();
+  };
+  process.on('disconnect', drain);
+  process.on('SIGTERM', drain);
+  // Ctrl+C reaches every process in the group; let the primary coordinate the drain.
+  process.on('SIGINT', () => undefined);
+
+  // Fail fast on missing configuration and load CLIP before taking traffic.
+  const warmStartedAt = Date.now();
+  getSearchDependencies();
+  getCandidateService();
+  getSimilarDependencies();
+  await new ClipXenovaProvider().warmup();
+
+  server.listen(env.serverPort, () => {
+    ready = true;
+    logger.info(`[SERVER] worker pid=${process.pid} ready warmup_ms=${Date.now() - warmStartedAt}`);
+    logger.flush();
+    process.send?.({ type: 'ready' } satisfies WorkerMessage);
+  });
+}
+
+if (cluster.isPrimary) {
+  runPrimary();
+} else {
+  runWorker().catch((error) => {
+    const message = error instanceof Error ? error.message : String(error);
+    logger.error(`[SERVER] worker pid=${process.pid} failed to start: ${message}`);
+    logger.flush();
+    process.exit(1);
+  });
+}
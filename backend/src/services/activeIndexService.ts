@@ -0,0 +1,165 @@
+import { env } from '../config/env';
+import type { ActiveIndexRecord } from '../types/metadata';
+import { UNVERSIONED_INDEX_VERSION, metadataKeyPrefix } from '../utils/indexVersion';
+import { MetadataService } from './metadataService';
+
+/** What one request reads: a Pinecone namespace and the matching metadata key prefix. */
+export type ActiveIndex = {
+  /** null while the unversioned index is served (before the first switch or after rolling back to it). */
+  version: string | null;
+  namespace: string;
+  metadataPrefix: string;
+};
+
+export type IndexActivation = {
+  version: string;
+  namespace: string;
+  vectors: number;
+  parts: number;
+};
+
+/**
+ * Reads and switches the active-index pointer written by the indexer. Handlers resolve it once
+ * per request from a short-lived cache, so a switch reaches every warm instance within the TTL
+ * without adding a metadata read to each request.
+ */
+export class ActiveIndexService {
+  private metadataService: MetadataService;
+  private defaultNamespace: string;
+  private ttlMs: number;
+  private cached: { index: ActiveIndex; expiresAt: number } | null = null;
+  private refreshing: Promise<ActiveIndex> | null = null;
+
+  constructor(metadataService: MetadataService, defaultNamespace: string, ttlMs: number) {
+    this.metadataService = metadataService;
+    this.defaultNamespace = defaultNamespace;
+    this.ttlMs = ttlMs;
+  }
+
+  async resolve(): Promise<ActiveIndex> {
+    const cached = this.cached;
+    if (cached && Date.now() < cached.expiresAt) {
+      return cached.index;
+    }
+    // One refresh at a time; concurrent requests wait for it instead of each reading the pointer.
+    if (!this.refreshing) {
+      this.refreshing = this.read()
+        .then((record) => {
+          const index = this.toActiveIndex(record);
+          this.cached = { index, expiresAt: Date.now() + this.ttlMs };
+          return index;
+        })
+        .finally(() => {
+          this.refreshing = null;
+        });
+    }
+    if (!cached) {
+      return this.refreshing;
+    }
+    // A pointer that cannot be re-read is still the best answer; keep serving it until it can.
+    return this.refreshing.catch(() => cached.index);
+  }
+
+  /** The stored pointer, bypassing the cache. */
+  async read(): Promise<ActiveIndexRecord | null> {
+    return this.metadataService.getActiveIndex();
+  }
+
+  /**
+   * Points the index at `next` unless another build switched it since `current` was read. The
+   * version being replaced is retired (kept for rollback until garbage-collected); activating a
+   * retired or staged version takes it off that list. Without a pointer yet, the unversioned index
+   * (`unversioned` counts its vectors and parts) is what gets retired.
+   */
+  async activate(
+    next: IndexActivation,
+    current: ActiveIndexRecord | null,
+    unversioned: { vectors: number; parts: number } = { vectors: 0, parts: 0 },
+    now: Date = new Date()
+  ): Promise<ActiveIndexRecord> {
+    const outgoing = current ?? this.unversionedRecord(unversioned, now);
+    const retired = outgoing.retired.filter((entry) => entry.version !== next.version);
+    if (outgoing.version !== next.version) {
+      retired.push({
+        version: outgoing.version,
+        namespace: outgoing.namespace,
+        vectors: outgoing.vectors,
+        parts: outgoing.parts,
+        retiredAt: now.toISOString()
+      });
+    }
+    const staged = outgoing.staged.filter((entry) => entry.version !== next.version);
+    const record: ActiveIndexRecord = { ...next, activatedAt: now.toISOString(), retired, staged };
+    await this.metadataService.putActiveIndex(record, current?.version ?? null);
+    this.cached = { index: this.toActiveIndex(record), expiresAt: Date.now() + this.ttlMs };
+    return record;
+  }
+
+  /**
+   * Records a validated build that was not switched to (`--no_switch`), so it can be activated
+   * later and is garbage-collected if it never is. Search keeps reading the current version.
+   */
+  async stage(
+    next: IndexActivation,
+    current: ActiveIndexRecord | null,
+    unversioned: { vectors: number; parts: number } = { vectors: 0, parts: 0 },
+    now: Date = new Date()
+  ): Promise<ActiveIndexRecord> {
+    const base = current ?? this.unversionedRecord(unversioned, now);
+    const record: ActiveIndexRecord = {
+      ...base,
+      staged: [...base.staged.filter((entry) => entry.version !== next.version), { ...next, stagedAt: now.toISOString() }]
+    };
+    await this.metadataService.putActiveIndex(record, current?.version ?? null);
+    return record;
+  }
+
+  /** Forgets retired or staged versions whose vectors and metadata have been deleted. */
+  async dropVersions(versions: string[], current: ActiveIndexRecord): Promise<ActiveIndexRecord> {
+    const dropped = new Set(versions);
+    const record: ActiveIndexRecord = {
+      ...current,
+      retired: current.retired.filter((entry) => !dropped.has(entry.version)),
+      staged: current.staged.filter((entry) => !dropped.has(entry.version))
+    };
+    await this.metadataService.putActiveIndex(record, current.version);
+    return record;
+  }
+
+  private unversionedRecord(counts: { vectors: number; parts: number }, now: Date): ActiveIndexRecord {
+    return {
+      version: UNVERSIONED_INDEX_VERSION,
+      namespace: this.defaultNamespace,
+      activatedAt: now.toISOString(),
+      vectors: counts.vectors,
+      parts: counts.parts,
+      retired: [],
+      staged: []
+    };
+  }
+
+  private toActiveIndex(record: ActiveIndexRecord | null): ActiveIndex {
+    if (!record) {
+      return { version: null, namespace: this.defaultNamespace, metadataPrefix: '' };
+    }
+    // A rollback to the unversioned index reads it exactly as before the first switch.
+    const version = record.version === UNVERSIONED_INDEX_VERSION ? null : record.version;
+    return { version, namespace: record.namespace, metadataPrefix: metadataKeyPrefix(version) };
+  }
+}
+
+// Shared across invocations of a warm instance so the pointer cache outlives one request.
+const sharedActiveIndexServices = new Map<string, ActiveIndexService>();
+
+export function getSharedActiveIndexService(
+  tableName: string,
+  metadataService: MetadataService,
+  defaultNamespace: string
+): ActiveIndexService {
+  let service = sharedActiveIndexServices.get(tableName);
+  if (!service) {
+    service = new ActiveIndexService(metadataService, defaultNamespace, env.activeIndexTtlMs);
+    sharedActiveIndexServices.set(tableName, service);
+  }
+  return service;
+}
@@ -0,0 +1,161 @@
+import { performance } from 'perf_hooks';
+
+export type AdmissionControllerOptions = {
+  /** Searches allowed to run at once; the rest wait in the queue. */
+  maxInFlight: number;
+  /** Waiting searches beyond this are rejected immediately (429). */
+  maxQueue: number;
+  /** Budget from arrival to response; queued searches that can no longer finish in time are shed (503). */
+  deadlineMs: number;
+};
+
+export type AdmissionStats = {
+  inFlight: number;
+  queueDepth: number;
+  admitted: number;
+  queued: number;
+  rejectedQueueFull: number;
+  shedDeadline: number;
+  serviceMsEwma: number;
+};
+
+export type AdmissionTicket = {
+  release: () => void;
+};
+
+type QueuedSearch = {
+  deadlineAt: number;
+  resolve: (ticket: AdmissionTicket) => void;
+  reject: (error: unknown) => void;
+  timer: NodeJS.Timeout | null;
+};
+
+// Weight of the newest sample in the service-time moving average.
+const SERVICE_TIME_EWMA_ALPHA = 0.2;
+
+/**
+ * Bounds concurrent searches in a long-running process and sheds load it cannot serve in time.
+ *
+ * Up to `maxInFlight` searches run at once and up to `maxQueue` more wait in FIFO order. A search is
+ * rejected with "queue full" when the queue is at capacity. It is shed with "deadline" when the
+ * moving average of recent service times says it would not finish within `deadlineMs` of arriving.
+ * Both checks run on arrival and again before a queued search starts. Shedding early keeps the admitted
+ * searches inside the SLO instead of letting every request slow down until the gateway times out.
+ */
+export class AdmissionController {
+  private options: AdmissionControllerOptions;
+  private queue: QueuedSearch[] = [];
+  private inFlight = 0;
+  private serviceMsEwma = 0;
+  private stats = { admitted: 0, queued: 0, rejectedQueueFull: 0, shedDeadline: 0 };
+
+  constructor(options: AdmissionControllerOptions) {
+    this.options = {
+      maxInFlight: Math.max(1, options.maxInFlight),
+      maxQueue: Math.max(0, options.maxQueue),
+      deadlineMs: Math.max(0, options.deadlineMs)
+    };
+  }
+
+  /** Resolves once the search may start; rejects with an "Admission rejected: ..." error otherwise. */
+  acquire(): Promise<AdmissionTicket> {
+    const now = performance.now();
+    const deadlineAt = now + this.options.deadlineMs;
+
+    if (this.inFlight < this.options.maxInFlight && this.queue.length === 0) {
+      return Promise.resolve(this.admit());
+    }
+    if (this.queue.length >= this.options.maxQueue) {
+      this.stats.rejectedQueueFull += 1;
+      return Promise.reject(new Error('Admission rejected: queue full'));
+    }
+    if (!this.canFinishInTime(this.queue.length, now, deadlineAt)) {
+      this.stats.shedDeadline += 1;
+      return Promise.reject(new Error('Admission rejected: deadline cannot be met'));
+    }
+
+    return new Promise<AdmissionTicket>((resolve, reject) => {
+      const entry: QueuedSearch = { deadlineAt, resolve, reject, timer: null };
+      if (this.serviceMsEwma > 0) {
+        // Leave the queue as soon as the remaining budget is smaller than a typical search.
+        const shedInMs = Math.max(0, deadlineAt - this.serviceMsEwma - now);
+        entry.timer = setTimeout(() => this.shed(entry), shedInMs);
+        entry.timer.unref();
+      }
+      this.queue.push(entry);
+      this.stats.queued += 1;
+    });
+  }
+
+  /** Seconds a rejected client should wait: roughly the time to drain the current queue. */
+  retryAfterSeconds(): number {
+    const drainMs = ((this.queue.length + this.inFlight) / this.options.maxInFlight) * this.serviceMsEwma;
+    return Math.max(1, Math.ceil(drainMs / 1000));
+  }
+
+  getStats(): AdmissionStats {
+    return {
+      ...this.stats,
+      inFlight: this.inFlight,
+      queueDepth: this.queue.length,
+      serviceMsEwma: Math.round(this.serviceMsEwma)
+    };
+  }
+
+  private canFinishInTime(position: number, now: number, deadlineAt: number): boolean {
+    if (this.serviceMsEwma === 0) {
+      return true;
+    }
+    // Searches ahead of this one drain `maxInFlight` at a time, then it needs one service time itself.
+    const expectedStartMs = Math.floor(position / this.options.maxInFlight + 1) * this.serviceMsEwma;
+    return now + expectedStartMs + this.serviceMsEwma <= deadlineAt;
+  }
+
+  private admit(): AdmissionTicket {
+    this.inFlight += 1;
+    this.stats.admitted += 1;
+    const admittedAt = performance.now();
+    let released = false;
+    return {
+      release: () => {
+        if (released) {
+          return;
+        }
+        released = true;
+        this.inFlight -= 1;
+        const serviceMs = performance.now() - admittedAt;
+        this.serviceMsEwma =
+          this.serviceMsEwma === 0 ? serviceMs : this.serviceMsEwma + SERVICE_TIME_EWMA_ALPHA * (serviceMs - this.serviceMsEwma);
+        this.drain();
+      }
+    };
+  }
+
+  private shed(entry: QueuedSearch): void {
+    const index = this.queue.indexOf(entry);
+    if (index === -1) {
+      return;
+    }
+    this.queue.splice(index, 1);
+    if (entry.timer) {
+      clearTimeout(entry.timer);
+    }
+    this.stats.shedDeadline += 1;
+    entry.reject(new Error('Admission rejected: deadline cannot be met'));
+  }
+
+  private drain(): void {
+    while (this.inFlight < this.options.maxInFlight && this.queue.length > 0) {
+      const entry = this.queue[0];
+      if (performance.now() + this.serviceMsEwma > entry.deadlineAt) {
+        this.shed(entry);
+        continue;
+      }
+      this.queue.shift();
+      if (entry.timer) {
+        clearTimeout(entry.timer);
+      }
+      entry.resolve(this.admit());
+    }
+  }
+}
@@ -0,0 +1,123 @@
+import type { AtlasPlacement, ReferenceMetadata } from '../types/metadata';
+import type { CandidateView, ModelCandidate, PendingCandidate } from '../types/search';
+import { MetadataService } from './metadataService';
+import { StorageService } from './storageService';
+
+export const VIEW_SUFFIXES = ['top', 'bottom', 'left', 'right', 'front', 'back', 'isometric'] as const;
+
+const MAX_FALLBACK_VIEWS = 7;
+
+type ResolvedView = {
+  view: CandidateView;
+  atlas?: AtlasPlacement;
+};
+
+export function splitReferenceId(id: string): { partId: string; view: string } | null {
+  for (const view of VIEW_SUFFIXES) {
+    const suffix = `-${view}`;
+    if (id.endsWith(suffix) && id.length > suffix.length) {
+      return { partId: id.slice(0, -suffix.length), view };
+    }
+  }
+  return null;
+}
+
+export class CandidateService {
+  private metadataService: MetadataService;
+  private storageService: StorageService;
+
+  constructor(metadataService: MetadataService, storageService: StorageService) {
+    this.metadataService = metadataService;
+    this.storageService = storageService;
+  }
+
+  /** Hydrates from one index version's metadata items (see MetadataService.withKeyPrefix). */
+  withMetadataPrefix(keyPrefix: string): CandidateService {
+    const metadataService = this.metadataService.withKeyPrefix(keyPrefix);
+    return metadataService === this.metadataService ? this : new CandidateService(metadataService, this.storageService);
+  }
+
+  async hydrate(candidate: PendingCandidate): Promise<ModelCandidate & { source: 'canonical' | 'fallback' }> {
+    const scoreById = new Map(candidate.matches.map((match) => [match.id, match.score]));
+
+    const canonicalViews = await this.resolveViews(
+      VIEW_SUFFIXES.map((view) => ({ id: `${candidate.partId}-${view}` })),
+      // Views deduplicated at index time have no vector of their own; they share their representative's score.
+      (id, metadata) =>
+        scoreById.get(id) ??
+        (metadata.representativeId ? scoreById.get(metadata.representativeId) : undefined) ??
+        candidate.aggregateScore
+    );
+    if (canonicalViews.length > 0) {
+      return { ...(await this.toModelCandidate(candidate, canonicalViews)), source: 'canonical' };
+    }
+
+    const fallbackViews = await this.resolveViews(
+      [...candidate.matches].sort((a, b) => b.score - a.score).slice(0, MAX_FALLBACK_VIEWS),
+      (id) => scoreById.get(id) ?? candidate.aggregateScore
+    );
+    return { ...(await this.toModelCandidate(candidate, fallbackViews)), source: 'fallback' };
+  }
+
+  private async toModelCandidate(candidate: PendingCandidate, resolved: ResolvedView[]): Promise<ModelCandidate> {
+    // Views share one sprite sheet when the part was ingested with one; tiles from a stale sheet
+    // (a view re-rendered without it) are dropped so the client falls back to the full image.
+    const atlas = resolved.find((item) => item.atlas)?.atlas;
+    const views = resolved.map(({ view, atlas: placement }) =>
+      atlas && placement?.s3Key === atlas.s3Key ? { ...view, tile: placement.tile } : view
+    );
+    return {
+      partId: candidate.partId,
+      model: candidate.model,
+      aggregateScore: candidate.aggregateScore,
+      views,
+      ...(atlas
+        ? {
+            atlas: {
+              signedUrl: await this.storageService.getSignedReferenceUrl(atlas.s3Key),
+              width: atlas.width,
+              height: atlas.height
+            }
+          }
+        : {})
+    };
+  }
+
+  private async resolveViews(
+    entries: Array<{ id: string }>,
+    scoreFor: (id: string, metadata: ReferenceMetadata) => number
+  ): Promise<ResolvedView[]> {
+    // Metadata reads and presigns are independent per view, so resolve them concurrently.
+    // A failed read drops that view only; the candidate fails when every read failed.
+    const errors: unknown[] = [];
+    const resolved = await Promise.all(
+      entries.map(async (entry): Promise<ResolvedView | null> => {
+        const metadata = await this.metadataService.getReferenceMetadata(entry.id).catch((error: unknown) => {
+          errors.push(error);
+          return null;
+        });
+        if (!metadata) {
+          return null;
+        }
+        // Still signed so the full-resolution view opens on click without another round trip;
+        // presigning is a local HMAC, the browser only fetches it when asked to.
+        const signedImageUrl = await this.storageService.getSignedReferenceUrl(metadata.s3Key);
+        return {
+          view: {
+            id: entry.id,
+            score: scoreFor(entry.id, metadata),
+            model: metadata.model,
+            view: metadata.view,
+            label: metadata.label,
+            signedImageUrl
+          },
+          atlas: metadata.atlas
+        };
+      })
+    );
+    if (entries.length > 0 && errors.length === entries.length) {
+      throw errors[0];
+    }
+    return resolved.filter((item): item is ResolvedView => item !== null);
+  }
+}
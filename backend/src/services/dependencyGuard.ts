@@ -0,0 +1,270 @@
+import { performance } from 'perf_hooks';
+import { env } from '../config/env';
+import { remainingBudgetMs } from '../utils/deadline';
+import { percentile, registerGauge } from '../utils/metrics';
+
+export type DependencyGuardOptions = {
+  /** Upper bound per call; the remaining request budget shortens it further. */
+  timeoutMs: number;
+  /** Floor for the hedge delay; 0 disables hedging. */
+  hedgeMinDelayMs: number;
+  /** Extra requests allowed as a fraction of calls, so hedging cannot double the load on a slow dependency. */
+  hedgeMaxRatio: number;
+  /** Consecutive failures that open the circuit; 0 disables the breaker. */
+  failureThreshold: number;
+  /** How long an open circuit fails fast before letting one probe call through. */
+  openMs: number;
+};
+
+export type DependencyGuardStats = {
+  /** 0 = closed, 1 = half-open, 2 = open. */
+  state: number;
+  calls: number;
+  failures: number;
+  timeouts: number;
+  shortCircuited: number;
+  hedged: number;
+  hedgeWins: number;
+  hedgeDelayMs: number;
+};
+
+type CircuitState = 'closed' | 'half_open' | 'open';
+
+// Successful attempt latencies kept for the hedge-delay percentile.
+const LATENCY_WINDOW = 256;
+// Hedging starts once the window says something about the latency distribution.
+const MIN_HEDGE_SAMPLES = 20;
+const HEDGE_PERCENTILE = 95;
+// Unused hedge allowance carried between quiet and busy periods.
+const MAX_HEDGE_TOKENS = 10;
+const STATE_CODES: Record<CircuitState, number> = { closed: 0, half_open: 1, open: 2 };
+
+/** Errors raised by the guard itself rather than by the dependency. */
+export function isDependencyUnavailable(message: string): boolean {
+  return message.includes('circuit open') || message.includes('timed out after') || message.includes('deadline exceeded');
+}
+
+/**
+ * Wraps calls to one downstream dependency (Pinecone, DynamoDB) with three protections:
+ *
+ * - a per-call timeout, the smaller of `timeoutMs` and what is left of the request deadline;
+ * - for idempotent reads, a hedged duplicate sent when the first attempt is slower than the recent
+ *   p95, with the first response winning and the loser aborted;
+ * - a circuit breaker that opens after `failureThreshold` consecutive failures and then fails fast
+ *   for `openMs`, so callers can degrade instead of queueing behind a sick dependency.
+ *
+ * Errors are plain `Error`s whose messages start with the dependency name; see `isDependencyUnavailable`.
+ */
+export class DependencyGuard {
+  private name: string;
+  private options: DependencyGuardOptions;
+  private state: CircuitState = 'closed';
+  private consecutiveFailures = 0;
+  private openedAt = 0;
+  private probeInFlight = false;
+  private latencies: number[] = [];
+  private latencyCursor = 0;
+  private hedgeTokens = MAX_HEDGE_TOKENS;
+  private stats = { calls: 0, failures: 0, timeouts: 0, shortCircuited: 0, hedged: 0, hedgeWins: 0 };
+
+  constructor(name: string, options: DependencyGuardOptions) {
+    this.name = name;
+    this.options = {
+      timeoutMs: Math.max(1, options.timeoutMs),
+      hedgeMinDelayMs: Math.max(0, options.hedgeMinDelayMs),
+      hedgeMaxRatio: Math.max(0, options.hedgeMaxRatio),
+      failureThreshold: Math.max(0, options.failureThreshold),
+      openMs: Math.max(0, options.openMs)
+    };
+  }
+
+  /**
+   * Runs `operation`, passing an AbortSignal that fires when the attempt is no longer needed
+   * (timed out, or beaten by its hedge). Only pass `hedge: true` for idempotent reads.
+   */
+  async call<T>(operation: (signal: AbortSignal) => Promise<T>, options: { hedge?: boolean } = {}): Promise<T> {
+    const budgetMs = remainingBudgetMs();
+    const timeoutMs = Math.floor(Math.min(this.options.timeoutMs, budgetMs ?? Number.POSITIVE_INFINITY));
+    if (timeoutMs <= 0) {
+      // The request ran out of time on its own; that says nothing about the dependency's health.
+      throw new Error(`${this.name} deadline exceeded before the call started`);
+    }
+    if (!this.allowCall()) {
+      this.stats.shortCircuited += 1;
+      throw new Error(`${this.name} circuit open`);
+    }
+
+    this.stats.calls += 1;
+    this.hedgeTokens = Math.min(MAX_HEDGE_TOKENS, this.hedgeTokens + this.options.hedgeMaxRatio);
+    try {
+      const result = await this.race(operation, timeoutMs, options.hedge === true);
+      this.onSuccess();
+      return result;
+    } catch (error) {
+      this.onFailure();
+      throw error;
+    }
+  }
+
+  /** Seconds until an open circuit lets a probe through; used for Retry-After. */
+  retryAfterSeconds(): number {
+    if (this.state !== 'open') {
+      return 1;
+    }
+    return Math.max(1, Math.ceil((this.openedAt + this.options.openMs - performance.now()) / 1000));
+  }
+
+  getStats(): DependencyGuardStats {
+    return {
+      state: STATE_CODES[this.state],
+      ...this.stats,
+      hedgeDelayMs: Math.round(this.hedgeDelayMs() ?? 0)
+    };
+  }
+
+  private allowCall(): boolean {
+    if (this.options.failureThreshold === 0 || this.state === 'closed') {
+      return true;
+    }
+    if (this.state === 'open') {
+      if (performance.now() - this.openedAt < this.options.openMs) {
+        return false;
+      }
+      this.state = 'half_open';
+    }
+    // Half-open: a single probe decides whether the circuit closes again.
+    if (this.probeInFlight) {
+      return false;
+    }
+    this.probeInFlight = true;
+    return true;
+  }
+
+  private onSuccess(): void {
+    this.consecutiveFailures = 0;
+    this.probeInFlight = false;
+    this.state = 'closed';
+  }
+
+  private onFailure(): void {
+    this.stats.failures += 1;
+    this.consecutiveFailures += 1;
+    this.probeInFlight = false;
+    const threshold = this.options.failureThreshold;
+    if (threshold > 0 && (this.state === 'half_open' || this.consecutiveFailures >= threshold)) {
+      this.state = 'open';
+      this.openedAt = performance.now();
+    }
+  }
+
+  private hedgeDelayMs(): number | null {
+    if (this.options.hedgeMinDelayMs === 0 || this.latencies.length < MIN_HEDGE_SAMPLES) {
+      return null;
+    }
+    const sorted = [...this.latencies].sort((a, b) => a - b);
+    return Math.max(this.options.hedgeMinDelayMs, percentile(sorted, HEDGE_PERCENTILE));
+  }
+
+  private recordLatency(durationMs: number): void {
+    if (this.latencies.length < LATENCY_WINDOW) {
+      this.latencies.push(durationMs);
+      return;
+    }
+    this.latencies[this.latencyCursor] = durationMs;
+    this.latencyCursor = (this.latencyCursor + 1) % LATENCY_WINDOW;
+  }
+
+  private race<T>(operation: (signal: AbortSignal) => Promise<T>, timeoutMs: number, hedge: boolean): Promise<T> {
+    return new Promise<T>((resolve, reject) => {
+      const controllers: AbortController[] = [];
+      let pending = 0;
+      let settled = false;
+      let hedgeTimer: NodeJS.Timeout | null = null;
+
+      const settle = (finish: () => void) => {
+        if (settled) {
+          return;
+        }
+        settled = true;
+        clearTimeout(timeoutTimer);
+        if (hedgeTimer) {
+          clearTimeout(hedgeTimer);
+        }
+        for (const controller of controllers) {
+          controller.abort();
+        }
+        finish();
+      };
+
+      const launch = (isHedge: boolean) => {
+        const controller = new AbortController();
+        const startedAt = performance.now();
+        controllers.push(controller);
+        pending += 1;
+        let attempt: Promise<T>;
+        try {
+          attempt = operation(controller.signal);
+        } catch (error) {
+          attempt = Promise.reject(error);
+        }
+        attempt.then(
+          (value) => {
+            this.recordLatency(performance.now() - startedAt);
+            if (isHedge && !settled) {
+              this.stats.hedgeWins += 1;
+            }
+            settle(() => resolve(value));
+          },
+          (error: unknown) => {
+            pending -= 1;
+            // A hedge only helps with slowness; the first real error wins unless another attempt is still running.
+            if (pending === 0) {
+              settle(() => reject(error));
+            }
+          }
+        );
+      };
+
+      const timeoutTimer = setTimeout(() => {
+        this.stats.timeouts += 1;
+        settle(() => reject(new Error(`${this.name} timed out after ${timeoutMs}ms`)));
+      }, timeoutMs);
+
+      launch(false);
+
+      const delayMs = hedge ? this.hedgeDelayMs() : null;
+      if (delayMs !== null && delayMs < timeoutMs) {
+        hedgeTimer = setTimeout(() => {
+          if (settled || this.hedgeTokens < 1) {
+            return;
+          }
+          this.hedgeTokens -= 1;
+          this.stats.hedged += 1;
+          launch(true);
+        }, delayMs);
+      }
+    });
+  }
+}
+
+export type GuardedDependency = 'pinecone' | 'dynamodb';
+
+const sharedGuards = new Map<GuardedDependency, DependencyGuard>();
+
+/** One guard per dependency per process, so breaker state and latency history span requests. */
+export function getSharedDependencyGuard(name: GuardedDependency): DependencyGuard {
+  let guard = sharedGuards.get(name);
+  if (!guard) {
+    const created = new DependencyGuard(name, {
+      timeoutMs: name === 'pinecone' ? env.pineconeTimeoutMs : env.dynamodbTimeoutMs,
+      hedgeMinDelayMs: env.hedgeMinDelayMs,
+      hedgeMaxRatio: env.hedgeMaxRatio,
+      failureThreshold: env.circuitFailureThreshold,
+      openMs: env.circuitOpenMs
+    });
+    registerGauge(`dependency_${name}`, () => created.getStats());
+    sharedGuards.set(name, created);
+    guard = created;
+  }
+  return guard;
+}
@@ -0,0 +1,133 @@
+import { performance } from 'perf_hooks';
+import type { EmbeddingInput, EmbeddingProvider } from '../types/providers';
+import { currentRequestTimer, recordLatency } from '../utils/metrics';
+import type { RequestTimer } from '../utils/metrics';
+
+export type EmbeddingBatcherOptions = {
+  /** Longest a request waits for others to join its batch. */
+  windowMs: number;
+  maxBatchSize: number;
+};
+
+type PendingEmbedding = EmbeddingInput & {
+  enqueuedAt: number;
+  // Captured at enqueue: batches are dispatched from a timer, outside the request's context.
+  timer?: RequestTimer;
+  resolve: (vector: number[]) => void;
+  reject: (error: unknown) => void;
+};
+
+export type EmbeddingBatcherStats = {
+  queueDepth: number;
+  inFlight: number;
+  batches: number;
+  embedded: number;
+  maxObservedBatchSize: number;
+};
+
+/**
+ * Coalesces concurrent embedding requests into batched forward passes.
+ *
+ * The first request to arrive on an idle queue starts a `windowMs` timer; the batch is dispatched
+ * when the timer fires or `maxBatchSize` requests are queued, whichever comes first. Only one batch
+ * runs at a time so batches do not compete for the same cores; requests that arrive while a batch
+ * is running are dispatched together as soon as it finishes.
+ */
+export class EmbeddingBatcher {
+  private provider: EmbeddingProvider;
+  private options: EmbeddingBatcherOptions;
+  private queue: PendingEmbedding[] = [];
+  private timer: NodeJS.Timeout | null = null;
+  private running = false;
+  private stats: EmbeddingBatcherStats = { queueDepth: 0, inFlight: 0, batches: 0, embedded: 0, maxObservedBatchSize: 0 };
+
+  constructor(provider: EmbeddingProvider, options: EmbeddingBatcherOptions) {
+    this.provider = provider;
+    this.options = { windowMs: Math.max(0, options.windowMs), maxBatchSize: Math.max(1, options.maxBatchSize) };
+  }
+
+  embed(buffer: Buffer, mimeType?: string): Promise<number[]> {
+    return new Promise<number[]>((resolve, reject) => {
+      this.queue.push({
+        buffer,
+        mimeType,
+        enqueuedAt: performance.now(),
+        timer: currentRequestTimer(),
+        resolve,
+        reject
+      });
+      this.schedule();
+    });
+  }
+
+  getStats(): EmbeddingBatcherStats {
+    return { ...this.stats, queueDepth: this.queue.length };
+  }
+
+  private schedule(): void {
+    if (this.running) {
+      return;
+    }
+    if (this.queue.length >= this.options.maxBatchSize) {
+      this.dispatch();
+      return;
+    }
+    if (!this.timer) {
+      this.timer = setTimeout(() => this.dispatch(), this.options.windowMs);
+    }
+  }
+
+  private dispatch(): void {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    if (this.running || this.queue.length === 0) {
+      return;
+    }
+
+    const batch = this.queue.splice(0, this.options.maxBatchSize);
+    const dispatchedAt = performance.now();
+    for (const item of batch) {
+      const waitMs = dispatchedAt - item.enqueuedAt;
+      if (item.timer) {
+        item.timer.record('embedding_queue_wait', waitMs);
+      } else {
+        recordLatency('embedding_queue_wait', waitMs);
+      }
+    }
+    this.running = true;
+    this.stats.inFlight = batch.length;
+    this.stats.batches += 1;
+    this.stats.maxObservedBatchSize = Math.max(this.stats.maxObservedBatchSize, batch.length);
+
+    this.provider
+      .embedBuffers(batch.map(({ buffer, mimeType }) => ({ buffer, mimeType })))
+      .then(
+        (vectors) => {
+          batch.forEach((item, index) => {
+            const vector = vectors[index];
+            if (vector) {
+              item.resolve(vector);
+            } else {
+              item.reject(new Error('Embedding batch returned fewer vectors than inputs'));
+            }
+          });
+          this.stats.embedded += batch.length;
+        },
+        (error) => {
+          for (const item of batch) {
+            item.reject(error);
+          }
+        }
+      )
+      .finally(() => {
+        this.running = false;
+        this.stats.inFlight = 0;
+        // Anything queued during the batch has already waited; send it straight away.
+        if (this.queue.length > 0) {
+          this.dispatch();
+        }
+      });
+  }
+}
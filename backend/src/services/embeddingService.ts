@@ -1,13 +1,26 @@
-import { ClipXenovaProvider } from '../providers/embedding/clipXenovaProvider';
+import type { EmbeddingInput, EmbeddingProvider } from '../types/providers';
+import { timeSpan } from '../utils/metrics';
+import { EmbeddingBatcher } from './embeddingBatcher';
 
 export class EmbeddingService {
-  private provider: ClipXenovaProvider;
+  private provider: EmbeddingProvider;
+  private batcher?: EmbeddingBatcher;
 
-  constructor(provider: ClipXenovaProvider) {
+  constructor(provider: EmbeddingProvider, batcher?: EmbeddingBatcher) {
     this.provider = provider;
+    this.batcher = batcher;
   }
 
-  async embedImage(buffer: Buffer): Promise<number[]> {
-    return this.provider.embedBuffer(buffer);
+  async embedImage(buffer: Buffer, mimeType?: string): Promise<number[]> {
+    const batcher = this.batcher;
+    if (batcher) {
+      return timeSpan('embedding', () => batcher.embed(buffer, mimeType));
+    }
+    return timeSpan('embedding', () => this.provider.embedBuffer(buffer, mimeType));
+  }
+
+  /** Embeds several images in one provider call, bypassing the request batcher. */
+  async embedImages(inputs: EmbeddingInput[]): Promise<number[][]> {
+    return timeSpan('embedding', () => this.provider.embedBuffers(inputs));
   }
 }
@@ -1,20 +1,93 @@
-import type { ReferenceMetadata } from '../types/metadata';
-import { DynamoDbProvider } from '../providers/metadata/dynamodbProvider';
+import type { ActiveIndexRecord, PartNeighborsRecord, ReferenceMetadata } from '../types/metadata';
+import type { MetadataProvider } from '../types/providers';
+import { timeSpan } from '../utils/metrics';
+import type { DependencyGuard } from './dependencyGuard';
 
 export class MetadataService {
-  private provider: DynamoDbProvider;
+  private provider: MetadataProvider;
   private tableName: string;
+  private guard?: DependencyGuard;
+  // Item ids of one index version share this prefix (see utils/indexVersion.ts); '' is the legacy index.
+  private keyPrefix: string;
 
-  constructor(provider: DynamoDbProvider, tableName: string) {
+  constructor(provider: MetadataProvider, tableName: string, guard?: DependencyGuard, keyPrefix = '') {
     this.provider = provider;
     this.tableName = tableName;
+    this.guard = guard;
+    this.keyPrefix = keyPrefix;
+  }
+
+  /** The same table and guard, reading and writing one index version's items. */
+  withKeyPrefix(keyPrefix: string): MetadataService {
+    return keyPrefix === this.keyPrefix
+      ? this
+      : new MetadataService(this.provider, this.tableName, this.guard, keyPrefix);
   }
 
   async writeReferenceMetadata(item: ReferenceMetadata): Promise<void> {
-    await this.provider.putMetadata(this.tableName, item);
+    await this.provider.putMetadata(this.tableName, { ...item, id: `${this.keyPrefix}${item.id}` });
+  }
+
+  async writeReferenceMetadataBatch(items: ReferenceMetadata[]): Promise<void> {
+    await this.provider.putMetadataBatch(
+      this.tableName,
+      items.map((item) => ({ ...item, id: `${this.keyPrefix}${item.id}` }))
+    );
   }
 
   async getReferenceMetadata(id: string): Promise<ReferenceMetadata | null> {
-    return this.provider.getMetadata(this.tableName, id);
+    const key = `${this.keyPrefix}${id}`;
+    const guard = this.guard;
+    const item = guard
+      ? await timeSpan('metadata', () =>
+          guard.call((signal) => this.provider.getMetadata(this.tableName, key, signal), { hedge: true })
+        )
+      : await timeSpan('metadata', () => this.provider.getMetadata(this.tableName, key));
+    return item && this.keyPrefix ? { ...item, id } : item;
+  }
+
+  async writePartNeighbors(record: PartNeighborsRecord): Promise<void> {
+    await this.provider.putPartNeighbors(this.tableName, { ...record, partId: `${this.keyPrefix}${record.partId}` });
+  }
+
+  async deletePartNeighbors(partId: string): Promise<void> {
+    await this.provider.deletePartNeighbors(this.tableName, `${this.keyPrefix}${partId}`);
+  }
+
+  async getPartNeighbors(partId: string): Promise<PartNeighborsRecord | null> {
+    const key = `${this.keyPrefix}${partId}`;
+    const guard = this.guard;
+    const record = guard
+      ? await timeSpan('metadata', () =>
+          guard.call((signal) => this.provider.getPartNeighbors(this.tableName, key, signal), { hedge: true })
+        )
+      : await timeSpan('metadata', () => this.provider.getPartNeighbors(this.tableName, key));
+    return record && this.keyPrefix ? { ...record, partId } : record;
+  }
+
+  /** Deletes every item of one index version; returns how many items were deleted. */
+  async deleteKeyPrefix(keyPrefix: string): Promise<number> {
+    if (!keyPrefix) {
+      throw new Error('Refusing to delete metadata without an index version prefix');
+    }
+    return this.provider.deleteMetadataWithPrefix(this.tableName, keyPrefix);
+  }
+
+  /** Deletes every item of the unversioned index, once it has been retired and collected. */
+  async deleteUnversioned(): Promise<number> {
+    return this.provider.deleteUnversionedMetadata(this.tableName);
+  }
+
+  // The active-index pointer is shared by all versions, so it is never prefixed.
+  async getActiveIndex(): Promise<ActiveIndexRecord | null> {
+    const guard = this.guard;
+    if (!guard) {
+      return this.provider.getActiveIndex(this.tableName);
+    }
+    return guard.call((signal) => this.provider.getActiveIndex(this.tableName, signal), { hedge: true });
+  }
+
+  async putActiveIndex(record: ActiveIndexRecord, expectedVersion: string | null): Promise<void> {
+    await this.provider.putActiveIndex(this.tableName, record, expectedVersion);
   }
 }
@@ -0,0 +1,100 @@
+import type { StorageProvider } from '../types/providers';
+import { UNVERSIONED_INDEX_VERSION } from '../utils/indexVersion';
+import { isPartGraphState, refreshPartGraph } from '../utils/partGraph';
+import type { PartGraphRefresh, PartGraphState } from '../utils/partGraph';
+import { MetadataService } from './metadataService';
+
+export const PART_GRAPH_STATE_FILE_NAME = '_part_graph.json';
+
+/**
+ * State object of one index version's graph. Each version keeps its own so a blue/green build
+ * starts from an empty graph and writes every list into its own metadata items.
+ */
+export function partGraphStateKey(prefix: string, indexVersion: string | null): string {
+  return indexVersion && indexVersion !== UNVERSIONED_INDEX_VERSION
+    ? `${prefix}${PART_GRAPH_STATE_FILE_NAME.replace(/\.json$/, `.${indexVersion}.json`)}`
+    : `${prefix}${PART_GRAPH_STATE_FILE_NAME}`;
+}
+
+export type PartGraphServiceOptions = {
+  k: number;
+  dryRun: boolean;
+};
+
+function isMissingObject(error: unknown): boolean {
+  return error instanceof Error && (error.name === 'NoSuchKey' || error.name === 'NotFound');
+}
+
+/**
+ * Keeps the "similar parts" graph in step with the index. Part centroids and the current graph
+ * live in one S3 state object next to the snapshots; each refresh rescores only the rows a change
+ * can affect and rewrites only the DynamoDB neighbour items that changed.
+ */
+export class PartGraphService {
+  private storage: StorageProvider;
+  private metadataService: MetadataService;
+  private bucketName: string;
+  private stateKey: string;
+  private options: PartGraphServiceOptions;
+
+  constructor(
+    storage: StorageProvider,
+    metadataService: MetadataService,
+    bucketName: string,
+    stateKey: string,
+    options: PartGraphServiceOptions
+  ) {
+    this.storage = storage;
+    this.metadataService = metadataService;
+    this.bucketName = bucketName;
+    this.stateKey = stateKey;
+    this.options = options;
+  }
+
+  /**
+   * Applies changed part centroids and persists the graph. With `liveParts` (a full listing of the
+   * catalog), parts in the graph but no longer listed are removed; without it nothing is removed.
+   */
+  async refresh(updates: Map<string, number[]>, liveParts?: Set<string>): Promise<PartGraphRefresh> {
+    const previous = await this.loadState();
+    const removedIds = liveParts ? Object.keys(previous?.parts ?? {}).filter((partId) => !liveParts.has(partId)) : [];
+    const result = refreshPartGraph(previous, updates, removedIds, this.options.k);
+    if (this.options.dryRun) {
+      return result;
+    }
+
+    const { state } = result;
+    for (const partId of result.changed) {
+      await this.metadataService.writePartNeighbors({
+        partId,
+        neighbors: state.parts[partId].neighbors,
+        k: state.k,
+        updatedAt: state.updatedAt
+      });
+    }
+    for (const partId of result.removed) {
+      await this.metadataService.deletePartNeighbors(partId);
+    }
+    await this.storage.putObject({
+      bucket: this.bucketName,
+      key: this.stateKey,
+      body: Buffer.from(JSON.stringify(state)),
+      contentType: 'application/json'
+    });
+    return result;
+  }
+
+  private async loadState(): Promise<PartGraphState | null> {
+    let body: Buffer;
+    try {
+      body = await this.storage.getObjectBuffer(this.bucketName, this.stateKey);
+    } catch (error) {
+      if (isMissingObject(error)) {
+        return null;
+      }
+      throw error;
+    }
+    const parsed: unknown = JSON.parse(body.toString('utf8'));
+    return isPartGraphState(parsed) ? parsed : null;
+  }
+}
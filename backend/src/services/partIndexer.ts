@@ -0,0 +1,202 @@
+import type { AtlasLayout, PartAttributes, ReferenceMetadata, ShapeDescriptor } from '../types/metadata';
+import { partCentroid } from '../utils/partGraph';
+import { encodeShapeVector } from '../utils/shape';
+import { clusterViewEmbeddings } from '../utils/viewDedupe';
+import type { ViewCluster } from '../utils/viewDedupe';
+import { VIEW_SUFFIXES } from './candidateService';
+import { EmbeddingService } from './embeddingService';
+import { MetadataService } from './metadataService';
+import { PineconeService } from './pineconeService';
+import type { ReferenceVector } from './pineconeService';
+
+export const DEFAULT_DEDUPE_THRESHOLD = 0.97;
+// Buffered vectors that trigger a flush: four full Pinecone upsert requests.
+const BULK_FLUSH_VECTORS = 400;
+
+export type PartSnapshot = {
+  view: string;
+  s3Key: string;
+  buffer: Buffer;
+};
+
+export type PartIndexerOptions = {
+  dedupe: boolean;
+  dedupeThreshold: number;
+  dryRun: boolean;
+  /**
+   * Writing into a new, empty index version: there are no earlier vectors to clean up, and writes
+   * are buffered across parts into full bulk requests. Call `flush()` after the last part.
+   */
+  freshIndex?: boolean;
+};
+
+export type EmbeddedPart = {
+  partId: string;
+  snapshots: PartSnapshot[];
+  clusters: ViewCluster[];
+  dims: number;
+  /** Normalised mean of all view embeddings, the part's node in the similar-parts graph. */
+  centroid: number[];
+};
+
+export type PartSidecars = {
+  shape?: ShapeDescriptor;
+  attributes?: PartAttributes;
+  /** Sprite sheet uploaded next to the views, see utils/atlas.ts. */
+  atlas?: { s3Key: string; layout: AtlasLayout };
+};
+
+export type PartIndexResult = {
+  views: number;
+  vectors: number;
+  aliased: number;
+  dims: number;
+  withShape: boolean;
+  withAtlas: boolean;
+  centroid: number[];
+  /** `top=top+bottom` style summary of deduplicated views, empty when nothing was folded. */
+  aliasSummary: string;
+};
+
+function viewRank(view: string): number {
+  const rank = (VIEW_SUFFIXES as readonly string[]).indexOf(view);
+  return rank === -1 ? VIEW_SUFFIXES.length : rank;
+}
+
+/**
+ * Embeds one part's snapshots, folds near-duplicate views and writes DynamoDB metadata plus
+ * Pinecone vectors. Shared by the S3 indexer and the fused render-to-index ingest.
+ */
+export class PartIndexer {
+  private embeddingService: EmbeddingService;
+  private metadataService: MetadataService;
+  private pineconeService: PineconeService;
+  private options: PartIndexerOptions;
+  private pendingItems: ReferenceMetadata[] = [];
+  private pendingVectors: ReferenceVector[] = [];
+
+  constructor(
+    embeddingService: EmbeddingService,
+    metadataService: MetadataService,
+    pineconeService: PineconeService,
+    options: PartIndexerOptions
+  ) {
+    this.embeddingService = embeddingService;
+    this.metadataService = metadataService;
+    this.pineconeService = pineconeService;
+    this.options = options;
+  }
+
+  async embed(partId: string, snapshots: PartSnapshot[]): Promise<EmbeddedPart> {
+    // Canonical order decides which view of a near-duplicate pair keeps its vector.
+    const ordered = [...snapshots].sort((a, b) => viewRank(a.view) - viewRank(b.view));
+    const embeddings = await this.embeddingService.embedImages(
+      ordered.map(({ buffer }) => ({ buffer, mimeType: 'image/png' }))
+    );
+    const views = ordered.map((snapshot, index) => ({ view: snapshot.view, embedding: embeddings[index] }));
+    const clusters = this.options.dedupe
+      ? clusterViewEmbeddings(views, this.options.dedupeThreshold)
+      : views.map((view) => ({ representative: view, aliases: [] }));
+    return {
+      partId,
+      snapshots: ordered,
+      clusters,
+      dims: embeddings[0]?.length ?? 0,
+      centroid: partCentroid(embeddings)
+    };
+  }
+
+  async write(part: EmbeddedPart, sidecars: PartSidecars = {}): Promise<PartIndexResult> {
+    const { partId, snapshots, clusters } = part;
+    const { shape, atlas } = sidecars;
+    const attributes = sidecars.attributes ?? {};
+    const representativeByView = new Map<string, string>();
+    const aliasesByView = new Map<string, string[]>();
+    for (const cluster of clusters) {
+      aliasesByView.set(cluster.representative.view, cluster.aliases);
+      for (const alias of cluster.aliases) {
+        representativeByView.set(alias, cluster.representative.view);
+      }
+    }
+
+    if (!this.options.dryRun) {
+      // Every view keeps its metadata item so candidate hydration still shows all canonical views.
+      // Items and vectors go out as bulk writes rather than one request per view.
+      const items: ReferenceMetadata[] = snapshots.map((snapshot) => {
+        const representativeView = representativeByView.get(snapshot.view);
+        const aliases = aliasesByView.get(snapshot.view);
+        const tile = atlas?.layout.tiles[snapshot.view];
+        return {
+          id: `${partId}-${snapshot.view}`,
+          model: partId,
+          view: snapshot.view,
+          s3Key: snapshot.s3Key,
+          label: `${partId} - ${snapshot.view} view`,
+          ...attributes,
+          ...(shape ? { shape } : {}),
+          ...(representativeView ? { representativeId: `${partId}-${representativeView}` } : {}),
+          ...(aliases && aliases.length > 0 ? { aliases } : {}),
+          ...(atlas && tile
+            ? { atlas: { s3Key: atlas.s3Key, width: atlas.layout.width, height: atlas.layout.height, tile } }
+            : {})
+        };
+      });
+      const vectors: ReferenceVector[] = clusters.map((cluster) => {
+        const view = cluster.representative.view;
+        return {
+          id: `${partId}-${view}`,
+          values: cluster.representative.embedding,
+          metadata: {
+            model: partId,
+            view,
+            s3Key: snapshots.find((snapshot) => snapshot.view === view)?.s3Key ?? '',
+            shape: shape ? encodeShapeVector(shape) : undefined,
+            aliases: cluster.aliases,
+            ...attributes
+          }
+        };
+      });
+      if (this.options.freshIndex) {
+        this.pendingItems.push(...items);
+        this.pendingVectors.push(...vectors);
+        if (this.pendingVectors.length >= BULK_FLUSH_VECTORS) {
+          await this.flush();
+        }
+      } else {
+        await this.metadataService.writeReferenceMetadataBatch(items);
+        await this.pineconeService.upsertReferenceVectors(vectors);
+        // Drop vectors left behind by earlier runs for views that are now aliases.
+        const aliasIds = Array.from(representativeByView.keys()).map((view) => `${partId}-${view}`);
+        await this.pineconeService.deleteReferenceVectors(aliasIds);
+      }
+    }
+
+    return {
+      views: snapshots.length,
+      vectors: clusters.length,
+      aliased: representativeByView.size,
+      dims: part.dims,
+      withShape: Boolean(shape),
+      withAtlas: Boolean(atlas),
+      centroid: part.centroid,
+      aliasSummary: clusters
+        .filter((cluster) => cluster.aliases.length > 0)
+        .map((cluster) => `${cluster.representative.view}=${[cluster.representative.view, ...cluster.aliases].join('+')}`)
+        .join(' ')
+    };
+  }
+
+  /** Writes whatever `freshIndex` mode still holds in its buffer. */
+  async flush(): Promise<void> {
+    const items = this.pendingItems.splice(0);
+    const vectors = this.pendingVectors.splice(0);
+    await Promise.all([
+      this.metadataService.writeReferenceMetadataBatch(items),
+      this.pineconeService.upsertReferenceVectors(vectors)
+    ]);
+  }
+
+  async indexPart(partId: string, snapshots: PartSnapshot[], sidecars?: PartSidecars): Promise<PartIndexResult> {
+    return this.write(await this.embed(partId, snapshots), sidecars);
+  }
+}
@@ -1,29 +1,104 @@
-import { PineconeProvider, PineconeMatch } from '../providers/vector/pineconeProvider';
+import type { PartAttributes } from '../types/metadata';
+import type { VectorMatch, VectorMetadata, VectorProvider, VectorQueryOptions, VectorRecord } from '../types/providers';
+import { timeSpan } from '../utils/metrics';
+import type { DependencyGuard } from './dependencyGuard';
+
+export type ReferenceVectorMetadata = {
+  model: string;
+  view: string;
+  s3Key: string;
+  shape?: string;
+  aliases?: string[];
+} & PartAttributes;
+
+export type ReferenceVector = {
+  id: string;
+  values: number[];
+  metadata: ReferenceVectorMetadata;
+};
+
+function toVectorMetadata(metadata: ReferenceVectorMetadata): VectorMetadata {
+  const aliases = metadata.aliases ?? [];
+  const vectorMetadata: VectorMetadata = {
+    model: metadata.model,
+    view: metadata.view,
+    // Filterable list of every view this vector represents.
+    views: [metadata.view, ...aliases],
+    s3Key: metadata.s3Key
+  };
+  if (metadata.shape) {
+    vectorMetadata.shape = metadata.shape;
+  }
+  if (aliases.length > 0) {
+    vectorMetadata.aliases = aliases.join(',');
+  }
+  for (const field of ['family', 'manufacturer', 'sourceFile'] as const) {
+    const value = metadata[field];
+    if (value) {
+      vectorMetadata[field] = value;
+    }
+  }
+  return vectorMetadata;
+}
 
 export class PineconeService {
-  private provider: PineconeProvider;
+  private provider: VectorProvider;
   private indexName: string;
-  private namespace: string;
+  readonly namespace: string;
+  private guard?: DependencyGuard;
 
-  constructor(provider: PineconeProvider, indexName: string, namespace: string) {
+  constructor(provider: VectorProvider, indexName: string, namespace: string, guard?: DependencyGuard) {
     this.provider = provider;
     this.indexName = indexName;
     this.namespace = namespace;
+    this.guard = guard;
+  }
+
+  /** The same index and guard, scoped to another namespace (one index version). */
+  withNamespace(namespace: string): PineconeService {
+    return namespace === this.namespace ? this : new PineconeService(this.provider, this.indexName, namespace, this.guard);
+  }
+
+  async upsertReferenceVector(id: string, values: number[], metadata: ReferenceVectorMetadata): Promise<void> {
+    await this.upsertReferenceVectors([{ id, values, metadata }]);
+  }
+
+  async upsertReferenceVectors(vectors: ReferenceVector[]): Promise<void> {
+    if (vectors.length === 0) {
+      return;
+    }
+    const records: VectorRecord[] = vectors.map(({ id, values, metadata }) => ({
+      id,
+      values,
+      metadata: toVectorMetadata(metadata)
+    }));
+    await this.provider.upsertVectors(this.indexName, this.namespace, records);
+  }
+
+  async deleteReferenceVectors(ids: string[]): Promise<void> {
+    await this.provider.deleteVectors(this.indexName, this.namespace, ids);
+  }
+
+  async countReferenceVectors(): Promise<number> {
+    return this.provider.countVectors(this.indexName, this.namespace);
   }
 
-  async upsertReferenceVector(
-    id: string,
-    values: number[],
-    metadata: { model: string; view: string; s3Key: string }
-  ): Promise<void> {
-    await this.provider.upsertVector(this.indexName, this.namespace, id, values, {
-      model: metadata.model,
-      view: metadata.view,
-      s3Key: metadata.s3Key
-    });
+  async deleteNamespace(): Promise<void> {
+    await this.provider.deleteNamespace(this.indexName, this.namespace);
   }
 
-  async querySimilar(vector: number[], topK: number): Promise<PineconeMatch[]> {
-    return this.provider.queryVectors(this.indexName, this.namespace, vector, topK);
+  async querySimilar(vector: number[], topK: number, options?: VectorQueryOptions): Promise<VectorMatch[]> {
+    const guard = this.guard;
+    if (!guard) {
+      return timeSpan('vector_query', () =>
+        this.provider.queryVectors(this.indexName, this.namespace, vector, topK, options)
+      );
+    }
+    return timeSpan('vector_query', () =>
+      guard.call(
+        (signal) => this.provider.queryVectors(this.indexName, this.namespace, vector, topK, { ...options, signal }),
+        { hedge: true }
+      )
+    );
   }
 }
@@ -1,10 +1,11 @@
-import { S3Provider } from '../providers/storage/s3Provider';
+import type { StorageProvider } from '../types/providers';
+import { timeSpan } from '../utils/metrics';
 
 export class StorageService {
-  private provider: S3Provider;
+  private provider: StorageProvider;
   private bucketName: string;
 
-  constructor(provider: S3Provider, bucketName: string) {
+  constructor(provider: StorageProvider, bucketName: string) {
     this.provider = provider;
     this.bucketName = bucketName;
   }
@@ -19,6 +20,6 @@ export class StorageService {
   }
 
   async getSignedReferenceUrl(key: string, expiresInSeconds = 900): Promise<string> {
-    return this.provider.getPresignedUrl(this.bucketName, key, expiresInSeconds);
+    return timeSpan('presign', () => this.provider.getPresignedUrl(this.bucketName, key, expiresInSeconds));
   }
 }
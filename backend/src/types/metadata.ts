@@ -1,7 +1,114 @@
+/** Written by the FreeCAD renderer as `descriptors.json` next to each part's snapshots. */
+export type ShapeDescriptor = {
+  version: number;
+  extents: number[];
+  volume: number;
+  area: number;
+  fillRatio: number;
+  sphericity: number;
+  solids: number;
+  faces: number;
+  edges: number;
+  cylindricalFaces: number;
+  holes: number;
+  /** Unit-range vector: aspect mid/min, fill ratio, sphericity, cylindrical fraction, face and hole complexity. */
+  vector: number[];
+};
+
+/** Catalog attributes of a part; values are stored lower-cased so filters match exactly. */
+export type PartAttributes = {
+  family?: string;
+  manufacturer?: string;
+  /** CAD file path relative to the ingest input directory. */
+  sourceFile?: string;
+};
+
+export type AtlasTile = {
+  x: number;
+  y: number;
+  width: number;
+  height: number;
+};
+
+/** Written by the ingest as `atlas.json` next to the part's `atlas.jpg` sprite sheet. */
+export type AtlasLayout = {
+  version: number;
+  tileSize: number;
+  columns: number;
+  width: number;
+  height: number;
+  /** Keyed by view name. */
+  tiles: Record<string, AtlasTile>;
+};
+
+/** Where one view sits in its part's sprite sheet. */
+export type AtlasPlacement = {
+  s3Key: string;
+  width: number;
+  height: number;
+  tile: AtlasTile;
+};
+
 export type ReferenceMetadata = {
   id: string;
   model: string;
   view: string;
   s3Key: string;
   label: string;
+  shape?: ShapeDescriptor;
+  family?: string;
+  manufacturer?: string;
+  sourceFile?: string;
+  /** Set on views deduplicated at index time: id of the vector that stands in for this view. */
+  representativeId?: string;
+  /** Set on representative views: other views of the part folded into this vector. */
+  aliases?: string[];
+  /** Set when the part has a sprite sheet; the view itself stays at `s3Key` at full resolution. */
+  atlas?: AtlasPlacement;
+};
+
+export type PartNeighbor = {
+  partId: string;
+  /** Cosine similarity of the two parts' centroids. */
+  score: number;
+};
+
+/** Precomputed "similar parts" list, written by the indexer and served by `/parts/{partId}/similar`. */
+export type PartNeighborsRecord = {
+  partId: string;
+  neighbors: PartNeighbor[];
+  k: number;
+  updatedAt: string;
+};
+
+/** An index build switched away from, kept for rollback until its grace period ends. */
+export type RetiredIndexVersion = {
+  version: string;
+  namespace: string;
+  vectors: number;
+  parts: number;
+  retiredAt: string;
+};
+
+/** A validated `--no_switch` build waiting for `--activate`; collected like a retired version. */
+export type StagedIndexVersion = {
+  version: string;
+  namespace: string;
+  vectors: number;
+  parts: number;
+  stagedAt: string;
+};
+
+/**
+ * The "active index" pointer: which Pinecone namespace and metadata key prefix search reads.
+ * Stored as one item in the metadata table and switched with a conditional write.
+ */
+export type ActiveIndexRecord = {
+  version: string;
+  namespace: string;
+  activatedAt: string;
+  vectors: number;
+  parts: number;
+  retired: RetiredIndexVersion[];
+  staged: StagedIndexVersion[];
 };
@@ -0,0 +1,87 @@
+import type { ActiveIndexRecord, PartNeighborsRecord, ReferenceMetadata } from './metadata';
+
+export type VectorMatch = {
+  id: string;
+  score: number;
+  /** Only populated when the query asks for metadata. */
+  metadata?: Record<string, string>;
+};
+
+/** Metadata stored with a vector; list values match a filter when any element matches. */
+export type VectorMetadata = Record<string, string | string[]>;
+
+/** Field -> accepted values; fields are ANDed, values within a field are ORed. */
+export type VectorMetadataFilter = Record<string, string[]>;
+
+export type VectorRecord = {
+  id: string;
+  values: number[];
+  metadata: VectorMetadata;
+};
+
+export type VectorQueryOptions = {
+  includeMetadata?: boolean;
+  /** Applied inside the vector engine so only matching vectors are scanned. */
+  filter?: VectorMetadataFilter;
+  /** Aborts the request when the caller no longer needs it (timeout or hedge loss). */
+  signal?: AbortSignal;
+};
+
+export type PutObjectInput = {
+  bucket: string;
+  key: string;
+  body: Buffer;
+  contentType: string;
+};
+
+export type EmbeddingInput = {
+  buffer: Buffer;
+  mimeType?: string;
+};
+
+export type EmbeddingProvider = {
+  embedBuffer(buffer: Buffer, mimeType?: string): Promise<number[]>;
+  /** One forward pass over all inputs; results are in input order. */
+  embedBuffers(inputs: EmbeddingInput[]): Promise<number[][]>;
+};
+
+export type VectorProvider = {
+  /** Writes in as few requests as the engine allows. */
+  upsertVectors(indexName: string, namespace: string, records: VectorRecord[]): Promise<void>;
+  queryVectors(
+    indexName: string,
+    namespace: string,
+    vector: number[],
+    topK: number,
+    options?: VectorQueryOptions
+  ): Promise<VectorMatch[]>;
+  deleteVectors(indexName: string, namespace: string, ids: string[]): Promise<void>;
+  /** May lag recent writes by a few seconds. */
+  countVectors(indexName: string, namespace: string): Promise<number>;
+  deleteNamespace(indexName: string, namespace: string): Promise<void>;
+};
+
+export type MetadataProvider = {
+  putMetadata(tableName: string, item: ReferenceMetadata): Promise<void>;
+  /** Bulk write; retries items the store could not take in one request. */
+  putMetadataBatch(tableName: string, items: ReferenceMetadata[]): Promise<void>;
+  getMetadata(tableName: string, id: string, signal?: AbortSignal): Promise<ReferenceMetadata | null>;
+  putPartNeighbors(tableName: string, record: PartNeighborsRecord): Promise<void>;
+  getPartNeighbors(tableName: string, partId: string, signal?: AbortSignal): Promise<PartNeighborsRecord | null>;
+  deletePartNeighbors(tableName: string, partId: string): Promise<void>;
+  /** Deletes every item whose id starts with `prefix`; returns how many were deleted. */
+  deleteMetadataWithPrefix(tableName: string, prefix: string): Promise<number>;
+  /** Deletes every item of the unversioned index (ids without a version prefix), except the pointer. */
+  deleteUnversionedMetadata(tableName: string): Promise<number>;
+  getActiveIndex(tableName: string, signal?: AbortSignal): Promise<ActiveIndexRecord | null>;
+  /** Fails unless the stored pointer is still at `expectedVersion` (null: no pointer yet). */
+  putActiveIndex(tableName: string, record: ActiveIndexRecord, expectedVersion: string | null): Promise<void>;
+};
+
+export type StorageProvider = {
+  putObject(input: PutObjectInput): Promise<void>;
+  getPresignedUrl(bucket: string, key: string, expiresInSeconds: number): Promise<string>;
+  listObjectKeys(bucket: string, prefix: string): Promise<string[]>;
+  getObjectBuffer(bucket: string, key: string): Promise<Buffer>;
+  deleteObject(bucket: string, key: string): Promise<void>;
+};
@@ -0,0 +1,40 @@
+import type { AtlasTile } from './metadata';
+
+export type CandidateView = {
+  id: string;
+  score: number;
+  model: string;
+  view: string;
+  label: string;
+  /** Full-resolution view image. */
+  signedImageUrl: string;
+  /** Offset of this view in the candidate's `atlas`, when it has one. */
+  tile?: AtlasTile;
+};
+
+export type CandidateAtlas = {
+  signedUrl: string;
+  width: number;
+  height: number;
+};
+
+export type ModelCandidate = {
+  partId: string;
+  model: string;
+  aggregateScore: number;
+  views: CandidateView[];
+  /** One sprite sheet for all views; absent for parts ingested before atlases existed. */
+  atlas?: CandidateAtlas;
+};
+
+export type PartMatch = {
+  id: string;
+  score: number;
+};
+
+export type PendingCandidate = {
+  partId: string;
+  model: string;
+  aggregateScore: number;
+  matches: PartMatch[];
+};
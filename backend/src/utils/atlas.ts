@@ -0,0 +1,102 @@
+import type { AtlasLayout, AtlasTile } from '../types/metadata';
+
+// Per-part sprite sheet: every view tiled at display resolution so a result card costs one image
+// fetch per candidate instead of one per view. Written next to the views as atlas.jpg + atlas.json.
+
+export const ATLAS_IMAGE_FILE_NAME = 'atlas.jpg';
+export const ATLAS_LAYOUT_FILE_NAME = 'atlas.json';
+export const ATLAS_LAYOUT_VERSION = 1;
+export const DEFAULT_ATLAS_TILE_SIZE = 320;
+// 4 x 2 for the seven canonical views keeps the sheet close to the 4:3 result cards.
+const ATLAS_COLUMNS = 4;
+const ATLAS_JPEG_QUALITY = 0.85;
+// Snapshot background painted by the renderers, used to letterbox non-square views.
+const ATLAS_BACKGROUND = '#212122';
+
+function isTile(value: unknown): value is AtlasTile {
+  if (!value || typeof value !== 'object') {
+    return false;
+  }
+  const tile = value as Record<string, unknown>;
+  return ['x', 'y', 'width', 'height'].every((key) => typeof tile[key] === 'number' && Number.isFinite(tile[key]));
+}
+
+export function isAtlasLayout(value: unknown): value is AtlasLayout {
+  if (!value || typeof value !== 'object') {
+    return false;
+  }
+  const layout = value as Record<string, unknown>;
+  return (
+    layout.version === ATLAS_LAYOUT_VERSION &&
+    typeof layout.width === 'number' &&
+    typeof layout.height === 'number' &&
+    typeof layout.tileSize === 'number' &&
+    Boolean(layout.tiles) &&
+    typeof layout.tiles === 'object' &&
+    Object.values(layout.tiles as Record<string, unknown>).every(isTile)
+  );
+}
+
+/** Row-major grid of square tiles, in the order the views are given. */
+export function computeAtlasLayout(views: readonly string[], tileSize: number): AtlasLayout {
+  const columns = Math.min(ATLAS_COLUMNS, Math.max(1, views.length));
+  const rows = Math.max(1, Math.ceil(views.length / columns));
+  const tiles: Record<string, AtlasTile> = {};
+  views.forEach((view, index) => {
+    tiles[view] = {
+      x: (index % columns) * tileSize,
+      y: Math.floor(index / columns) * tileSize,
+      width: tileSize,
+      height: tileSize
+    };
+  });
+  return {
+    version: ATLAS_LAYOUT_VERSION,
+    tileSize,
+    columns,
+    width: columns * tileSize,
+    height: rows * tileSize,
+    tiles
+  };
+}
+
+/**
+ * Downscales each view into its tile (aspect preserved, letterboxed on the render background)
+ * and encodes the sheet as JPEG. Returns null when node-canvas is not installed.
+ */
+export async function buildAtlas(
+  views: Array<{ view: string; buffer: Buffer }>,
+  tileSize = DEFAULT_ATLAS_TILE_SIZE
+): Promise<{ image: Buffer; layout: AtlasLayout } | null> {
+  const canvas = await import('canvas').catch(() => null);
+  if (!canvas) {
+    return null;
+  }
+
+  const layout = computeAtlasLayout(
+    views.map(({ view }) => view),
+    tileSize
+  );
+  const sheet = canvas.createCanvas(layout.width, layout.height);
+  const context = sheet.getContext('2d');
+  context.imageSmoothingQuality = 'high';
+  context.fillStyle = ATLAS_BACKGROUND;
+  context.fillRect(0, 0, layout.width, layout.height);
+
+  for (const { view, buffer } of views) {
+    const tile = layout.tiles[view];
+    const image = await canvas.loadImage(buffer);
+    const scale = Math.min(tile.width / image.width, tile.height / image.height);
+    const width = Math.round(image.width * scale);
+    const height = Math.round(image.height * scale);
+    context.drawImage(
+      image,
+      tile.x + Math.floor((tile.width - width) / 2),
+      tile.y + Math.floor((tile.height - height) / 2),
+      width,
+      height
+    );
+  }
+
+  return { image: sheet.toBuffer('image/jpeg', { quality: ATLAS_JPEG_QUALITY }), layout };
+}
@@ -0,0 +1,98 @@
+import { createHmac, randomBytes, timingSafeEqual } from 'crypto';
+import { env } from '../config/env';
+import type { PendingCandidate } from '../types/search';
+import { isIndexVersion } from './indexVersion';
+import { logger } from './logger';
+
+const CURSOR_VERSION = 2;
+const MAX_CURSOR_CANDIDATES = 10;
+const MAX_CURSOR_MATCHES = 64;
+
+type CursorPayload = {
+  v: number;
+  c: PendingCandidate[];
+  /** Index version the candidates were ranked against; absent for the unversioned index. */
+  i?: string;
+};
+
+export type DecodedCandidateCursor = {
+  candidates: PendingCandidate[];
+  indexVersion: string | null;
+};
+
+let cursorKey: Buffer | null = null;
+
+// Cursors are `<base64url payload>.<base64url HMAC-SHA256 of the payload>`. Without CURSOR_SECRET
+// the key is random per process, so a cursor only verifies on the instance that issued it.
+function getCursorKey(): Buffer {
+  if (!cursorKey) {
+    if (env.cursorSecret) {
+      cursorKey = Buffer.from(env.cursorSecret, 'utf8');
+    } else {
+      logger.warn('CURSOR_SECRET is not set; candidate cursors are signed with a per-process key');
+      cursorKey = randomBytes(32);
+    }
+  }
+  return cursorKey;
+}
+
+function sign(encodedPayload: string): Buffer {
+  return createHmac('sha256', getCursorKey()).update(encodedPayload).digest();
+}
+
+export function encodeCandidateCursor(candidates: PendingCandidate[], indexVersion: string | null = null): string | null {
+  if (candidates.length === 0) {
+    return null;
+  }
+  const payload: CursorPayload = { v: CURSOR_VERSION, c: candidates, ...(indexVersion ? { i: indexVersion } : {}) };
+  const encodedPayload = Buffer.from(JSON.stringify(payload), 'utf8').toString('base64url');
+  return `${encodedPayload}.${sign(encodedPayload).toString('base64url')}`;
+}
+
+export function decodeCandidateCursor(cursor: string): DecodedCandidateCursor {
+  const [encodedPayload, encodedSignature, ...rest] = cursor.split('.');
+  const signature = Buffer.from(encodedSignature ?? '', 'base64url');
+  const expected = sign(encodedPayload);
+  if (rest.length > 0 || signature.length !== expected.length || !timingSafeEqual(signature, expected)) {
+    throw new Error('Invalid candidate cursor');
+  }
+
+  let payload: CursorPayload;
+  try {
+    payload = JSON.parse(Buffer.from(encodedPayload, 'base64url').toString('utf8')) as CursorPayload;
+  } catch {
+    throw new Error('Invalid candidate cursor');
+  }
+
+  if (
+    !payload ||
+    payload.v !== CURSOR_VERSION ||
+    !Array.isArray(payload.c) ||
+    payload.c.length > MAX_CURSOR_CANDIDATES ||
+    (payload.i !== undefined && (typeof payload.i !== 'string' || !isIndexVersion(payload.i)))
+  ) {
+    throw new Error('Invalid candidate cursor');
+  }
+
+  const candidates = payload.c.map((candidate) => {
+    if (
+      typeof candidate?.partId !== 'string' ||
+      typeof candidate.model !== 'string' ||
+      typeof candidate.aggregateScore !== 'number' ||
+      !Array.isArray(candidate.matches) ||
+      candidate.matches.length > MAX_CURSOR_MATCHES
+    ) {
+      throw new Error('Invalid candidate cursor');
+    }
+    return {
+      partId: candidate.partId,
+      model: candidate.model,
+      aggregateScore: candidate.aggregateScore,
+      matches: candidate.matches
+        .filter((match) => typeof match?.id === 'string' && typeof match.score === 'number')
+        .map((match) => ({ id: match.id, score: match.score }))
+    };
+  });
+
+  return { candidates, indexVersion: payload.i ?? null };
+}
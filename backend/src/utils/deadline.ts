@@ -0,0 +1,28 @@
+import { AsyncLocalStorage } from 'async_hooks';
+
+// Absolute request deadline (epoch ms) for the current handler invocation, so downstream calls
+// can size their timeouts from what is left of the request budget instead of a fixed value.
+
+// Kept back from every per-call timeout for building and sending the response.
+const RESPONSE_RESERVE_MS = 250;
+
+const deadlineStorage = new AsyncLocalStorage<number>();
+
+export function runWithDeadline<T>(deadlineAt: number, fn: () => Promise<T>): Promise<T> {
+  return deadlineStorage.run(deadlineAt, fn);
+}
+
+/**
+ * Deadline for a handler invocation: `budgetMs` from now, or earlier when the Lambda runtime
+ * will kill the invocation first (`getRemainingTimeInMillis`, minus a safety margin).
+ */
+export function requestDeadline(budgetMs: number, lambdaRemainingMs?: number): number {
+  const lambdaBudgetMs = lambdaRemainingMs === undefined ? Number.POSITIVE_INFINITY : lambdaRemainingMs - 1_000;
+  return Date.now() + Math.max(0, Math.min(budgetMs, lambdaBudgetMs));
+}
+
+/** Milliseconds a downstream call may still take, or undefined outside a request. */
+export function remainingBudgetMs(): number | undefined {
+  const deadlineAt = deadlineStorage.getStore();
+  return deadlineAt === undefined ? undefined : deadlineAt - Date.now() - RESPONSE_RESERVE_MS;
+}
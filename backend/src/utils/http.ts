@@ -0,0 +1,50 @@
+import { RequestTimer } from './metrics';
+
+export type JsonResponse = {
+  statusCode: number;
+  headers: Record<string, string>;
+  body: string;
+};
+
+export function jsonResponse(statusCode: number, payload: Record<string, unknown>, requestId?: string): JsonResponse {
+  const headers: Record<string, string> = { 'content-type': 'application/json' };
+  if (requestId) {
+    headers['x-request-id'] = requestId;
+  }
+  return {
+    statusCode,
+    headers,
+    body: JSON.stringify(payload)
+  };
+}
+
+export function withRetryAfter(response: JsonResponse, seconds: number): JsonResponse {
+  return {
+    ...response,
+    headers: {
+      ...response.headers,
+      'retry-after': String(seconds)
+    }
+  };
+}
+
+export function withCacheControl(response: JsonResponse, maxAgeSeconds: number): JsonResponse {
+  return {
+    ...response,
+    headers: {
+      ...response.headers,
+      'cache-control': `public, max-age=${maxAgeSeconds}`
+    }
+  };
+}
+
+export function withServerTiming(response: JsonResponse, timer: RequestTimer): JsonResponse {
+  return {
+    ...response,
+    headers: {
+      ...response.headers,
+      'server-timing': timer.serverTiming(),
+      'timing-allow-origin': '*'
+    }
+  };
+}
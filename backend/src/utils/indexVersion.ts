@@ -0,0 +1,40 @@
+// Blue/green index versions. Each build writes its vectors into its own Pinecone namespace and its
+// DynamoDB items under its own id prefix, so a new build never touches the one serving traffic.
+
+const INDEX_VERSION_PATTERN = /^v\d{8}-\d{6}$/;
+const VERSIONED_ID_PATTERN = /^v\d{8}-\d{6}#/;
+
+/**
+ * Pointer entry for the original index (PINECONE_NAMESPACE, unprefixed items). It is retired on the
+ * first blue/green switch like any other version, so it can be rolled back to and collected.
+ */
+export const UNVERSIONED_INDEX_VERSION = 'unversioned';
+
+/** `v20261019-120000` (UTC), sortable by build time. */
+export function newIndexVersion(now: Date = new Date()): string {
+  const stamp = now.toISOString().replace(/[-:]/g, '').replace('T', '-').slice(0, 15);
+  return `v${stamp}`;
+}
+
+export function isIndexVersion(value: string): boolean {
+  return INDEX_VERSION_PATTERN.test(value);
+}
+
+/** A version `--activate` can switch to: a blue/green build or the original unversioned index. */
+export function isActivatableVersion(value: string): boolean {
+  return isIndexVersion(value) || value === UNVERSIONED_INDEX_VERSION;
+}
+
+/** Whether a metadata item id belongs to a blue/green version rather than the unversioned index. */
+export function hasVersionPrefix(id: string): boolean {
+  return VERSIONED_ID_PATTERN.test(id);
+}
+
+export function versionedNamespace(baseNamespace: string, version: string): string {
+  return `${baseNamespace}--${version}`;
+}
+
+/** Id prefix of a version's metadata items; the legacy unversioned index (null) has none. */
+export function metadataKeyPrefix(version: string | null): string {
+  return version && version !== UNVERSIONED_INDEX_VERSION ? `${version}#` : '';
+}
@@ -0,0 +1,190 @@
+import { randomUUID } from 'crypto';
+import type { IncomingMessage, ServerResponse } from 'http';
+import type { APIGatewayProxyEventV2, APIGatewayProxyHandlerV2, APIGatewayProxyResultV2, Context } from 'aws-lambda';
+
+// Matches the API Gateway payload limit the Lambda deployment runs behind.
+export const MAX_REQUEST_BODY_BYTES = 6 * 1024 * 1024;
+
+export function readRequestBody(req: IncomingMessage, maxBytes = MAX_REQUEST_BODY_BYTES): Promise<Buffer> {
+  return new Promise<Buffer>((resolve, reject) => {
+    const chunks: Buffer[] = [];
+    let size = 0;
+    let tooLarge = false;
+    req.on('data', (chunk: Buffer) => {
+      if (tooLarge) {
+        // Keep draining without buffering so the socket stays open for the 413 response.
+        return;
+      }
+      size += chunk.length;
+      if (size > maxBytes) {
+        tooLarge = true;
+        chunks.length = 0;
+        reject(new Error(`Request body exceeds ${maxBytes} bytes`));
+        return;
+      }
+      chunks.push(chunk);
+    });
+    req.on('end', () => resolve(Buffer.concat(chunks)));
+    req.on('error', reject);
+  });
+}
+
+/**
+ * Builds the HTTP API (payload 2.0) event the Lambda handlers expect from a plain Node request.
+ * Bodies are always passed base64-encoded, as API Gateway does for binary multipart uploads.
+ */
+export function toApiGatewayEvent(
+  req: IncomingMessage,
+  body: Buffer,
+  routeKey: string,
+  pathParameters?: Record<string, string>
+): APIGatewayProxyEventV2 {
+  const url = new URL(req.url ?? '/', 'http://localhost');
+  const headers: Record<string, string> = {};
+  for (const [name, value] of Object.entries(req.headers)) {
+    if (value !== undefined) {
+      headers[name.toLowerCase()] = Array.isArray(value) ? value.join(',') : value;
+    }
+  }
+
+  const queryStringParameters: Record<string, string> = {};
+  for (const key of new Set(url.searchParams.keys())) {
+    queryStringParameters[key] = url.searchParams.getAll(key).join(',');
+  }
+
+  const method = (req.method ?? 'GET').toUpperCase();
+  const now = new Date();
+  const requestId = headers['x-request-id'] || randomUUID();
+  return {
+    version: '2.0',
+    routeKey,
+    rawPath: url.pathname,
+    rawQueryString: url.search.slice(1),
+    cookies: headers.cookie ? headers.cookie.split(';').map((cookie) => cookie.trim()) : undefined,
+    headers,
+    queryStringParameters: Object.keys(queryStringParameters).length > 0 ? queryStringParameters : undefined,
+    pathParameters,
+    requestContext: {
+      accountId: 'local',
+      apiId: 'local',
+      domainName: headers.host ?? 'localhost',
+      domainPrefix: (headers.host ?? 'localhost').split('.')[0],
+      http: {
+        method,
+        path: url.pathname,
+        protocol: `HTTP/${req.httpVersion}`,
+        sourceIp: req.socket.remoteAddress ?? '',
+        userAgent: headers['user-agent'] ?? ''
+      },
+      requestId,
+      routeKey,
+      stage: '$default',
+      time: now.toISOString(),
+      timeEpoch: now.getTime()
+    },
+    body: body.length > 0 ? body.toString('base64') : undefined,
+    isBase64Encoded: body.length > 0
+  };
+}
+
+/**
+ * Matches a request against API Gateway style route keys (`GET /parts/{partId}/similar`) and
+ * returns the key with its decoded path parameters.
+ */
+export function matchRouteKey(
+  routeKeys: string[],
+  method: string,
+  path: string
+): { routeKey: string; pathParameters?: Record<string, string> } | null {
+  const segments = path.split('/');
+  for (const routeKey of routeKeys) {
+    const [routeMethod, routePath] = routeKey.split(' ');
+    const routeSegments = routePath.split('/');
+    if (routeMethod !== method || routeSegments.length !== segments.length) {
+      continue;
+    }
+    const pathParameters: Record<string, string> = {};
+    const matched = routeSegments.every((segment, index) => {
+      const param = /^\{(\w+)\}$/.exec(segment);
+      if (!param) {
+        return segment === segments[index];
+      }
+      if (!segments[index]) {
+        return false;
+      }
+      try {
+        pathParameters[param[1]] = decodeURIComponent(segments[index]);
+        return true;
+      } catch {
+        return false;
+      }
+    });
+    if (matched) {
+      return { routeKey, pathParameters: Object.keys(pathParameters).length > 0 ? pathParameters : undefined };
+    }
+  }
+  return null;
+}
+
+function toContext(event: APIGatewayProxyEventV2, timeoutMs: number): Context {
+  const deadline = Date.now() + timeoutMs;
+  return {
+    callbackWaitsForEmptyEventLoop: false,
+    functionName: event.routeKey,
+    functionVersion: '$LATEST',
+    invokedFunctionArn: `local:${event.routeKey}`,
+    memoryLimitInMB: '0',
+    awsRequestId: event.requestContext.requestId,
+    logGroupName: 'local',
+    logStreamName: String(process.pid),
+    getRemainingTimeInMillis: () => Math.max(0, deadline - Date.now()),
+    done: () => undefined,
+    fail: () => undefined,
+    succeed: () => undefined
+  };
+}
+
+/**
+ * Runs a handler under its route's time limit, like the Lambda timeout: a handler still running
+ * when `timeoutMs` passes is abandoned and the call rejects with "Handler timed out".
+ */
+export async function invokeHandler(
+  handler: APIGatewayProxyHandlerV2,
+  event: APIGatewayProxyEventV2,
+  timeoutMs: number
+): Promise<APIGatewayProxyResultV2> {
+  let timer: NodeJS.Timeout | undefined;
+  const timeout = new Promise<never>((_, reject) => {
+    timer = setTimeout(() => reject(new Error(`Handler timed out after ${timeoutMs} ms`)), timeoutMs);
+  });
+  try {
+    const result = await Promise.race([
+      Promise.resolve(handler(event, toContext(event, timeoutMs), () => undefined)),
+      timeout
+    ]);
+    return result ?? { statusCode: 204 };
+  } finally {
+    clearTimeout(timer);
+  }
+}
+
+export function sendHandlerResult(res: ServerResponse, result: APIGatewayProxyResultV2, extraHeaders: Record<string, string> = {}): void {
+  // A bare string/object result means "200 with this JSON body" in the payload 2.0 format.
+  if (typeof result === 'string' || !('statusCode' in result)) {
+    res.writeHead(200, { 'content-type': 'application/json', ...extraHeaders });
+    res.end(typeof result === 'string' ? result : JSON.stringify(result));
+    return;
+  }
+
+  const headers: Record<string, string | string[]> = { ...extraHeaders };
+  for (const [name, value] of Object.entries(result.headers ?? {})) {
+    headers[name.toLowerCase()] = String(value);
+  }
+  if (result.cookies && result.cookies.length > 0) {
+    headers['set-cookie'] = result.cookies;
+  }
+  const body = result.body === undefined ? Buffer.alloc(0) : Buffer.from(result.body, result.isBase64Encoded ? 'base64' : 'utf8');
+  headers['content-length'] = String(body.length);
+  res.writeHead(result.statusCode ?? 200, headers);
+  res.end(body);
+}
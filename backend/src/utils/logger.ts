@@ -1,9 +1,26 @@
-﻿export type LogLevel = 'DEBUG' | 'INFO' | 'WARN' | 'ERROR';
+﻿import fs from 'fs';
+import { env } from '../config/env';
+
+export type LogLevel = 'DEBUG' | 'INFO' | 'WARN' | 'ERROR';
+
+export type LogMessage = string | (() => string);
 
 type LogOptions = {
   requestId?: string;
 };
 
+const LEVEL_RANK: Record<LogLevel, number> = {
+  DEBUG: 10,
+  INFO: 20,
+  WARN: 30,
+  ERROR: 40
+};
+
+// Buffered lines are written when any of these limits is hit, on ERROR, or on logger.flush().
+const MAX_BUFFERED_LINES = 100;
+const MAX_BUFFERED_CHARS = 16 * 1024;
+const BUFFER_FLUSH_INTERVAL_MS = 250;
+
 const istFormatter = new Intl.DateTimeFormat('en-CA', {
   timeZone: 'Asia/Kolkata',
   year: 'numeric',
@@ -27,16 +44,93 @@ export function formatIstTimestamp(date: Date): string {
   return `${lookup.year}-${lookup.month}-${lookup.day} ${lookup.hour}:${lookup.minute}:${lookup.second} IST`;
 }
 
-function log(level: LogLevel, message: string, options?: LogOptions): void {
-  const timestamp = formatIstTimestamp(new Date());
+function parseLevel(value: string): LogLevel {
+  const upper = value.trim().toUpperCase();
+  return upper in LEVEL_RANK ? (upper as LogLevel) : 'INFO';
+}
+
+const threshold = LEVEL_RANK[parseLevel(env.logLevel)];
+const jsonOutput = env.logFormat.trim().toLowerCase() === 'json';
+const buffered = env.logBuffer;
+
+let cachedSecond = -1;
+let cachedTimestamp = '';
+
+function currentTimestamp(): string {
+  const now = Date.now();
+  const second = Math.floor(now / 1000);
+  if (second !== cachedSecond) {
+    cachedSecond = second;
+    cachedTimestamp = formatIstTimestamp(new Date(now));
+  }
+  return cachedTimestamp;
+}
+
+let pendingLines: string[] = [];
+let pendingChars = 0;
+let flushTimer: NodeJS.Timeout | null = null;
+
+function flush(): void {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+  if (pendingLines.length === 0) {
+    return;
+  }
+  const output = `${pendingLines.join('\n')}\n`;
+  pendingLines = [];
+  pendingChars = 0;
+  process.stdout.write(output);
+}
+
+function write(line: string, level: LogLevel): void {
+  if (!buffered) {
+    process.stdout.write(`${line}\n`);
+    return;
+  }
+  pendingLines.push(line);
+  pendingChars += line.length;
+  if (level === 'ERROR' || pendingLines.length >= MAX_BUFFERED_LINES || pendingChars >= MAX_BUFFERED_CHARS) {
+    flush();
+    return;
+  }
+  if (!flushTimer) {
+    flushTimer = setTimeout(flush, BUFFER_FLUSH_INTERVAL_MS);
+    flushTimer.unref();
+  }
+}
+
+process.on('exit', () => {
+  if (pendingLines.length > 0) {
+    fs.writeSync(1, `${pendingLines.join('\n')}\n`);
+    pendingLines = [];
+    pendingChars = 0;
+  }
+});
+
+function isLevelEnabled(level: LogLevel): boolean {
+  return LEVEL_RANK[level] >= threshold;
+}
+
+function log(level: LogLevel, message: LogMessage, options?: LogOptions): void {
+  if (!isLevelEnabled(level)) {
+    return;
+  }
+  const text = typeof message === 'function' ? message() : message;
+  const timestamp = currentTimestamp();
   const requestId = options?.requestId ?? '-';
-  const line = `${timestamp} | ${level} | requestId=${requestId} | ${message}`;
-  console.log(line);
+  const line = jsonOutput
+    ? JSON.stringify({ time: timestamp, level, requestId, message: text })
+    : `${timestamp} | ${level} | requestId=${requestId} | ${text}`;
+  write(line, level);
 }
 
 export const logger = {
-  debug: (message: string, options?: LogOptions) => log('DEBUG', message, options),
-  info: (message: string, options?: LogOptions) => log('INFO', message, options),
-  warn: (message: string, options?: LogOptions) => log('WARN', message, options),
-  error: (message: string, options?: LogOptions) => log('ERROR', message, options)
+  debug: (message: LogMessage, options?: LogOptions) => log('DEBUG', message, options),
+  info: (message: LogMessage, options?: LogOptions) => log('INFO', message, options),
+  warn: (message: LogMessage, options?: LogOptions) => log('WARN', message, options),
+  error: (message: LogMessage, options?: LogOptions) => log('ERROR', message, options),
+  isLevelEnabled,
+  flush
 };
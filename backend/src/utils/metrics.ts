@@ -0,0 +1,171 @@
+import { AsyncLocalStorage } from 'async_hooks';
+import { performance } from 'perf_hooks';
+import { env } from '../config/env';
+import { logger } from './logger';
+import { percentile } from './percentile';
+
+// Each stage keeps a bounded ring of recent samples; percentiles are computed at flush time.
+const MAX_SAMPLES_PER_STAGE = 2048;
+
+export type StageSnapshot = {
+  count: number;
+  p50Ms: number;
+  p90Ms: number;
+  p99Ms: number;
+  maxMs: number;
+};
+
+export { percentile };
+
+function round(value: number): number {
+  return Math.round(value * 100) / 100;
+}
+
+class LatencyHistogram {
+  private samples: number[] = [];
+  private cursor = 0;
+  private count = 0;
+
+  record(durationMs: number): void {
+    this.count += 1;
+    if (this.samples.length < MAX_SAMPLES_PER_STAGE) {
+      this.samples.push(durationMs);
+      return;
+    }
+    this.samples[this.cursor] = durationMs;
+    this.cursor = (this.cursor + 1) % MAX_SAMPLES_PER_STAGE;
+  }
+
+  snapshot(): StageSnapshot {
+    const sorted = [...this.samples].sort((a, b) => a - b);
+    return {
+      count: this.count,
+      p50Ms: round(percentile(sorted, 50)),
+      p90Ms: round(percentile(sorted, 90)),
+      p99Ms: round(percentile(sorted, 99)),
+      maxMs: round(sorted[sorted.length - 1] ?? 0)
+    };
+  }
+}
+
+let histograms = new Map<string, LatencyHistogram>();
+let windowStartedAt = Date.now();
+const gauges = new Map<string, () => Record<string, number>>();
+
+/** Registers point-in-time values (queue depth, batch sizes, ...) included in every `[METRICS]` record. */
+export function registerGauge(name: string, read: () => Record<string, number>): void {
+  gauges.set(name, read);
+}
+
+function readGauges(): Record<string, Record<string, number>> {
+  const values: Record<string, Record<string, number>> = {};
+  for (const [name, read] of gauges) {
+    values[name] = read();
+  }
+  return values;
+}
+
+export function recordLatency(stage: string, durationMs: number): void {
+  let histogram = histograms.get(stage);
+  if (!histogram) {
+    histogram = new LatencyHistogram();
+    histograms.set(stage, histogram);
+  }
+  histogram.record(durationMs);
+}
+
+export function snapshotLatencyMetrics(): Record<string, StageSnapshot> {
+  const stages: Record<string, StageSnapshot> = {};
+  for (const [stage, histogram] of histograms) {
+    stages[stage] = histogram.snapshot();
+  }
+  return stages;
+}
+
+/**
+ * Logs the current per-stage percentiles as one `[METRICS]` record and starts a new window.
+ * Without `force`, this is a no-op until the flush interval has elapsed, so it is cheap to call per request.
+ */
+export function flushLatencyMetrics(force = false): void {
+  const now = Date.now();
+  if (histograms.size === 0 || (!force && now - windowStartedAt < env.metricsFlushIntervalMs)) {
+    return;
+  }
+  const record = {
+    type: 'latency_percentiles',
+    windowStart: new Date(windowStartedAt).toISOString(),
+    windowMs: now - windowStartedAt,
+    stages: snapshotLatencyMetrics(),
+    gauges: readGauges()
+  };
+  histograms = new Map();
+  windowStartedAt = now;
+  logger.info(`[METRICS] ${JSON.stringify(record)}`);
+}
+
+setInterval(() => flushLatencyMetrics(), env.metricsFlushIntervalMs).unref();
+
+export class RequestTimer {
+  private readonly startedAt = performance.now();
+  private stages = new Map<string, { totalMs: number; count: number }>();
+
+  record(stage: string, durationMs: number): void {
+    const existing = this.stages.get(stage);
+    if (existing) {
+      existing.totalMs += durationMs;
+      existing.count += 1;
+    } else {
+      this.stages.set(stage, { totalMs: durationMs, count: 1 });
+    }
+    recordLatency(stage, durationMs);
+  }
+
+  elapsedMs(): number {
+    return performance.now() - this.startedAt;
+  }
+
+  /** `Server-Timing` header value; repeated stages report their summed duration and call count. */
+  serverTiming(): string {
+    const entries = Array.from(this.stages, ([stage, { totalMs, count }]) =>
+      count > 1 ? `${stage};dur=${totalMs.toFixed(1)};desc="n=${count}"` : `${stage};dur=${totalMs.toFixed(1)}`
+    );
+    entries.push(`total;dur=${this.elapsedMs().toFixed(1)}`);
+    return entries.join(', ');
+  }
+
+  /** `key=value` durations in ms, parsed back by `summarize_latency.ts`. */
+  summary(): string {
+    const entries = Array.from(this.stages, ([stage, { totalMs }]) => `${stage}=${totalMs.toFixed(2)}`);
+    return [`total=${this.elapsedMs().toFixed(2)}`, ...entries].join(' ');
+  }
+}
+
+const timerStorage = new AsyncLocalStorage<RequestTimer>();
+
+export function runWithTimer<T>(timer: RequestTimer, fn: () => Promise<T>): Promise<T> {
+  return timerStorage.run(timer, fn);
+}
+
+/** The timer of the request being handled, if any; for stages measured outside its async context. */
+export function currentRequestTimer(): RequestTimer | undefined {
+  return timerStorage.getStore();
+}
+
+/**
+ * Times `fn` under `stage`. The duration goes to the active request timer when one is set
+ * (see `runWithTimer`), otherwise straight into the process-wide histograms.
+ */
+export async function timeSpan<T>(stage: string, fn: () => T | Promise<T>): Promise<T> {
+  const startedAt = performance.now();
+  try {
+    return await fn();
+  } finally {
+    const durationMs = performance.now() - startedAt;
+    const timer = timerStorage.getStore();
+    if (timer) {
+      timer.record(stage, durationMs);
+    } else {
+      recordLatency(stage, durationMs);
+    }
+  }
+}
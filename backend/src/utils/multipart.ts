@@ -10,33 +10,174 @@ export type MultipartFile = {
   size: number;
 };
 
-export async function parseMultipartFile(
-  event: APIGatewayProxyEventV2,
-  options: { fieldName: string; maxBytes: number }
-): Promise<MultipartFile> {
+type ParseOptions = { fieldName: string; maxBytes: number };
+type MultiFileParseOptions = ParseOptions & { maxFiles: number };
+
+const CRLF = Buffer.from('\r\n');
+const HEADER_SEPARATOR = Buffer.from('\r\n\r\n');
+const DASH = 0x2d;
+const RAW_BODY_MIME_PATTERN = /^(application\/octet-stream|image\/[a-z0-9.+-]+)$/;
+
+function getContentType(event: APIGatewayProxyEventV2): string {
   const contentType = event.headers['content-type'] || event.headers['Content-Type'];
   if (!contentType) {
     throw new Error('Missing Content-Type header');
   }
+  return contentType;
+}
 
+function decodeBody(event: APIGatewayProxyEventV2): Buffer {
   const body = event.body ?? '';
   if (!body) {
     throw new Error('Missing request body');
   }
-  const buffer = event.isBase64Encoded ? Buffer.from(body, 'base64') : Buffer.from(body, 'binary');
+  return event.isBase64Encoded ? Buffer.from(body, 'base64') : Buffer.from(body, 'binary');
+}
+
+/** `Image/JPEG; charset=binary` -> `image/jpeg`, so MIME checks see the bare media type. */
+function toMediaType(contentType: string): string {
+  return contentType.split(';')[0].trim().toLowerCase();
+}
+
+function getBoundary(contentType: string): string | null {
+  const match = /boundary=(?:"([^"]+)"|([^;\s]+))/i.exec(contentType);
+  return match ? match[1] ?? match[2] ?? null : null;
+}
+
+function getHeaderValue(headers: string, name: string): string | undefined {
+  for (const line of headers.split('\r\n')) {
+    const colonIdx = line.indexOf(':');
+    if (colonIdx > 0 && line.slice(0, colonIdx).trim().toLowerCase() === name) {
+      return line.slice(colonIdx + 1).trim();
+    }
+  }
+  return undefined;
+}
+
+/**
+ * Scans the multipart body in place and returns up to `limit` parts of `options.fieldName` as
+ * `subarray` views of `buffer`. Returns null when the body is not shaped the way this scanner
+ * expects, so callers can fall back to Busboy.
+ */
+function scanMultipartFiles(
+  buffer: Buffer,
+  contentType: string,
+  options: ParseOptions,
+  limit: number
+): MultipartFile[] | null {
+  const boundary = getBoundary(contentType);
+  if (!boundary) {
+    return null;
+  }
+  const delimiter = Buffer.from(`--${boundary}`);
+  const partDelimiter = Buffer.concat([CRLF, delimiter]);
+
+  let pos = buffer.indexOf(delimiter);
+  if (pos < 0) {
+    return null;
+  }
+
+  const files: MultipartFile[] = [];
+  while (files.length < limit) {
+    pos += delimiter.length;
+    if (buffer[pos] === DASH && buffer[pos + 1] === DASH) {
+      break;
+    }
+    if (buffer[pos] !== CRLF[0] || buffer[pos + 1] !== CRLF[1]) {
+      return null;
+    }
+    pos += CRLF.length;
+
+    const headerEnd = buffer.indexOf(HEADER_SEPARATOR, pos);
+    if (headerEnd < 0) {
+      return null;
+    }
+    const headers = buffer.toString('utf8', pos, headerEnd);
+    const bodyStart = headerEnd + HEADER_SEPARATOR.length;
+    const bodyEnd = buffer.indexOf(partDelimiter, bodyStart);
+    if (bodyEnd < 0) {
+      return null;
+    }
+
+    const disposition = getHeaderValue(headers, 'content-disposition') ?? '';
+    const name = /(?:^|;)\s*name="([^"]*)"/i.exec(disposition)?.[1];
+    const filename = /filename="([^"]*)"/i.exec(disposition)?.[1];
+    if (name === options.fieldName && filename !== undefined) {
+      const size = bodyEnd - bodyStart;
+      if (size > options.maxBytes) {
+        throw new Error(`File exceeds max size of ${options.maxBytes} bytes`);
+      }
+      files.push({
+        fieldname: name,
+        filename: filename || 'upload',
+        mimeType: toMediaType(getHeaderValue(headers, 'content-type') ?? '') || 'application/octet-stream',
+        buffer: buffer.subarray(bodyStart, bodyEnd),
+        size
+      });
+    }
+
+    pos = bodyEnd + CRLF.length;
+  }
+  if (files.length === 0) {
+    throw new Error(`Missing file field: ${options.fieldName}`);
+  }
+  return files;
+}
+
+function assertFileCount(files: MultipartFile[], maxFiles: number): MultipartFile[] {
+  if (files.length > maxFiles) {
+    throw new Error(`Too many files: at most ${maxFiles} per request`);
+  }
+  return files;
+}
+
+/**
+ * Scans the multipart body in place and returns the file part as a `subarray` view of `buffer`.
+ * Returns null when the body is not shaped the way this scanner expects, so callers can fall back to Busboy.
+ */
+export function parseMultipartBuffer(buffer: Buffer, contentType: string, options: ParseOptions): MultipartFile | null {
+  return scanMultipartFiles(buffer, contentType, options, 1)?.[0] ?? null;
+}
+
+/** Every part of `options.fieldName`, in body order; more than `options.maxFiles` is an error. */
+export function parseMultipartFilesBuffer(
+  buffer: Buffer,
+  contentType: string,
+  options: MultiFileParseOptions
+): MultipartFile[] | null {
+  const files = scanMultipartFiles(buffer, contentType, options, options.maxFiles + 1);
+  return files ? assertFileCount(files, options.maxFiles) : null;
+}
 
+export async function parseMultipartFilesWithBusboy(
+  buffer: Buffer,
+  contentType: string,
+  options: MultiFileParseOptions
+): Promise<MultipartFile[]> {
   return new Promise((resolve, reject) => {
     const busboy = Busboy({ headers: { 'content-type': contentType } });
-    let fileFound = false;
-    let receivedFile: MultipartFile | null = null;
+    const receivedFiles: MultipartFile[] = [];
+    let pendingFiles = 0;
     let rejected = false;
+    const fail = (error: Error) => {
+      if (!rejected) {
+        rejected = true;
+        reject(error);
+      }
+    };
 
     busboy.on('file', (fieldname, file, info) => {
-      if (fieldname !== options.fieldName) {
+      if (fieldname !== options.fieldName || rejected) {
+        file.resume();
+        return;
+      }
+      pendingFiles += 1;
+      if (pendingFiles > options.maxFiles) {
         file.resume();
+        fail(new Error(`Too many files: at most ${options.maxFiles} per request`));
         return;
       }
-      fileFound = true;
+      const index = pendingFiles - 1;
       const chunks: Buffer[] = [];
       let total = 0;
 
@@ -45,22 +186,18 @@ export async function parseMultipartFile(
         if (total > options.maxBytes) {
           file.unpipe();
           file.resume();
-          if (!rejected) {
-            rejected = true;
-            reject(new Error(`File exceeds max size of ${options.maxBytes} bytes`));
-          }
+          fail(new Error(`File exceeds max size of ${options.maxBytes} bytes`));
           return;
         }
         chunks.push(data);
       });
 
       file.on('end', () => {
-        const fileBuffer = Buffer.concat(chunks);
-        receivedFile = {
+        receivedFiles[index] = {
           fieldname,
           filename: info.filename || 'upload',
-          mimeType: info.mimeType || 'application/octet-stream',
-          buffer: fileBuffer,
+          mimeType: toMediaType(info.mimeType ?? '') || 'application/octet-stream',
+          buffer: Buffer.concat(chunks),
           size: total
         };
       });
@@ -70,15 +207,101 @@ export async function parseMultipartFile(
       if (rejected) {
         return;
       }
-      if (!fileFound || !receivedFile) {
+      if (receivedFiles.length === 0) {
         reject(new Error(`Missing file field: ${options.fieldName}`));
         return;
       }
-      resolve(receivedFile);
+      resolve(receivedFiles);
     });
 
-    busboy.on('error', (error) => reject(error));
+    busboy.on('error', (error) => fail(error as Error));
 
     Readable.from(buffer).pipe(busboy);
   });
 }
+
+export async function parseMultipartWithBusboy(
+  buffer: Buffer,
+  contentType: string,
+  options: ParseOptions
+): Promise<MultipartFile> {
+  // Extra parts of the field are drained and ignored, as the in-place scanner does.
+  const files = await parseMultipartFilesWithBusboy(buffer, contentType, { ...options, maxFiles: Number.MAX_SAFE_INTEGER });
+  return files[0];
+}
+
+export async function parseMultipartFile(event: APIGatewayProxyEventV2, options: ParseOptions): Promise<MultipartFile> {
+  const contentType = getContentType(event);
+  const buffer = decodeBody(event);
+  return parseMultipartBuffer(buffer, contentType, options) ?? parseMultipartWithBusboy(buffer, contentType, options);
+}
+
+export async function parseMultipartFiles(
+  event: APIGatewayProxyEventV2,
+  options: MultiFileParseOptions
+): Promise<MultipartFile[]> {
+  const contentType = getContentType(event);
+  const buffer = decodeBody(event);
+  return (
+    parseMultipartFilesBuffer(buffer, contentType, options) ??
+    parseMultipartFilesWithBusboy(buffer, contentType, options)
+  );
+}
+
+function sniffImageMimeType(buffer: Buffer): string {
+  if (buffer.length >= 8 && buffer.readUInt32BE(0) === 0x89504e47 && buffer.readUInt32BE(4) === 0x0d0a1a0a) {
+    return 'image/png';
+  }
+  if (buffer.length >= 3 && buffer[0] === 0xff && buffer[1] === 0xd8 && buffer[2] === 0xff) {
+    return 'image/jpeg';
+  }
+  if (buffer.length >= 12 && buffer.toString('latin1', 0, 4) === 'RIFF' && buffer.toString('latin1', 8, 12) === 'WEBP') {
+    return 'image/webp';
+  }
+  return 'application/octet-stream';
+}
+
+function parseRawBody(event: APIGatewayProxyEventV2, mediaType: string, options: ParseOptions): MultipartFile {
+  const buffer = decodeBody(event);
+  if (buffer.length > options.maxBytes) {
+    throw new Error(`File exceeds max size of ${options.maxBytes} bytes`);
+  }
+  const filenameHeader = event.headers['x-filename'] || event.headers['X-Filename'];
+  return {
+    fieldname: options.fieldName,
+    filename: filenameHeader || 'upload',
+    mimeType: mediaType === 'application/octet-stream' ? sniffImageMimeType(buffer) : mediaType,
+    buffer,
+    size: buffer.length
+  };
+}
+
+/**
+ * Accepts either `multipart/form-data` or a raw `image/*` / `application/octet-stream` body.
+ * Raw bodies skip multipart parsing entirely; the decoded request body is used as the file buffer.
+ */
+export async function parseUploadedFile(event: APIGatewayProxyEventV2, options: ParseOptions): Promise<MultipartFile> {
+  const contentType = getContentType(event);
+  const mediaType = toMediaType(contentType);
+
+  if (RAW_BODY_MIME_PATTERN.test(mediaType)) {
+    return parseRawBody(event, mediaType, options);
+  }
+
+  return parseMultipartFile(event, options);
+}
+
+/** Like `parseUploadedFile`, but a multipart body may repeat the file field up to `options.maxFiles` times. */
+export async function parseUploadedFiles(
+  event: APIGatewayProxyEventV2,
+  options: MultiFileParseOptions
+): Promise<MultipartFile[]> {
+  const contentType = getContentType(event);
+  const mediaType = toMediaType(contentType);
+
+  if (RAW_BODY_MIME_PATTERN.test(mediaType)) {
+    return [parseRawBody(event, mediaType, options)];
+  }
+
+  return parseMultipartFiles(event, options);
+}
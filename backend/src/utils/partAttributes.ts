@@ -0,0 +1,79 @@
+import type { PartAttributes } from '../types/metadata';
+import type { VectorMetadataFilter } from '../types/providers';
+
+const MAX_ATTRIBUTE_LENGTH = 128;
+const MAX_FILTER_VALUES = 10;
+
+/** /search query parameter -> vector metadata field. */
+const FILTER_FIELDS: Record<string, string> = {
+  family: 'family',
+  manufacturer: 'manufacturer',
+  // Representative vectors list every view they stand in for, so aliased views still match.
+  view: 'views'
+};
+
+export function normalizeAttributeValue(value: unknown): string | undefined {
+  if (typeof value !== 'string') {
+    return undefined;
+  }
+  const normalized = value.trim().toLowerCase().replace(/\s+/g, ' ');
+  return normalized && normalized.length <= MAX_ATTRIBUTE_LENGTH ? normalized : undefined;
+}
+
+export function isPartAttributes(value: unknown): value is PartAttributes {
+  if (!value || typeof value !== 'object') {
+    return false;
+  }
+  return ['family', 'manufacturer', 'sourceFile'].every((field) => {
+    const fieldValue = (value as Record<string, unknown>)[field];
+    return fieldValue === undefined || typeof fieldValue === 'string';
+  });
+}
+
+/** Drops empty fields and normalizes family/manufacturer; `sourceFile` keeps its case. */
+export function cleanPartAttributes(attributes: PartAttributes): PartAttributes {
+  const cleaned: PartAttributes = {};
+  const family = normalizeAttributeValue(attributes.family);
+  const manufacturer = normalizeAttributeValue(attributes.manufacturer);
+  if (family) {
+    cleaned.family = family;
+  }
+  if (manufacturer) {
+    cleaned.manufacturer = manufacturer;
+  }
+  if (attributes.sourceFile && attributes.sourceFile.trim()) {
+    cleaned.sourceFile = attributes.sourceFile.trim();
+  }
+  return cleaned;
+}
+
+/**
+ * Builds a vector filter from `/search` query parameters (`family`, `manufacturer`, `view`).
+ * Comma-separated values match any of them. Returns null when no filter was requested.
+ */
+export function parseSearchFilter(
+  query: Record<string, string | undefined> | undefined
+): VectorMetadataFilter | null {
+  const filter: VectorMetadataFilter = {};
+  for (const [param, field] of Object.entries(FILTER_FIELDS)) {
+    const raw = query?.[param];
+    if (raw === undefined || raw.trim() === '') {
+      continue;
+    }
+    const values = raw.split(',').map((value) => normalizeAttributeValue(value));
+    if (values.length > MAX_FILTER_VALUES || values.some((value) => value === undefined)) {
+      throw new Error(`Invalid search filter: ${param}`);
+    }
+    filter[field] = Array.from(new Set(values as string[]));
+  }
+  return Object.keys(filter).length > 0 ? filter : null;
+}
+
+export function describeFilter(filter: VectorMetadataFilter | null): string {
+  if (!filter) {
+    return 'none';
+  }
+  return Object.entries(filter)
+    .map(([field, values]) => `${field}=${values.join('|')}`)
+    .join(',');
+}
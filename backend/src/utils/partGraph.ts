@@ -0,0 +1,205 @@
+import type { PartNeighbor } from '../types/metadata';
+
+// Part-to-part k-nearest-neighbour graph over part centroids (mean of a part's view embeddings).
+// Built at index time so "similar parts" is a key lookup at request time.
+
+export const DEFAULT_SIMILAR_K = 10;
+export const PART_GRAPH_VERSION = 1;
+// Rows scored together: the block of row vectors stays in cache while every column streams past.
+const ROW_BLOCK = 32;
+
+/** Persisted between indexing runs so the graph can be refreshed for changed parts only. */
+export type PartGraphState = {
+  version: number;
+  dims: number;
+  k: number;
+  updatedAt: string;
+  parts: Record<string, { vector: string; neighbors: PartNeighbor[] }>;
+};
+
+export type PartGraphRefresh = {
+  state: PartGraphState;
+  /** Parts whose neighbour list changed and must be rewritten. */
+  changed: string[];
+  /** Parts dropped from the graph. */
+  removed: string[];
+  /** Rows scored against the whole catalog (all parts on a full rebuild). */
+  rowsScored: number;
+  fullRebuild: boolean;
+};
+
+/** L2-normalised mean of a part's (already normalised) view embeddings. */
+export function partCentroid(embeddings: number[][]): number[] {
+  const dims = embeddings[0]?.length ?? 0;
+  const sum = new Array<number>(dims).fill(0);
+  for (const embedding of embeddings) {
+    for (let d = 0; d < dims; d += 1) {
+      sum[d] += embedding[d];
+    }
+  }
+  const norm = Math.sqrt(sum.reduce((acc, value) => acc + value * value, 0)) || 1;
+  return sum.map((value) => value / norm);
+}
+
+export function encodeVector(vector: ArrayLike<number>): string {
+  return Buffer.from(Float32Array.from(vector).buffer).toString('base64');
+}
+
+export function decodeVector(encoded: string): Float32Array {
+  const bytes = Buffer.from(encoded, 'base64');
+  return new Float32Array(bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength));
+}
+
+export function isPartGraphState(value: unknown): value is PartGraphState {
+  if (!value || typeof value !== 'object') {
+    return false;
+  }
+  const state = value as Record<string, unknown>;
+  return (
+    state.version === PART_GRAPH_VERSION &&
+    typeof state.dims === 'number' &&
+    typeof state.k === 'number' &&
+    Boolean(state.parts) &&
+    typeof state.parts === 'object'
+  );
+}
+
+/**
+ * Scores `rows` against every part in one blocked pass over a contiguous row-major matrix and
+ * reports each (row, column, cosine) pair except the diagonal.
+ */
+function scoreRows(
+  matrix: Float32Array,
+  dims: number,
+  count: number,
+  rows: number[],
+  visit: (row: number, column: number, score: number) => void
+): void {
+  const scores = new Float32Array(ROW_BLOCK);
+  for (let start = 0; start < rows.length; start += ROW_BLOCK) {
+    const block = rows.slice(start, start + ROW_BLOCK);
+    for (let column = 0; column < count; column += 1) {
+      const columnOffset = column * dims;
+      scores.fill(0);
+      for (let b = 0; b < block.length; b += 1) {
+        const rowOffset = block[b] * dims;
+        let dot = 0;
+        for (let d = 0; d < dims; d += 1) {
+          dot += matrix[rowOffset + d] * matrix[columnOffset + d];
+        }
+        scores[b] = dot;
+      }
+      for (let b = 0; b < block.length; b += 1) {
+        if (block[b] !== column) {
+          visit(block[b], column, scores[b]);
+        }
+      }
+    }
+  }
+}
+
+/** Inserts into a list kept sorted by descending score and capped at `k`; returns whether it changed. */
+function offerNeighbor(list: PartNeighbor[], candidate: PartNeighbor, k: number): boolean {
+  if (list.length >= k && candidate.score <= list[list.length - 1].score) {
+    return false;
+  }
+  let index = list.length;
+  while (index > 0 && list[index - 1].score < candidate.score) {
+    index -= 1;
+  }
+  list.splice(index, 0, candidate);
+  if (list.length > k) {
+    list.pop();
+  }
+  return true;
+}
+
+function roundScore(score: number): number {
+  return Math.round(score * 1e6) / 1e6;
+}
+
+/**
+ * Applies new or changed part vectors (and removals) to a previous graph.
+ *
+ * Changed parts get a full row. Unchanged parts keep their list. The symmetric scores from the
+ * changed rows show whether a changed part now enters an unchanged part's top-k. Only unchanged
+ * parts whose list referenced a changed or removed part are rescored in full, because that
+ * neighbour may have moved away. Updates whose vector matches the stored one are ignored. A
+ * different `k` rescores every row from the stored vectors; a different embedding size drops the
+ * previous parts, whose vectors can no longer be compared.
+ */
+export function refreshPartGraph(
+  previous: PartGraphState | null,
+  updates: Map<string, number[]>,
+  removedIds: Iterable<string>,
+  k: number
+): PartGraphRefresh {
+  const dims = updates.values().next().value?.length ?? previous?.dims ?? 0;
+  const previousParts = previous && previous.dims === dims ? previous.parts : {};
+  const keepNeighbors = previous !== null && previous.dims === dims && previous.k === k;
+  // Re-indexing an unchanged part reproduces its centroid; that is not a change to the graph.
+  const updated = keepNeighbors
+    ? new Map(Array.from(updates).filter(([partId, vector]) => previousParts[partId]?.vector !== encodeVector(vector)))
+    : updates;
+  const removed = new Set(Array.from(removedIds).filter((id) => !updates.has(id) && previousParts[id]));
+  if (previous && previous.dims !== dims) {
+    Object.keys(previous.parts)
+      .filter((id) => !updates.has(id))
+      .forEach((id) => removed.add(id));
+  }
+
+  const ids: string[] = [];
+  const vectors: ArrayLike<number>[] = [];
+  for (const [partId, entry] of Object.entries(previousParts)) {
+    if (!updated.has(partId) && !removed.has(partId)) {
+      ids.push(partId);
+      vectors.push(decodeVector(entry.vector));
+    }
+  }
+  for (const [partId, vector] of updated) {
+    ids.push(partId);
+    vectors.push(vector);
+  }
+  const matrix = new Float32Array(ids.length * dims);
+  vectors.forEach((vector, index) => matrix.set(vector, index * dims));
+
+  const neighbors: PartNeighbor[][] = ids.map((id) =>
+    keepNeighbors && !updated.has(id) ? previousParts[id].neighbors.map((neighbor) => ({ ...neighbor })) : []
+  );
+  const dirty = new Set<string>([...updated.keys(), ...removed]);
+  const fullRows = new Set<number>();
+  ids.forEach((id, index) => {
+    if (!keepNeighbors || updated.has(id) || neighbors[index].some((neighbor) => dirty.has(neighbor.partId))) {
+      fullRows.add(index);
+      neighbors[index] = [];
+    }
+  });
+  const changed = new Set<number>(fullRows);
+
+  const rows = Array.from(fullRows);
+  scoreRows(matrix, dims, ids.length, rows, (row, column, score) => {
+    offerNeighbor(neighbors[row], { partId: ids[column], score: roundScore(score) }, k);
+    // Symmetry: a changed row's score is also the column part's score for it.
+    if (!fullRows.has(column) && updated.has(ids[row])) {
+      if (offerNeighbor(neighbors[column], { partId: ids[row], score: roundScore(score) }, k)) {
+        changed.add(column);
+      }
+    }
+  });
+
+  const parts: PartGraphState['parts'] = {};
+  ids.forEach((id, index) => {
+    parts[id] = {
+      vector: updated.has(id) ? encodeVector(vectors[index]) : previousParts[id].vector,
+      neighbors: neighbors[index]
+    };
+  });
+
+  return {
+    state: { version: PART_GRAPH_VERSION, dims, k, updatedAt: new Date().toISOString(), parts },
+    changed: Array.from(changed, (index) => ids[index]),
+    removed: Array.from(removed),
+    rowsScored: rows.length,
+    fullRebuild: !keepNeighbors
+  };
+}
@@ -0,0 +1,10 @@
+// No imports: scripts that must not initialize the logger (see eval_retrieval.ts) use this directly.
+
+/** Nearest-rank percentile of an ascending-sorted list; 0 for an empty list. */
+export function percentile(sorted: number[], p: number): number {
+  if (sorted.length === 0) {
+    return 0;
+  }
+  const idx = Math.min(sorted.length - 1, Math.max(0, Math.ceil((p / 100) * sorted.length) - 1));
+  return sorted[idx];
+}
@@ -0,0 +1,107 @@
+// Part ranking used by /search, shared with the offline retrieval evaluation so tuning runs
+// score exactly what production returns.
+
+export type RankingOptions = {
+  /** Vector matches requested per query. */
+  topK: number;
+  /** Weight of a part's best view score; the mean view score gets the remainder. */
+  bestScoreWeight: number;
+  /** Parts below this aggregate score are dropped unless none qualify. */
+  minPartScore: number;
+  /** Parts returned to the client. */
+  maxParts: number;
+};
+
+export const DEFAULT_RANKING_OPTIONS: RankingOptions = {
+  topK: 20,
+  bestScoreWeight: 0.7,
+  minPartScore: 0.72,
+  maxParts: 5
+};
+
+export type RankableMatch = {
+  partId: string;
+  score: number;
+  shape: number[] | null;
+};
+
+export type PartAggregate<T extends RankableMatch> = {
+  partId: string;
+  bestScore: number;
+  totalScore: number;
+  count: number;
+  bestCandidate: T;
+  shape: number[] | null;
+  aggregateScore: number;
+};
+
+/**
+ * Merges the match lists of several query photos of one part into a single list, keeping each
+ * vector's best score, and cuts it back to `topK`. A view that any photo matched well counts once
+ * at that score. Keeping only the best `topK` means `aggregateByPart` scores parts over as many
+ * matches as for one photo, so the thresholds tuned on single-photo lists still apply.
+ */
+export function fuseQueryMatches<T extends { id: string; score: number }>(lists: T[][], topK: number): T[] {
+  const best = new Map<string, T>();
+  for (const list of lists) {
+    for (const match of list) {
+      const existing = best.get(match.id);
+      if (!existing || match.score > existing.score) {
+        best.set(match.id, match);
+      }
+    }
+  }
+  return Array.from(best.values())
+    .sort((a, b) => b.score - a.score)
+    .slice(0, topK);
+}
+
+/** Groups view matches by part and scores each part, best first. */
+export function aggregateByPart<T extends RankableMatch>(candidates: T[], bestScoreWeight: number): PartAggregate<T>[] {
+  const grouped = new Map<string, Omit<PartAggregate<T>, 'aggregateScore'>>();
+  for (const candidate of candidates) {
+    const existing = grouped.get(candidate.partId);
+    if (!existing) {
+      grouped.set(candidate.partId, {
+        partId: candidate.partId,
+        bestScore: candidate.score,
+        totalScore: candidate.score,
+        count: 1,
+        bestCandidate: candidate,
+        shape: candidate.shape
+      });
+      continue;
+    }
+    existing.totalScore += candidate.score;
+    existing.count += 1;
+    existing.shape = existing.shape ?? candidate.shape;
+    if (candidate.score > existing.bestScore) {
+      existing.bestScore = candidate.score;
+      existing.bestCandidate = candidate;
+    }
+  }
+
+  return Array.from(grouped.values())
+    .map((part) => {
+      const meanScore = part.totalScore / part.count;
+      const aggregateScore = part.bestScore * bestScoreWeight + meanScore * (1 - bestScoreWeight);
+      return { ...part, aggregateScore };
+    })
+    .sort((a, b) => b.aggregateScore - a.aggregateScore);
+}
+
+/**
+ * Applies the score threshold and result cap. When no part clears the threshold the top parts
+ * are returned anyway, so a search always has something to show.
+ */
+export function selectParts<T extends { aggregateScore: number }>(
+  aggregated: T[],
+  minPartScore: number,
+  maxParts: number
+): { parts: T[]; qualified: number } {
+  const qualified = aggregated.filter((item) => item.aggregateScore >= minPartScore).slice(0, maxParts);
+  return {
+    parts: qualified.length > 0 ? qualified : aggregated.slice(0, maxParts),
+    qualified: qualified.length
+  };
+}
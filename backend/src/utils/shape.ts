@@ -0,0 +1,104 @@
+import type { ShapeDescriptor } from '../types/metadata';
+
+/** Pinecone metadata key holding the comma-separated descriptor vector. */
+export const SHAPE_METADATA_KEY = 'shape';
+const SHAPE_VECTOR_LENGTH = 7;
+
+export function isShapeDescriptor(value: unknown): value is ShapeDescriptor {
+  if (!value || typeof value !== 'object') {
+    return false;
+  }
+  const vector = (value as { vector?: unknown }).vector;
+  return (
+    Array.isArray(vector) &&
+    vector.length === SHAPE_VECTOR_LENGTH &&
+    vector.every((component) => typeof component === 'number' && Number.isFinite(component))
+  );
+}
+
+export function encodeShapeVector(descriptor: ShapeDescriptor): string {
+  return descriptor.vector.map((component) => Number(component.toFixed(4))).join(',');
+}
+
+export function parseShapeVector(value: string | undefined): number[] | null {
+  if (!value) {
+    return null;
+  }
+  const vector = value.split(',').map((component) => Number.parseFloat(component));
+  if (vector.length !== SHAPE_VECTOR_LENGTH || vector.some((component) => !Number.isFinite(component))) {
+    return null;
+  }
+  return vector;
+}
+
+/** Euclidean distance scaled to [0, 1] for unit-range vectors of equal length. */
+export function shapeDistance(a: number[], b: number[]): number {
+  let sum = 0;
+  for (let i = 0; i < a.length; i += 1) {
+    const delta = a[i] - b[i];
+    sum += delta * delta;
+  }
+  return Math.sqrt(sum / a.length);
+}
+
+export type ShapeRerankOptions = {
+  /** Score penalty per unit of shape distance from the consensus. */
+  weight: number;
+  /** Parts further than this from the consensus are dropped; undefined disables pruning. */
+  maxDistance?: number;
+  /** Number of top visual parts whose descriptors form the consensus. */
+  consensusSize: number;
+};
+
+export type ShapeRankedPart = {
+  aggregateScore: number;
+  shape: number[] | null;
+};
+
+/**
+ * Reorders visually ranked parts by agreement with the geometry of the strongest matches.
+ *
+ * The consensus is the score-weighted mean descriptor of the top `consensusSize` parts that have
+ * one; every other part is penalised by its distance from it. Parts without descriptors keep their
+ * visual score and are never pruned. Input must already be sorted by `aggregateScore`.
+ */
+export function rerankByShape<T extends ShapeRankedPart>(
+  parts: T[],
+  options: ShapeRerankOptions
+): { parts: T[]; pruned: number } {
+  const consensusParts = parts.filter((part) => part.shape).slice(0, Math.max(1, options.consensusSize));
+  if (consensusParts.length === 0) {
+    return { parts, pruned: 0 };
+  }
+
+  const consensus = new Array<number>(SHAPE_VECTOR_LENGTH).fill(0);
+  let totalWeight = 0;
+  for (const part of consensusParts) {
+    const weight = Math.max(part.aggregateScore, 1e-6);
+    totalWeight += weight;
+    (part.shape as number[]).forEach((component, index) => {
+      consensus[index] += component * weight;
+    });
+  }
+  for (let i = 0; i < consensus.length; i += 1) {
+    consensus[i] /= totalWeight;
+  }
+
+  let pruned = 0;
+  const ranked: Array<{ part: T; rankScore: number }> = [];
+  for (const part of parts) {
+    if (!part.shape) {
+      ranked.push({ part, rankScore: part.aggregateScore });
+      continue;
+    }
+    const distance = shapeDistance(part.shape, consensus);
+    if (options.maxDistance !== undefined && distance > options.maxDistance) {
+      pruned += 1;
+      continue;
+    }
+    ranked.push({ part, rankScore: part.aggregateScore - options.weight * distance });
+  }
+
+  ranked.sort((a, b) => b.rankScore - a.rankScore);
+  return { parts: ranked.map((entry) => entry.part), pruned };
+}
@@ -0,0 +1,54 @@
+export type ViewEmbedding = {
+  view: string;
+  embedding: number[];
+};
+
+export type ViewCluster = {
+  /** View whose vector is stored in the index. */
+  representative: ViewEmbedding;
+  /** Views folded into the representative, in input order. */
+  aliases: string[];
+};
+
+export function cosineSimilarity(a: number[], b: number[]): number {
+  let dot = 0;
+  let normA = 0;
+  let normB = 0;
+  for (let i = 0; i < a.length; i += 1) {
+    dot += a[i] * b[i];
+    normA += a[i] * a[i];
+    normB += b[i] * b[i];
+  }
+  if (normA === 0 || normB === 0) {
+    return 0;
+  }
+  return dot / Math.sqrt(normA * normB);
+}
+
+/**
+ * Greedy leader clustering of one part's view embeddings.
+ *
+ * Views are visited in input order; each joins the most similar existing representative when the
+ * cosine similarity reaches `threshold`, otherwise it becomes a new representative. Input order
+ * therefore decides which view of a symmetric pair is kept (e.g. `top` over `bottom`).
+ */
+export function clusterViewEmbeddings(views: ViewEmbedding[], threshold: number): ViewCluster[] {
+  const clusters: ViewCluster[] = [];
+  for (const view of views) {
+    let best: ViewCluster | null = null;
+    let bestSimilarity = -Infinity;
+    for (const cluster of clusters) {
+      const similarity = cosineSimilarity(view.embedding, cluster.representative.embedding);
+      if (similarity > bestSimilarity) {
+        best = cluster;
+        bestSimilarity = similarity;
+      }
+    }
+    if (best && bestSimilarity >= threshold) {
+      best.aliases.push(view.view);
+    } else {
+      clusters.push({ representative: view, aliases: [] });
+    }
+  }
+  return clusters;
+}
@@ -0,0 +1,56 @@
+// The backend CLIP model resizes the shortest edge to 224px, so anything larger is wasted upload.
+// A small margin keeps the server-side center crop from resampling an already-resampled edge.
+const TARGET_SHORT_EDGE = 256;
+const OUTPUT_MIME_TYPE = 'image/jpeg';
+const OUTPUT_QUALITY = 0.9;
+
+async function canvasToBlob(width: number, height: number, bitmap: ImageBitmap): Promise<Blob | null> {
+  if (typeof OffscreenCanvas !== 'undefined') {
+    const canvas = new OffscreenCanvas(width, height);
+    const context = canvas.getContext('2d');
+    if (!context) {
+      return null;
+    }
+    context.drawImage(bitmap, 0, 0, width, height);
+    return canvas.convertToBlob({ type: OUTPUT_MIME_TYPE, quality: OUTPUT_QUALITY });
+  }
+
+  const canvas = document.createElement('canvas');
+  canvas.width = width;
+  canvas.height = height;
+  const context = canvas.getContext('2d');
+  if (!context) {
+    return null;
+  }
+  context.drawImage(bitmap, 0, 0, width, height);
+  return new Promise((resolve) => canvas.toBlob(resolve, OUTPUT_MIME_TYPE, OUTPUT_QUALITY));
+}
+
+export async function resizeImageForUpload(file: File): Promise<File> {
+  if (typeof createImageBitmap !== 'function') {
+    return file;
+  }
+
+  try {
+    const bitmap = await createImageBitmap(file);
+    try {
+      const scale = TARGET_SHORT_EDGE / Math.min(bitmap.width, bitmap.height);
+      if (scale >= 1) {
+        return file;
+      }
+      const width = Math.max(1, Math.round(bitmap.width * scale));
+      const height = Math.max(1, Math.round(bitmap.height * scale));
+      const blob = await canvasToBlob(width, height, bitmap);
+      if (!blob || blob.size >= file.size) {
+        return file;
+      }
+      const baseName = file.name.replace(/\.[^.]+$/, '') || 'upload';
+      return new File([blob], `${baseName}.jpg`, { type: OUTPUT_MIME_TYPE });
+    } finally {
+      bitmap.close();
+    }
+  } catch {
+    // Unsupported formats (e.g. HEIC on some browsers) are uploaded as-is.
+    return file;
+  }
+}
@@ -1,4 +1,5 @@
-﻿import { useEffect, useMemo, useState } from 'react';
+﻿import { useEffect, useMemo, useRef, useState } from 'react';
+import { resizeImageForUpload } from '../lib/resizeImage';
 
 type Match = {
   id: string;
@@ -7,6 +8,20 @@ type Match = {
   view: string;
   label: string;
   signedImageUrl: string;
+  tile?: AtlasTile;
+};
+
+type AtlasTile = {
+  x: number;
+  y: number;
+  width: number;
+  height: number;
+};
+
+type CandidateAtlas = {
+  signedUrl: string;
+  width: number;
+  height: number;
 };
 
 type ModelCandidate = {
@@ -14,17 +29,50 @@ type ModelCandidate = {
   model: string;
   aggregateScore: number;
   views: Match[];
+  atlas?: CandidateAtlas;
+};
+
+type PendingCandidate = {
+  partId: string;
+  model: string;
+  aggregateScore: number;
 };
 
+type CandidatePage = {
+  modelCandidate: ModelCandidate | null;
+  cursor: string | null;
+};
+
+// Matches MAX_UPLOAD_FILES in the backend search handler.
+const MAX_QUERY_PHOTOS = 6;
+
+// Percent-based sprite offsets scale with the card, so the same atlas serves every card width.
+function spriteStyle(atlas: CandidateAtlas, tile: AtlasTile) {
+  const offset = (position: number, size: number, total: number) =>
+    total > size ? `${(position / (total - size)) * 100}%` : '0%';
+  return {
+    aspectRatio: `${tile.width} / ${tile.height}`,
+    backgroundImage: `url("${atlas.signedUrl}")`,
+    backgroundSize: `${(atlas.width / tile.width) * 100}% ${(atlas.height / tile.height) * 100}%`,
+    backgroundPosition: `${offset(tile.x, tile.width, atlas.width)} ${offset(tile.y, tile.height, atlas.height)}`
+  };
+}
+
 export default function Home() {
-  const [selectedFile, setSelectedFile] = useState<File | null>(null);
+  const [selectedFiles, setSelectedFiles] = useState<File[]>([]);
   const [selectedPreviewUrl, setSelectedPreviewUrl] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const [modelCandidates, setModelCandidates] = useState<ModelCandidate[]>([]);
+  const [pendingCandidates, setPendingCandidates] = useState<PendingCandidate[]>([]);
+  const [isLoadingNext, setIsLoadingNext] = useState(false);
   const [activeModelIndex, setActiveModelIndex] = useState(0);
   const [shownModelIndexes, setShownModelIndexes] = useState<number[]>([]);
   const [feedbackMessage, setFeedbackMessage] = useState('');
-  const canSearch = Boolean(selectedFile) && !isLoading;
+  const cursorRef = useRef<string | null>(null);
+  const prefetchRef = useRef<Promise<ModelCandidate | null> | null>(null);
+  const searchGenerationRef = useRef(0);
+  const canSearch = selectedFiles.length > 0 && !isLoading;
+  const totalCandidates = modelCandidates.length + pendingCandidates.length;
 
   const apiBaseUrl = useMemo(
     () => (process.env.NEXT_PUBLIC_API_BASE_URL?.trim() || 'http://localhost:3001'),
@@ -36,19 +84,36 @@ export default function Home() {
     }
     return new URL('/search', apiBaseUrl).toString();
   }, [apiBaseUrl]);
-
-  const handleFileChange = (file: File | null) => {
-    if (selectedPreviewUrl) {
-      URL.revokeObjectURL(selectedPreviewUrl);
+  const candidatesUrl = useMemo(() => {
+    if (!apiBaseUrl) {
+      return '';
     }
-    setSelectedFile(file);
-    setSelectedPreviewUrl(file ? URL.createObjectURL(file) : '');
+    return new URL('/search/candidates', apiBaseUrl).toString();
+  }, [apiBaseUrl]);
+
+  const resetCandidates = () => {
+    searchGenerationRef.current += 1;
+    cursorRef.current = null;
+    prefetchRef.current = null;
     setModelCandidates([]);
+    setPendingCandidates([]);
+    setIsLoadingNext(false);
     setActiveModelIndex(0);
     setShownModelIndexes([]);
     setFeedbackMessage('');
   };
 
+  const handleFilesChange = (fileList: FileList | null) => {
+    if (selectedPreviewUrl) {
+      URL.revokeObjectURL(selectedPreviewUrl);
+    }
+    // Several angles of the same part go into one search; the first one is previewed.
+    const files = Array.from(fileList ?? []).slice(0, MAX_QUERY_PHOTOS);
+    setSelectedFiles(files);
+    setSelectedPreviewUrl(files.length > 0 ? URL.createObjectURL(files[0]) : '');
+    resetCandidates();
+  };
+
   useEffect(() => {
     return () => {
       if (selectedPreviewUrl) {
@@ -57,17 +122,61 @@ export default function Home() {
     };
   }, [selectedPreviewUrl]);
 
-  const revealModelAtIndex = (index: number, candidates: ModelCandidate[]) => {
-    const boundedIndex = Math.max(0, Math.min(index, Math.max(0, candidates.length - 1)));
-    if (!candidates[boundedIndex]) {
+  const revealModelAtIndex = (index: number, hydratedCount: number) => {
+    if (hydratedCount <= 0) {
       return;
     }
+    const boundedIndex = Math.max(0, Math.min(index, hydratedCount - 1));
     setActiveModelIndex(boundedIndex);
     setShownModelIndexes((prev) => (prev.includes(boundedIndex) ? prev : [...prev, boundedIndex]));
   };
 
+  // Hydrates the next pending candidate in the background so "No" can reveal it immediately.
+  const prefetchNextCandidate = (): Promise<ModelCandidate | null> => {
+    if (prefetchRef.current) {
+      return prefetchRef.current;
+    }
+    const cursor = cursorRef.current;
+    if (!cursor || !candidatesUrl) {
+      return Promise.resolve(null);
+    }
+
+    const generation = searchGenerationRef.current;
+    const request = (async () => {
+      try {
+        const url = new URL(candidatesUrl);
+        url.searchParams.set('cursor', cursor);
+        const response = await fetch(url.toString());
+        if (!response.ok) {
+          return null;
+        }
+        const payload = (await response.json()) as CandidatePage;
+        if (generation !== searchGenerationRef.current) {
+          return null;
+        }
+        cursorRef.current = payload.cursor || null;
+        const candidate = payload.modelCandidate;
+        if (candidate) {
+          setModelCandidates((prev) => [...prev, candidate]);
+          setPendingCandidates((prev) => prev.slice(1));
+        } else {
+          setPendingCandidates([]);
+        }
+        return candidate;
+      } catch {
+        return null;
+      } finally {
+        if (generation === searchGenerationRef.current) {
+          prefetchRef.current = null;
+        }
+      }
+    })();
+    prefetchRef.current = request;
+    return request;
+  };
+
   const handleSearch = async () => {
-    if (!selectedFile) {
+    if (selectedFiles.length === 0) {
       return;
     }
     if (!searchUrl) {
@@ -75,14 +184,15 @@ export default function Home() {
     }
 
     setIsLoading(true);
-    setModelCandidates([]);
-    setActiveModelIndex(0);
-    setShownModelIndexes([]);
-    setFeedbackMessage('');
+    resetCandidates();
+    const generation = searchGenerationRef.current;
 
     try {
+      const uploadFiles = await Promise.all(selectedFiles.map(resizeImageForUpload));
       const formData = new FormData();
-      formData.append('file', selectedFile);
+      for (const uploadFile of uploadFiles) {
+        formData.append('file', uploadFile);
+      }
 
       const response = await fetch(searchUrl, {
         method: 'POST',
@@ -93,10 +203,23 @@ export default function Home() {
         return;
       }
       const payload = await response.json();
+      if (generation !== searchGenerationRef.current) {
+        return;
+      }
       const candidates = (payload.modelCandidates || []) as ModelCandidate[];
       setModelCandidates(candidates);
+      setPendingCandidates((payload.pendingCandidates || []) as PendingCandidate[]);
+      cursorRef.current = (payload.cursor as string | null) || null;
       if (candidates.length > 0) {
-        revealModelAtIndex(0, candidates);
+        revealModelAtIndex(0, candidates.length);
+        void prefetchNextCandidate();
+      } else if (cursorRef.current) {
+        // Degraded response (ranking without hydration): hydrate the first candidate separately.
+        const first = await prefetchNextCandidate();
+        if (first && generation === searchGenerationRef.current) {
+          revealModelAtIndex(0, 1);
+          void prefetchNextCandidate();
+        }
       }
     } catch {
       // Keep UI clean; inspect backend terminal for detailed diagnostics.
@@ -105,20 +228,40 @@ export default function Home() {
     }
   };
 
-  const handleModelFeedback = (isCorrect: boolean) => {
+  const handleModelFeedback = async (isCorrect: boolean) => {
     if (isCorrect) {
       setFeedbackMessage('We are glad to help.');
       return;
     }
 
     const nextIndex = activeModelIndex + 1;
-    if (nextIndex >= modelCandidates.length) {
+    if (nextIndex >= totalCandidates) {
       setFeedbackMessage('No other strong model candidates are available.');
       return;
     }
 
-    revealModelAtIndex(nextIndex, modelCandidates);
-    setFeedbackMessage(`Showing next model candidate (${nextIndex + 1}/${modelCandidates.length}).`);
+    let hydratedCount = modelCandidates.length;
+    if (nextIndex >= hydratedCount) {
+      const generation = searchGenerationRef.current;
+      setIsLoadingNext(true);
+      setFeedbackMessage('Loading next model candidate...');
+      const candidate = await prefetchNextCandidate();
+      if (generation !== searchGenerationRef.current) {
+        return;
+      }
+      setIsLoadingNext(false);
+      if (!candidate) {
+        setFeedbackMessage('No other strong model candidates are available.');
+        return;
+      }
+      hydratedCount += 1;
+    }
+
+    revealModelAtIndex(nextIndex, hydratedCount);
+    setFeedbackMessage(`Showing next model candidate (${nextIndex + 1}/${totalCandidates}).`);
+    if (nextIndex + 1 >= hydratedCount) {
+      void prefetchNextCandidate();
+    }
   };
 
   const shownCandidates = shownModelIndexes
@@ -138,9 +281,11 @@ export default function Home() {
 
         {selectedPreviewUrl ? (
           <section className="query-preview">
-            <p className="query-preview-title">Uploaded Query Image</p>
+            <p className="query-preview-title">
+              {selectedFiles.length > 1 ? `Uploaded Query Images (${selectedFiles.length})` : 'Uploaded Query Image'}
+            </p>
             <div className="query-preview-image">
-              <img src={selectedPreviewUrl} alt={selectedFile?.name ?? 'Uploaded query image'} />
+              <img src={selectedPreviewUrl} alt={selectedFiles[0]?.name ?? 'Uploaded query image'} />
             </div>
           </section>
         ) : null}
@@ -151,22 +296,24 @@ export default function Home() {
             onDragOver={(event) => event.preventDefault()}
             onDrop={(event) => {
               event.preventDefault();
-              const file = event.dataTransfer.files?.[0] ?? null;
-              handleFileChange(file);
+              handleFilesChange(event.dataTransfer.files);
             }}
           >
             <div className="upload-icon">+</div>
             <div>
               <p className="upload-title">Drag & drop your part image</p>
-              <p className="upload-subtitle">or click to choose a file</p>
-              {selectedFile ? <p className="upload-file">{selectedFile.name}</p> : null}
+              <p className="upload-subtitle">or click to choose files (up to {MAX_QUERY_PHOTOS} angles of one part)</p>
+              {selectedFiles.length > 0 ? (
+                <p className="upload-file">{selectedFiles.map((file) => file.name).join(', ')}</p>
+              ) : null}
             </div>
             <input
               className="file-input"
               type="file"
               accept="image/*"
-              onChange={(event) => handleFileChange(event.target.files?.[0] ?? null)}
-              aria-label="Choose image file"
+              multiple
+              onChange={(event) => handleFilesChange(event.target.files)}
+              aria-label="Choose image files"
             />
           </label>
           <button
@@ -187,7 +334,7 @@ export default function Home() {
               {isLoading
                 ? 'Searching'
                 : shownCandidates.length
-                  ? `${totalShownViews} views | showing ${shownCandidates.length}/${Math.max(modelCandidates.length, 1)} models`
+                  ? `${totalShownViews} views | showing ${shownCandidates.length}/${Math.max(totalCandidates, 1)} models`
                   : 'Awaiting upload'}
             </span>
           </div>
@@ -207,9 +354,19 @@ export default function Home() {
                   <div className="results-grid">
                     {candidate.views.map((match) => (
                       <article key={match.id} className="result-card">
-                        <div className="result-image">
-                          <img src={match.signedImageUrl} alt={match.label} />
-                        </div>
+                        {/* Sprites come from the candidate's single atlas; the full-resolution view opens on click. */}
+                        <a className="result-image" href={match.signedImageUrl} target="_blank" rel="noreferrer">
+                          {candidate.atlas && match.tile ? (
+                            <div
+                              className="result-sprite"
+                              role="img"
+                              aria-label={match.label}
+                              style={spriteStyle(candidate.atlas, match.tile)}
+                            />
+                          ) : (
+                            <img src={match.signedImageUrl} alt={match.label} />
+                          )}
+                        </a>
                         <div className="result-info">
                           <h3>{match.label}</h3>
                           <p>Score: {match.score.toFixed(4)}</p>
@@ -225,10 +382,10 @@ export default function Home() {
             <div className="model-feedback">
               <p>Is this model correct?</p>
               <div className="model-feedback-actions">
-                <button type="button" onClick={() => handleModelFeedback(true)}>
+                <button type="button" onClick={() => void handleModelFeedback(true)}>
                   Yes
                 </button>
-                <button type="button" onClick={() => handleModelFeedback(false)}>
+                <button type="button" onClick={() => void handleModelFeedback(false)} disabled={isLoadingNext}>
                   No
                 </button>
               </div>